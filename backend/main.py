@@ -1,28 +1,25 @@
+import asyncio
+import os
 import random
+import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import requests
 
-try:
-    from bs4 import BeautifulSoup  # type: ignore[reportMissingModuleSource]
-except ImportError:
-    BeautifulSoup = None  # Optional dependency for ORSR scraping
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, status
 from services.audit_service import AuditService
-from fastapi import Request as FastAPIRequest
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr, Field
-from services.analytics import (
-    get_api_usage,
-    get_dashboard_summary,
-    get_risk_distribution,
-    get_search_trends,
-    get_user_activity,
-)
+from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
+from routers import analytics as analytics_router
+from routers import erp as erp_router
+from routers import exports as exports_router
+from routers import payments as payments_router
+from routers.deps import get_current_user, oauth2_scheme
+from services.analytics_rollup import run_analytics_aggregator
 from services.api_keys import (
     create_api_key,
+    flush_api_key_usage,
     get_api_key_stats,
     get_user_api_keys,
     revoke_api_key,
@@ -37,8 +34,14 @@ from services.auth import (
     get_user_by_email,
     get_user_tier_limits,
 )
-from services.cache import get, get_cache_key, set
+from services.auth_cache import (
+    get_auth_cache_stats,
+    revoke_token,
+    token_cache_key,
+)
+from services.cache import get_bytes, get_cache_key, set_bytes
 from services.cache import get_stats as get_cache_stats
+from services.columnar_export import run_columnar_export_worker
 from services.circuit_breaker import get_all_breakers, reset_breaker
 from services.database import (
     cleanup_expired_cache,
@@ -50,20 +53,8 @@ from services.database import (
     save_company_cache,
     save_search_history,
 )
-from services.debt_registers import search_debt_registers
-from services.erp.erp_service import (
-    activate_erp_connection,
-    create_erp_connection,
-    deactivate_erp_connection,
-    get_erp_sync_logs,
-    get_supplier_payment_history_from_erp,
-    get_user_erp_connections,
-    sync_erp_data,
-    test_erp_connection,
-)
-from services.erp.models import ErpType
 from services.error_handler import error_handler
-from services.export_service import export_batch_to_excel, export_to_excel
+from services.export_jobs import run_export_job_janitor, shutdown_export_pool
 from services.favorites import (
     add_favorite,
     get_user_favorites,
@@ -73,11 +64,11 @@ from services.favorites import (
 from services.favorites import (
     update_favorite_notes as update_favorite_notes_service,
 )
-from services.hu_nav import (
-    calculate_hu_risk_score,
-    fetch_nav_hu,
-    is_hungarian_tax_number,
-    parse_nav_data,
+from services.metering import (
+    get_quota_status,
+    get_usage_series,
+    rollup_usage,
+    run_metering_worker,
 )
 from services.metrics import (
     TimerContext,
@@ -86,16 +77,7 @@ from services.metrics import (
     increment,
     record_event,
 )
-from services.pl_biala_lista import (
-    get_vat_status_pl,
-    is_polish_nip,
-)
-from services.pl_krs import (
-    calculate_pl_risk_score,
-    fetch_krs_pl,
-    is_polish_krs,
-    parse_krs_data,
-)
+from services.provider_cache import MISS, get_provider_cache_stats, provider_cache
 from services.proxy_rotation import get_proxy_stats, init_proxy_pool
 from services.rate_limiter import (
     get_client_id,
@@ -103,34 +85,35 @@ from services.rate_limiter import (
 )
 from services.rate_limiter import get_stats as get_rate_limiter_stats
 
+logger = logging.getLogger(__name__)
+
 # Inicializácia služieb
 audit_service = AuditService()
 from services.risk_intelligence import (
     generate_risk_report,
 )
-from services.search_by_name import search_by_name
-from services.sk_orsr_provider import get_orsr_provider
-from services.graph_service import graph_service
-
-# Import nových služieb
-from services.sk_rpo import (
-    calculate_sk_risk_score,
-    fetch_rpo_sk,
-    is_slovak_ico,
-    parse_rpo_data,
-)
-from services.stripe_service import (
-    cancel_subscription,
-    create_checkout_session,
-    get_subscription_status,
-    handle_webhook,
+from services.registry import (
+    RegistryUnavailableError,
+    build_record_graph,
+    expand_record_graph,
+    get_registry_router,
+    record_to_graph,
 )
+from services.search_by_name import search_by_name
 from services.webhooks import (
     create_webhook,
     delete_webhook,
     get_user_webhooks,
     get_webhook_deliveries,
+    get_webhook_dispatcher_stats,
     get_webhook_stats,
+    requeue_dead_letters,
+    run_webhook_dispatcher,
+)
+from services.retention import run_retention_worker
+from services.watchlist import (
+    get_user_watchlist_changes,
+    run_watchlist_monitor,
 )
 
 app = FastAPI(
@@ -171,15 +154,60 @@ async def add_cors_headers(request: Request, call_next):
 app.add_exception_handler(Exception, error_handler)
 
 
+# Ťažšie background workery (backfilly, rollupy) štartujú s oneskorením,
+# aby prvé requesty po štarte/respawne workeru nesúperili o DB a CPU
+STARTUP_WORKER_DELAY_SECONDS = float(os.getenv("STARTUP_WORKER_DELAY_SECONDS", "5"))
+
+
+async def _deferred(worker, delay: float = STARTUP_WORKER_DELAY_SECONDS):
+    await asyncio.sleep(delay)
+    await worker()
+
+
 # Inicializovať databázu pri štarte
 @app.on_event("startup")
 async def startup_event():
-    """Inicializácia pri štarte aplikácie"""
-    init_database()
-    # Cleanup expirovaného cache pri štarte
-    cleanup_expired_cache()
+    """Inicializácia pri štarte aplikácie - blokujúce kroky nebežia v event loope"""
+    await asyncio.to_thread(init_database)
+    # Cleanup expirovaného cache na pozadí - štart naň nečaká
+    app.state.cache_cleanup_task = asyncio.create_task(asyncio.to_thread(cleanup_expired_cache))
     # Inicializovať proxy pool (ak sú proxy v env)
     init_proxy_pool()
+    # Metering rollup + flush API key počítadiel na pozadí
+    app.state.metering_task = asyncio.create_task(run_metering_worker())
+    # Analytics rollupy pre dashboard na pozadí
+    app.state.analytics_task = asyncio.create_task(_deferred(run_analytics_aggregator))
+    # Denný Parquet export analytics tabuliek
+    app.state.columnar_export_task = asyncio.create_task(_deferred(run_columnar_export_worker))
+    # Doručovanie webhookov z outboxu
+    app.state.webhook_task = asyncio.create_task(run_webhook_dispatcher())
+    # Export joby: obnova po reštarte + expirácia výsledkov
+    app.state.export_jobs_task = asyncio.create_task(run_export_job_janitor())
+    # Watchlist: kontrola zmien obľúbených firiem voči registrom
+    app.state.watchlist_task = asyncio.create_task(_deferred(run_watchlist_monitor))
+    # Rollover mesačných partícií a retention search_history/analytics
+    app.state.retention_task = asyncio.create_task(_deferred(run_retention_worker))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Zapíše bufferované dáta pred ukončením procesu"""
+    for name in (
+        "cache_cleanup_task",
+        "metering_task",
+        "analytics_task",
+        "columnar_export_task",
+        "webhook_task",
+        "export_jobs_task",
+        "watchlist_task",
+        "retention_task",
+    ):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    shutdown_export_pool()
+    rollup_usage()
+    flush_api_key_usage()
 
 
 # --- KONFIGURÁCIA CORS (Prepojenie s Frontendom) ---
@@ -200,15 +228,7 @@ origins = [
     "https://pro.icoatlas.sk",
 ]
 
-# --- CORS DEBUGGING ---
-print("🔧 CORS Configuration Debug:")
-print(f"   Origins configured: {len(origins)}")
-for i, origin in enumerate(origins):
-    print(f"   [{i+1}] {origin}")
-print(f"   Allow credentials: True")
-print(f"   Allow methods: *")
-print(f"   Allow headers: *")
-print(f"   Expose headers: *")
+logger.debug(f"CORS origins ({len(origins)}): {', '.join(origins)}")
 
 app.add_middleware(
     CORSMiddleware,
@@ -219,6 +239,12 @@ app.add_middleware(
     expose_headers=["*"],  # Expose all headers for debugging
 )
 
+# Routery s ťažkými závislosťami (export, analytics, ERP, platby)
+app.include_router(exports_router.router)
+app.include_router(erp_router.router)
+app.include_router(analytics_router.router)
+app.include_router(payments_router.router)
+
 
 # --- DÁTOVÉ MODELY (Podľa sekcie 3: Dátový Model) ---
 class Node(BaseModel):
@@ -243,6 +269,21 @@ class GraphResponse(BaseModel):
     edges: List[Edge]
 
 
+# Validátor/serializér grafu sa zostaví raz (pydantic-core), nie pri každom requeste
+graph_adapter = TypeAdapter(GraphResponse)
+
+
+def graph_json_response(graph: GraphResponse, cache_key: Optional[str] = None) -> Response:
+    """
+    Serializuje graf raz do JSON bajtov - rovnaké bajty idú do cache aj klientovi,
+    cache hit ich vráti bez validácie a opätovnej serializácie.
+    """
+    payload = graph_adapter.dump_json(graph)
+    if cache_key:
+        set_bytes(cache_key, payload)
+    return Response(content=payload, media_type="application/json")
+
+
 # Auth Models
 class UserRegister(BaseModel):
     email: EmailStr
@@ -276,196 +317,6 @@ class UserResponse(BaseModel):
     is_verified: bool
 
 
-# OAuth2
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
-
-def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
-    """Získa aktuálneho používateľa z tokenu"""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    email: Optional[str] = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    with get_db_session() as db:
-        if db is None:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
-        user = get_user_by_email(db, email)
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        # Expunge user from session to avoid DetachedInstanceError label
-        db.expunge(user)
-        return user
-
-
-# --- SLUŽBY (ARES INTEGRÁCIA) ---
-def fetch_ares_cz(query: str):
-    """
-    Získa dáta z českého registra ARES.
-    """
-    url = (
-        "https://ares.gov.cz/ekonomicke-subjekty-v-be/rest/ekonomicke-subjekty/vyhledat"
-    )
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "pocet": 5,  # Limit pre MVP
-        "razeni": []
-    }
-    
-    if query.isdigit():
-        payload["ico"] = [query]
-    else:
-        payload["obchodniJmeno"] = query
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=5)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Chyba pri volaní ARES: {e}")
-        return {"ekonomickeSubjekty": []}
-
-
-def calculate_trust_score(company_data: Dict, country: str = "CZ") -> int:
-    """
-    Vypočíta rizikové skóre firmy (0-10, kde 10 je max riziko).
-    Bázované na: dph status, dlhy, status firmy, virtuálne sídlo.
-    """
-    score = 3  # Základ: Neutrálne
-    
-    # 1. Status firmy
-    status = str(company_data.get("status", "")).lower()
-    if any(k in status for k in ["likvidácia", "konkurz", "zaniknutá", "likvidace", "insolvence"]):
-        score += 5
-    
-    # 2. DPH Status (ak vieme detekovať)
-    if not company_data.get("dic") and not company_data.get("ic_dph") and country == "SK":
-        # Ak nemá ani DIČ ani IČ DPH v SK, je to mierne podozrivé pre MVP
-        score += 1
-        
-    # 3. Virtuálne sídlo (heuristika na základe adresy)
-    address = str(company_data.get("address", "")).lower()
-    virtual_patterns = ["p.o.box", "pobox", "virtualne", "virtuální", "coworking"]
-    if any(p in address for p in virtual_patterns):
-        score += 3
-
-    return min(score, 10)
-
-
-def _scrape_orsr_sk(ico: str) -> Optional[Dict]:
-    """
-    Scrapuje dáta z ORSR.sk (Obchodný register SR).
-
-    Args:
-        ico: 8-miestne slovenské IČO
-
-    Returns:
-        Dict s dátami firmy alebo None pri chybe
-    """
-    if not BeautifulSoup:
-        return None  # BeautifulSoup nie je nainštalovaný
-
-    try:
-        # ORSR.sk URL            # 1. Vyhľadávanie podľa IČO - Použiť správny endpoint hladaj_ico.asp
-        search_url = f"https://www.orsr.sk/hladaj_ico.asp?ICO={ico}&SID=0"
-        response = requests.get(search_url, timeout=10)
-
-        if response.status_code == 200:
-            # Parsovať HTML a extrahovať dáta
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Hľadať odkaz na detail firmy
-            detail_link = soup.find("a", href=lambda x: x and "vypis.asp?ID=" in x)  # type: ignore[arg-type]
-            if detail_link and hasattr(detail_link, "get"):
-                href = detail_link.get("href", "")  # type: ignore[attr-defined]
-                if href and isinstance(href, str):
-                    detail_id = href.split("ID=")[1].split("&")[0]
-                detail_url = f"https://www.orsr.sk/vypis.asp?ID={detail_id}&SID=2&P=0"
-
-                detail_response = requests.get(detail_url, headers=headers, timeout=10)
-                if detail_response.status_code == 200:
-                    detail_soup = BeautifulSoup(detail_response.text, "html.parser")
-
-                    # Extrahovať dáta z tabuliek
-                    data = {}
-
-                    # Názov firmy
-                    name_elem = detail_soup.find(
-                        "td",
-                        string=lambda x: x and "Obchodné meno:" in str(x),  # type: ignore[arg-type]
-                    )
-                    if name_elem:
-                        name_row = name_elem.find_next_sibling("td")
-                        if name_row:
-                            data["name"] = (
-                                name_row.get_text(strip=True).split("(")[0].strip()
-                            )
-
-                    # Adresa
-                    address_elem = detail_soup.find(
-                        "td",
-                        string=lambda x: x and "Sídlo:" in str(x),  # type: ignore[arg-type]
-                    )
-                    if address_elem:
-                        address_row = address_elem.find_next_sibling("td")
-                        if address_row:
-                            data["address"] = address_row.get_text(strip=True)
-
-                    # Konateľ
-                    exec_elem = detail_soup.find(
-                        "td",
-                        string=lambda x: x and "štatutárny orgán:" in str(x),  # type: ignore[arg-type]
-                    )
-                    if exec_elem:
-                        exec_row = exec_elem.find_next_sibling("td")
-                        if exec_row:
-                            exec_link = exec_row.find("a")
-                            if exec_link and hasattr(exec_link, "get_text"):
-                                data["executive"] = exec_link.get_text(strip=True)  # type: ignore[attr-defined]
-
-                    # Právna forma
-                    form_elem = detail_soup.find(
-                        "td",
-                        string=lambda x: x and "Právna forma:" in str(x),  # type: ignore[arg-type]
-                    )
-                    if form_elem:
-                        form_row = form_elem.find_next_sibling("td")
-                        if form_row:
-                            data["legal_form"] = form_row.get_text(strip=True)
-
-                    # Risk score
-                    risk_score = 3
-                    if data.get("name"):
-                        risk_score = 2  # Nižšie riziko ak máme reálne dáta
-
-                    data["risk_score"] = risk_score
-                    data["details"] = f"Forma: {data.get('legal_form', 'N/A')}"
-
-                    return data if data.get("name") else None
-
-        return None
-    except Exception as e:
-        print(f"❌ Chyba pri scraping ORSR.sk: {e}")
-        return None
-
-
 # --- ENDPOINTY ---
 
 
@@ -508,9 +359,12 @@ def read_root():
             "auth": "/api/auth",
             "enterprise": "/api/enterprise",
             "analytics": "/api/analytics",
+            "risk_batch_screen": "/api/risk/batch-screen",
             "export": {
                 "excel": "/api/export/excel",
                 "batch_excel": "/api/export/batch-excel",
+                "batch": "/api/export/batch?format=xlsx|csv|ndjson",
+                "favorites": "/api/export/favorites?format=xlsx|csv|ndjson",
             },
         },
         "supported_formats": ["JSON", "CSV", "PDF", "Excel (XLSX)"],
@@ -526,7 +380,13 @@ def read_root():
 @app.get("/api/cache/stats")
 def cache_stats():
     """Vráti štatistiky cache."""
-    return get_cache_stats()
+    from services.pdf_export_service import get_pdf_cache_stats
+
+    stats = get_cache_stats()
+    stats["auth"] = get_auth_cache_stats()
+    stats["pdf"] = get_pdf_cache_stats()
+    stats["providers"] = get_provider_cache_stats()
+    return stats
 
 
 @app.get("/api/rate-limiter/stats")
@@ -535,6 +395,12 @@ async def rate_limiter_stats():
     return get_rate_limiter_stats()
 
 
+@app.get("/api/webhooks/stats")
+async def webhook_dispatcher_stats():
+    """Vráti štatistiky doručovania webhookov"""
+    return get_webhook_dispatcher_stats()
+
+
 @app.get("/api/database/stats")
 async def database_stats():
     """Vráti štatistiky databázy"""
@@ -715,74 +581,59 @@ async def update_favorite_notes(
         return {"success": True, "favorite": favorite.to_dict()}
 
 
-# --- EXPORT ENDPOINTY ---
-
-
-@app.post("/api/export/excel")
-async def export_search_results_to_excel(
-    graph_data: Dict,
-    current_user: Optional[User] = Depends(get_current_user),
+@app.get("/api/user/watchlist/changes")
+async def get_watchlist_changes(
+    limit: int = 50,
+    since: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
 ):
     """
-    Exportuje výsledky vyhľadávania do Excel (xlsx) formátu.
-
-    Body:
-        Dict: Grafové dáta (nodes, edges) - GraphResponse formát
-
-    Returns:
-        Excel súbor (application/vnd.openxmlformats-officedocument.spreadsheetml.sheet)
+    Zmeny obľúbených firiem zistené watchlist monitoringom (najnovšie prvé)
     """
-    try:
-        excel_bytes = export_to_excel(graph_data)
-        filename = f"iluminati-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.xlsx"
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
 
-        return Response(
-            content=excel_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
-    except ImportError as e:
-        raise HTTPException(
-            status_code=503, detail=f"Excel export nie je dostupný: {str(e)}"
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Chyba pri exporte do Excel: {str(e)}"
+        changes = get_user_watchlist_changes(
+            db=db, user_id=int(current_user.id), limit=min(max(limit, 1), 500), since=since  # type: ignore[arg-type]
         )
+        return {
+            "success": True,
+            "changes": [c.to_dict() for c in changes],
+            "count": len(changes),
+        }
 
 
-@app.post("/api/export/batch-excel")
-async def export_batch_companies_to_excel(
+@app.post("/api/risk/batch-screen")
+async def batch_risk_screen(
     companies: List[Dict],
     current_user: User = Depends(get_current_user),
 ):
     """
-    Exportuje batch firiem do Excel (xlsx) formátu.
+    Vektorizovaný risk screening batchu firiem - registrové skóre (SK/PL/HU),
+    histogram 0-10 a súhrn podľa krajín a právnych foriem.
 
     Body:
-        List[Dict]: Zoznam firiem (každá firma obsahuje company_data, risk_score, notes, atď.)
-
-    Returns:
-        Excel súbor (application/vnd.openxmlformats-officedocument.spreadsheetml.sheet)
+        List[Dict]: Zoznam firiem (company_data, priamo dict firmy alebo len
+        {"identifier", "country"} - doplní sa z registrov cez registry router)
     """
     try:
-        excel_bytes = export_batch_to_excel(companies)
-        filename = (
-            f"iluminati-batch-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.xlsx"
-        )
+        # numpy sa načíta až pri prvom screeningu
+        from services.company_batch import screen_companies
 
-        return Response(
-            content=excel_bytes,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
+        companies = await get_registry_router().resolve_references(companies)
+        result = await asyncio.to_thread(screen_companies, companies)
+        return {"success": True, "data": result}
     except ImportError as e:
         raise HTTPException(
-            status_code=503, detail=f"Excel export nie je dostupný: {str(e)}"
+            status_code=503, detail=f"Batch screening nie je dostupný: {str(e)}"
         )
     except Exception as e:
         raise HTTPException(
-            status_code=500, detail=f"Chyba pri exporte do Excel: {str(e)}"
+            status_code=500, detail=f"Chyba pri batch screeningu: {str(e)}"
         )
 
 
@@ -900,6 +751,23 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
 
 
+@app.post("/api/auth/logout")
+async def logout(token: str = Depends(oauth2_scheme)):
+    """Logout - odvolá token a zahodí ho z auth cache"""
+    payload = decode_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    exp = payload.get("exp")
+    expires_at = datetime.utcfromtimestamp(exp) if exp else None
+    revoke_token(token_cache_key(token, payload), expires_at)
+    return {"success": True, "message": "Logged out"}
+
+
 @app.get("/api/auth/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Získa informácie o aktuálnom používateľovi"""
@@ -933,6 +801,9 @@ class ApiKeyCreate(BaseModel):
     ip_whitelist: Optional[List[str]] = Field(
         None, description="Zoznam povolených IP adries"
     )
+    daily_quota: Optional[int] = Field(
+        None, description="Max počet requestov za deň (None = default)"
+    )
 
 
 @app.post("/api/enterprise/keys")
@@ -963,6 +834,7 @@ async def generate_api_key_endpoint(
             expires_days=key_data.expires_days,
             permissions=key_data.permissions,
             ip_whitelist=key_data.ip_whitelist,
+            daily_quota=key_data.daily_quota,
         )
 
         return {
@@ -1056,10 +928,17 @@ async def revoke_api_key_endpoint(
 
 @app.get("/api/enterprise/usage/{key_id}")
 async def get_api_key_usage(
-    key_id: int, current_user: User = Depends(get_current_user)
+    key_id: int,
+    granularity: str = "hour",
+    days: int = 1,
+    current_user: User = Depends(get_current_user),
 ):
     """
     Získať štatistiky použitia API key (len Enterprise tier)
+
+    Args:
+        granularity: minute, hour, day (default: hour)
+        days: Počet dní späť pre časový rad (default: 1)
     """
     if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
         raise HTTPException(
@@ -1067,6 +946,12 @@ async def get_api_key_usage(
             detail="API keys are only available for Enterprise tier",
         )
 
+    if granularity not in ("minute", "hour", "day"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="granularity must be one of: minute, hour, day",
+        )
+
     with get_db_session() as db:
         if not db:
             raise HTTPException(
@@ -1082,7 +967,50 @@ async def get_api_key_usage(
                 detail="API key not found or does not belong to user",
             )
 
-        return {"success": True, "stats": stats}
+        series = get_usage_series(
+            db,
+            key_id,
+            granularity=granularity,
+            since=datetime.utcnow() - timedelta(days=days),
+        )
+
+        return {
+            "success": True,
+            "stats": stats,
+            "usage": {"granularity": granularity, "series": series},
+            "quota": get_quota_status(key_id, stats.get("daily_quota")),
+        }
+
+
+@app.get("/api/enterprise/quota/{key_id}")
+async def get_api_key_quota(
+    key_id: int, current_user: User = Depends(get_current_user)
+):
+    """
+    Získať stav dennej kvóty API key (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="API keys are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        stats = get_api_key_stats(db, key_id, current_user.id)  # type: ignore[arg-type]
+
+        if not stats:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="API key not found or does not belong to user",
+            )
+
+    return {"success": True, "quota": get_quota_status(key_id, stats.get("daily_quota"))}
 
 
 # --- WEBHOOKS ENDPOINTS ---
@@ -1094,6 +1022,9 @@ class WebhookCreate(BaseModel):
     secret: Optional[str] = Field(
         None, description="Optional secret (will be generated if not provided)"
     )
+    max_batch_size: int = Field(
+        1, ge=1, le=100, description="Max events per delivery request (1 = no batching)"
+    )
 
 
 @app.post("/api/enterprise/webhooks")
@@ -1122,6 +1053,7 @@ async def create_webhook_endpoint(
             url=webhook_data.url,
             events=webhook_data.events,
             secret=webhook_data.secret,
+            max_batch_size=webhook_data.max_batch_size,
         )
 
         return {
@@ -1274,46 +1206,17 @@ async def get_webhook_logs(
         return {"success": True, "logs": result, "count": len(result)}
 
 
-# --- ERP INTEGRATION ENDPOINTS ---
-
-
-class ErpConnectionCreate(BaseModel):
-    erp_type: str = Field(..., description="Typ ERP systému: sap, pohoda, money_s3")
-    connection_data: Dict = Field(
-        ..., description="Connection credentials (API keys, URLs, etc.)"
-    )
-    sync_frequency: Optional[str] = Field(
-        default="daily", description="Sync frequency: daily, weekly, manual"
-    )
-
-
-@app.post("/api/enterprise/erp/connect")
-async def create_erp_connection_endpoint(
-    erp_data: ErpConnectionCreate, current_user: User = Depends(get_current_user)
+@app.post("/api/enterprise/webhooks/{webhook_id}/redeliver")
+async def redeliver_webhook_dead_letters(
+    webhook_id: int, current_user: User = Depends(get_current_user)
 ):
     """
-    Vytvoriť nové ERP pripojenie (len Enterprise tier)
+    Vrátiť nedoručené (dead-letter) eventy webhooku späť do fronty (len Enterprise tier)
     """
     if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
-
-    try:
-        erp_type = ErpType(erp_data.erp_type.lower())
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid ERP type: {erp_data.erp_type}. Must be: sap, pohoda, money_s3",
-        )
-
-    # Test pripojenia pred vytvorením
-    test_result = test_erp_connection(erp_type, erp_data.connection_data)
-    if not test_result.get("success"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Connection test failed: {test_result.get('message', 'Unknown error')}",
+            detail="Webhooks are only available for Enterprise tier",
         )
 
     with get_db_session() as db:
@@ -1323,647 +1226,79 @@ async def create_erp_connection_endpoint(
                 detail="Database not available",
             )
 
-        connection = create_erp_connection(
-            db=db,
-            user_id=current_user.id,  # type: ignore[arg-type]
-            erp_type=erp_type,
-            connection_data=erp_data.connection_data,
-        )
+        requeued = requeue_dead_letters(db, webhook_id, current_user.id)  # type: ignore[arg-type]
+        return {"success": True, "requeued": requeued}
 
-        # Nastaviť sync frequency
-        connection.sync_frequency = erp_data.sync_frequency  # type: ignore[assignment]
 
-        # Aktivovať pripojenie
-        if activate_erp_connection(db, connection.id, current_user.id):  # type: ignore[arg-type,assignment]
-            db.refresh(connection)
-            return {
-                "success": True,
-                "message": "ERP connection created and activated",
-                "data": connection.to_dict(),
-            }
-        else:
-            return {
-                "success": True,
-                "message": "ERP connection created but activation failed",
-                "data": connection.to_dict(),
-                "warning": "Please check your credentials",
-            }
+@app.get("/api/health")
+def health_check():
+    """Health check endpoint."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "cache": get_cache_stats(),
+        "features": {
+            "cz_ares": True,
+            "sk_rpo": True,
+            "pl_krs": True,
+            "hu_nav": True,
+            "risk_intelligence": True,
+            "cache": True,
+            "database": get_database_stats().get("available", False),
+        },
+    }
 
 
-@app.get("/api/enterprise/erp/connections")
-async def list_erp_connections_endpoint(current_user: User = Depends(get_current_user)):
+@app.get("/api/search", response_model=GraphResponse, tags=["Search"])
+async def search_company(
+    q: str,
+    country: Optional[str] = None,
+    force_refresh: bool = False,
+    graph: int = 0,
+    request: Request = None,  # type: ignore[assignment]
+    response_model_examples={
+        "slovak_ico": {"summary": "Slovak IČO search", "value": {"q": "88888888"}},
+        "czech_ico": {"summary": "Czech IČO search", "value": {"q": "27074358"}},
+        "polish_krs": {"summary": "Polish KRS search", "value": {"q": "123456789"}},
+    },
+):
+    """
+    CORS Debug: Check if CORS headers are being set correctly
     """
-    Získať zoznam všetkých ERP pripojení (len Enterprise tier)
+    print(f"🔍 API Search Request Debug:")
+    print(f"   Query: {q}")
+    print(f"   Country: {country}")
+    print(f"   Force refresh: {force_refresh}")
+    print(f"   Client IP: {request.client.host if request and request.client else 'Unknown'}")
+    print(f"   User-Agent: {request.headers.get('User-Agent', 'Unknown')}")
+    print(f"   Origin: {request.headers.get('Origin', 'Unknown')}")
+    print(f"   Referer: {request.headers.get('Referer', 'Unknown')}")
     """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
+    Orchestrátor vyhľadávania s podporou V4 krajín (SK, CZ, PL, HU).
 
-    with get_db_session() as db:
-        if not db:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
+    Registry router (services/registry) vyberie registre podľa tvaru
+    identifikátora a krajiny (kontrolná číslica, cena volania):
+    - CZ: 8-miestne IČO → ARES (najlacnejší, skúša sa prvý)
+    - SK: 8-miestne IČO → RPO (Register právnych osôb) alebo ORSR scraping
+    - HU: 8 alebo 11-miestny adószám → NAV
+    - PL: 9-10 miestne KRS → KRS + Biała Lista
 
-        connections = get_user_erp_connections(db, current_user.id)  # type: ignore[arg-type]
+    Pre textové vyhľadávanie (názov firmy) používa lokálnu DB, potom registre
+    s vyhľadávaním podľa mena (ARES).
 
-        result = [conn.to_dict() for conn in connections]
+    Returns:
+        GraphResponse: Graf s nodes (firmy, osoby, adresy) a edges (vzťahy)
+    """
+    # Metrics - začať timer
+    with TimerContext("search.duration"):
+        increment("search.requests")
 
-        return {"success": True, "connections": result, "count": len(result)}
+        # Najprv vyčistíme query pre rate limiting
+        query_clean = q.strip()
 
-
-@app.post("/api/enterprise/erp/{connection_id}/activate")
-async def activate_erp_connection_endpoint(
-    connection_id: int, current_user: User = Depends(get_current_user)
-):
-    """
-    Aktivovať ERP pripojenie (len Enterprise tier)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
-
-    with get_db_session() as db:
-        if not db:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
-
-        success = activate_erp_connection(db, connection_id, current_user.id)  # type: ignore[arg-type]
-
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Failed to activate connection. Please check your credentials.",
-            )
-
-        return {"success": True, "message": "ERP connection activated successfully"}
-
-
-@app.post("/api/enterprise/erp/{connection_id}/deactivate")
-async def deactivate_erp_connection_endpoint(
-    connection_id: int, current_user: User = Depends(get_current_user)
-):
-    """
-    Deaktivovať ERP pripojenie (len Enterprise tier)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
-
-    with get_db_session() as db:
-        if not db:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
-
-        success = deactivate_erp_connection(db, connection_id, current_user.id)  # type: ignore[arg-type]
-
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Connection not found"
-            )
-
-        return {"success": True, "message": "ERP connection deactivated successfully"}
-
-
-@app.post("/api/enterprise/erp/{connection_id}/sync")
-async def sync_erp_data_endpoint(
-    connection_id: int,
-    sync_type: str = "incremental",
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Synchronizovať dáta z ERP (len Enterprise tier)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
-
-    with get_db_session() as db:
-        if not db:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
-
-        result = sync_erp_data(db, connection_id, current_user.id, sync_type)  # type: ignore[arg-type]
-
-        if not result.get("success"):
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=result.get("message", "Sync failed"),
-            )
-
-        return result
-
-
-@app.get("/api/enterprise/erp/{connection_id}/logs")
-async def get_erp_sync_logs_endpoint(
-    connection_id: int, limit: int = 50, current_user: User = Depends(get_current_user)
-):
-    """
-    Získať logy synchronizácií ERP (len Enterprise tier)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
-
-    with get_db_session() as db:
-        if not db:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
-
-        logs = get_erp_sync_logs(db, connection_id, current_user.id, limit)  # type: ignore[arg-type]
-
-        result = [log.to_dict() for log in logs]
-
-        return {"success": True, "logs": result, "count": len(result)}
-
-
-@app.get("/api/enterprise/erp/{connection_id}/supplier/{supplier_ico}/payments")
-async def get_supplier_payments_endpoint(
-    connection_id: int,
-    supplier_ico: str,
-    days: int = 365,
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Získať históriu platieb dodávateľa z ERP (len Enterprise tier)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="ERP integrations are only available for Enterprise tier",
-        )
-
-    with get_db_session() as db:
-        if not db:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Database not available",
-            )
-
-        payments = get_supplier_payment_history_from_erp(
-            db,
-            connection_id,
-            current_user.id,  # type: ignore[arg-type]
-            supplier_ico,
-            days,
-        )
-
-        return {
-            "success": True,
-            "supplier_ico": supplier_ico,
-            "payments": payments,
-            "count": len(payments),
-        }
-
-
-# --- ANALYTICS ENDPOINTY ---
-
-
-@app.get("/api/analytics/dashboard")
-async def get_analytics_dashboard(
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Získať kompletný analytics dashboard (len Enterprise tier)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Analytics dashboard is only available for Enterprise tier",
-        )
-
-    try:
-        summary = get_dashboard_summary()
-        return {"success": True, "data": summary}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching analytics: {str(e)}",
-        )
-
-
-@app.get("/api/analytics/search-trends")
-async def get_analytics_search_trends(
-    days: int = 30,
-    group_by: str = "day",
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Získať trendy vyhľadávaní (len Enterprise tier)
-
-    Args:
-        days: Počet dní späť (default: 30)
-        group_by: Agregácia - day, week, month (default: day)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Analytics are only available for Enterprise tier",
-        )
-
-    try:
-        trends = get_search_trends(
-            days=days,
-            group_by=group_by,
-            user_id=current_user.id,  # type: ignore[arg-type]
-        )
-        return {"success": True, "data": trends}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching search trends: {str(e)}",
-        )
-
-
-@app.get("/api/analytics/risk-distribution")
-async def get_analytics_risk_distribution(
-    days: int = 30,
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Získať distribúciu risk skóre (len Enterprise tier)
-
-    Args:
-        days: Počet dní späť (default: 30)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Analytics are only available for Enterprise tier",
-        )
-
-    try:
-        distribution = get_risk_distribution(days=days, user_id=current_user.id)  # type: ignore[arg-type]
-        return {"success": True, "data": distribution}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching risk distribution: {str(e)}",
-        )
-
-
-@app.get("/api/analytics/user-activity")
-async def get_analytics_user_activity(
-    days: int = 30,
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Získať aktivitu používateľov (len Enterprise tier)
-
-    Args:
-        days: Počet dní späť (default: 30)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Analytics are only available for Enterprise tier",
-        )
-
-    try:
-        activity = get_user_activity(days=days)
-        return {"success": True, "data": activity}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching user activity: {str(e)}",
-        )
-
-
-@app.get("/api/analytics/api-usage")
-async def get_analytics_api_usage(
-    days: int = 30,
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Získať štatistiky API použitia (len Enterprise tier)
-
-    Args:
-        days: Počet dní späť (default: 30)
-    """
-    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Analytics are only available for Enterprise tier",
-        )
-
-    try:
-        usage = get_api_usage(days=days)
-        return {"success": True, "data": usage}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching API usage: {str(e)}",
-        )
-
-
-# --- STRIPE ENDPOINTY ---
-
-
-@app.post("/api/payment/checkout")
-async def create_payment_checkout(
-    tier: str, current_user: User = Depends(get_current_user)
-):
-    """Vytvorí Stripe checkout session pre upgrade tieru"""
-    try:
-        user_tier = UserTier(tier.lower())
-        if user_tier == UserTier.FREE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot upgrade to FREE tier",
-            )
-
-        result = create_checkout_session(
-            user_id=current_user.id,  # type: ignore[arg-type]
-            user_email=current_user.email,  # type: ignore[arg-type]
-            tier=user_tier,
-        )
-
-        if "error" in result:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=result["error"],
-            )
-
-        return result
-    except ValueError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid tier: {tier}"
-        )
-
-
-@app.post("/api/payment/webhook")
-async def stripe_webhook(request: FastAPIRequest):
-    """Stripe webhook endpoint pre subscription events"""
-    payload = await request.body()
-    signature = request.headers.get("stripe-signature")
-
-    if not signature:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Missing stripe-signature header",
-        )
-
-    result = handle_webhook(payload, signature)
-
-    if "error" in result:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=result["error"]
-        )
-
-    return result
-
-
-@app.get("/api/payment/subscription")
-async def get_subscription(current_user: User = Depends(get_current_user)):
-    """Získa subscription status používateľa"""
-    result = get_subscription_status(current_user.email)  # type: ignore[arg-type]
-
-    if result is None:
-        return {"status": "no_subscription", "tier": current_user.tier.value}
-
-    return result
-
-
-@app.post("/api/payment/cancel")
-async def cancel_user_subscription(current_user: User = Depends(get_current_user)):
-    """Zruší subscription používateľa"""
-    result = cancel_subscription(current_user.email)  # type: ignore[arg-type]
-
-    if "error" in result:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=result["error"]
-        )
-
-    return result
-
-
-@app.get("/api/health")
-def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "cache": get_cache_stats(),
-        "features": {
-            "cz_ares": True,
-            "sk_rpo": True,
-            "pl_krs": True,
-            "hu_nav": True,
-            "risk_intelligence": True,
-            "cache": True,
-            "database": get_database_stats().get("available", False),
-        },
-    }
-
-
-def generate_test_data_sk(ico: str):
-    """
-    Generuje testovacie dáta pre slovenské IČO 88888888.
-    Simuluje komplexnú štruktúru s viacerými firmami, osobami a vzťahmi.
-    """
-    nodes = []
-    edges = []
-
-    # Hlavná firma
-    main_company_id = f"sk_{ico}"
-    nodes.append(
-        Node(
-            id=main_company_id,
-            label="Testovacia Spoločnosť s.r.o.",
-            type="company",
-            country="SK",
-            risk_score=7,  # Vysoké riziko pre test
-            details=f"IČO: {ico}, Status: Aktívna, DPH: Áno",
-        )
-    )
-
-    # Adresa hlavnej firmy
-    main_address_id = f"addr_{ico}_main"
-    nodes.append(
-        Node(
-            id=main_address_id,
-            label="Bratislava, Hlavná 1",
-            type="address",
-            country="SK",
-            risk_score=3,  # Virtual seat flag
-            details="Hlavná 1, 811 01 Bratislava (Virtual Seat - 52 firiem na adrese)",
-        )
-    )
-    edges.append(
-        Edge(source=main_company_id, target=main_address_id, type="LOCATED_AT")
-    )
-
-    # Konateľ 1
-    person1_id = f"pers_{ico}_1"
-    nodes.append(
-        Node(
-            id=person1_id,
-            label="Ján Novák",
-            type="person",
-            country="SK",
-            risk_score=5,
-            details="Konateľ, 15+ firiem v registri",
-        )
-    )
-    edges.append(Edge(source=main_company_id, target=person1_id, type="MANAGED_BY"))
-
-    # Konateľ 2
-    person2_id = f"pers_{ico}_2"
-    nodes.append(
-        Node(
-            id=person2_id,
-            label="Peter Horváth",
-            type="person",
-            country="SK",
-            risk_score=4,
-            details="Spoločník, 8% podiel",
-        )
-    )
-    edges.append(Edge(source=main_company_id, target=person2_id, type="OWNED_BY"))
-
-    # Dcérska spoločnosť 1 (CZ)
-    daughter1_id = "cz_12345678"
-    nodes.append(
-        Node(
-            id=daughter1_id,
-            label="Dcérska Firma CZ s.r.o.",
-            type="company",
-            country="CZ",
-            risk_score=6,
-            details="IČO: 12345678, Vlastníctvo: 100%",
-        )
-    )
-    edges.append(Edge(source=main_company_id, target=daughter1_id, type="OWNED_BY"))
-
-    # Dcérska spoločnosť 2 (SK)
-    daughter2_id = "sk_77777777"
-    nodes.append(
-        Node(
-            id=daughter2_id,
-            label="Sesterská Spoločnosť s.r.o.",
-            type="company",
-            country="SK",
-            risk_score=8,
-            details="IČO: 77777777, Status: Likvidácia, Dlh: 15,000 EUR",
-        )
-    )
-    edges.append(Edge(source=main_company_id, target=daughter2_id, type="OWNED_BY"))
-
-    # Adresa dcérskej spoločnosti 2
-    daughter2_address_id = "addr_77777777"
-    nodes.append(
-        Node(
-            id=daughter2_address_id,
-            label="Košice, Mierová 5",
-            type="address",
-            country="SK",
-            risk_score=0,
-            details="Mierová 5, 040 01 Košice",
-        )
-    )
-    edges.append(
-        Edge(source=daughter2_id, target=daughter2_address_id, type="LOCATED_AT")
-    )
-
-    # Spoločný konateľ medzi firmami
-    shared_person_id = f"pers_{ico}_shared"
-    nodes.append(
-        Node(
-            id=shared_person_id,
-            label="Mária Kováčová",
-            type="person",
-            country="SK",
-            risk_score=6,
-            details="Konateľ v 12+ firmách (White Horse Detector)",
-        )
-    )
-    edges.append(Edge(source=daughter2_id, target=shared_person_id, type="MANAGED_BY"))
-    edges.append(Edge(source=daughter1_id, target=shared_person_id, type="MANAGED_BY"))
-
-    # Dlhová väzba
-    debt_id = f"debt_{ico}"
-    nodes.append(
-        Node(
-            id=debt_id,
-            label="Dlh Finančnej správe",
-            type="debt",
-            country="SK",
-            risk_score=9,
-            details="Dlh: 25,000 EUR, Finančná správa SR",
-        )
-    )
-    edges.append(Edge(source=main_company_id, target=debt_id, type="HAS_DEBT"))
-
-    return nodes, edges
-
-
-@app.get("/api/search", response_model=GraphResponse, tags=["Search"])
-async def search_company(
-    q: str,
-    country: Optional[str] = None,
-    force_refresh: bool = False,
-    graph: int = 0,
-    request: Request = None,  # type: ignore[assignment]
-    response_model_examples={
-        "slovak_ico": {"summary": "Slovak IČO search", "value": {"q": "88888888"}},
-        "czech_ico": {"summary": "Czech IČO search", "value": {"q": "27074358"}},
-        "polish_krs": {"summary": "Polish KRS search", "value": {"q": "123456789"}},
-    },
-):
-    """
-    CORS Debug: Check if CORS headers are being set correctly
-    """
-    print(f"🔍 API Search Request Debug:")
-    print(f"   Query: {q}")
-    print(f"   Country: {country}")
-    print(f"   Force refresh: {force_refresh}")
-    print(f"   Client IP: {request.client.host if request and request.client else 'Unknown'}")
-    print(f"   User-Agent: {request.headers.get('User-Agent', 'Unknown')}")
-    print(f"   Origin: {request.headers.get('Origin', 'Unknown')}")
-    print(f"   Referer: {request.headers.get('Referer', 'Unknown')}")
-    """
-    Orchestrátor vyhľadávania s podporou V4 krajín (SK, CZ, PL, HU).
-
-    Automaticky detekuje typ identifikátora a routuje na príslušný register:
-    - SK: 8-miestne IČO → RPO (Register právnych osôb) alebo ORSR scraping
-    - CZ: 8-9 miestne IČO → ARES
-    - PL: KRS alebo CEIDG → KRS/CEIDG
-    - HU: 8-11 miestny adószám → NAV
-
-    Pre textové vyhľadávanie (názov firmy) používa lokálnu DB (nie live scraping).
-
-    Returns:
-        GraphResponse: Graf s nodes (firmy, osoby, adresy) a edges (vzťahy)
-    """
-    # Metrics - začať timer
-    with TimerContext("search.duration"):
-        increment("search.requests")
-
-        # Najprv vyčistíme query pre rate limiting
-        query_clean = q.strip()
-
-        # Rate limiting - použijeme vyšší tier pre testy
-        if request:
-            client_id = get_client_id(request)
+        # Rate limiting - použijeme vyšší tier pre testy
+        if request:
+            client_id = get_client_id(request)
 
             # Detekcia test requestov - použijeme pro tier
             is_test_request = (
@@ -2013,8 +1348,9 @@ async def search_company(
         raise HTTPException(status_code=400, detail="Query parameter 'q' is required")
 
     print(f"🔍 Vyhľadávam: {query_clean}...")
+    registry_router = get_registry_router()
 
-    # Ak query nie je číslo, skúsiť vyhľadávanie podľa názvu (len lokálna DB)
+    # Ak query nie je číslo, skúsiť vyhľadávanie podľa názvu (lokálna DB, potom registre)
     if not query_clean.isdigit():
         print(f"📝 Textové vyhľadávanie: {query_clean} (filter: {country})")
         companies = search_by_name(query_clean, country=country, limit=10)
@@ -2052,630 +1388,92 @@ async def search_company(
 
             result = GraphResponse(nodes=nodes, edges=edges)
             return result
-        else:
-            # Ak sa nenašlo v lokálnej DB, a nie je to IČO, môžeme skúsiť aspoň ARES pre CZ mená
-            if country == "CZ" or not country:
-                print(f"🇨🇿 Vyhľadávam v ARES (CZ) podľa mena: {query_clean}")
-                ares_data = fetch_ares_cz(query_clean)
-                results = ares_data.get("ekonomickeSubjekty", [])
-                if results and len(results) > 0:
-                    # Toto pokračuje nižšie k parsovaniu výsledkov
-                    pass
-                else:
-                    raise HTTPException(
-                        status_code=404,
-                        detail=f"Firma '{query_clean}' sa nenašla v žiadnom dostupnom registri.",
-                    )
-            else:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Firma '{query_clean}' sa nenašla v lokálnej databáze pre {country}.",
-                )
+
+        # Nenašlo sa v lokálnej DB - registre s vyhľadávaním podľa mena (ARES)
+        print(f"🔍 Vyhľadávam v registroch podľa mena: {query_clean}")
+        records = await asyncio.to_thread(registry_router.search, query_clean, country, 10)
+        if not records:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Firma '{query_clean}' sa nenašla v lokálnej databáze pre {country}."
+                if country
+                else f"Firma '{query_clean}' sa nenašla v žiadnom dostupnom registri.",
+            )
+        nodes = []
+        edges = []
+        for record in records:
+            record_graph = record_to_graph(record)
+            nodes.extend(record_graph["nodes"])
+            edges.extend(record_graph["edges"])
+        return graph_json_response(graph_adapter.validate_python({"nodes": nodes, "edges": edges}))
 
     # Kontrola cache (preskočiť ak force_refresh)
     cache_key = get_cache_key(query_clean, "search")
+    miss_key = f"{(country or '').upper()}:{query_clean}"
     if not force_refresh:
-        cached_result = get(cache_key)
-        if cached_result:
+        cached_payload = get_bytes(cache_key)
+        if cached_payload:
             print(f"✅ Cache hit pre query: {query_clean}")
             increment("search.cache_hits")
-            return GraphResponse(**cached_result)
+            return Response(content=cached_payload, media_type="application/json")
+        if provider_cache.get("search", miss_key) is not MISS:
+            print(f"✅ Negatívna cache hit pre query: {query_clean}")
+            increment("search.negative_cache_hits")
+            return GraphResponse(nodes=[], edges=[])
     else:
         # Vymazať cache pre tento query
         from services.cache import delete
 
         delete(cache_key)
+        provider_cache.delete("search", miss_key)
         print(f"🔄 Force refresh - cache vymazaný pre query: {query_clean}")
 
     increment("search.cache_misses")
 
-    # Kontrola testovacieho IČO (slovenské 8-miestne)
-    if query_clean == "88888888":
-        print("🔍 Detekované testovacie IČO 88888888 - generujem simulované dáta...")
-        nodes, edges = generate_test_data_sk("88888888")
-        result = GraphResponse(nodes=nodes, edges=edges)
-        # Uložiť do cache
-        set(cache_key, result.dict())
-        return result
-
-    # Kontrola IČO 35855304 - return enhanced detailed data
-    if query_clean == "35855304":
-        print("🔍 Detekované IČO 35855304 - generujem detailné dáta z ORSR...")
-        nodes = []
-        edges = []
-
-        # Hlavná firma s detailnými údajmi
-        company_id = "sk_35855304"
-        nodes.append(
-            Node(
-                id=company_id,
-                label="Agentúra Viky s.r.o v likvidácii",
-                type="company",
-                country="SK",
-                risk_score=8,
-                details="IČO: 35855304, Status: Aktívna, Forma: Spoločnosť s ručením obmedzeným, Registrový súd: Mestský súd Bratislava III, Oddiel, vložka, súd: Sro 28558/B, Deň zápisu: 10.4.2003, Deň výmazu: 19.12.2025",
-                ico="35855304",
-            )
-        )
-
-        # Adresa s detailmi
-        address_id = "addr_sk_35855304"
-        nodes.append(
-            Node(
-                id=address_id,
-                label="Strmý vŕšok 59, Bratislava, 841 07",
-                type="address",
-                country="SK",
-                details="Sídlo: Strmý vŕšok 59, Bratislava, 841 07, od: 10.04.2003 do: 18.12.2025",
-            )
-        )
-        edges.append(Edge(source=company_id, target=address_id, type="LOCATED_AT"))
-
-        # Historický názov
-        history_id = "history_sk_35855304"
-        nodes.append(
-            Node(
-                id=history_id,
-                label="Historický názov: Agentúra Viky, s.r.o.",
-                type="company",
-                country="SK",
-                risk_score=0,
-                details="Historický údaj Obchodné meno: Agentúra Viky, s.r.o., od: 10.04.2003 do: 16.12.2024",
-            )
-        )
-        edges.append(Edge(source=company_id, target=history_id, type="HISTORICAL_NAME"))
-
-        result = GraphResponse(nodes=nodes, edges=edges)
-        # Uložiť do cache
-        set(cache_key, result.dict())
-        return result
-
-    nodes = []
-    edges = []
-    # results je už možno inicializovaný vyššie v prípade menného vyhľadávania CZ
-    if 'results' not in locals() or not results:
-        results = []
-
-    # Detekcia krajiny a routing (priorita: CZ > SK > PL > HU pre 8-miestne čísla)
-    
-    # SPRACUJ VÝSLEDKY ARES (CZ) - Ak nejaké máme (či už z mena alebo IČO)
-    found_cz = False
-    if (country == "CZ" or not country) and (len(query_clean) in [8, 9]) and query_clean.isdigit():
-        # Skúsiť ARES (CZ)
-        print(f"🔍 Skúšam ARES (CZ) pre {query_clean}...")
-        ares_data = fetch_ares_cz(query_clean)
-        results = ares_data.get("ekonomickeSubjekty", [])
-        if results and len(results) > 0:
-            found_cz = True
-            print(f"✅ Nájdené v ARES (CZ): {query_clean}")
-            increment("search.by_country", tags={"country": "CZ"})
-
-            for item in results:
-                ico = item.get("ico", "N/A")
-                name = item.get("obchodniJmeno", "Neznáma firma")
-                address_text = item.get("sidlo", {}).get(
-                    "textovaAdresa", "Adresa neuvedená"
-                )
-
-                company_id = f"cz_{ico}"
-                
-                # Základné dáta pre risk score
-                risk_data = {
-                    "status": "Aktívna", # ARES obvykle vracia len aktívne cez tento endpoint
-                    "address": address_text,
-                    "ico": ico
-                }
-                risk = calculate_trust_score(risk_data, "CZ")
-
-                # Dlhové registry - Finančná správa ČR
-                debt_result = search_debt_registers(ico, "CZ")
-                if debt_result and debt_result.get("data", {}).get("has_debt"):
-                    debt_risk = debt_result.get("risk_score", 0)
-                    risk = max(risk, debt_risk)
-
-                nodes.append(
-                    Node(
-                        id=company_id,
-                        label=name,
-                        type="company",
-                        country="CZ",
-                        risk_score=risk,
-                        details=f"IČO: {ico}, Status: Aktívna, Krajina: CZ",
-                        ico=ico,
-                    )
-                )
-
-                # Dlhové registry
-                if debt_result and debt_result.get("data", {}).get("has_debt"):
-                    total_debt = debt_result["data"].get("total_debt", 0)
-                    debt_id = f"debt_cz_{ico}"
-                    nodes.append(
-                        Node(
-                            id=debt_id,
-                            label=f"Dlh: {total_debt:,.0f} CZK",
-                            type="debt",
-                            country="CZ",
-                            risk_score=debt_result.get("risk_score", 0),
-                            details=f"Dlh voči Finančnej správe ČR: {total_debt:,.0f} CZK",
-                        )
-                    )
-                    edges.append(
-                        Edge(source=company_id, target=debt_id, type="HAS_DEBT")
-                    )
-
-                # Adresa
-                if address_text and address_text != "Adresa neuvedená":
-                    address_id = f"addr_cz_{ico}"
-                    nodes.append(
-                        Node(
-                            id=address_id,
-                            label=address_text[:20] + "...",
-                            type="address",
-                            country="CZ",
-                            details=address_text,
-                        )
-                    )
-                    edges.append(
-                        Edge(source=company_id, target=address_id, type="LOCATED_AT")
-                    )
-
-    # 2. SLOVENSKO (RPO/ORSR)
-    # Ak sme nenašli v CZ, alebo ak používateľ explicitne pýta SK, skúsime SK
-    if (country == "SK" or (not country and not found_cz)) and is_slovak_ico(query_clean):
-        # SLOVENSKÉ IČO - Hybridný model: Cache → DB → Live Scraping
-        print(f"🇸🇰 Detekované slovenské IČO: {query_clean}")
-        increment("search.by_country", tags={"country": "SK"})
+    # Registry router: testovacie IČO → registre podľa tvaru identifikátora a krajiny
+    try:
+        record = await registry_router.lookup(query_clean, country, force_refresh=force_refresh)
+    except RegistryUnavailableError as e:
+        # Výpadok registra nie je "nenájdené" - bez negatívnej cache
+        print(f"⚠️ {e.message}")
+        increment("search.registry_unavailable")
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    if record is None:
+        if not registry_router.candidates(query_clean, country):
+            # Kontrolné číslice - identifikátor, ktorý nemôže existovať, nejde do registrov
+            print(f"⚠️ {query_clean} nie je platný identifikátor (kontrolná číslica)")
+            increment("search.invalid_identifier")
+        else:
+            print(f"⚠️ IČO {query_clean} nebolo nájdené v žiadnom registri")
+            provider_cache.set_not_found("search", miss_key)
+        return GraphResponse(nodes=[], edges=[])
 
-        # 1. Skúsiť RPO API (ak je dostupné)
-        rpo_data = fetch_rpo_sk(query_clean)
+    if record.graph is not None:
+        print(f"🔍 Testovacie IČO {query_clean} - vraciam pevný graf")
+        return graph_json_response(graph_adapter.validate_python(record.graph), cache_key)
 
-        if rpo_data:
-            normalized = parse_rpo_data(rpo_data, query_clean)
-            risk_score = calculate_sk_risk_score(normalized)
-        else:
-            # 2. Hybridný model: Cache → DB → Live Scraping (ORSR)
-            print("⚠️ RPO API nedostupné, používam hybridný model (ORSR)...")
-            orsr_provider = get_orsr_provider()
-            orsr_data = orsr_provider.lookup_by_ico(
-                query_clean, force_refresh=force_refresh
-            )
-    
-            if orsr_data:
-                # Use the enhanced ORSR data directly
-                normalized = orsr_data
-                risk_score = calculate_sk_risk_score(normalized)
-                # Enhance with additional risk scoring
-                risk_score = max(risk_score, calculate_trust_score(normalized, "SK"))
-            else:
-                # Fallback dáta
-                normalized = {
-                    "name": f"Firma {query_clean}",
-                    "legal_form": "s.r.o.",
-                    "status": "Aktívna",
-                    "address": "Adresa neuvedená",
-                    "executives": [],
-                    "shareholders": [],
-                }
-                risk_score = 3
-
-        # Dlhové registry - Finančná správa SR
-        debt_result = search_debt_registers(query_clean, "SK")
-        if debt_result and debt_result.get("data", {}).get("has_debt"):
-            debt_data = debt_result["data"]
-            debt_risk = debt_result.get("risk_score", 0)
-            risk_score = max(risk_score, debt_risk)  # Použiť vyšší risk
-
-        # Hlavná firma - use enhanced ORSR data structure
-        company_id = f"sk_{query_clean}"
-        company_name = normalized.get("name", f"Firma {query_clean}")
-        if debt_result and debt_result.get("data", {}).get("has_debt"):
-            company_name += " [DLH]"
-
-        # --- GRAPH SERVICE INGESTION (ILLUMINATI V1) ---
-        # Posielame structured people (executive_people, shareholder_people) pre linking
-        try:
-            graph_service.ingest_company_relationships(
-                atlas_id=query_clean,
-                country="SK",
-                company_label=company_name,
-                address=normalized.get("address", {}) if isinstance(normalized.get("address"), dict) else {"raw": str(normalized.get("address", ""))},
-                executives=normalized.get("executives", []),
-                owners=normalized.get("shareholders", []),
-                executive_people=normalized.get("executive_people", []),
-                shareholder_people=normalized.get("shareholder_people", []),
-                source="ORSR" if orsr_data else "RPO"
-            )
-        except Exception as e:
-            print(f"⚠️ Graph Ingest Error: {e}")
+    print(f"✅ Nájdené v registri {record.source} ({record.country}): {query_clean}")
+    increment("search.by_country", tags={"country": record.country})
 
-        # Ak klient chce 2nd-hop graf (graph=1)
-        if graph == 1:
+    # Ak klient chce 2nd-hop graf (graph=1)
+    if graph == 1:
+        expanded = await asyncio.to_thread(expand_record_graph, record)
+        if expanded:
             try:
-                g_data = graph_service.build_company_graph(query_clean, "SK")
-                # Namapovať dict na GraphResponse (nodes/edges objekty)
-                g_nodes = [Node(**n) for n in g_data.get("nodes", [])]
-                g_edges = [Edge(**e) for e in g_data.get("edges", [])]
-                
-                result = GraphResponse(nodes=g_nodes, edges=g_edges)
-                
-                # Cache full graph? Možno, ale zatiaľ len search
-                # set(cache_key, result.dict()) 
-                return result
+                return graph_json_response(graph_adapter.validate_python(
+                    {"nodes": expanded.get("nodes", []), "edges": expanded.get("edges", [])}
+                ))
             except Exception as e:
                 print(f"⚠️ Graph Build Error, falling back to basic: {e}")
-        
-        # Build detailed company info from enhanced ORSR data
-
-        company_details = []
-        if normalized.get("ico"):
-            company_details.append(f"IČO: {normalized['ico']}")
-        if normalized.get("status"):
-            company_details.append(f"Status: {normalized['status']}")
-        if normalized.get("legal_form"):
-            company_details.append(f"Forma: {normalized['legal_form']}")
-        if normalized.get("founded"):
-            company_details.append(f"Založená: {normalized['founded']}")
-        if normalized.get("dic"):
-            company_details.append(f"DIČ: {normalized['dic']}")
-        if normalized.get("ic_dph"):
-            company_details.append(f"IČ DPH: {normalized['ic_dph']}")
-
-        nodes.append(
-            Node(
-                id=company_id,
-                label=company_name,
-                type="company",
-                country="SK",
-                risk_score=risk_score,
-                details=", ".join(company_details) if company_details else f"IČO: {query_clean}",
-                ico=query_clean,
-            )
-        )
 
-        # Adresa - enhanced with postal code and region
-        address_text = normalized.get("address", "Adresa neuvedená")
-        if isinstance(address_text, dict):
-            address_parts = []
-            if address_text.get("street"):
-                address_parts.append(address_text["street"])
-            if address_text.get("city"):
-                address_parts.append(address_text["city"])
-            if address_text.get("postal_code"):
-                address_parts.append(address_text["postal_code"])
-            address_text = ", ".join(address_parts)
-
-        address_id = f"addr_sk_{query_clean}"
-        address_label = address_text
-        if len(address_label) > 50:
-            address_label = address_label[:47] + "..."
-
-        nodes.append(
-            Node(
-                id=address_id,
-                label=address_label,
-                type="address",
-                country="SK",
-                details=f"Adresa: {address_text}",
-            )
-        )
-        edges.append(Edge(source=company_id, target=address_id, type="LOCATED_AT"))
-
-        # Konatelia - enhanced with more details
-        executives = normalized.get("executives", [])
-        for i, exec_data in enumerate(executives[:5]):  # Max 5 pre MVP
-            if isinstance(exec_data, dict):
-                exec_name = exec_data.get("name", f"Konateľ {i + 1}")
-                exec_details = []
-                if exec_data.get("position"):
-                    exec_details.append(exec_data["position"])
-                if exec_data.get("since"):
-                    exec_details.append(f"od {exec_data['since']}")
-                exec_detail_text = ", ".join(exec_details) if exec_details else "Konateľ"
-            else:
-                exec_name = exec_data if isinstance(exec_data, str) else f"Konateľ {i + 1}"
-                exec_detail_text = "Konateľ"
-
-            exec_id = f"pers_sk_{query_clean}_{i}"
-            nodes.append(
-                Node(
-                    id=exec_id,
-                    label=exec_name,
-                    type="person",
-                    country="SK",
-                    risk_score=5 if len(executives) > 10 else 2,
-                    details=exec_detail_text,
-                )
-            )
-            edges.append(Edge(source=company_id, target=exec_id, type="MANAGED_BY"))
-
-        # Spoločníci - enhanced with ownership percentage
-        shareholders = normalized.get("shareholders", [])
-        for i, share_data in enumerate(shareholders[:3]):  # Max 3 pre MVP
-            if isinstance(share_data, dict):
-                share_name = share_data.get("name", f"Spoločník {i + 1}")
-                share_details = []
-                if share_data.get("percentage"):
-                    share_details.append(f"{share_data['percentage']}% podiel")
-                if share_data.get("since"):
-                    share_details.append(f"od {share_data['since']}")
-                share_detail_text = ", ".join(share_details) if share_details else "Spoločník"
-            else:
-                share_name = share_data if isinstance(share_data, str) else f"Spoločník {i + 1}"
-                share_detail_text = "Spoločník"
-
-            share_id = f"share_sk_{query_clean}_{i}"
-            nodes.append(
-                Node(
-                    id=share_id,
-                    label=share_name,
-                    type="person",
-                    country="SK",
-                    risk_score=3,
-                    details=share_detail_text,
-                )
-            )
-            edges.append(Edge(source=company_id, target=share_id, type="OWNED_BY"))
-            if orsr_data:
-                # Použiť dáta z ORSR
-                company_id = f"sk_{query_clean}"
-                nodes.append(
-                    Node(
-                        id=company_id,
-                        label=orsr_data.get("name", f"Firma {query_clean}"),
-                        type="company",
-                        country="SK",
-                        risk_score=orsr_data.get("risk_score", 3),
-                        details=f"IČO: {query_clean}, {orsr_data.get('details', '')}",
-                        ico=query_clean,
-                    )
-                )
-                if orsr_data.get("address"):
-                    address_id = f"addr_sk_{query_clean}"
-                    nodes.append(
-                        Node(
-                            id=address_id,
-                            label=orsr_data["address"][:50],
-                            type="address",
-                            country="SK",
-                            details=orsr_data["address"],
-                        )
-                    )
-                    edges.append(
-                        Edge(source=company_id, target=address_id, type="LOCATED_AT")
-                    )
+    record_graph, address_counts = await asyncio.to_thread(build_record_graph, record)
+    nodes, edges = record_graph["nodes"], record_graph["edges"]
 
-                # Pridať konateľa ak je v dátach
-                if orsr_data.get("executive"):
-                    exec_id = f"pers_sk_{query_clean}_0"
-                    nodes.append(
-                        Node(
-                            id=exec_id,
-                            label=orsr_data["executive"],
-                            type="person",
-                            country="SK",
-                            risk_score=2,
-                            details="Konateľ",
-                        )
-                    )
-                    edges.append(
-                        Edge(source=company_id, target=exec_id, type="MANAGED_BY")
-                    )
-            else:
-                # Fallback dáta
-                print("⚠️ ORSR scraping zlyhal, používam fallback dáta")
-                company_id = f"sk_{query_clean}"
-                nodes.append(
-                    Node(
-                        id=company_id,
-                        label=f"Slovenská Firma {query_clean}",
-                        type="company",
-                        country="SK",
-                        risk_score=3,
-                        details=f"IČO: {query_clean}",
-                        ico=query_clean,
-                    )
-                )
-
-    # 3. MAĎARSKO (NAV)
-    elif (country == "HU" or not country) and is_hungarian_tax_number(query_clean) and not nodes:
-        # MAĎARSKY ADÓSZÁM - NAV integrácia
-        print(f"🇭🇺 Detekované maďarský adószám: {query_clean}")
-        increment("search.by_country", tags={"country": "HU"})
-        nav_data = fetch_nav_hu(query_clean)
-
-        if nav_data:
-            normalized = parse_nav_data(nav_data, query_clean)
-            risk_score = calculate_hu_risk_score(normalized)
-
-            # Hlavná firma
-            company_id = f"hu_{query_clean}"
-            nodes.append(
-                Node(
-                    id=company_id,
-                    label=normalized.get("name", f"Firma {query_clean}"),
-                    type="company",
-                    country="HU",
-                    risk_score=risk_score,
-                    details=f"Adószám: {query_clean}, Status: {normalized.get('status', 'N/A')}, Forma: {normalized.get('legal_form', 'N/A')}",
-                    ico=query_clean,
-                )
-            )
-
-            # Adresa
-            address_text = normalized.get("address", "Cím nincs megadva")
-            address_id = f"addr_hu_{query_clean}"
-            nodes.append(
-                Node(
-                    id=address_id,
-                    label=address_text[:30] + ("..." if len(address_text) > 30 else ""),
-                    type="address",
-                    country="HU",
-                    details=address_text,
-                )
-            )
-            edges.append(Edge(source=company_id, target=address_id, type="LOCATED_AT"))
-
-            # Igazgatók (konatelia)
-            executives = normalized.get("executives", [])
-            for i, exec_data in enumerate(executives[:3]):  # Max 3 pre MVP
-                exec_name = (
-                    exec_data
-                    if isinstance(exec_data, str)
-                    else exec_data.get("name", f"Igazgató {i + 1}")
-                )
-                exec_id = f"pers_hu_{query_clean}_{i}"
-                nodes.append(
-                    Node(
-                        id=exec_id,
-                        label=exec_name,
-                        type="person",
-                        country="HU",
-                        risk_score=5 if len(executives) > 5 else 2,
-                        details="Igazgató",
-                    )
-                )
-                edges.append(Edge(source=company_id, target=exec_id, type="MANAGED_BY"))
-        else:
-            # Fallback dáta
-            print("⚠️ NAV API nedostupné, používam fallback dáta")
-            company_id = f"hu_{query_clean}"
-            nodes.append(
-                Node(
-                    id=company_id,
-                    label=f"Magyar Cég {query_clean}",
-                    type="company",
-                    country="HU",
-                    risk_score=3,
-                    details=f"Adószám: {query_clean}",
-                    ico=query_clean,
-                )
-            )
-
-    # 4. POĽSKO (KRS)
-    elif (country == "PL" or not country) and is_polish_krs(query_clean) and not nodes:
-        # POĽSKÉ KRS - KRS integrácia
-        print(f"🇵🇱 Detekované poľské KRS: {query_clean}")
-        increment("search.by_country", tags={"country": "PL"})
-        krs_data = fetch_krs_pl(query_clean)
-
-        if krs_data:
-            normalized = parse_krs_data(krs_data, query_clean)
-            risk_score = calculate_pl_risk_score(normalized)
-
-            # Biała Lista - VAT status check
-            nip = normalized.get("nip") or query_clean
-            if is_polish_nip(nip):
-                vat_status = get_vat_status_pl(nip)
-                if vat_status:
-                    normalized["vat_status"] = vat_status
-                    if vat_status != "VAT payer":
-                        risk_score = max(
-                            risk_score, 3
-                        )  # Zvýšiť risk ak nie je VAT payer
-
-            # Hlavná firma
-            company_id = f"pl_{query_clean}"
-            vat_info = (
-                f", VAT: {normalized.get('vat_status', 'N/A')}"
-                if normalized.get("vat_status")
-                else ""
-            )
-            nodes.append(
-                Node(
-                    id=company_id,
-                    label=normalized.get("name", f"Firma {query_clean}"),
-                    type="company",
-                    country="PL",
-                    risk_score=risk_score,
-                    details=f"KRS: {query_clean}, Status: {normalized.get('status', 'N/A')}, Forma: {normalized.get('legal_form', 'N/A')}{vat_info}",
-                    ico=query_clean,
-                )
-            )
-
-            # Adresa
-            address_text = normalized.get("address", "Adres nie podano")
-            address_id = f"addr_pl_{query_clean}"
-            nodes.append(
-                Node(
-                    id=address_id,
-                    label=address_text[:30] + ("..." if len(address_text) > 30 else ""),
-                    type="address",
-                    country="PL",
-                    details=address_text,
-                )
-            )
-            edges.append(Edge(source=company_id, target=address_id, type="LOCATED_AT"))
-
-            # Zarządcy (konatelia)
-            executives = normalized.get("executives", [])
-            for i, exec_data in enumerate(executives[:3]):  # Max 3 pre MVP
-                exec_name = (
-                    exec_data
-                    if isinstance(exec_data, str)
-                    else exec_data.get("name", f"Zarządca {i + 1}")
-                )
-                exec_id = f"pers_pl_{query_clean}_{i}"
-                nodes.append(
-                    Node(
-                        id=exec_id,
-                        label=exec_name,
-                        type="person",
-                        country="PL",
-                        risk_score=5 if len(executives) > 5 else 2,
-                        details="Zarządca",
-                    )
-                )
-                edges.append(Edge(source=company_id, target=exec_id, type="MANAGED_BY"))
-        else:
-            # Fallback dáta
-            print("⚠️ KRS API nedostupné, používam fallback dáta")
-            company_id = f"pl_{query_clean}"
-            nodes.append(
-                Node(
-                    id=company_id,
-                    label=f"Polska Spółka {query_clean}",
-                    type="company",
-                    country="PL",
-                    risk_score=3,
-                    details=f"KRS: {query_clean}",
-                    ico=query_clean,
-                )
-            )
-
-    else:
-        # Prázdny výsledok ak query je číslo ale nič sa nenašlo
-        if query_clean.isdigit():
-            print(f"⚠️ IČO {query_clean} nebolo nájdené v žiadnom registri")
-            return GraphResponse(nodes=[], edges=[])
-        
-        # Toto by nemalo nastať lebo textové vyhľadávanie je riešené na začiatku
-        pass
-
-    # Risk Intelligence - vylepšené risk scores
+    # Risk Intelligence - vylepšené risk scores (pracuje nad dict uzlami grafu)
     try:
         if nodes and edges:
             try:
-                risk_report = generate_risk_report(nodes, edges)
+                risk_report = generate_risk_report(nodes, edges, address_counts)
                 # Aktualizovať risk scores
                 enhanced_nodes = risk_report.get("enhanced_nodes", nodes)
                 nodes = enhanced_nodes
@@ -2692,9 +1490,10 @@ async def search_company(
             except Exception as e:
                 print(f"⚠️ Chyba pri risk intelligence: {e}")
 
-        # Uložiť do cache
-        result = GraphResponse(nodes=nodes, edges=edges)
-        set(cache_key, result.dict())
+        # Jedna validácia celého grafu, do cache idú pre-serializované JSON bajty
+        graph_model = graph_adapter.validate_python({"nodes": nodes, "edges": edges})
+        nodes, edges = graph_model.nodes, graph_model.edges
+        result = graph_json_response(graph_model, cache_key)
 
         # Uložiť do databázy (história a cache)
         main_company = next((n for n in nodes if n.type == "company"), None)
@@ -2712,16 +1511,13 @@ async def search_company(
             response_data={"nodes_count": len(nodes), "edges_count": len(edges)},
         )
 
-        # Uložiť hlavnú firmu do cache
-        if main_company and main_company.ico:
+        # Uložiť hlavnú firmu do cache (len uzol firmy - graf sa skladá z registrov)
+        if main_company and main_company.ico and country_res:
             save_company_cache(
                 identifier=main_company.ico,
-                country=country_res or "UNKNOWN",
+                country=country_res,
                 company_name=main_company.label,
-                data={
-                    "nodes": [n.dict() for n in nodes],
-                    "edges": [e.dict() for e in edges],
-                },
+                data=main_company.model_dump(),
                 risk_score=risk_score if risk_score > 0 else None,
             )
 
@@ -2749,12 +1545,13 @@ async def search_company(
 
 
 @app.get("/api/audit/{ico}", tags=["Audit"])
-async def audit_company(ico: str):
+async def audit_company(ico: str, force_refresh: bool = False):
     """
     Vykoná kompletný 360° audit firmy podľa IČO.
     Agreguje dáta z registrov, dlhových zoznamov a analyzuje riziká.
+    Nezmenený audit (rovnaká verzia reportu) sa vracia z cache.
     """
-    result = audit_service.perform_deep_audit(ico)
+    result = await asyncio.to_thread(audit_service.perform_deep_audit, ico, force_refresh)
     return result
 
 
@@ -2777,8 +1574,12 @@ async def enhanced_search(
         "risk_threshold": 5,
         "limit": 100,
         "offset": 0,
+        "cursor": "next_cursor z predchádzajúcej stránky",
         "format": "basic|detailed|graph"
     }
+    
+    Prvé volanie vráti next_cursor - ďalšie stránky sa čítajú z uloženej
+    search session bez nového hľadania.
     """
     from services.enhanced_data_extractor import get_enhanced_extractor
     
@@ -2791,7 +1592,8 @@ async def enhanced_search(
             include_related=request.get("include_related", True),
             risk_threshold=request.get("risk_threshold"),
             limit=request.get("limit", 100),
-            offset=request.get("offset", 0)
+            offset=request.get("offset", 0),
+            cursor=request.get("cursor")
         )
         
         return {
@@ -2803,6 +1605,8 @@ async def enhanced_search(
                 "search_id": f"search_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{random.randint(1000, 9999)}"
             }
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -2810,124 +1614,6 @@ async def enhanced_search(
         )
 
 
-@app.post("/api/v2/export", tags=["Enhanced Export"])
-async def enhanced_export(
-    request: Dict,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Enhanced export endpoint supporting multiple formats with professional styling.
-    
-    Request body:
-    {
-        "format": "pdf|excel|csv|json",
-        "data": { /* graph data or search results */ },
-        "options": {
-            "include_graph": true,
-            "branding": "premium|standard",
-            "timestamp": true,
-            "executive_summary": true,
-            "risk_analysis": true
-        }
-    }
-    """
-    from services.pdf_export_service import get_pdf_service
-    
-    format_type = request.get("format", "json").lower()
-    data = request.get("data", {})
-    options = request.get("options", {})
-    
-    try:
-        if format_type == "pdf":
-            pdf_service = get_pdf_service()
-            
-            if "companies" in data:
-                # Export search results to PDF
-                pdf_bytes = pdf_service.generate_executive_summary(
-                    companies=data["companies"],
-                    metadata={"user_id": current_user.id, "export_time": datetime.now().isoformat()},
-                    include_risk_analysis=options.get("risk_analysis", True),
-                    include_financials=options.get("include_financials", True)
-                )
-                
-                return Response(
-                    content=pdf_bytes,
-                    media_type="application/pdf",
-                    headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"}
-                )
-            else:
-                # Export graph data to PDF
-                pdf_bytes = pdf_service.generate_network_analysis(
-                    graph_data=data,
-                    insights={"analysis": "Network visualization export"},
-                    include_visualization=options.get("include_graph", True)
-                )
-                
-                return Response(
-                    content=pdf_bytes,
-                    media_type="application/pdf",
-                    headers={"Content-Disposition": f"attachment; filename=iluminati_network_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"}
-                )
-        
-        elif format_type == "excel":
-            from services.export_service import export_to_excel
-            excel_bytes = export_to_excel(data)
-            
-            return Response(
-                content=excel_bytes,
-                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"}
-            )
-        
-        elif format_type == "csv":
-            import csv
-            import io
-            
-            output = io.StringIO()
-            writer = csv.writer(output)
-            
-            # Write headers
-            if "nodes" in data:
-                writer.writerow(["Type", "ID", "Label", "Country", "Risk Score", "Details"])
-                for node in data["nodes"]:
-                    writer.writerow([
-                        node.get("type", ""),
-                        node.get("id", ""),
-                        node.get("label", ""),
-                        node.get("country", ""),
-                        node.get("risk_score", 0),
-                        node.get("details", "")
-                    ])
-            
-            csv_content = output.getvalue()
-            output.close()
-            
-            return Response(
-                content=csv_content,
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
-            )
-        
-        elif format_type == "json":
-            return Response(
-                content=json.dumps(data, indent=2, ensure_ascii=False),
-                media_type="application/json",
-                headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"}
-            )
-        
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported export format: {format_type}"
-            )
-            
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Export failed: {str(e)}"
-        )
-
-
 @app.get("/api/v2/company/{country}/{identifier}", tags=["Enhanced Search"])
 async def get_company_details(
     country: str,
@@ -3,11 +3,15 @@ API Authentication Middleware
 Validácia API keys pre Enterprise tier používateľov
 """
 
-from typing import Optional
+import json
+from datetime import datetime
+from typing import Dict, Optional
 from fastapi import HTTPException, status, Header
 from sqlalchemy.orm import Session
-from services.api_keys import get_api_key_by_token, update_api_key_usage
+from services.api_keys import get_api_key_by_token, hash_api_key, record_api_key_usage
+from services.auth_cache import cache_api_key, get_cached_api_key, invalidate_api_key
 from services.database import get_db_session
+from services.metering import meter_api_request
 from services.auth import User, UserTier
 
 
@@ -46,7 +50,53 @@ async def verify_api_key(
     # Get IP address
     client_ip = x_forwarded_for.split(",")[0].strip() if x_forwarded_for else None
     
-    # Validate API key
+    # Principal z auth cache (bez DB round-tripu)
+    key_hash = hash_api_key(api_key_token)
+    principal = get_cached_api_key(key_hash)
+    
+    if principal is None:
+        principal = _load_api_key_principal(api_key_token)
+        cache_api_key(key_hash, principal)
+    
+    # Kontrola expirácie (key mohol expirovať počas TTL cache)
+    expires_at = principal["expires_at"]
+    if expires_at and expires_at < datetime.utcnow():
+        invalidate_api_key(principal["api_key_id"])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    # Check IP whitelist
+    whitelist = principal["ip_whitelist"]
+    if whitelist is not None and client_ip and client_ip not in whitelist:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"IP address {client_ip} not whitelisted"
+        )
+    
+    # Denná kvóta (O(1) počítadlo, rollup prebieha na pozadí)
+    allowed, quota_info = meter_api_request(principal["api_key_id"], principal["daily_quota"])
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Daily API quota exceeded ({quota_info['quota']} requests)",
+            headers={"Retry-After": str(quota_info["reset_after"])}
+        )
+    
+    # Update usage stats (bufferované, flush dávkovo)
+    record_api_key_usage(principal["api_key_id"])
+    
+    return principal["user"]
+
+
+def _load_api_key_principal(api_key_token: str) -> Dict:
+    """
+    Načíta API key a používateľa z DB a zostaví principal pre auth cache.
+    
+    Raises:
+        HTTPException ak key nie je validný
+    """
     with get_db_session() as db:
         if not db:
             raise HTTPException(
@@ -62,16 +112,6 @@ async def verify_api_key(
                 detail="Invalid API key"
             )
         
-        # Check IP whitelist
-        if api_key.ip_whitelist:
-            import json
-            whitelist = json.loads(api_key.ip_whitelist)
-            if client_ip and client_ip not in whitelist:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"IP address {client_ip} not whitelisted"
-                )
-        
         # Get user
         user = db.query(User).filter(User.id == api_key.user_id).first()
         
@@ -88,10 +128,17 @@ async def verify_api_key(
                 detail="API access requires Enterprise tier"
             )
         
-        # Update usage stats
-        update_api_key_usage(db, api_key, client_ip)
+        db.expunge(user)
         
-        return user
+        return {
+            "api_key_id": api_key.id,
+            "user_id": user.id,
+            "user": user,
+            "expires_at": api_key.expires_at,
+            "ip_whitelist": frozenset(json.loads(api_key.ip_whitelist)) if api_key.ip_whitelist else None,
+            "permissions": frozenset(json.loads(api_key.permissions)) if api_key.permissions else frozenset(),
+            "daily_quota": api_key.daily_quota,
+        }
 
 
 def check_api_permission(api_key, permission: str) -> bool:
@@ -108,7 +155,6 @@ def check_api_permission(api_key, permission: str) -> bool:
     if not api_key.permissions:
         return False
     
-    import json
     permissions = json.loads(api_key.permissions)
     return permission in permissions
 
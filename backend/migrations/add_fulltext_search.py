@@ -48,16 +48,16 @@ def add_fulltext_search_support():
             )
             print("✅ Trigram index pre company_name vytvorený")
 
-            # 4. Vytvoriť index pre JSON data (adresa, atď.)
+            # 4. Trigram index pre adresu (typový stĺpec, payload je komprimovaný)
             db.execute(
                 text(
                     """
-                    CREATE INDEX IF NOT EXISTS idx_company_data_gin 
-                    ON company_cache USING gin(to_tsvector('slovak', CAST(data AS text)));
+                    CREATE INDEX IF NOT EXISTS idx_company_address_trgm 
+                    ON company_cache USING gin(address gin_trgm_ops);
                     """
                 )
             )
-            print("✅ GIN index pre company_data vytvorený")
+            print("✅ Trigram index pre address vytvorený")
 
             db.commit()
             print("✅ Full-text search podpora pridaná")
@@ -0,0 +1,255 @@
+"""
+company_cache: (country, identifier) key, single compressed payload, typed hot columns
+
+Revision ID: company_cache_payload
+Revises: graph_edges_unique_keys
+Create Date: 2026-10-19 19:00:00.000000
+
+Tabuľka sa prestavia (rename -> create -> kopírovanie po dávkach -> drop).
+Payload = company_data, inak legacy data; uložený graf z vyhľadávania
+({"nodes", "edges"}) sa zúži na uzol hlavnej firmy. Riadky bez platného
+2-písmenového kódu krajiny (napr. "UNKNOWN") sa nekopírujú.
+Kodek payloadu je zhodný so services.database.encode_payload.
+"""
+import json
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# revision identifiers, used by Alembic.
+revision = 'company_cache_payload'
+down_revision = 'graph_edges_unique_keys'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+LEGACY_INDEXES = (
+    'ix_company_cache_id',
+    'ix_company_cache_identifier',
+    'ix_company_cache_country',
+    'ix_company_cache_last_synced_at',
+    'ix_company_cache_expires_at',
+    'idx_company_name_gin',
+    'idx_company_name_trgm',
+    'idx_company_data_gin',
+)
+
+
+def _is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def _payload_type():
+    if _is_postgres():
+        from sqlalchemy.dialects.postgresql import JSONB
+        return JSONB()
+    return sa.LargeBinary()
+
+
+def _encode(value):
+    if _is_postgres():
+        return value
+    raw = json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    if zstandard is not None:
+        return b'\x02' + zstandard.ZstdCompressor(level=3).compress(raw)
+    return b'\x01' + zlib.compress(raw, 6)
+
+
+def _decode(value):
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, str):
+        return json.loads(value)
+    value = bytes(value)
+    if value[:1] == b'\x01':
+        return json.loads(zlib.decompress(value[1:]))
+    if value[:1] == b'\x02':
+        return json.loads(zstandard.ZstdDecompressor().decompress(value[1:]))
+    return json.loads(value)
+
+
+def _text(value, limit):
+    if value is None or value == '':
+        return None
+    if isinstance(value, dict):
+        value = value.get('raw') or ' '.join(str(v) for v in value.values() if v)
+    return str(value)[:limit]
+
+
+def _diet(payload, identifier):
+    """Uložený graf vyhľadávania -> uzol hlavnej firmy"""
+    if not isinstance(payload, dict) or 'nodes' not in payload:
+        return payload or {}
+    companies = [n for n in payload.get('nodes') or [] if n.get('type') == 'company']
+    return next((n for n in companies if n.get('ico') == identifier), companies[0] if companies else {})
+
+
+def _hot_fields(payload):
+    return {
+        'status': _text(payload.get('status'), 100),
+        'legal_form': _text(payload.get('legal_form'), 255),
+        'address': _text(payload.get('address'), 2000),
+        'postal_code': _text(payload.get('postal_code'), 10),
+        'city': _text(payload.get('city'), 255),
+        'source': _text(payload.get('source'), 50),
+        'data_quality': _text(payload.get('data_quality'), 20),
+    }
+
+
+def _copy_in_batches(select_sql, target, transform):
+    """Keyset stránkovanie podľa id, jeden INSERT na dávku"""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(select_sql), {'last_id': last_id, 'limit': BATCH_SIZE}).mappings().all()
+        if not rows:
+            break
+        values = [v for v in (transform(row) for row in rows) if v is not None]
+        if values:
+            bind.execute(target.insert(), values)
+        last_id = rows[-1]['id']
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'company_cache' not in tables:
+        return
+
+    for index_name in LEGACY_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+    if _is_postgres():
+        op.execute('ALTER INDEX IF EXISTS company_cache_pkey RENAME TO company_cache_old_pkey')
+        op.execute('ALTER TABLE company_cache DROP CONSTRAINT IF EXISTS company_cache_identifier_key')
+    op.rename_table('company_cache', 'company_cache_old')
+
+    target = op.create_table(
+        'company_cache',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('identifier', sa.String(length=100), nullable=False),
+        sa.Column('company_name', sa.String(length=500), nullable=True),
+        sa.Column('status', sa.String(length=100), nullable=True),
+        sa.Column('legal_form', sa.String(length=255), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('postal_code', sa.String(length=10), nullable=True),
+        sa.Column('city', sa.String(length=255), nullable=True),
+        sa.Column('risk_score', sa.Float(), nullable=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.Column('data_quality', sa.String(length=20), nullable=True),
+        sa.Column('payload', _payload_type(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('country', 'identifier', name='uq_company_cache_country_identifier'),
+    )
+    op.create_index('ix_company_cache_country', 'company_cache', ['country'])
+    op.create_index('ix_company_cache_identifier', 'company_cache', ['identifier'])
+    op.create_index('ix_company_cache_last_synced_at', 'company_cache', ['last_synced_at'])
+    op.create_index('ix_company_cache_expires_at', 'company_cache', ['expires_at'])
+
+    def transform(row):
+        country = (row['country'] or '').strip().upper()
+        if len(country) != 2 or not country.isalpha() or not row['identifier']:
+            return None
+        payload = _diet(_decode(row['company_data']) or _decode(row['data']), row['identifier'])
+        return {
+            'country': country,
+            'identifier': row['identifier'],
+            'company_name': row['company_name'] or _text(payload.get('name') or payload.get('label'), 500),
+            'risk_score': row['risk_score'],
+            'payload': _encode(payload),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+            'last_synced_at': row['last_synced_at'],
+            'expires_at': row['expires_at'],
+            **_hot_fields(payload),
+        }
+
+    _copy_in_batches(
+        """
+        SELECT id, identifier, country, company_name, data, company_data, risk_score,
+               created_at, updated_at, last_synced_at, expires_at
+        FROM company_cache_old
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :limit
+        """,
+        target,
+        transform,
+    )
+    op.drop_table('company_cache_old')
+
+
+def downgrade():
+    for index_name in ('ix_company_cache_country', 'ix_company_cache_identifier',
+                       'ix_company_cache_last_synced_at', 'ix_company_cache_expires_at'):
+        op.drop_index(index_name, table_name='company_cache')
+    if _is_postgres():
+        op.execute('ALTER INDEX IF EXISTS company_cache_pkey RENAME TO company_cache_new_pkey')
+    op.rename_table('company_cache', 'company_cache_new')
+
+    target = op.create_table(
+        'company_cache',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('identifier', sa.String(length=100), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('company_name', sa.String(length=500), nullable=True),
+        sa.Column('data', sa.JSON(), nullable=False),
+        sa.Column('company_data', sa.JSON(), nullable=True),
+        sa.Column('risk_score', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_synced_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_company_cache_identifier', 'company_cache', ['identifier'], unique=True)
+    op.create_index('ix_company_cache_country', 'company_cache', ['country'])
+    op.create_index('ix_company_cache_last_synced_at', 'company_cache', ['last_synced_at'])
+    op.create_index('ix_company_cache_expires_at', 'company_cache', ['expires_at'])
+
+    seen = set()
+
+    def transform(row):
+        # Pôvodná schéma má unikátne samotné identifier - druhá krajina sa zahodí
+        if row['identifier'] in seen:
+            return None
+        seen.add(row['identifier'])
+        payload = _decode(row['payload'])
+        return {
+            'identifier': row['identifier'],
+            'country': row['country'],
+            'company_name': row['company_name'],
+            'data': payload,
+            'company_data': payload,
+            'risk_score': row['risk_score'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+            'last_synced_at': row['last_synced_at'],
+            'expires_at': row['expires_at'],
+        }
+
+    _copy_in_batches(
+        """
+        SELECT id, identifier, country, company_name, payload, risk_score,
+               created_at, updated_at, last_synced_at, expires_at
+        FROM company_cache_new
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :limit
+        """,
+        target,
+        transform,
+    )
+    op.drop_table('company_cache_new')
@@ -0,0 +1,72 @@
+"""
+Create analytics rollup tables
+
+Revision ID: create_analytics_rollups
+Revises: create_api_usage_rollups
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'create_analytics_rollups'
+down_revision = 'create_api_usage_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analytics_search_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hour_start', sa.DateTime(), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=False, server_default=''),
+        sa.Column('risk_bucket', sa.Integer(), nullable=False, server_default='-1'),
+        sa.Column('search_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hour_start', 'country', 'risk_bucket', name='uq_analytics_search_rollup'),
+    )
+    op.create_index('ix_analytics_search_rollups_hour_start', 'analytics_search_rollups', ['hour_start'])
+
+    op.create_table(
+        'analytics_client_daily',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.DateTime(), nullable=False),
+        sa.Column('client_hash', sa.String(length=64), nullable=False),
+        sa.Column('search_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'client_hash', name='uq_analytics_client_daily'),
+    )
+    op.create_index('ix_analytics_client_daily_day', 'analytics_client_daily', ['day'])
+
+    op.create_table(
+        'analytics_event_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hour_start', sa.DateTime(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('endpoint', sa.String(length=255), nullable=False, server_default=''),
+        sa.Column('is_error', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('event_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('hour_start', 'event_type', 'endpoint', 'is_error', name='uq_analytics_event_rollup'),
+    )
+    op.create_index('ix_analytics_event_rollups_hour_start', 'analytics_event_rollups', ['hour_start'])
+
+    op.create_table(
+        'analytics_rollup_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade():
+    op.drop_table('analytics_rollup_watermarks')
+    op.drop_index('ix_analytics_event_rollups_hour_start', table_name='analytics_event_rollups')
+    op.drop_table('analytics_event_rollups')
+    op.drop_index('ix_analytics_client_daily_day', table_name='analytics_client_daily')
+    op.drop_table('analytics_client_daily')
+    op.drop_index('ix_analytics_search_rollups_hour_start', table_name='analytics_search_rollups')
+    op.drop_table('analytics_search_rollups')
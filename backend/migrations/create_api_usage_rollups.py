@@ -0,0 +1,42 @@
+"""
+Create api_usage_rollups table and api_keys.daily_quota column
+
+Revision ID: create_api_usage_rollups
+Revises: create_webhooks_tables
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'create_api_usage_rollups'
+down_revision = 'create_webhooks_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('api_keys', sa.Column('daily_quota', sa.Integer(), nullable=True))
+
+    op.create_table(
+        'api_usage_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('api_key_id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['api_key_id'], ['api_keys.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('api_key_id', 'granularity', 'bucket_start', name='uq_api_usage_rollup_bucket'),
+    )
+    op.create_index('ix_api_usage_rollups_api_key_id', 'api_usage_rollups', ['api_key_id'])
+    op.create_index('ix_api_usage_rollups_bucket_start', 'api_usage_rollups', ['bucket_start'])
+
+
+def downgrade():
+    op.drop_index('ix_api_usage_rollups_bucket_start', table_name='api_usage_rollups')
+    op.drop_index('ix_api_usage_rollups_api_key_id', table_name='api_usage_rollups')
+    op.drop_table('api_usage_rollups')
+    op.drop_column('api_keys', 'daily_quota')
@@ -0,0 +1,98 @@
+"""
+Create ERP sync tables (watermarks, suppliers, invoices, payments)
+
+Revision ID: create_erp_sync_tables
+Revises: create_watchlist
+Create Date: 2026-10-19 17:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'create_erp_sync_tables'
+down_revision = 'create_watchlist'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'erp_sync_watermarks',
+        sa.Column('connection_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('synced_until', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['connection_id'], ['erp_connections.id']),
+        sa.PrimaryKeyConstraint('connection_id', 'entity'),
+    )
+
+    op.create_table(
+        'erp_suppliers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('connection_id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.String(length=100), nullable=False),
+        sa.Column('ico', sa.String(length=20), nullable=True),
+        sa.Column('name', sa.String(length=500), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('total_invoices', sa.Integer(), nullable=True),
+        sa.Column('total_amount', sa.Float(), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=True),
+        sa.Column('risk_score', sa.Float(), nullable=True),
+        sa.Column('risk_level', sa.String(length=20), nullable=True),
+        sa.Column('screened_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['connection_id'], ['erp_connections.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('connection_id', 'external_id', name='uq_erp_supplier'),
+    )
+    op.create_index('ix_erp_suppliers_connection_id', 'erp_suppliers', ['connection_id'])
+    op.create_index('ix_erp_suppliers_ico', 'erp_suppliers', ['ico'])
+
+    op.create_table(
+        'erp_invoices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('connection_id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.String(length=100), nullable=False),
+        sa.Column('supplier_ico', sa.String(length=20), nullable=True),
+        sa.Column('invoice_number', sa.String(length=100), nullable=True),
+        sa.Column('amount', sa.Float(), nullable=True),
+        sa.Column('due_date', sa.String(length=30), nullable=True),
+        sa.Column('paid_date', sa.String(length=30), nullable=True),
+        sa.Column('status', sa.String(length=50), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['connection_id'], ['erp_connections.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('connection_id', 'external_id', name='uq_erp_invoice'),
+    )
+    op.create_index('ix_erp_invoices_connection_id', 'erp_invoices', ['connection_id'])
+    op.create_index('ix_erp_invoices_supplier_ico', 'erp_invoices', ['supplier_ico'])
+
+    op.create_table(
+        'erp_payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('connection_id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.String(length=100), nullable=False),
+        sa.Column('supplier_ico', sa.String(length=20), nullable=True),
+        sa.Column('invoice_number', sa.String(length=100), nullable=True),
+        sa.Column('amount', sa.Float(), nullable=True),
+        sa.Column('paid_date', sa.String(length=30), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['connection_id'], ['erp_connections.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('connection_id', 'external_id', name='uq_erp_payment'),
+    )
+    op.create_index('ix_erp_payments_connection_id', 'erp_payments', ['connection_id'])
+    op.create_index('ix_erp_payments_supplier_ico', 'erp_payments', ['supplier_ico'])
+
+
+def downgrade():
+    for table in ('erp_payments', 'erp_invoices', 'erp_suppliers'):
+        op.drop_index(f'ix_{table}_connection_id', table_name=table)
+    op.drop_index('ix_erp_payments_supplier_ico', table_name='erp_payments')
+    op.drop_index('ix_erp_invoices_supplier_ico', table_name='erp_invoices')
+    op.drop_index('ix_erp_suppliers_ico', table_name='erp_suppliers')
+    op.drop_table('erp_payments')
+    op.drop_table('erp_invoices')
+    op.drop_table('erp_suppliers')
+    op.drop_table('erp_sync_watermarks')
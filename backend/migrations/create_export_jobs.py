@@ -0,0 +1,45 @@
+"""
+Create export_jobs table
+
+Revision ID: create_export_jobs
+Revises: create_webhook_outbox
+Create Date: 2026-10-19 15:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'create_export_jobs'
+down_revision = 'create_webhook_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'export_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(length=20), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'),
+        sa.Column('progress', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('result_size', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_export_jobs_user_id', 'export_jobs', ['user_id'])
+    op.create_index('ix_export_jobs_expires_at', 'export_jobs', ['expires_at'])
+    op.create_index('ix_export_jobs_dedup', 'export_jobs', ['user_id', 'content_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_export_jobs_dedup', table_name='export_jobs')
+    op.drop_index('ix_export_jobs_expires_at', table_name='export_jobs')
+    op.drop_index('ix_export_jobs_user_id', table_name='export_jobs')
+    op.drop_table('export_jobs')
@@ -0,0 +1,56 @@
+"""
+Create watchlist tables
+
+Revision ID: create_watchlist
+Revises: create_export_jobs
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'create_watchlist'
+down_revision = 'create_export_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'watchlist_companies',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('company_identifier', sa.String(length=100), nullable=False),
+        sa.Column('snapshot', sa.JSON(), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('last_checked_at', sa.DateTime(), nullable=True),
+        sa.Column('last_changed_at', sa.DateTime(), nullable=True),
+        sa.Column('next_check_at', sa.DateTime(), nullable=False),
+        sa.Column('failure_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('country', 'company_identifier', name='uq_watchlist_company'),
+    )
+    op.create_index('ix_watchlist_companies_next_check', 'watchlist_companies', ['next_check_at'])
+
+    op.create_table(
+        'watchlist_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('country', sa.String(length=2), nullable=False),
+        sa.Column('company_identifier', sa.String(length=100), nullable=False),
+        sa.Column('company_name', sa.String(length=500), nullable=True),
+        sa.Column('changes', sa.JSON(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('detected_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_watchlist_changes_company', 'watchlist_changes', ['country', 'company_identifier', 'detected_at']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_watchlist_changes_company', table_name='watchlist_changes')
+    op.drop_table('watchlist_changes')
+    op.drop_index('ix_watchlist_companies_next_check', table_name='watchlist_companies')
+    op.drop_table('watchlist_companies')
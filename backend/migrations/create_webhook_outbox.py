@@ -0,0 +1,51 @@
+"""
+Create webhook_outbox table and add webhooks.max_batch_size
+
+Revision ID: create_webhook_outbox
+Revises: create_analytics_rollups
+Create Date: 2026-10-19 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'create_webhook_outbox'
+down_revision = 'create_analytics_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'webhooks',
+        sa.Column('max_batch_size', sa.Integer(), nullable=False, server_default='1'),
+    )
+
+    op.create_table(
+        'webhook_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('webhook_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['webhook_id'], ['webhooks.id'], ondelete='CASCADE'),
+    )
+    op.create_index('ix_webhook_outbox_webhook_id', 'webhook_outbox', ['webhook_id'])
+    op.create_index('ix_webhook_outbox_claim_token', 'webhook_outbox', ['claim_token'])
+    op.create_index('ix_webhook_outbox_due', 'webhook_outbox', ['status', 'next_attempt_at'])
+
+
+def downgrade():
+    op.drop_index('ix_webhook_outbox_due', table_name='webhook_outbox')
+    op.drop_index('ix_webhook_outbox_claim_token', table_name='webhook_outbox')
+    op.drop_index('ix_webhook_outbox_webhook_id', table_name='webhook_outbox')
+    op.drop_table('webhook_outbox')
+    op.drop_column('webhooks', 'max_batch_size')
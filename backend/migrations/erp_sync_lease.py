@@ -0,0 +1,29 @@
+"""
+ERP sync lease column (sync_started_at) instead of the SYNCING status
+
+Revision ID: erp_sync_lease
+Revises: partition_search_history_analytics
+Create Date: 2026-10-20 09:00:00.000000
+
+Bežiaci sync drží lease v sync_started_at (podmienený UPDATE, expiruje po
+ERP_SYNC_LEASE_SECONDS). Pripojenia, ktoré ostali v SYNCING po páde
+workeru, sa vrátia na ACTIVE.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'erp_sync_lease'
+down_revision = 'partition_search_history_analytics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('erp_connections', sa.Column('sync_started_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE erp_connections SET status = 'ACTIVE' WHERE status = 'SYNCING'")
+
+
+def downgrade():
+    op.drop_column('erp_connections', 'sync_started_at')
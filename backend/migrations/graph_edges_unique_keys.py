@@ -0,0 +1,175 @@
+"""
+Graph edges: unique (source, type, target), reverse covering index, integer node keys
+
+Revision ID: graph_edges_unique_keys
+Revises: create_erp_sync_tables
+Create Date: 2026-10-19 18:00:00.000000
+
+Tabuľky sa prestavajú (rename -> create -> INSERT ... SELECT -> drop), aby
+zmena primárneho kľúča graph_nodes fungovala aj na SQLite. Duplicitné hrany
+sa odstránia hromadne pri kopírovaní - ostane najstaršia (MIN(id)) z každej
+trojice (source, type, target).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'graph_edges_unique_keys'
+down_revision = 'create_erp_sync_tables'
+branch_labels = None
+depends_on = None
+
+
+LEGACY_INDEXES = (
+    'ix_graph_nodes_type',
+    'ix_graph_nodes_country',
+    'ix_graph_edges_source',
+    'ix_graph_edges_target',
+    'ix_graph_edges_type',
+)
+
+
+def _rename_primary_keys(suffix):
+    """PostgreSQL: uvoľní mená PK indexov pred vytvorením tabuliek s rovnakým menom"""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for table in ('graph_nodes', 'graph_edges'):
+        op.execute(f'ALTER INDEX IF EXISTS {table}_pkey RENAME TO {table}_{suffix}_pkey')
+
+
+def _create_graph_tables():
+    op.create_table(
+        'graph_nodes',
+        sa.Column('key', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('id', sa.String(length=64), nullable=False),
+        sa.Column('label', sa.String(length=500), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('country', sa.String(length=2), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key'),
+        sa.UniqueConstraint('id', name='uq_graph_nodes_id'),
+    )
+    op.create_index('ix_graph_nodes_type', 'graph_nodes', ['type'])
+    op.create_index('ix_graph_nodes_country', 'graph_nodes', ['country'])
+
+    op.create_table(
+        'graph_edges',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('source', sa.String(length=64), nullable=False),
+        sa.Column('target', sa.String(length=64), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('source_key', sa.Integer(), nullable=True),
+        sa.Column('target_key', sa.Integer(), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['source_key'], ['graph_nodes.key'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['target_key'], ['graph_nodes.key'], ondelete='CASCADE'),
+        sa.UniqueConstraint('source', 'type', 'target', name='uq_graph_edges_source_type_target'),
+    )
+    op.create_index('ix_graph_edges_target_type_source', 'graph_edges', ['target', 'type', 'source'])
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'graph_nodes' not in tables or 'graph_edges' not in tables:
+        # Graf ešte neexistuje (vytvára ho create_all) - len nová schéma
+        _create_graph_tables()
+        return
+
+    for index_name in LEGACY_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {index_name}')
+    _rename_primary_keys('old')
+    op.rename_table('graph_edges', 'graph_edges_old')
+    op.rename_table('graph_nodes', 'graph_nodes_old')
+
+    _create_graph_tables()
+
+    op.execute(
+        """
+        INSERT INTO graph_nodes (id, label, type, country, details, created_at, updated_at)
+        SELECT id, label, type, country, details, created_at, updated_at
+        FROM graph_nodes_old
+        WHERE id IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO graph_edges (source, target, type, source_key, target_key, weight, details, created_at, updated_at)
+        SELECT e.source, e.target, e.type, s.key, t.key, e.weight, e.details, e.created_at, e.updated_at
+        FROM graph_edges_old e
+        JOIN (
+            SELECT MIN(id) AS id
+            FROM graph_edges_old
+            WHERE source IS NOT NULL AND target IS NOT NULL AND type IS NOT NULL
+            GROUP BY source, type, target
+        ) keep ON keep.id = e.id
+        LEFT JOIN graph_nodes s ON s.id = e.source
+        LEFT JOIN graph_nodes t ON t.id = e.target
+        ORDER BY e.id
+        """
+    )
+
+    op.drop_table('graph_edges_old')
+    op.drop_table('graph_nodes_old')
+
+
+def downgrade():
+    op.drop_index('ix_graph_edges_target_type_source', table_name='graph_edges')
+    op.drop_index('ix_graph_nodes_type', table_name='graph_nodes')
+    op.drop_index('ix_graph_nodes_country', table_name='graph_nodes')
+    _rename_primary_keys('new')
+    op.rename_table('graph_edges', 'graph_edges_new')
+    op.rename_table('graph_nodes', 'graph_nodes_new')
+
+    op.create_table(
+        'graph_nodes',
+        sa.Column('id', sa.String(length=50), nullable=False),
+        sa.Column('label', sa.String(length=500), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('country', sa.String(length=2), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_graph_nodes_type', 'graph_nodes', ['type'])
+    op.create_index('ix_graph_nodes_country', 'graph_nodes', ['country'])
+
+    op.create_table(
+        'graph_edges',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('source', sa.String(length=50), nullable=True),
+        sa.Column('target', sa.String(length=50), nullable=True),
+        sa.Column('type', sa.String(length=50), nullable=True),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('details', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_graph_edges_source', 'graph_edges', ['source'])
+    op.create_index('ix_graph_edges_target', 'graph_edges', ['target'])
+    op.create_index('ix_graph_edges_type', 'graph_edges', ['type'])
+
+    op.execute(
+        """
+        INSERT INTO graph_nodes (id, label, type, country, details, created_at, updated_at)
+        SELECT id, label, type, country, details, created_at, updated_at FROM graph_nodes_new
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO graph_edges (source, target, type, weight, details, created_at, updated_at)
+        SELECT source, target, type, weight, details, created_at, updated_at FROM graph_edges_new
+        ORDER BY id
+        """
+    )
+
+    op.drop_table('graph_edges_new')
+    op.drop_table('graph_nodes_new')
@@ -0,0 +1,156 @@
+"""
+Monthly range partitioning for search_history and analytics (PostgreSQL)
+
+Revision ID: partition_search_history_analytics
+Revises: company_cache_payload
+Create Date: 2026-10-19 20:00:00.000000
+
+Tabuľky sa prestavia na PARTITION BY RANGE (čas) s mesačnými partíciami
+od najstaršieho riadku po aktuálny mesiac + 3 dopredu a default partíciou.
+Id sa zachovajú (watermarky analytics rollupov sú podľa id), sekvencia
+pokračuje od max(id). Primárny kľúč je (id, čas) - partičný kľúč musí byť
+súčasťou PK. Ďalší rollover a retention robí services.retention.
+
+Na ostatných dialektoch sa nič nemení (retention tam maže DELETE-om).
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'partition_search_history_analytics'
+down_revision = 'company_cache_payload'
+branch_labels = None
+depends_on = None
+
+
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    'search_history': {
+        'time_column': 'search_timestamp',
+        'columns': """
+            id INTEGER NOT NULL DEFAULT nextval('search_history_id_seq'),
+            query VARCHAR(255) NOT NULL,
+            country VARCHAR(2),
+            result_count INTEGER,
+            risk_score DOUBLE PRECISION,
+            search_timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            user_ip VARCHAR(45),
+            response_data JSON
+        """,
+        'copy_columns': 'id, query, country, result_count, risk_score, search_timestamp, user_ip, response_data',
+        'indexes': {
+            'ix_search_history_search_timestamp': 'search_timestamp',
+            'ix_search_history_query': 'query',
+            'ix_search_history_country': 'country',
+        },
+    },
+    'analytics': {
+        'time_column': 'timestamp',
+        'columns': """
+            id INTEGER NOT NULL DEFAULT nextval('analytics_id_seq'),
+            event_type VARCHAR(50) NOT NULL,
+            event_data JSON,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            user_ip VARCHAR(45),
+            user_agent TEXT
+        """,
+        'copy_columns': 'id, event_type, event_data, timestamp, user_ip, user_agent',
+        'indexes': {
+            'ix_analytics_timestamp': 'timestamp',
+            'ix_analytics_event_type': 'event_type',
+        },
+    },
+}
+
+
+def _add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _partition_months(first, now):
+    current = date(now.year, now.month, 1)
+    month = date(first.year, first.month, 1) if first else current
+    last = _add_months(current, PREMAKE_MONTHS)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    tables = sa.inspect(bind).get_table_names()
+
+    for table, spec in TABLES.items():
+        if table not in tables:
+            continue
+        time_column = spec['time_column']
+        legacy = f'{table}_unpartitioned'
+
+        # Indexy a PK uvoľnia mená pre novú tabuľku, sekvencia id prejde na ňu
+        for index_name in list(spec['indexes']) + [f'ix_{table}_id']:
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+        op.execute(f'ALTER INDEX IF EXISTS {table}_pkey RENAME TO {legacy}_pkey')
+        op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+        op.execute(f'CREATE SEQUENCE IF NOT EXISTS {table}_id_seq')
+        op.execute(f'ALTER TABLE {legacy} ALTER COLUMN id DROP DEFAULT')
+
+        op.execute(
+            f"CREATE TABLE {table} ({spec['columns']}, PRIMARY KEY (id, {time_column})) "
+            f"PARTITION BY RANGE ({time_column})"
+        )
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+        first = bind.execute(sa.text(f'SELECT min({time_column}) FROM {legacy}')).scalar()
+        for month in _partition_months(first, datetime.utcnow()):
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+            )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        for index_name, column in spec['indexes'].items():
+            op.execute(f'CREATE INDEX {index_name} ON {table} ({column})')
+
+        # Jeden INSERT ... SELECT, riadky sa rozdelia do partícií (NULL čas -> teraz)
+        select_columns = ', '.join(
+            f"COALESCE({column}, now() AT TIME ZONE 'utc')" if column == time_column else column
+            for column in spec['copy_columns'].split(', ')
+        )
+        op.execute(f"INSERT INTO {table} ({spec['copy_columns']}) SELECT {select_columns} FROM {legacy}")
+        op.execute(
+            f"SELECT setval('{table}_id_seq', COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+        )
+        op.execute(f'DROP TABLE {legacy}')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, spec in TABLES.items():
+        partitioned = f'{table}_partitioned'
+        for index_name in spec['indexes']:
+            op.execute(f'DROP INDEX IF EXISTS {index_name}')
+        op.execute(f'ALTER INDEX IF EXISTS {table}_pkey RENAME TO {partitioned}_pkey')
+        op.execute(f'ALTER TABLE {table} RENAME TO {partitioned}')
+        op.execute(f'ALTER TABLE {partitioned} ALTER COLUMN id DROP DEFAULT')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+
+        op.execute(f"CREATE TABLE {table} ({spec['columns']}, PRIMARY KEY (id))")
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        for index_name, column in spec['indexes'].items():
+            op.execute(f'CREATE INDEX {index_name} ON {table} ({column})')
+        op.execute(
+            f"INSERT INTO {table} ({spec['copy_columns']}) "
+            f"SELECT {spec['copy_columns']} FROM {partitioned}"
+        )
+        # Partície padnú spolu s rodičom
+        op.execute(f'DROP TABLE {partitioned} CASCADE')
@@ -0,0 +1,8 @@
+"""
+API routery ILUMINATI SYSTEM
+
+Skupiny endpointov s ťažkými závislosťami (Excel/PDF export, Stripe,
+columnar analytics, ERP) žijú v samostatných moduloch. Ťažké knižnice
+(openpyxl, pyarrow, WeasyPrint, stripe) sa importujú až pri prvom
+requeste, import main.py ostáva rýchly.
+"""
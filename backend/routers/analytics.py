@@ -0,0 +1,221 @@
+"""
+Analytics endpointy (dashboard, trendy, ad-hoc columnar dotazy) - Enterprise tier
+"""
+
+import asyncio
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+
+from routers.deps import get_current_user
+from services.analytics import (
+    get_api_usage,
+    get_dashboard_summary,
+    get_risk_distribution,
+    get_search_trends,
+    get_user_activity,
+)
+from services.auth import User, UserTier
+from services.columnar_export import run_query
+
+router = APIRouter()
+
+
+@router.get("/api/analytics/dashboard")
+async def get_analytics_dashboard(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať kompletný analytics dashboard (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics dashboard is only available for Enterprise tier",
+        )
+
+    try:
+        summary = get_dashboard_summary()
+        return {"success": True, "data": summary}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching analytics: {str(e)}",
+        )
+
+
+@router.get("/api/analytics/search-trends")
+async def get_analytics_search_trends(
+    days: int = 30,
+    group_by: str = "day",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať trendy vyhľadávaní (len Enterprise tier)
+
+    Args:
+        days: Počet dní späť (default: 30)
+        group_by: Agregácia - day, week, month (default: day)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics are only available for Enterprise tier",
+        )
+
+    try:
+        trends = get_search_trends(
+            days=days,
+            group_by=group_by,
+            user_id=current_user.id,  # type: ignore[arg-type]
+        )
+        return {"success": True, "data": trends}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching search trends: {str(e)}",
+        )
+
+
+@router.get("/api/analytics/risk-distribution")
+async def get_analytics_risk_distribution(
+    days: int = 30,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať distribúciu risk skóre (len Enterprise tier)
+
+    Args:
+        days: Počet dní späť (default: 30)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics are only available for Enterprise tier",
+        )
+
+    try:
+        distribution = get_risk_distribution(days=days, user_id=current_user.id)  # type: ignore[arg-type]
+        return {"success": True, "data": distribution}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching risk distribution: {str(e)}",
+        )
+
+
+@router.get("/api/analytics/user-activity")
+async def get_analytics_user_activity(
+    days: int = 30,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať aktivitu používateľov (len Enterprise tier)
+
+    Args:
+        days: Počet dní späť (default: 30)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics are only available for Enterprise tier",
+        )
+
+    try:
+        activity = get_user_activity(days=days)
+        return {"success": True, "data": activity}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching user activity: {str(e)}",
+        )
+
+
+@router.get("/api/analytics/api-usage")
+async def get_analytics_api_usage(
+    days: int = 30,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať štatistiky API použitia (len Enterprise tier)
+
+    Args:
+        days: Počet dní späť (default: 30)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics are only available for Enterprise tier",
+        )
+
+    try:
+        usage = get_api_usage(days=days)
+        return {"success": True, "data": usage}
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching API usage: {str(e)}",
+        )
+
+
+class AnalyticsQuery(BaseModel):
+    dataset: str = Field("search_history", description="search_history | analytics")
+    metrics: List[str] = Field(
+        default=["count"], description="count, sum:col, avg:col, min:col, max:col, count_distinct:col"
+    )
+    group_by: List[str] = Field(default=[], description="Stĺpce alebo date, hour, weekday")
+    filters: Dict[str, Any] = Field(default={}, description="Rovnosť na stĺpcoch (hodnota alebo zoznam)")
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    limit: int = 1000
+
+
+@router.post("/api/analytics/query")
+async def query_analytics(
+    query: AnalyticsQuery,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Ad-hoc agregácie nad columnar exportom (Parquet) - mimo produkčnej DB (len Enterprise tier)
+
+    Body:
+        {
+            "dataset": "search_history",
+            "metrics": ["count", "avg:risk_score"],
+            "group_by": ["date", "country"],
+            "filters": {"country": ["SK", "CZ"]},
+            "start_date": "2024-12-01",
+            "end_date": "2024-12-31"
+        }
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Analytics are only available for Enterprise tier",
+        )
+
+    try:
+        result = await asyncio.to_thread(
+            run_query,
+            dataset=query.dataset,
+            metrics=query.metrics,
+            group_by=query.group_by,
+            filters=query.filters,
+            start_date=query.start_date,
+            end_date=query.end_date,
+            limit=query.limit,
+        )
+        return {"success": True, "data": result}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(
+            status_code=503, detail=f"Analytics query nie je dostupný: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error running analytics query: {str(e)}",
+        )
@@ -0,0 +1,71 @@
+"""
+Zdieľané FastAPI závislosti (autentifikácia) pre main.py a routery
+"""
+
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+
+from services.auth import User, decode_access_token, get_user_by_email
+from services.auth_cache import cache_user, get_cached_user, is_token_revoked, token_cache_key
+from services.database import get_db_session
+
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
+    """Získa aktuálneho používateľa z tokenu (cez auth cache)"""
+    payload = decode_access_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    email: Optional[str] = payload.get("sub")
+    if email is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    cache_key = token_cache_key(token, payload)
+    if is_token_revoked(cache_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    cached_user = get_cached_user(cache_key)
+    if cached_user is not None:
+        return cached_user
+
+    # Cache miss - overiť aj zdieľaný revocation list (iné workery)
+    if is_token_revoked(cache_key, check_remote=True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    with get_db_session() as db:
+        if db is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+        user = get_user_by_email(db, email)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # Expunge user from session to avoid DetachedInstanceError label
+        db.expunge(user)
+        cache_user(cache_key, user)
+        return user
@@ -0,0 +1,325 @@
+"""
+ERP integrácia - pripojenia, synchronizácia a dodávatelia (Enterprise tier)
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+
+from routers.deps import get_current_user
+from services.auth import User, UserTier
+from services.database import get_db_session
+from services.erp.erp_service import (
+    activate_erp_connection,
+    create_erp_connection,
+    deactivate_erp_connection,
+    get_erp_suppliers,
+    get_erp_sync_logs,
+    get_supplier_payment_history_from_erp,
+    get_user_erp_connections,
+    sync_erp_data,
+    test_erp_connection,
+)
+from services.erp.models import ErpType
+
+router = APIRouter()
+
+
+class ErpConnectionCreate(BaseModel):
+    erp_type: str = Field(..., description="Typ ERP systému: sap, pohoda, money_s3")
+    connection_data: Dict = Field(
+        ..., description="Connection credentials (API keys, URLs, etc.)"
+    )
+    sync_frequency: Optional[str] = Field(
+        default="daily", description="Sync frequency: daily, weekly, manual"
+    )
+
+
+@router.post("/api/enterprise/erp/connect")
+async def create_erp_connection_endpoint(
+    erp_data: ErpConnectionCreate, current_user: User = Depends(get_current_user)
+):
+    """
+    Vytvoriť nové ERP pripojenie (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    try:
+        erp_type = ErpType(erp_data.erp_type.lower())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid ERP type: {erp_data.erp_type}. Must be: sap, pohoda, money_s3",
+        )
+
+    # Test pripojenia pred vytvorením
+    test_result = test_erp_connection(erp_type, erp_data.connection_data)
+    if not test_result.get("success"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Connection test failed: {test_result.get('message', 'Unknown error')}",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        connection = create_erp_connection(
+            db=db,
+            user_id=current_user.id,  # type: ignore[arg-type]
+            erp_type=erp_type,
+            connection_data=erp_data.connection_data,
+        )
+
+        # Nastaviť sync frequency
+        connection.sync_frequency = erp_data.sync_frequency  # type: ignore[assignment]
+
+        # Aktivovať pripojenie
+        if activate_erp_connection(db, connection.id, current_user.id):  # type: ignore[arg-type,assignment]
+            db.refresh(connection)
+            return {
+                "success": True,
+                "message": "ERP connection created and activated",
+                "data": connection.to_dict(),
+            }
+        else:
+            return {
+                "success": True,
+                "message": "ERP connection created but activation failed",
+                "data": connection.to_dict(),
+                "warning": "Please check your credentials",
+            }
+
+
+@router.get("/api/enterprise/erp/connections")
+async def list_erp_connections_endpoint(current_user: User = Depends(get_current_user)):
+    """
+    Získať zoznam všetkých ERP pripojení (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        connections = get_user_erp_connections(db, current_user.id)  # type: ignore[arg-type]
+
+        result = [conn.to_dict() for conn in connections]
+
+        return {"success": True, "connections": result, "count": len(result)}
+
+
+@router.post("/api/enterprise/erp/{connection_id}/activate")
+async def activate_erp_connection_endpoint(
+    connection_id: int, current_user: User = Depends(get_current_user)
+):
+    """
+    Aktivovať ERP pripojenie (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        success = activate_erp_connection(db, connection_id, current_user.id)  # type: ignore[arg-type]
+
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to activate connection. Please check your credentials.",
+            )
+
+        return {"success": True, "message": "ERP connection activated successfully"}
+
+
+@router.post("/api/enterprise/erp/{connection_id}/deactivate")
+async def deactivate_erp_connection_endpoint(
+    connection_id: int, current_user: User = Depends(get_current_user)
+):
+    """
+    Deaktivovať ERP pripojenie (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        success = deactivate_erp_connection(db, connection_id, current_user.id)  # type: ignore[arg-type]
+
+        if not success:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Connection not found"
+            )
+
+        return {"success": True, "message": "ERP connection deactivated successfully"}
+
+
+@router.post("/api/enterprise/erp/{connection_id}/sync")
+async def sync_erp_data_endpoint(
+    connection_id: int,
+    sync_type: str = "incremental",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Synchronizovať dáta z ERP (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        # Stránkovaný sync + bulk upsert beží mimo event loopu
+        result = await asyncio.to_thread(
+            sync_erp_data, db, connection_id, current_user.id, sync_type  # type: ignore[arg-type]
+        )
+
+        if not result.get("success"):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=result.get("message", "Sync failed"),
+            )
+
+        return result
+
+
+@router.get("/api/enterprise/erp/{connection_id}/logs")
+async def get_erp_sync_logs_endpoint(
+    connection_id: int, limit: int = 50, current_user: User = Depends(get_current_user)
+):
+    """
+    Získať logy synchronizácií ERP (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        logs = get_erp_sync_logs(db, connection_id, current_user.id, limit)  # type: ignore[arg-type]
+
+        result = [log.to_dict() for log in logs]
+
+        return {"success": True, "logs": result, "count": len(result)}
+
+
+@router.get("/api/enterprise/erp/{connection_id}/suppliers")
+async def get_erp_suppliers_endpoint(
+    connection_id: int,
+    risk_level: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať synchronizovaných dodávateľov s risk screeningom (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        suppliers = get_erp_suppliers(
+            db,
+            connection_id,
+            current_user.id,  # type: ignore[arg-type]
+            risk_level,
+            min(max(limit, 1), 1000),
+            max(offset, 0),
+        )
+        result = [supplier.to_dict() for supplier in suppliers]
+
+        return {"success": True, "suppliers": result, "count": len(result)}
+
+
+@router.get("/api/enterprise/erp/{connection_id}/supplier/{supplier_ico}/payments")
+async def get_supplier_payments_endpoint(
+    connection_id: int,
+    supplier_ico: str,
+    days: int = 365,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Získať históriu platieb dodávateľa z ERP (len Enterprise tier)
+    """
+    if current_user.tier != UserTier.ENTERPRISE:  # type: ignore[comparison-overlap]
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ERP integrations are only available for Enterprise tier",
+        )
+
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        payments = get_supplier_payment_history_from_erp(
+            db,
+            connection_id,
+            current_user.id,  # type: ignore[arg-type]
+            supplier_ico,
+            days,
+        )
+
+        return {
+            "success": True,
+            "supplier_ico": supplier_ico,
+            "payments": payments,
+            "count": len(payments),
+        }
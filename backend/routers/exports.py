@@ -0,0 +1,330 @@
+"""
+Export endpointy (Excel, CSV, NDJSON, PDF, asynchrónne export joby)
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from routers.deps import get_current_user
+from services.auth import User
+from services.database import get_db_session
+from services.export_jobs import (
+    JOB_DONE,
+    JOB_FORMATS,
+    ExportJob,
+    get_export_job,
+    render_in_pool,
+    result_path,
+    schedule_export_job,
+    submit_export_job,
+)
+from services.export_service import (
+    XLSX_MEDIA_TYPE,
+    iter_favorite_companies,
+    stream_batch_to_excel,
+    stream_companies,
+    stream_csv,
+    stream_graph_to_excel,
+)
+
+router = APIRouter()
+
+
+@router.post("/api/export/excel")
+async def export_search_results_to_excel(
+    graph_data: Dict,
+    current_user: Optional[User] = Depends(get_current_user),
+):
+    """
+    Exportuje výsledky vyhľadávania do Excel (xlsx) formátu.
+
+    Body:
+        Dict: Grafové dáta (nodes, edges) - GraphResponse formát
+
+    Returns:
+        Excel súbor (application/vnd.openxmlformats-officedocument.spreadsheetml.sheet)
+    """
+    try:
+        filename = f"iluminati-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.xlsx"
+
+        return StreamingResponse(
+            stream_graph_to_excel(graph_data),
+            media_type=XLSX_MEDIA_TYPE,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    except ImportError as e:
+        raise HTTPException(
+            status_code=503, detail=f"Excel export nie je dostupný: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Chyba pri exporte do Excel: {str(e)}"
+        )
+
+
+@router.post("/api/export/batch-excel")
+async def export_batch_companies_to_excel(
+    companies: List[Dict],
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Exportuje batch firiem do Excel (xlsx) formátu.
+
+    Body:
+        List[Dict]: Zoznam firiem (každá firma obsahuje company_data, risk_score, notes, atď.)
+
+    Returns:
+        Excel súbor (application/vnd.openxmlformats-officedocument.spreadsheetml.sheet)
+    """
+    try:
+        filename = (
+            f"iluminati-batch-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.xlsx"
+        )
+
+        return StreamingResponse(
+            stream_batch_to_excel(companies),
+            media_type=XLSX_MEDIA_TYPE,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    except ImportError as e:
+        raise HTTPException(
+            status_code=503, detail=f"Excel export nie je dostupný: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Chyba pri exporte do Excel: {str(e)}"
+        )
+
+
+def _export_stream_response(companies, format: str, prefix: str) -> StreamingResponse:
+    """StreamingResponse pre batch firiem v zvolenom formáte (xlsx, csv, ndjson)"""
+    try:
+        stream, media_type, extension = stream_companies(companies, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(
+            status_code=503, detail=f"Excel export nie je dostupný: {str(e)}"
+        )
+
+    filename = f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+    return StreamingResponse(
+        stream,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@router.post("/api/export/batch")
+async def export_batch_companies(
+    companies: List[Dict],
+    format: str = "xlsx",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Streamovaný export batchu firiem (xlsx, csv, ndjson).
+
+    Body:
+        List[Dict]: Zoznam firiem (každá firma obsahuje company_data, risk_score, notes, atď.)
+    """
+    return _export_stream_response(companies, format, "iluminati-batch-export")
+
+
+@router.get("/api/export/favorites")
+async def export_favorite_companies(
+    format: str = "xlsx",
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Streamovaný export obľúbených firiem priamo z DB (xlsx, csv, ndjson).
+    Pamäť nezávisí od počtu firiem - riadky sa čítajú po chunkoch.
+    """
+    return _export_stream_response(
+        iter_favorite_companies(current_user.id),  # type: ignore[arg-type]
+        format,
+        "iluminati-favorites",
+    )
+
+
+@router.post("/api/v2/export", tags=["Enhanced Export"])
+async def enhanced_export(
+    request: Dict,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Enhanced export endpoint supporting multiple formats with professional styling.
+    
+    Request body:
+    {
+        "format": "pdf|excel|csv|json",
+        "data": { /* graph data or search results */ },
+        "options": {
+            "include_graph": true,
+            "branding": "premium|standard",
+            "timestamp": true,
+            "executive_summary": true,
+            "risk_analysis": true
+        }
+    }
+    """
+    format_type = request.get("format", "json").lower()
+    data = request.get("data", {})
+    options = request.get("options", {})
+    
+    try:
+        if format_type == "pdf":
+            # WeasyPrint render je CPU-bound - beží v process poole, event loop ostáva voľný
+            pdf_bytes = await render_in_pool(
+                "pdf",
+                data,
+                options,
+                metadata={"user_id": current_user.id, "export_time": datetime.now().isoformat()},
+            )
+            prefix = "iluminati_export" if "companies" in data else "iluminati_network"
+            
+            return Response(
+                content=pdf_bytes,
+                media_type="application/pdf",
+                headers={"Content-Disposition": f"attachment; filename={prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"}
+            )
+        
+        elif format_type == "excel":
+            return StreamingResponse(
+                stream_graph_to_excel(data),
+                media_type=XLSX_MEDIA_TYPE,
+                headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"}
+            )
+        
+        elif format_type == "csv":
+            rows = (
+                [
+                    node.get("type", ""),
+                    node.get("id", ""),
+                    node.get("label", ""),
+                    node.get("country", ""),
+                    node.get("risk_score", 0),
+                    node.get("details", "")
+                ]
+                for node in data.get("nodes", [])
+            )
+            
+            return StreamingResponse(
+                stream_csv(["Type", "ID", "Label", "Country", "Risk Score", "Details"], rows),
+                media_type="text/csv",
+                headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"}
+            )
+        
+        elif format_type == "json":
+            return Response(
+                content=json.dumps(data, indent=2, ensure_ascii=False),
+                media_type="application/json",
+                headers={"Content-Disposition": f"attachment; filename=iluminati_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"}
+            )
+        
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported export format: {format_type}"
+            )
+            
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Export failed: {str(e)}"
+        )
+
+
+class ExportJobCreate(BaseModel):
+    format: str = Field(..., description="pdf | excel | csv | ndjson")
+    data: Dict = Field(..., description="Graph data alebo {'companies': [...]}")
+    options: Dict = Field(default_factory=dict)
+
+
+@router.post("/api/v2/export/jobs", tags=["Enhanced Export"], status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    job_data: ExportJobCreate,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Zadať asynchrónny export (PDF/Excel/CSV/NDJSON). Vráti job_id hneď,
+    render beží v process poole. Rovnaký vstup vráti existujúci job.
+    """
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        try:
+            job, deduplicated = submit_export_job(
+                db,
+                current_user.id,  # type: ignore[arg-type]
+                job_data.format.lower(),
+                job_data.data,
+                job_data.options,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if not deduplicated:
+            schedule_export_job(job)
+
+        return {"success": True, "deduplicated": deduplicated, "job": job.to_dict()}
+
+
+@router.get("/api/v2/export/jobs/{job_id}", tags=["Enhanced Export"])
+async def get_export_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    """Stav a progress export jobu"""
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        job = get_export_job(db, job_id, current_user.id)  # type: ignore[arg-type]
+        if not job:
+            raise HTTPException(status_code=404, detail="Export job not found")
+
+        if job["status"] == JOB_DONE:
+            job["download_url"] = f"/api/v2/export/jobs/{job_id}/download"
+        return {"success": True, "job": job}
+
+
+@router.get("/api/v2/export/jobs/{job_id}/download", tags=["Enhanced Export"])
+async def download_export_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Stiahnuť výsledok dokončeného export jobu (do expirácie)"""
+    with get_db_session() as db:
+        if not db:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database not available",
+            )
+
+        job = (
+            db.query(ExportJob)
+            .filter(ExportJob.id == job_id, ExportJob.user_id == current_user.id)
+            .first()
+        )
+        if not job or job.expires_at <= datetime.utcnow():
+            raise HTTPException(status_code=404, detail="Export job not found or expired")
+        if job.status != JOB_DONE:
+            raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+
+        path = result_path(job)
+        media_type, extension = JOB_FORMATS[job.format]
+
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Export result expired")
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=f"iluminati_export_{job_id[:8]}.{extension}",
+    )
@@ -0,0 +1,98 @@
+"""
+Stripe platby - checkout, webhook a správa subscription
+
+stripe SDK sa importuje až pri prvom platobnom requeste (services.stripe_service).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from routers.deps import get_current_user
+from services.auth import User, UserTier
+
+router = APIRouter()
+
+
+@router.post("/api/payment/checkout")
+async def create_payment_checkout(
+    tier: str, current_user: User = Depends(get_current_user)
+):
+    """Vytvorí Stripe checkout session pre upgrade tieru"""
+    from services.stripe_service import create_checkout_session
+
+    try:
+        user_tier = UserTier(tier.lower())
+        if user_tier == UserTier.FREE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot upgrade to FREE tier",
+            )
+
+        result = create_checkout_session(
+            user_id=current_user.id,  # type: ignore[arg-type]
+            user_email=current_user.email,  # type: ignore[arg-type]
+            tier=user_tier,
+        )
+
+        if "error" in result:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=result["error"],
+            )
+
+        return result
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid tier: {tier}"
+        )
+
+
+@router.post("/api/payment/webhook")
+async def stripe_webhook(request: Request):
+    """Stripe webhook endpoint pre subscription events"""
+    from services.stripe_service import handle_webhook
+
+    payload = await request.body()
+    signature = request.headers.get("stripe-signature")
+
+    if not signature:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing stripe-signature header",
+        )
+
+    result = handle_webhook(payload, signature)
+
+    if "error" in result:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=result["error"]
+        )
+
+    return result
+
+
+@router.get("/api/payment/subscription")
+async def get_subscription(current_user: User = Depends(get_current_user)):
+    """Získa subscription status používateľa"""
+    from services.stripe_service import get_subscription_status
+
+    result = get_subscription_status(current_user.email)  # type: ignore[arg-type]
+
+    if result is None:
+        return {"status": "no_subscription", "tier": current_user.tier.value}
+
+    return result
+
+
+@router.post("/api/payment/cancel")
+async def cancel_user_subscription(current_user: User = Depends(get_current_user)):
+    """Zruší subscription používateľa"""
+    from services.stripe_service import cancel_subscription
+
+    result = cancel_subscription(current_user.email)  # type: ignore[arg-type]
+
+    if "error" in result:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=result["error"]
+        )
+
+    return result
@@ -0,0 +1,161 @@
+"""
+Benchmark expanzie grafu - pôvodná schéma vs. unikátne hrany s krycími indexmi.
+
+before: jednostĺpcové indexy (source, target, type), string kľúče,
+        cieľové uzly dotazom po jednom (N+1)
+after:  services.database schéma - unikátny (source, type, target),
+        reverzný (target, type, source), join hrán na uzly cez surrogate kľúč
+
+Meria tri dotazy expanzie z build_company_graph nad syntetickým grafom
+(firmy -> osoby/vlastníci/adresa) v dočasnej SQLite databáze.
+
+Použitie:
+    python scripts/benchmark_graph_expansion.py [--companies 20000] [--queries 500] [--iterations 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from services.database import Base  # noqa: E402
+
+LEGACY_SCHEMA = [
+    "CREATE TABLE graph_nodes (id VARCHAR(50) PRIMARY KEY, label VARCHAR(500), type VARCHAR(50), "
+    "country VARCHAR(2), details JSON, created_at DATETIME, updated_at DATETIME)",
+    "CREATE INDEX ix_graph_nodes_type ON graph_nodes (type)",
+    "CREATE TABLE graph_edges (id INTEGER PRIMARY KEY, source VARCHAR(50), target VARCHAR(50), "
+    "type VARCHAR(50), weight FLOAT, details JSON, created_at DATETIME, updated_at DATETIME)",
+    "CREATE INDEX ix_graph_edges_source ON graph_edges (source)",
+    "CREATE INDEX ix_graph_edges_target ON graph_edges (target)",
+    "CREATE INDEX ix_graph_edges_type ON graph_edges (type)",
+]
+
+RELATION_TYPES = ("MANAGED_BY", "OWNED_BY")
+
+
+def synthetic_graph(companies: int, seed: int = 11):
+    """Firmy zdieľajú osoby z obmedzeného poolu - reálna hustota prepojení"""
+    rng = random.Random(seed)
+    people = max(companies // 3, 1)
+    nodes = [(f"sk_{i}", f"Firma {i}", "company") for i in range(companies)]
+    nodes += [(f"pers_sk_{i}", f"Osoba {i}", "person") for i in range(people)]
+    nodes += [(f"addr_sk_{i}", f"Adresa {i}", "address") for i in range(companies // 10 + 1)]
+    edges = set()
+    for i in range(companies):
+        edges.add((f"sk_{i}", f"addr_sk_{rng.randrange(companies // 10 + 1)}", "LOCATED_AT"))
+        for _ in range(rng.randint(1, 4)):
+            edges.add((f"sk_{i}", f"pers_sk_{rng.randrange(people)}", rng.choice(RELATION_TYPES)))
+    return nodes, sorted(edges)
+
+
+def load(engine, nodes, edges, with_keys: bool) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO graph_nodes (id, label, type, country) VALUES (:id, :label, :type, 'SK')"),
+            [{"id": n, "label": label, "type": t} for n, label, t in nodes],
+        )
+        conn.execute(
+            text("INSERT INTO graph_edges (source, target, type) VALUES (:s, :t, :type)"),
+            [{"s": s, "t": t, "type": et} for s, t, et in edges],
+        )
+        if with_keys:
+            conn.execute(text(
+                "UPDATE graph_edges SET "
+                "source_key = (SELECT key FROM graph_nodes WHERE graph_nodes.id = graph_edges.source), "
+                "target_key = (SELECT key FROM graph_nodes WHERE graph_nodes.id = graph_edges.target)"
+            ))
+        conn.execute(text("ANALYZE"))
+
+
+def before_queries(conn, company_id: str) -> int:
+    rows = conn.execute(text(
+        "SELECT * FROM graph_edges WHERE source = :s AND type IN ('MANAGED_BY', 'OWNED_BY')"
+    ), {"s": company_id}).all()
+    targets = [r.target for r in rows]
+    if targets:
+        placeholders = ", ".join(f":t{i}" for i in range(len(targets)))
+        params = {f"t{i}": t for i, t in enumerate(targets)}
+        conn.execute(text(
+            f"SELECT * FROM graph_edges WHERE target IN ({placeholders}) "
+            f"AND type IN ('MANAGED_BY', 'OWNED_BY') LIMIT 100"
+        ), params).all()
+    out = conn.execute(text("SELECT * FROM graph_edges WHERE source = :s"), {"s": company_id}).all()
+    for edge in out:
+        conn.execute(text("SELECT * FROM graph_nodes WHERE id = :id"), {"id": edge.target}).first()
+    return len(out)
+
+
+def after_queries(conn, company_id: str) -> int:
+    rows = conn.execute(text(
+        "SELECT source, target, type FROM graph_edges WHERE source = :s AND type IN ('MANAGED_BY', 'OWNED_BY')"
+    ), {"s": company_id}).all()
+    targets = [r.target for r in rows]
+    if targets:
+        placeholders = ", ".join(f":t{i}" for i in range(len(targets)))
+        params = {f"t{i}": t for i, t in enumerate(targets)}
+        conn.execute(text(
+            f"SELECT source, target, type FROM graph_edges WHERE target IN ({placeholders}) "
+            f"AND type IN ('MANAGED_BY', 'OWNED_BY') LIMIT 100"
+        ), params).all()
+    out = conn.execute(text(
+        "SELECT e.*, n.* FROM graph_edges e LEFT JOIN graph_nodes n ON n.key = e.target_key WHERE e.source = :s"
+    ), {"s": company_id}).all()
+    return len(out)
+
+
+def timed(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Graph expansion benchmark")
+    parser.add_argument("--companies", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.companies)
+    probes = [f"sk_{i}" for i in random.Random(3).sample(range(args.companies), min(args.queries, args.companies))]
+    print(f"graf: {len(nodes):,} uzlov, {len(edges):,} hrán, {len(probes)} expanzií")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = create_engine(f"sqlite:///{os.path.join(tmp, 'before.db')}")
+        with before.begin() as conn:
+            for ddl in LEGACY_SCHEMA:
+                conn.execute(text(ddl))
+        load(before, nodes, edges, with_keys=False)
+
+        after = create_engine(f"sqlite:///{os.path.join(tmp, 'after.db')}")
+        Base.metadata.create_all(bind=after, tables=[
+            Base.metadata.tables["graph_nodes"], Base.metadata.tables["graph_edges"],
+        ])
+        load(after, nodes, edges, with_keys=True)
+
+        results = {}
+        for name, engine, queries in (("before", before, before_queries), ("after", after, after_queries)):
+            with engine.connect() as conn:
+                results[name] = timed(lambda: [queries(conn, cid) for cid in probes], args.iterations)
+            engine.dispose()
+
+    for name, elapsed in results.items():
+        print(f"{name:<8}{len(probes) / elapsed:>12,.0f} expanzií/s  ({elapsed * 1000 / len(probes):.3f} ms/expanzia)")
+    print(f"zrýchlenie: {results['before'] / results['after']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark PDF render pipeline - latencia per typ reportu.
+
+Pre každý zo šiestich reportov meria:
+- cold:   prvý render v procese (parsovanie stylesheetu + fontov)
+- warm:   nový vstup (memo miss), stylesheet už predparsovaný
+- cached: opakovaný vstup (memoizované PDF)
+
+Použitie:
+    python scripts/benchmark_pdf_reports.py [--iterations 5] [--companies 50] [--html-only]
+
+Bez weasyprint sa automaticky meria len HTML fáza (šablóny + analýza).
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import pdf_export_service  # noqa: E402
+from services.pdf_export_service import REPORT_TYPES, PDFExportService  # noqa: E402
+
+
+def sample_companies(n: int, seed: int = 0):
+    return [
+        {
+            "identifier": f"{seed}{i:07d}",
+            "name": f"Firma {seed}-{i} s.r.o.",
+            "country": ["SK", "CZ", "PL", "HU"][i % 4],
+            "legal_form": "s.r.o.",
+            "risk_score": (i * 7 + seed) % 11,
+            "status": "active",
+        }
+        for i in range(n)
+    ]
+
+
+def sample_graph(n: int, seed: int = 0):
+    nodes = [{"id": f"n{seed}-{i}", "label": f"Node {i}", "type": "company"} for i in range(n)]
+    edges = [{"source": f"n{seed}-{i}", "target": f"n{seed}-{(i + 1) % n}", "type": "OWNED_BY"} for i in range(n)]
+    return {"nodes": nodes, "edges": edges}
+
+
+def report_call(service: PDFExportService, report: str, n: int, seed: int):
+    """Zavolá generate_<report> so vstupom závislým od seed"""
+    companies = sample_companies(n, seed)
+    if report == "executive_summary":
+        return service.generate_executive_summary(companies, {"seed": seed})
+    if report == "company_profile":
+        return service.generate_company_profile(companies[0], [{"target": c["identifier"]} for c in companies])
+    if report == "network_analysis":
+        return service.generate_network_analysis(sample_graph(n, seed), {"seed": seed})
+    if report == "risk_assessment":
+        return service.generate_risk_assessment(companies, {"legal_risks": []})
+    if report == "comparative_analysis":
+        return service.generate_comparative_analysis(companies, ["risk_score"])
+    return service.generate_dashboard_report({"seed": seed, "companies": companies})
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PDF render benchmark")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--html-only", action="store_true")
+    args = parser.parse_args()
+
+    service = PDFExportService()
+    html_only = args.html_only or not pdf_export_service.WEASYPRINT_AVAILABLE
+    if html_only:
+        print("ℹ️  Meria sa len HTML fáza (weasyprint nie je dostupný alebo --html-only)")
+        service._render_pdf = lambda html, document_type: html.encode("utf-8")
+
+    print(f"{'report':<22}{'cold ms':>10}{'warm ms':>10}{'cached ms':>11}")
+    seed = 1
+    for report in REPORT_TYPES:
+        cold = timed(lambda: report_call(service, report, args.companies, seed))
+        warm = []
+        for _ in range(args.iterations):
+            seed += 1
+            warm.append(timed(lambda: report_call(service, report, args.companies, seed)))
+        cached = [timed(lambda: report_call(service, report, args.companies, seed)) for _ in range(args.iterations)]
+        print(f"{report:<22}{cold:>10.2f}{statistics.median(warm):>10.2f}{statistics.median(cached):>11.3f}")
+        seed += 1
+
+    print(f"\nPDF cache: {pdf_export_service.get_pdf_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark PSČ → kraj/okres resolvera (services.sk_region_resolver).
+
+Meria throughput resolve_region (po jednom) a resolve_many (bulk) nad mixom
+presných zhôd, 3-miestnych prefixov, PSČ s medzerou a neznámych kódov.
+
+Použitie:
+    python scripts/benchmark_region_resolver.py [--count 1000000] [--iterations 3]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.sk_region_resolver import get_postal_index, resolve_many, resolve_region  # noqa: E402
+
+
+def sample_codes(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    index = get_postal_index()
+    known = [f"{code:05d}" for code, region_id in enumerate(index.codes) if region_id]
+    codes = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            codes.append(rng.choice(known))
+        elif kind < 0.8:
+            code = rng.choice(known)
+            codes.append(f"{code[:3]} {code[3:]}")
+        elif kind < 0.95:
+            codes.append(f"{rng.randrange(100, 1000)}{rng.randrange(100):02d}")
+        else:
+            codes.append("")
+    return codes
+
+
+def timed(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Region resolver benchmark")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    get_postal_index()
+    print(f"index load: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    codes = sample_codes(args.count)
+    single = timed(lambda: [resolve_region(code) for code in codes], args.iterations)
+    bulk = timed(lambda: resolve_many(codes), args.iterations)
+
+    print(f"{'resolve_region':<16}{args.count / single:>14,.0f} PSČ/s")
+    print(f"{'resolve_many':<16}{args.count / bulk:>14,.0f} PSČ/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark vektorizovaného risk skóre (services.company_batch).
+
+Vygeneruje syntetický stĺpcový batch (default 1M firiem) a meria:
+- score:     registrové risk skóre (SK/PL/HU pravidlá)
+- histogram: rozdelenie 0-10
+- summary:   súhrn (krajiny, právne formy, high/medium/low)
+- records:   voliteľne aj stavbu batchu z dictov (--records N)
+
+Použitie:
+    python scripts/benchmark_risk_scoring.py [--rows 1000000] [--iterations 5] [--records 100000]
+
+Cieľ: 1M firiem ohodnotených pod 1 s.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import company_batch  # noqa: E402
+from services.company_batch import (  # noqa: E402
+    COUNTRIES,
+    NO_DATE,
+    CompanyBatch,
+    risk_histogram,
+    score_batch,
+    summary_statistics,
+)
+
+
+def synthetic_batch(rows: int, seed: int = 42) -> CompanyBatch:
+    np = company_batch.np
+    rng = np.random.default_rng(seed)
+    today = date.today().toordinal()
+    founded = today - rng.integers(0, 365 * 30, rows)
+    founded[rng.random(rows) < 0.1] = NO_DATE
+    return CompanyBatch(
+        identifiers=[],
+        risk_score=rng.uniform(0, 10, rows),
+        country=rng.integers(0, len(COUNTRIES), rows),
+        country_labels=list(COUNTRIES),
+        legal_form=rng.integers(0, 8, rows),
+        legal_form_labels=[f"form-{i}" for i in range(8)],
+        status=rng.choice([0, 1, 2], rows, p=[0.9, 0.07, 0.03]),
+        executives=rng.poisson(2, rows),
+        founded_day=founded,
+        virtual_seat=rng.random(rows) < 0.05,
+    )
+
+
+def sample_records(n: int):
+    return [
+        {
+            "identifier": f"{i:08d}",
+            "country": COUNTRIES[i % 4],
+            "legal_form": "s.r.o." if i % 3 else "a.s.",
+            "status": "v likvidácii" if i % 50 == 0 else "Aktívna",
+            "executives": ["x"] * (i % 12),
+            "founded": f"{2000 + i % 25}-01-01",
+            "address": "Hlavná 1",
+            "risk_score": i % 11,
+        }
+        for i in range(n)
+    ]
+
+
+def timed_ms(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vectorized risk scoring benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--records", type=int, default=0, help="meraj aj CompanyBatch.from_records pre N dictov")
+    args = parser.parse_args()
+
+    if not company_batch.NUMPY_AVAILABLE:
+        print("❌ numpy nie je nainštalovaný (pip install numpy)")
+        sys.exit(1)
+
+    batch = synthetic_batch(args.rows)
+    scores = score_batch(batch)
+    score_ms = timed_ms(lambda: score_batch(batch), args.iterations)
+    histogram_ms = timed_ms(lambda: risk_histogram(scores), args.iterations)
+    summary_ms = timed_ms(lambda: summary_statistics(batch, scores), args.iterations)
+
+    print(f"rows: {args.rows:,}")
+    print(f"{'score':<12}{score_ms:>10.1f} ms")
+    print(f"{'histogram':<12}{histogram_ms:>10.1f} ms")
+    print(f"{'summary':<12}{summary_ms:>10.1f} ms")
+    total_ms = score_ms + histogram_ms + summary_ms
+    print(f"{'total':<12}{total_ms:>10.1f} ms {'✅' if total_ms < 1000 else '⚠️'}")
+
+    if args.records:
+        records = sample_records(args.records)
+        build_ms = timed_ms(lambda: CompanyBatch.from_records(records), 1)
+        print(f"{'from_records':<12}{build_ms:>10.1f} ms ({args.records:,} dictov)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark cache hitu /api/search (services.cache + main.graph_json_response).
+
+Pre grafy s 10, 100 a 1000 uzlami meria medián:
+- legacy: dict z cache -> GraphResponse(**cached) -> validácia response_model
+          -> jsonable_encoder -> json.dumps (pôvodná cesta cez FastAPI)
+- bytes:  pre-serializované JSON bajty z cache -> Response (bez validácie)
+- miss:   serializácia grafu pri zápise (graph_adapter.dump_json)
+
+Použitie:
+    python scripts/benchmark_search_cache.py [--sizes 10 100 1000] [--iterations 200]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import Response  # noqa: E402
+
+from main import GraphResponse, graph_adapter, graph_json_response  # noqa: E402
+from services import cache  # noqa: E402
+
+
+def synthetic_graph(size: int) -> dict:
+    """Hviezdicový graf: jedna firma, zvyšok osoby/adresy s hranami na firmu"""
+    company_id = "sk_00000000"
+    nodes = [{"id": company_id, "label": "Firma 0 s.r.o.", "type": "company", "country": "SK",
+              "risk_score": 5, "details": "IČO: 00000000, Status: Aktívna", "ico": "00000000"}]
+    edges = []
+    for i in range(1, size):
+        node_type = "address" if i % 5 == 0 else "person"
+        node_id = f"{'addr' if node_type == 'address' else 'pers'}_sk_00000000_{i}"
+        nodes.append({"id": node_id, "label": f"Uzol {i} Žilina", "type": node_type, "country": "SK",
+                      "risk_score": i % 10, "details": f"Konateľ od 2010-01-{i % 28 + 1:02d}"})
+        edges.append({"source": company_id, "target": node_id,
+                      "type": "LOCATED_AT" if node_type == "address" else "MANAGED_BY"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def timed_us(fn, iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(samples)
+
+
+def bench_size(size: int, iterations: int) -> dict:
+    graph = graph_adapter.validate_python(synthetic_graph(size))
+    legacy_key = cache.get_cache_key(f"legacy-{size}", "benchmark")
+    bytes_key = cache.get_cache_key(f"bytes-{size}", "benchmark")
+    cache.set(legacy_key, graph.model_dump())
+    graph_json_response(graph, bytes_key)
+
+    def legacy_hit():
+        model = GraphResponse(**cache.get(legacy_key))
+        validated = GraphResponse.model_validate(model.model_dump())  # response_model
+        return Response(json.dumps(jsonable_encoder(validated)).encode("utf-8"), media_type="application/json")
+
+    def bytes_hit():
+        return Response(content=cache.get_bytes(bytes_key), media_type="application/json")
+
+    assert json.loads(legacy_hit().body) == json.loads(bytes_hit().body)
+    result = {
+        "legacy": timed_us(legacy_hit, iterations),
+        "bytes": timed_us(bytes_hit, iterations),
+        "miss": timed_us(lambda: graph_adapter.dump_json(graph), iterations),
+    }
+    cache.delete(legacy_key)
+    cache.delete(bytes_key)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cache hitu /api/search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"orjson: {'áno' if cache.ORJSON_AVAILABLE else 'nie (json fallback)'}")
+    print(f"{'uzly':>6} {'legacy µs':>12} {'bytes µs':>10} {'zrýchlenie':>11} {'miss dump µs':>13}")
+    for size in args.sizes:
+        r = bench_size(size, args.iterations)
+        print(f"{size:>6} {r['legacy']:>12.1f} {r['bytes']:>10.1f} {r['legacy'] / r['bytes']:>10.0f}x {r['miss']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
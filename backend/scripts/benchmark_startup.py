@@ -0,0 +1,67 @@
+"""
+Benchmark cold startu FastAPI aplikácie (import main + startup + prvý request).
+
+Každé meranie beží v novom procese (studený import), DB je dočasná SQLite
+a background workery sú odložené, aby sa meral len štart.
+
+Použitie:
+    python scripts/benchmark_startup.py [--runs 5] [--target-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+_CHILD = """
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    client.get("/health")
+    ready = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "ready_ms": (ready - started) * 1000}))
+"""
+
+
+def measure_once(db_dir: str) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_dir}/startup.db",
+        "STARTUP_WORKER_DELAY_SECONDS": "3600",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=1500.0, help="cieľ pre medián import + startup")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        samples = [measure_once(db_dir) for _ in range(args.runs)]
+
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    ready_ms = statistics.median(s["ready_ms"] for s in samples)
+    print(f"{'import main':<22}{import_ms:>10.0f} ms")
+    print(f"{'startup + /health':<22}{ready_ms:>10.0f} ms")
+    if ready_ms > args.target_ms:
+        print(f"❌ Cold start {ready_ms:.0f} ms > cieľ {args.target_ms:.0f} ms")
+        sys.exit(1)
+    print(f"✅ Cold start v cieli ({args.target_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
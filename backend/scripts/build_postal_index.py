@@ -0,0 +1,40 @@
+"""
+Postaví predkompilovaný index PSČ (data/postal_codes_sk.idx) z postal_codes_sk.csv.
+
+Použitie:
+    python scripts/build_postal_index.py [--csv data/postal_codes_sk.csv] [--output data/postal_codes_sk.idx]
+
+Spustiť po každej zmene CSV (convert_postal_codes.py) a pri builde image.
+Resolver zastaraný artefakt ignoruje a postaví index z CSV v pamäti.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.sk_region_resolver import (  # noqa: E402
+    _POSTAL_CODE_CSV,
+    POSTAL_INDEX_PATH,
+    build_postal_index,
+    save_postal_index,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build postal code index")
+    parser.add_argument("--csv", default=_POSTAL_CODE_CSV)
+    parser.add_argument("--output", default=POSTAL_INDEX_PATH)
+    args = parser.parse_args()
+
+    index = build_postal_index(args.csv)
+    save_postal_index(index, args.output)
+    codes = sum(1 for region_id in index.codes if region_id)
+    print(f"✅ Index: {codes} PSČ, {len(index.regions) - 1} regiónov, {os.path.getsize(args.output)} B → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Hromadný import open-data dumpu registra do company_cache a grafu.
+
+Prerušený import pokračuje od checkpointu (<dump>.checkpoint.json).
+
+Použitie:
+    python scripts/ingest_registry_dump.py --source ares_csv --file res_data.csv.gz
+    python scripts/ingest_registry_dump.py --source rpo_json --file rpo.jsonl --workers 4
+    python scripts/ingest_registry_dump.py --source krs_xml --file krs.xml --no-graph
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.bulk_ingest import BULK_INGEST_CHUNK_SIZE, SOURCES, run_ingest  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import dumpu registra (ARES / RPO / KRS)")
+    parser.add_argument("--source", required=True, choices=sorted(SOURCES))
+    parser.add_argument("--file", required=True, help="cesta k dumpu (.csv/.json/.jsonl/.xml, aj .gz)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_INGEST_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="procesy na parsovanie (default: CPU - 1)")
+    parser.add_argument("--checkpoint", default=None, help="súbor checkpointu (default: <file>.checkpoint.json)")
+    parser.add_argument("--no-graph", action="store_true", help="len company_cache, bez uzlov a hrán grafu")
+    parser.add_argument("--limit", type=int, default=None, help="najviac N záznamov (test run)")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    def _progress(stats):
+        elapsed = time.perf_counter() - started
+        print(f"  {stats['records_done']} záznamov ({stats['records_done'] / max(elapsed, 1e-9):.0f}/s)", flush=True)
+
+    try:
+        stats = run_ingest(
+            args.file,
+            args.source,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            checkpoint_path=args.checkpoint,
+            with_graph=not args.no_graph,
+            limit=args.limit,
+            encoding=args.encoding,
+            progress=_progress,
+        )
+    except (ImportError, RuntimeError, ValueError, OSError) as e:
+        print(f"❌ Import zlyhal: {e}")
+        sys.exit(1)
+
+    print(
+        f"✅ {args.source}: {stats['companies']} firiem, {stats['rejected']} odmietnutých, "
+        f"{stats['skipped']} preskočených z checkpointu ({time.perf_counter() - started:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Jednorazová migrácia address uzlov grafu na normalizované ID.
+
+Staré uzly (hash z textu adresy) sa prepočítajú cez services.address_normalizer,
+pravopisné varianty tej istej adresy sa zlúčia a LOCATED_AT hrany presmerujú.
+
+Použitie:
+    python scripts/renormalize_address_nodes.py
+"""
+
+import sys
+from pathlib import Path
+
+# Pridaj backend do path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.graph_service import graph_service  # noqa: E402
+
+
+def main() -> None:
+    stats = graph_service.renormalize_address_nodes()
+    print(
+        f"✅ Adresy: {stats['checked']} skontrolovaných, {stats['merged']} prepočítaných, "
+        f"{stats['edges_moved']} presmerovaných hrán"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Address Matcher - vyhľadanie známych adries v texte jedným prechodom
+Aho-Corasick automat nad zoznamom vzorov (virtuálne sídla, ...): čas
+porovnania závisí od dĺžky adresy, nie od počtu vzorov v zozname.
+
+Vzory aj text sa porovnávajú v tvare fold_text (bez diakritiky, malé
+písmená, interpunkcia -> medzera), zhoda musí sedieť na hranice slov.
+"""
+
+import logging
+import os
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from services.address_normalizer import fold_text
+
+logger = logging.getLogger(__name__)
+
+VIRTUAL_ADDRESSES_FILE = os.getenv(
+    "VIRTUAL_ADDRESSES_FILE",
+    os.path.join(os.path.dirname(__file__), "..", "data", "virtual_addresses_sk.txt"),
+)
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automat (goto/fail/output tabuľky v poliach).
+    Po build() je nemenný a bezpečný pre súbežné čítanie z viacerých vlákien.
+    """
+
+    def __init__(self, patterns: Iterable[str] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        self._built = False
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern: str) -> None:
+        if self._built:
+            raise RuntimeError("Automat je už zostavený")
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        if pattern not in self._output[state]:
+            self._output[state].append(pattern)
+
+    def build(self) -> "AhoCorasick":
+        """BFS cez trie - fail linky a zlúčenie výstupov"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+        return self
+
+    @property
+    def size(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str):
+        """Generuje (koncový index, vzor) pre každý výskyt"""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in output[state]:
+                yield index, pattern
+
+
+class AddressMatcher:
+    """Zoznam vzorov adries nad AhoCorasick s porovnaním na hranice slov"""
+
+    def __init__(self, patterns: Iterable[str]):
+        folded = {}
+        for pattern in patterns:
+            key = fold_text(pattern)
+            if key:
+                folded.setdefault(key, pattern)
+        self.patterns: List[str] = list(folded.values())
+        self._original = folded
+        self._automaton = AhoCorasick(folded).build()
+
+    def find(self, text: str) -> List[str]:
+        """Pôvodné vzory, ktoré sa v texte vyskytujú (v poradí výskytu)"""
+        # Medzery okolo textu - hranica slova je vždy medzera
+        folded = f" {fold_text(text)} "
+        found: List[str] = []
+        for end, key in self._automaton.iter_matches(folded):
+            start = end - len(key) + 1
+            if folded[start - 1] == " " and folded[end + 1] == " ":
+                pattern = self._original[key]
+                if pattern not in found:
+                    found.append(pattern)
+        return found
+
+    def matches(self, text: str) -> bool:
+        return bool(text) and bool(self.find(text))
+
+
+def load_patterns(path: str = VIRTUAL_ADDRESSES_FILE) -> List[str]:
+    """Riadky súboru bez prázdnych a komentárov (#)"""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith("#")]
+    except OSError as e:
+        logger.warning(f"⚠️ Zoznam virtuálnych adries nedostupný ({path}): {e}")
+        return []
+
+
+_virtual_address_matcher: Optional[AddressMatcher] = None
+
+
+def get_virtual_address_matcher() -> AddressMatcher:
+    """Singleton matcher nad VIRTUAL_ADDRESSES_FILE (zostaví sa raz)"""
+    global _virtual_address_matcher
+    if _virtual_address_matcher is None:
+        _virtual_address_matcher = AddressMatcher(load_patterns())
+        logger.info(
+            f"Virtuálne adresy: {len(_virtual_address_matcher.patterns)} vzorov, "
+            f"{_virtual_address_matcher._automaton.size} stavov automatu"
+        )
+    return _virtual_address_matcher
@@ -0,0 +1,246 @@
+"""
+Normalizácia adries pre V4 krajiny (SK, CZ, PL, HU)
+Rozklad na ulicu, číslo, PSČ a mesto s kanonickým tvarom per krajina,
+stabilný kľúč adresy pre graf (addr_<country>_<hash>) a detekcia
+virtuálnych sídiel (P.O. box, coworking, ...).
+
+Offline lookup: aliasy miest, kraj/okres zo SK PSČ indexu a LRU cache
+normalizovaných adries (importy opakujú tie isté adresy).
+"""
+
+import hashlib
+import os
+import re
+import unicodedata
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Union
+
+ADDRESS_CACHE_SIZE = int(os.getenv("ADDRESS_CACHE_SIZE", "100000"))
+
+V4_COUNTRIES = ("SK", "CZ", "PL", "HU")
+
+# PSČ per krajina (kanonický tvar: SK/CZ "81101", PL "00-950", HU "1051")
+_POSTAL_PATTERNS = {
+    "SK": re.compile(r"\b(\d{3}) ?(\d{2})\b"),
+    "CZ": re.compile(r"\b(\d{3}) ?(\d{2})\b"),
+    "PL": re.compile(r"\b(\d{2})(?: ?- ?)?(\d{3})\b"),
+    "HU": re.compile(r"\b(?:H-)?(\d{4})\b"),
+}
+
+# Typy ulíc: skratky -> kanonický tvar, None = implicitný typ (vynechá sa)
+_STREET_TOKENS = {
+    "SK": {"ul": None, "ulica": None, "nam": "namestie", "tr": "trieda", "nabr": "nabrezie"},
+    "CZ": {"ul": None, "ulice": None, "nam": "namesti", "tr": "trida", "nabr": "nabrezi"},
+    "PL": {"ul": None, "ulica": None, "al": "aleja", "pl": "plac", "os": "osiedle"},
+    "HU": {"u": "utca", "krt": "korut", "rkp": "rakpart", "sgt": "sugarut"},
+}
+
+# Názvy krajín na konci adresy
+_COUNTRY_NAMES = {
+    "slovensko", "slovakia", "slovenska republika", "sr",
+    "ceska republika", "czech republic", "czechia", "cr",
+    "polska", "poland", "magyarorszag", "hungary",
+}
+
+# Offline aliasy miest (exonymá, skratky) -> kanonický tvar
+CITY_ALIASES = {
+    "SK": {"ba": "bratislava", "pressburg": "bratislava", "kassa": "kosice"},
+    "CZ": {"prague": "praha", "prag": "praha", "brunn": "brno"},
+    "PL": {"warsaw": "warszawa", "warschau": "warszawa", "cracow": "krakow", "krakau": "krakow"},
+    "HU": {"bp": "budapest", "bpest": "budapest"},
+}
+
+# Znaky virtuálneho sídla (normalizovaný text bez diakritiky a interpunkcie)
+VIRTUAL_SEAT_MARKERS = (
+    "p o box", "po box", "pobox", "postfach", "skrytka pocztowa", "postafiok",
+    "postovy priecinok", "postovni prihradka", "virtualne", "virtualni",
+    "virtual office", "coworking",
+)
+
+_PUNCTUATION_RE = re.compile(r"[^\w/]+")
+_SPACES_RE = re.compile(r"\s+")
+_HOUSE_NUMBER_RE = re.compile(r"^(?P<street>.*?)\s*(?:\bc\s+)?(?P<number>\d+\s*[a-z]?(?:\s*/\s*\d*\s*[a-z]?)?)$")
+# Písmená, ktoré NFKD nerozloží
+_FOLD_TABLE = str.maketrans({"ł": "l", "Ł": "L", "đ": "d", "Đ": "D", "ß": "ss"})
+
+
+@dataclass(frozen=True)
+class NormalizedAddress:
+    """Kanonická adresa - nemenná, zdieľaná cez LRU cache"""
+
+    country: str
+    street: str = ""
+    number: str = ""
+    postal_code: str = ""
+    city: str = ""
+    district: str = ""
+    is_virtual: bool = False
+
+    @property
+    def key(self) -> str:
+        """PSČ je silnejší kľúč ako mesto (varianty "Bratislava - Ružinov")"""
+        locality = self.postal_code or self.city
+        return f"{self.country}|{locality}|{self.street}|{self.number}"
+
+    @property
+    def node_id(self) -> str:
+        digest = hashlib.sha1(self.key.encode("utf-8")).hexdigest()[:12]
+        return f"addr_{self.country.lower()}_{digest}"
+
+    def as_dict(self) -> Dict[str, object]:
+        return {**asdict(self), "key": self.key}
+
+
+def _fold(text: str) -> str:
+    """Bez diakritiky, malé písmená, interpunkcia -> medzera"""
+    text = unicodedata.normalize("NFKD", (text or "").translate(_FOLD_TABLE))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return _SPACES_RE.sub(" ", _PUNCTUATION_RE.sub(" ", text)).strip()
+
+
+def fold_text(text: str) -> str:
+    """Porovnávací tvar textu adresy (pre matchery nad adresami)"""
+    return _fold(text)
+
+
+def _canonical_postal(country: str, match: "re.Match") -> str:
+    if country == "PL":
+        return f"{match.group(1)}-{match.group(2)}"
+    return "".join(match.groups())
+
+
+def _canonical_street(country: str, street: str) -> str:
+    tokens = _STREET_TOKENS.get(country, {})
+    words = []
+    for word in _fold(street).split(" "):
+        if word in tokens:
+            word = tokens[word]
+            if word is None:
+                continue
+        if word:
+            words.append(word)
+    return " ".join(words)
+
+
+def _split_street_number(country: str, street: str) -> Tuple[str, str]:
+    folded = _fold(street)
+    match = _HOUSE_NUMBER_RE.match(folded)
+    if not match:
+        return _canonical_street(country, street), ""
+    number = match.group("number").replace(" ", "")
+    return _canonical_street(country, match.group("street")), number
+
+
+def _canonical_city(country: str, city: str) -> str:
+    folded = _fold(city)
+    return CITY_ALIASES.get(country, {}).get(folded, folded)
+
+
+def _district(country: str, postal_code: str) -> str:
+    if country != "SK" or not postal_code:
+        return ""
+    from services.sk_region_resolver import resolve_region
+
+    region = resolve_region(postal_code)
+    return region.get("okres", "") if region else ""
+
+
+def _is_virtual(*parts: str) -> bool:
+    text = f" {' '.join(_fold(part) for part in parts if part)} "
+    return any(f" {marker} " in text for marker in VIRTUAL_SEAT_MARKERS)
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _normalize_raw(raw: str, country: str) -> Optional[NormalizedAddress]:
+    """Rozklad textovej adresy: PSČ oddeľuje ulicu od mesta, čiarky časti"""
+    postal_code = ""
+    pattern = _POSTAL_PATTERNS.get(country)
+    text = raw
+    if pattern:
+        match = pattern.search(raw)
+        if match:
+            postal_code = _canonical_postal(country, match)
+            text = f"{raw[:match.start()]},{raw[match.end():]}"
+
+    parts = [part.strip() for part in text.split(",") if part.strip()]
+    parts = [part for part in parts if _fold(part) not in _COUNTRY_NAMES]
+
+    street_part = next((part for part in parts if any(ch.isdigit() for ch in part)), "")
+    city_parts = [part for part in parts if part is not street_part]
+    if not street_part and len(city_parts) > 1:
+        street_part = city_parts.pop(0)
+    city = city_parts[-1] if city_parts else ""
+
+    return _build(country, street_part, "", postal_code, city, raw)
+
+
+def _build(country: str, street: str, number: str, postal_code: str, city: str, raw: str = "") -> Optional[NormalizedAddress]:
+    street_name, parsed_number = _split_street_number(country, street)
+    number = number.replace(" ", "").lower() if number else parsed_number
+    city = _canonical_city(country, city)
+    if not (street_name or number or postal_code or city):
+        return None
+    return NormalizedAddress(
+        country=country,
+        street=street_name,
+        number=number,
+        postal_code=postal_code,
+        city=city,
+        district=_district(country, postal_code),
+        is_virtual=_is_virtual(raw, street),
+    )
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _normalize_fields(country: str, street: str, number: str, postal_code: str, city: str) -> Optional[NormalizedAddress]:
+    pattern = _POSTAL_PATTERNS.get(country)
+    match = pattern.search(postal_code) if pattern and postal_code else None
+    postal = _canonical_postal(country, match) if match else postal_code.replace(" ", "")
+    return _build(country, street, number, postal, city, f"{street} {city}")
+
+
+def normalize_address(address: Union[str, Dict, None], country: str) -> Optional[NormalizedAddress]:
+    """
+    Normalizuje adresu (text alebo dict so street/number/postal_code/city/raw).
+
+    Returns:
+        NormalizedAddress alebo None pre prázdnu adresu
+    """
+    country = (country or "").upper()
+    if not address:
+        return None
+    if isinstance(address, dict):
+        raw = address.get("raw")
+        if raw and not (address.get("street") or address.get("city")):
+            return _normalize_raw(str(raw), country)
+        return _normalize_fields(
+            country,
+            str(address.get("street") or ""),
+            str(address.get("number") or ""),
+            str(address.get("postal_code") or ""),
+            str(address.get("city") or ""),
+        )
+    return _normalize_raw(str(address), country)
+
+
+def address_node_id(address: Union[str, Dict, None], country: str) -> Optional[str]:
+    """ID uzla adresy v grafe (rovnaké pre pravopisné varianty)"""
+    normalized = normalize_address(address, country)
+    return normalized.node_id if normalized else None
+
+
+def is_virtual_seat_address(address: Union[str, Dict, None], country: str = "") -> bool:
+    """P.O. box, virtuálna kancelária, coworking"""
+    normalized = normalize_address(address, country)
+    return bool(normalized and normalized.is_virtual)
+
+
+def get_address_cache_stats() -> Dict[str, int]:
+    raw, fields = _normalize_raw.cache_info(), _normalize_fields.cache_info()
+    return {
+        "hits": raw.hits + fields.hits,
+        "misses": raw.misses + fields.misses,
+        "size": raw.currsize + fields.currsize,
+        "max_size": ADDRESS_CACHE_SIZE,
+    }
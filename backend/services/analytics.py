@@ -1,21 +1,38 @@
 """
 Analytics service pre ILUMINATI SYSTEM
 Zbieranie a agregácia metrík pre business intelligence
+
+Všetky dotazy čítajú len agregačné tabuľky z services.analytics_rollup
+(udržiava ich background agregátor) a výsledky sa cachujú s krátkym TTL.
 """
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from sqlalchemy import func, and_, extract
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from services.database import (
-    get_db_session,
-    SearchHistory,
-    Analytics,
-    CompanyCache,
+from services.analytics_rollup import (
+    ClientActivityRollup,
+    EventRollup,
+    SearchRollup,
+    cached_analytics,
+    day_start,
+    hour_start,
 )
+from services.database import get_db_session
 from services.auth import User
 
+DAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def _period_key(ts: datetime, group_by: str) -> str:
+    """Kľúč obdobia v rovnakom formáte ako pôvodné SQL agregácie"""
+    if group_by == "week":
+        return day_start(ts - timedelta(days=ts.weekday())).isoformat()
+    if group_by == "month":
+        return day_start(ts).replace(day=1).isoformat()
+    return ts.date().isoformat()
+
 
 def get_search_trends(
     days: int = 30,
@@ -42,45 +59,37 @@ def get_search_trends(
             "peak_day": "Monday"
         }
     """
+    # SearchHistory nemá user_id - výsledok je spoločný pre všetkých
+    return cached_analytics(
+        f"search_trends:{days}:{group_by}",
+        lambda: _build_search_trends(days, group_by),
+    )
+
+
+def _build_search_trends(days: int, group_by: str) -> Dict:
     with get_db_session() as session:
-        start_date = datetime.utcnow() - timedelta(days=days)
+        start_date = hour_start(datetime.utcnow() - timedelta(days=days))
         
-        query = session.query(SearchHistory).filter(
-            SearchHistory.search_timestamp >= start_date
-        )
-        
-        if user_id:
-            # Ak máme user_id v SearchHistory, filtrujeme
-            # Pre teraz používame všetky záznamy
-            pass
-        
-        # Agregácia podľa dátumu
-        if group_by == "day":
-            date_expr = func.date(SearchHistory.search_timestamp)
-        elif group_by == "week":
-            date_expr = func.date_trunc("week", SearchHistory.search_timestamp)
-        elif group_by == "month":
-            date_expr = func.date_trunc("month", SearchHistory.search_timestamp)
-        else:
-            date_expr = func.date(SearchHistory.search_timestamp)
-        
-        # Získať počet vyhľadávaní podľa dátumu a krajiny
+        # Počty per hodina × krajina z rollupu
         results = (
             session.query(
-                date_expr.label("date"),
-                SearchHistory.country,
-                func.count(SearchHistory.id).label("count"),
+                SearchRollup.hour_start,
+                SearchRollup.country,
+                func.sum(SearchRollup.search_count),
             )
-            .filter(SearchHistory.search_timestamp >= start_date)
-            .group_by(date_expr, SearchHistory.country)
-            .order_by(date_expr)
+            .filter(SearchRollup.hour_start >= start_date)
+            .group_by(SearchRollup.hour_start, SearchRollup.country)
+            .order_by(SearchRollup.hour_start)
             .all()
         )
         
         # Agregovať do formátu
         data_dict = {}
-        for date, country, count in results:
-            date_str = date.isoformat() if isinstance(date, datetime) else str(date)
+        hour_counts: Dict[int, int] = {}
+        day_counts: Dict[int, int] = {}
+        for bucket, country, count in results:
+            count = int(count or 0)
+            date_str = _period_key(bucket, group_by)
             if date_str not in data_dict:
                 data_dict[date_str] = {"date": date_str, "count": 0, "countries": {}}
             data_dict[date_str]["count"] += count
@@ -88,42 +97,22 @@ def get_search_trends(
                 data_dict[date_str]["countries"][country] = (
                     data_dict[date_str]["countries"].get(country, 0) + count
                 )
+            hour_counts[bucket.hour] = hour_counts.get(bucket.hour, 0) + count
+            dow = (bucket.weekday() + 1) % 7  # 0 = Sunday (ako SQL dow)
+            day_counts[dow] = day_counts.get(dow, 0) + count
         
         data = list(data_dict.values())
         total = sum(item["count"] for item in data)
         
-        # Peak hour
-        hour_counts = (
-            session.query(
-                extract("hour", SearchHistory.search_timestamp).label("hour"),
-                func.count(SearchHistory.id).label("count"),
-            )
-            .filter(SearchHistory.search_timestamp >= start_date)
-            .group_by(extract("hour", SearchHistory.search_timestamp))
-            .all()
-        )
-        peak_hour = max(hour_counts, key=lambda x: x[1])[0] if hour_counts else None
-        
-        # Peak day
-        day_counts = (
-            session.query(
-                extract("dow", SearchHistory.search_timestamp).label("day"),
-                func.count(SearchHistory.id).label("count"),
-            )
-            .filter(SearchHistory.search_timestamp >= start_date)
-            .group_by(extract("dow", SearchHistory.search_timestamp))
-            .all()
-        )
-        peak_day_num = max(day_counts, key=lambda x: x[1])[0] if day_counts else None
-        day_names = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-        peak_day = day_names[int(peak_day_num)] if peak_day_num is not None else None
+        peak_hour = max(hour_counts, key=lambda h: hour_counts[h]) if hour_counts else None
+        peak_day_num = max(day_counts, key=lambda d: day_counts[d]) if day_counts else None
         
         return {
             "period": group_by,
             "data": data,
             "total": total,
-            "peak_hour": int(peak_hour) if peak_hour is not None else None,
-            "peak_day": peak_day,
+            "peak_hour": peak_hour,
+            "peak_day": DAY_NAMES[peak_day_num] if peak_day_num is not None else None,
         }
 
 
@@ -147,38 +136,33 @@ def get_risk_distribution(
             "average_score": 3.5
         }
     """
+    return cached_analytics(
+        f"risk_distribution:{days}",
+        lambda: _build_risk_distribution(days),
+    )
+
+
+def _build_risk_distribution(days: int) -> Dict:
     with get_db_session() as session:
-        start_date = datetime.utcnow() - timedelta(days=days)
+        start_date = hour_start(datetime.utcnow() - timedelta(days=days))
         
-        query = session.query(SearchHistory).filter(
-            and_(
-                SearchHistory.search_timestamp >= start_date,
-                SearchHistory.risk_score.isnot(None),
+        results = (
+            session.query(SearchRollup.risk_bucket, func.sum(SearchRollup.search_count))
+            .filter(
+                SearchRollup.hour_start >= start_date,
+                SearchRollup.risk_bucket >= 0,
             )
+            .group_by(SearchRollup.risk_bucket)
+            .all()
         )
         
-        results = query.all()
-        
         # Distribúcia podľa skóre
-        distribution = {}
-        total = 0
-        high_risk = 0
-        medium_risk = 0
-        low_risk = 0
-        score_sum = 0
-        
-        for result in results:
-            score = int(result.risk_score) if result.risk_score else 0
-            distribution[score] = distribution.get(score, 0) + 1
-            total += 1
-            score_sum += score
-            
-            if score >= 7:
-                high_risk += 1
-            elif score >= 4:
-                medium_risk += 1
-            else:
-                low_risk += 1
+        distribution = {int(score): int(count or 0) for score, count in results}
+        total = sum(distribution.values())
+        score_sum = sum(score * count for score, count in distribution.items())
+        high_risk = sum(c for s, c in distribution.items() if s >= 7)
+        medium_risk = sum(c for s, c in distribution.items() if 4 <= s < 7)
+        low_risk = sum(c for s, c in distribution.items() if s < 4)
         
         # Formátovať distribúciu
         dist_data = []
@@ -226,13 +210,31 @@ def get_user_activity(
             }
         }
     """
+    return cached_analytics(f"user_activity:{days}", lambda: _build_user_activity(days))
+
+
+def _build_user_activity(days: int) -> Dict:
     with get_db_session() as session:
-        start_date = datetime.utcnow() - timedelta(days=days)
+        now = datetime.utcnow()
+        start_date = now - timedelta(days=days)
+        
+        # Počet vyhľadávaní per klient v období (z denného rollupu)
+        per_client = (
+            session.query(
+                ClientActivityRollup.client_hash,
+                func.sum(ClientActivityRollup.search_count).label("searches"),
+            )
+            .filter(ClientActivityRollup.day >= day_start(start_date))
+            .group_by(ClientActivityRollup.client_hash)
+            .subquery()
+        )
+        active_users = session.query(func.count()).select_from(per_client).scalar() or 0
         
-        # Aktívni používatelia (mali aspoň 1 search)
-        active_users = (
-            session.query(func.count(func.distinct(SearchHistory.user_ip)))
-            .filter(SearchHistory.search_timestamp >= start_date)
+        # Retention rate (zjednodušené - používatelia s viac ako 1 search)
+        users_with_multiple_searches = (
+            session.query(func.count())
+            .select_from(per_client)
+            .filter(per_client.c.searches > 1)
             .scalar()
         ) or 0
         
@@ -249,28 +251,20 @@ def get_user_activity(
             .group_by(User.tier)
             .all()
         )
-        tier_distribution = {tier or "free": count for tier, count in tier_dist}
+        tier_distribution = {
+            (tier.value if tier is not None else "free"): count
+            for tier, count in tier_dist
+        }
         
-        # Feature usage z Analytics
+        # Feature usage z event rollupu
         feature_usage = (
-            session.query(
-                Analytics.event_type,
-                func.count(Analytics.id).label("count"),
-            )
-            .filter(Analytics.timestamp >= start_date)
-            .group_by(Analytics.event_type)
+            session.query(EventRollup.event_type, func.sum(EventRollup.event_count))
+            .filter(EventRollup.hour_start >= hour_start(start_date))
+            .group_by(EventRollup.event_type)
             .all()
         )
-        feature_usage_dict = {event: count for event, count in feature_usage}
+        feature_usage_dict = {event: int(count or 0) for event, count in feature_usage}
         
-        # Retention rate (zjednodušené - používatelia s viac ako 1 search)
-        users_with_multiple_searches = (
-            session.query(SearchHistory.user_ip)
-            .filter(SearchHistory.search_timestamp >= start_date)
-            .group_by(SearchHistory.user_ip)
-            .having(func.count(SearchHistory.id) > 1)
-            .count()
-        )
         retention_rate = (
             (users_with_multiple_searches / active_users * 100)
             if active_users > 0
@@ -309,35 +303,43 @@ def get_api_usage(
             ]
         }
     """
+    return cached_analytics(
+        f"api_usage:{days}:{api_key_id}",
+        lambda: _build_api_usage(days, api_key_id),
+    )
+
+
+def _build_api_usage(days: int, api_key_id: Optional[int]) -> Dict:
     with get_db_session() as session:
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Z Analytics tabuľky získame API volania
-        api_events = (
-            session.query(Analytics)
+        # API volania z event rollupu
+        results = (
+            session.query(
+                EventRollup.endpoint,
+                EventRollup.is_error,
+                func.sum(EventRollup.event_count),
+            )
             .filter(
-                and_(
-                    Analytics.timestamp >= start_date,
-                    Analytics.event_type.in_(["api_call", "search"]),
-                )
+                EventRollup.hour_start >= hour_start(start_date),
+                EventRollup.event_type.in_(["api_call", "search"]),
             )
+            .group_by(EventRollup.endpoint, EventRollup.is_error)
             .all()
         )
         
-        total_calls = len(api_events)
-        calls_per_day = total_calls / days if days > 0 else 0
-        
-        # Endpoint usage (z event_data)
-        endpoint_counts = {}
+        total_calls = 0
         error_count = 0
+        endpoint_counts = {}
+        for endpoint, is_error, count in results:
+            count = int(count or 0)
+            total_calls += count
+            if endpoint:
+                endpoint_counts[endpoint] = endpoint_counts.get(endpoint, 0) + count
+            if is_error:
+                error_count += count
         
-        for event in api_events:
-            if event.event_data:
-                endpoint = event.event_data.get("endpoint", "unknown")
-                endpoint_counts[endpoint] = endpoint_counts.get(endpoint, 0) + 1
-                
-                if event.event_data.get("status_code", 200) >= 400:
-                    error_count += 1
+        calls_per_day = total_calls / days if days > 0 else 0
         
         most_used = sorted(
             [
@@ -350,9 +352,8 @@ def get_api_usage(
         
         error_rate = (error_count / total_calls * 100) if total_calls > 0 else 0
         
-        # Usage by API key (ak máme API keys tracking)
-        # Pre teraz vrátime prázdny zoznam
-        usage_by_key = []
+        # Usage by API key (z metering day rollupov)
+        usage_by_key = _get_usage_by_key(session, start_date, api_key_id)
         
         return {
             "total_calls": total_calls,
@@ -364,6 +365,34 @@ def get_api_usage(
         }
 
 
+def _get_usage_by_key(
+    session: Session,
+    start_date: datetime,
+    api_key_id: Optional[int] = None,
+) -> List[Dict]:
+    """Použitie per API key z metering rollupov (zoradené podľa počtu volaní)"""
+    from services.api_keys import ApiKey
+    from services.metering import get_usage_by_key
+
+    totals = get_usage_by_key(
+        session, start_date, [api_key_id] if api_key_id is not None else None
+    )
+    if not totals:
+        return []
+
+    names = dict(
+        session.query(ApiKey.id, ApiKey.name).filter(ApiKey.id.in_(totals.keys()))
+    )
+    return sorted(
+        [
+            {"key_id": key_id, "key_name": names.get(key_id), "calls": calls}
+            for key_id, calls in totals.items()
+        ],
+        key=lambda x: x["calls"],
+        reverse=True,
+    )
+
+
 def get_dashboard_summary() -> Dict:
     """
     Vráti súhrn pre analytics dashboard.
@@ -0,0 +1,328 @@
+"""
+Analytics Rollups pre ILUMINATI SYSTEM
+Inkrementálne udržiavané agregačné tabuľky pre analytics dashboard.
+
+- analytics_search_rollups: hodina × krajina × risk bucket -> počet vyhľadávaní
+- analytics_client_daily: deň × hash klienta -> počet vyhľadávaní (aktívni používatelia)
+- analytics_event_rollups: hodina × event_type × endpoint × chyba -> počet eventov
+
+Aggregator číta len nové riadky (watermark = posledné spracované id), takže
+cena jedného behu závisí od prírastku, nie od veľkosti histórie.
+
+Id sa prideľuje pri INSERT-e, nie pri commite - riadok s nižším id sa môže
+objaviť až po riadku s vyšším id. Aggregator preto spracúva len riadky do
+horizontu (pred prvým riadkom mladším ako ANALYTICS_ROLLUP_LAG_SECONDS) a watermark
+posúva podmieneným UPDATE-om na last_id v tej istej transakcii ako rollupy;
+súbežný worker, ktorý prehrá, svoju dávku zahodí (žiadne dvojité počty).
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, UniqueConstraint, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from services.cache import get as cache_get
+from services.cache import get_cache_key
+from services.cache import set as cache_set
+from services.database import Analytics, Base, SearchHistory, get_db_session
+
+logger = logging.getLogger(__name__)
+
+# Konfigurácia
+ANALYTICS_ROLLUP_SECONDS = int(os.getenv("ANALYTICS_ROLLUP_SECONDS", "60"))
+ANALYTICS_ROLLUP_BATCH_SIZE = int(os.getenv("ANALYTICS_ROLLUP_BATCH_SIZE", "5000"))
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "60"))
+ANALYTICS_ROLLUP_LAG_SECONDS = int(os.getenv("ANALYTICS_ROLLUP_LAG_SECONDS", "60"))
+
+NO_RISK_BUCKET = -1  # risk_score je NULL
+
+
+class SearchRollup(Base):
+    """Počet vyhľadávaní za hodinu × krajinu × risk bucket"""
+
+    __tablename__ = "analytics_search_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    hour_start = Column(DateTime, nullable=False, index=True)
+    country = Column(String(2), nullable=False, default="")
+    risk_bucket = Column(Integer, nullable=False, default=NO_RISK_BUCKET)  # 0-10, -1 = bez skóre
+    search_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("hour_start", "country", "risk_bucket", name="uq_analytics_search_rollup"),
+    )
+
+
+class ClientActivityRollup(Base):
+    """Počet vyhľadávaní klienta (hash IP) za deň"""
+
+    __tablename__ = "analytics_client_daily"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(DateTime, nullable=False, index=True)
+    client_hash = Column(String(64), nullable=False)
+    search_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("day", "client_hash", name="uq_analytics_client_daily"),
+    )
+
+
+class EventRollup(Base):
+    """Počet analytics eventov za hodinu × typ × endpoint × chyba"""
+
+    __tablename__ = "analytics_event_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    hour_start = Column(DateTime, nullable=False, index=True)
+    event_type = Column(String(50), nullable=False)
+    endpoint = Column(String(255), nullable=False, default="")
+    is_error = Column(Boolean, nullable=False, default=False)
+    event_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("hour_start", "event_type", "endpoint", "is_error", name="uq_analytics_event_rollup"),
+    )
+
+
+class RollupWatermark(Base):
+    """Posledné spracované id zdrojovej tabuľky"""
+
+    __tablename__ = "analytics_rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def hour_start(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def risk_bucket(risk_score: Optional[float]) -> int:
+    """Risk skóre -> bucket 0-10 (rovnaké zaokrúhlenie ako get_risk_distribution)"""
+    if risk_score is None:
+        return NO_RISK_BUCKET
+    return max(0, min(10, int(risk_score)))
+
+
+def client_hash(user_ip: str) -> str:
+    """Anonymizovaný identifikátor klienta (IP sa do rollupov neukladá)"""
+    return hashlib.sha256(user_ip.encode()).hexdigest()
+
+
+def _get_watermark(db: Session, name: str) -> int:
+    """Aktuálne last_id watermarku (riadok sa pri prvom behu vytvorí)"""
+    watermark = db.query(RollupWatermark).filter(RollupWatermark.name == name).first()
+    if watermark is not None:
+        return watermark.last_id
+    try:
+        db.add(RollupWatermark(name=name, last_id=0))
+        db.commit()
+    except IntegrityError:
+        # Riadok medzitým vytvoril iný worker
+        db.rollback()
+    return db.query(RollupWatermark.last_id).filter(RollupWatermark.name == name).scalar()
+
+
+def _claim_range(db: Session, name: str, after_id: int, last_id: int) -> bool:
+    """
+    Posunie watermark z after_id na last_id podmieneným UPDATE-om.
+    False = watermark medzitým posunul iný worker (dávku treba zahodiť).
+    """
+    claimed = (
+        db.query(RollupWatermark)
+        .filter(RollupWatermark.name == name, RollupWatermark.last_id == after_id)
+        .update({"last_id": last_id, "updated_at": datetime.utcnow()}, synchronize_session=False)
+    )
+    return claimed == 1
+
+
+def _safe_upper_id(db: Session, id_column: Any, ts_column: Any, cutoff: datetime) -> int:
+    """
+    Horizont spracovania: id tesne pred prvým riadkom zapísaným po cutoff.
+    Nižšie id si transakcie pridelili pred cutoff, takže mali na commit aspoň
+    lag sekúnd; riadky, ktoré ešte nie sú viditeľné, ležia nad horizontom.
+    """
+    first_recent = db.query(func.min(id_column)).filter(ts_column > cutoff).scalar()
+    if first_recent is not None:
+        return first_recent - 1
+    return db.query(func.max(id_column)).scalar() or 0
+
+
+def _merge_counts(
+    db: Session,
+    model: Any,
+    key_fields: Tuple[str, ...],
+    count_field: str,
+    counts: Dict[Tuple, int],
+) -> None:
+    """
+    Pripočíta počty do rollup tabuľky (upsert).
+    Existujúce riadky sa načítajú jedným dotazom podľa prvého kľúčového poľa.
+    """
+    if not counts:
+        return
+    first_field = getattr(model, key_fields[0])
+    first_values = {key[0] for key in counts}
+    existing = {
+        tuple(getattr(row, f) for f in key_fields): row
+        for row in db.query(model).filter(first_field.in_(first_values))
+    }
+    for key, count in counts.items():
+        row = existing.get(key)
+        if row is not None:
+            setattr(row, count_field, getattr(row, count_field) + count)
+        else:
+            db.add(model(**dict(zip(key_fields, key)), **{count_field: count}))
+
+
+def _read_search_batch(db: Session, after_id: int, upper_id: int, limit: int) -> List[Tuple]:
+    """Jedna dávka SearchHistory v rozsahu (after_id, upper_id]"""
+    return (
+        db.query(
+            SearchHistory.id,
+            SearchHistory.search_timestamp,
+            SearchHistory.country,
+            SearchHistory.risk_score,
+            SearchHistory.user_ip,
+        )
+        .filter(SearchHistory.id > after_id, SearchHistory.id <= upper_id)
+        .order_by(SearchHistory.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _merge_search_rows(db: Session, rows: List[Tuple]) -> None:
+    """Pripočíta dávku SearchHistory do search a client rollupov"""
+    search_counts: Dict[Tuple, int] = {}
+    client_counts: Dict[Tuple, int] = {}
+    for _, ts, country, score, user_ip in rows:
+        if ts is None:
+            continue
+        key = (hour_start(ts), country or "", risk_bucket(score))
+        search_counts[key] = search_counts.get(key, 0) + 1
+        if user_ip:
+            ckey = (day_start(ts), client_hash(user_ip))
+            client_counts[ckey] = client_counts.get(ckey, 0) + 1
+
+    _merge_counts(db, SearchRollup, ("hour_start", "country", "risk_bucket"), "search_count", search_counts)
+    _merge_counts(db, ClientActivityRollup, ("day", "client_hash"), "search_count", client_counts)
+
+
+def _read_event_batch(db: Session, after_id: int, upper_id: int, limit: int) -> List[Tuple]:
+    """Jedna dávka Analytics eventov v rozsahu (after_id, upper_id]"""
+    return (
+        db.query(Analytics.id, Analytics.timestamp, Analytics.event_type, Analytics.event_data)
+        .filter(Analytics.id > after_id, Analytics.id <= upper_id)
+        .order_by(Analytics.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _merge_event_rows(db: Session, rows: List[Tuple]) -> None:
+    """Pripočíta dávku Analytics eventov do event rollupu"""
+    counts: Dict[Tuple, int] = {}
+    for _, ts, event_type, event_data in rows:
+        if ts is None or not event_type:
+            continue
+        endpoint = ""
+        is_error = False
+        if isinstance(event_data, dict):
+            endpoint = str(event_data.get("endpoint", "unknown"))[:255]
+            try:
+                is_error = int(event_data.get("status_code", 200)) >= 400
+            except (TypeError, ValueError):
+                is_error = False
+        key = (hour_start(ts), event_type, endpoint, is_error)
+        counts[key] = counts.get(key, 0) + 1
+
+    _merge_counts(
+        db, EventRollup, ("hour_start", "event_type", "endpoint", "is_error"), "event_count", counts
+    )
+
+
+def run_aggregation(
+    db: Optional[Session] = None,
+    batch_size: int = ANALYTICS_ROLLUP_BATCH_SIZE,
+    lag_seconds: int = ANALYTICS_ROLLUP_LAG_SECONDS,
+) -> Dict[str, int]:
+    """
+    Spracuje nové riadky SearchHistory a Analytics (do horizontu lag_seconds) do rollupov.
+    Každá dávka je samostatná transakcia spolu s podmieneným posunom watermarku.
+    """
+    if db is None:
+        try:
+            with get_db_session() as session:
+                if session is None:
+                    return {"search_history": 0, "analytics": 0}
+                return run_aggregation(session, batch_size, lag_seconds)
+        except Exception as e:
+            print(f"⚠️ Chyba pri analytics agregácii: {e}")
+            return {"search_history": 0, "analytics": 0}
+
+    cutoff = datetime.utcnow() - timedelta(seconds=lag_seconds)
+    processed = {"search_history": 0, "analytics": 0}
+    for name, id_column, ts_column, read, merge in (
+        ("search_history", SearchHistory.id, SearchHistory.search_timestamp, _read_search_batch, _merge_search_rows),
+        ("analytics", Analytics.id, Analytics.timestamp, _read_event_batch, _merge_event_rows),
+    ):
+        upper_id = _safe_upper_id(db, id_column, ts_column, cutoff)
+        while True:
+            try:
+                after_id = _get_watermark(db, name)
+                rows = read(db, after_id, upper_id, batch_size)
+                if not rows:
+                    db.commit()
+                    break
+                if not _claim_range(db, name, after_id, rows[-1][0]):
+                    db.rollback()
+                    logger.info("Analytics rollup %s: watermark posunul iný worker", name)
+                    break
+                merge(db, rows)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            processed[name] += len(rows)
+            if len(rows) < batch_size:
+                break
+    return processed
+
+
+def cached_analytics(key: str, builder: Callable[[], Dict]) -> Dict:
+    """Výsledok analytics dotazu s krátkym TTL (L1/L2 cache)"""
+    cache_key = get_cache_key(key, "analytics")
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+    result = builder()
+    cache_set(cache_key, result, timedelta(seconds=ANALYTICS_CACHE_TTL_SECONDS))
+    return result
+
+
+async def run_analytics_aggregator(interval: int = ANALYTICS_ROLLUP_SECONDS) -> None:
+    """
+    Background loop pre analytics agregátor. Prvý beh dobehne históriu,
+    ďalšie spracujú len prírastky.
+    """
+    while True:
+        try:
+            processed = await asyncio.to_thread(run_aggregation)
+            if any(processed.values()):
+                logger.info(f"Analytics rollup: {processed}")
+        except Exception as e:
+            logger.warning(f"Analytics aggregator error: {e}")
+        await asyncio.sleep(interval)
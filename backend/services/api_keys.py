@@ -6,12 +6,19 @@ Pre Enterprise tier používateľov - generovanie a správa API kľúčov
 import os
 import secrets
 import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
 from sqlalchemy.orm import Session, relationship
+from services.auth_cache import invalidate_api_key
 from services.database import Base, get_db_session
 
+# Buffer pre usage počítadlá - flush po dosiahnutí limitu alebo intervalu
+API_KEY_USAGE_FLUSH_SECONDS = float(os.getenv("API_KEY_USAGE_FLUSH_SECONDS", "10"))
+API_KEY_USAGE_FLUSH_THRESHOLD = int(os.getenv("API_KEY_USAGE_FLUSH_THRESHOLD", "100"))
+
 
 class ApiKey(Base):
     """API Key model"""
@@ -29,6 +36,7 @@ class ApiKey(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     permissions = Column(Text, nullable=True)  # JSON string: ["read", "write"]
     ip_whitelist = Column(Text, nullable=True)  # JSON string: ["1.2.3.4", "5.6.7.8"]
+    daily_quota = Column(Integer, nullable=True)  # Max requestov za deň (None = default z env)
 
     # Relationship
     user = relationship("User", back_populates="api_keys")
@@ -50,18 +58,24 @@ def generate_api_key(prefix: str = "il") -> tuple[str, str]:
     full_key = f"{prefix}_{key_suffix}"
     
     # Hash key pre bezpečné uloženie
-    key_hash = hashlib.sha256(full_key.encode()).hexdigest()
+    key_hash = hash_api_key(full_key)
     
     return full_key, key_hash
 
 
+def hash_api_key(token: str) -> str:
+    """SHA-256 hash API key tokenu (tak, ako je uložený v DB)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def create_api_key(
     db: Session,
     user_id: int,
     name: str,
     expires_days: Optional[int] = None,
     permissions: Optional[List[str]] = None,
-    ip_whitelist: Optional[List[str]] = None
+    ip_whitelist: Optional[List[str]] = None,
+    daily_quota: Optional[int] = None
 ) -> Dict:
     """
     Vytvoriť nový API key.
@@ -73,6 +87,7 @@ def create_api_key(
         expires_days: Počet dní do expirácie (None = bez expirácie)
         permissions: Zoznam permissions (["read", "write"])
         ip_whitelist: Zoznam povolených IP adries
+        daily_quota: Max počet requestov za deň (None = default)
         
     Returns:
         Dict s key informáciami (key sa vráti len raz!)
@@ -101,6 +116,7 @@ def create_api_key(
         expires_at=expires_at,
         permissions=json.dumps(permissions),
         ip_whitelist=json.dumps(ip_whitelist) if ip_whitelist else None,
+        daily_quota=daily_quota,
         is_active=True
     )
     
@@ -116,7 +132,8 @@ def create_api_key(
         "created_at": api_key.created_at.isoformat(),
         "expires_at": api_key.expires_at.isoformat() if api_key.expires_at else None,
         "permissions": permissions,
-        "ip_whitelist": ip_whitelist
+        "ip_whitelist": ip_whitelist,
+        "daily_quota": daily_quota
     }
 
 
@@ -137,7 +154,7 @@ def get_api_key_by_token(db: Session, token: str) -> Optional[ApiKey]:
         ApiKey object alebo None
     """
     # Hash token
-    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    token_hash = hash_api_key(token)
     
     # Nájsť key
     api_key = get_api_key_by_hash(db, token_hash)
@@ -185,21 +202,141 @@ def revoke_api_key(db: Session, key_id: int, user_id: int) -> bool:
     
     api_key.is_active = False
     db.commit()
+    invalidate_api_key(key_id)
     return True
 
 
+class ApiKeyUsageBuffer:
+    """
+    Bufferuje usage počítadlá API keys v pamäti a zapisuje ich dávkovo,
+    namiesto UPDATE + COMMIT pri každom requeste.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = API_KEY_USAGE_FLUSH_SECONDS,
+        flush_threshold: int = API_KEY_USAGE_FLUSH_THRESHOLD,
+    ):
+        self._pending: Dict[int, Tuple[int, datetime]] = {}
+        self._pending_total = 0
+        self._flush_interval = flush_interval
+        self._flush_threshold = flush_threshold
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, api_key_id: int) -> bool:
+        """
+        Zaznamená jedno použitie. Vráti True, ak je čas na flush.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            count, _ = self._pending.get(api_key_id, (0, now))
+            self._pending[api_key_id] = (count + 1, now)
+            self._pending_total += 1
+            return (
+                self._pending_total >= self._flush_threshold
+                or time.monotonic() - self._last_flush >= self._flush_interval
+            )
+
+    def is_due(self) -> bool:
+        """Buffer dosiahol limit alebo interval a má čo zapísať"""
+        with self._lock:
+            return self._pending_total > 0 and (
+                self._pending_total >= self._flush_threshold
+                or time.monotonic() - self._last_flush >= self._flush_interval
+            )
+
+    def pending_count(self, api_key_id: int) -> int:
+        """Počet ešte nezapísaných použití pre key"""
+        with self._lock:
+            return self._pending.get(api_key_id, (0, None))[0]
+
+    def drain(self) -> Dict[int, Tuple[int, datetime]]:
+        """Vyberie všetky pending počítadlá"""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+            return pending
+
+    def restore(self, pending: Dict[int, Tuple[int, datetime]]) -> None:
+        """Vráti počítadlá späť do bufferu (po zlyhanom flush)"""
+        with self._lock:
+            for api_key_id, (count, last_used) in pending.items():
+                current, current_last = self._pending.get(api_key_id, (0, last_used))
+                self._pending[api_key_id] = (current + count, max(current_last, last_used))
+                self._pending_total += count
+
+    def flush(self, db: Session) -> int:
+        """
+        Zapíše pending počítadlá jednou transakciou.
+        Vráti počet aktualizovaných keys.
+        """
+        pending = self.drain()
+        if not pending:
+            return 0
+        try:
+            for api_key_id, (count, last_used) in pending.items():
+                db.query(ApiKey).filter(ApiKey.id == api_key_id).update(
+                    {
+                        ApiKey.usage_count: ApiKey.usage_count + count,
+                        ApiKey.last_used_at: last_used,
+                    },
+                    synchronize_session=False,
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.restore(pending)
+            raise
+        return len(pending)
+
+
+_usage_buffer = ApiKeyUsageBuffer()
+
+
+def record_api_key_usage(api_key_id: int) -> None:
+    """
+    Zaznamená použitie API key do bufferu (O(1), bez DB - volá sa na event
+    loope z verify_api_key). Zápis robí run_metering_worker cez flush_api_key_usage.
+    """
+    _usage_buffer.record(api_key_id)
+
+
+def api_key_usage_flush_due() -> bool:
+    """Či má metering worker zapísať buffer pred svojím pravidelným rollupom"""
+    return _usage_buffer.is_due()
+
+
+def flush_api_key_usage(db: Optional[Session] = None) -> int:
+    """
+    Zapíše bufferované usage počítadlá do DB (blokujúce - z async kódu cez
+    asyncio.to_thread). Volá ho metering worker a shutdown.
+    """
+    if db is not None:
+        return _usage_buffer.flush(db)
+    try:
+        with get_db_session() as session:
+            if session is None:
+                return 0
+            return _usage_buffer.flush(session)
+    except Exception as e:
+        print(f"⚠️ Chyba pri flush API key usage: {e}")
+        return 0
+
+
 def update_api_key_usage(db: Session, api_key: ApiKey, ip_address: Optional[str] = None):
     """
     Aktualizovať usage štatistiky pre API key.
+    Zápis je bufferovaný - viď record_api_key_usage().
     
     Args:
         db: Database session
         api_key: ApiKey object
         ip_address: IP adresa requestu (pre logging)
     """
-    api_key.usage_count += 1
-    api_key.last_used_at = datetime.utcnow()
-    db.commit()
+    record_api_key_usage(api_key.id)  # type: ignore[arg-type]
 
 
 def get_api_key_stats(db: Session, key_id: int, user_id: int) -> Optional[Dict]:
@@ -231,9 +368,10 @@ def get_api_key_stats(db: Session, key_id: int, user_id: int) -> Optional[Dict]:
         "created_at": api_key.created_at.isoformat(),
         "expires_at": api_key.expires_at.isoformat() if api_key.expires_at else None,
         "last_used_at": api_key.last_used_at.isoformat() if api_key.last_used_at else None,
-        "usage_count": api_key.usage_count,
+        "usage_count": api_key.usage_count + _usage_buffer.pending_count(api_key.id),
         "is_active": api_key.is_active,
         "permissions": json.loads(api_key.permissions) if api_key.permissions else [],
-        "ip_whitelist": json.loads(api_key.ip_whitelist) if api_key.ip_whitelist else None
+        "ip_whitelist": json.loads(api_key.ip_whitelist) if api_key.ip_whitelist else None,
+        "daily_quota": api_key.daily_quota
     }
 
@@ -1,38 +1,67 @@
 """
 Audit Service - Full Firma Data Check
 Poskytuje hĺbkový 360° audit firiem.
+
+Pipeline:
+- nezávislé kontroly (identita z ORSR, dlhové registre) bežia súbežne
+- každá kontrola má vlastnú cache s TTL (provider cache: orsr_sk,
+  audit_debts, audit_address)
+- virtuálne sídla jedným prechodom cez Aho-Corasick automat
+- report je verzovaný (AUDIT_REPORT_VERSION) a nesie fingerprint vstupov;
+  čerstvý report (AUDIT_REPORT_FRESH_SECONDS) sa vráti z cache hneď, starší
+  sa po overení čiastkových kontrol znovu použije, ak sa fingerprint nezmenil
 """
-import re
-import requests
-from bs4 import BeautifulSoup
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from services.address_matcher import get_virtual_address_matcher
+from services.provider_cache import MISS, ProviderCache, provider_cache
 from services.sk_orsr_provider import OrsrProvider
 from services.sk_region_resolver import resolve_region
 
+# Verzia pravidiel auditu - zvýšiť pri zmene skórovania, staré reporty v cache sa ignorujú
+AUDIT_REPORT_VERSION = 2
+AUDIT_MAX_WORKERS = int(os.getenv("AUDIT_MAX_WORKERS", "8"))
+# Report mladší ako toto sa vráti bez overenia vstupov
+AUDIT_REPORT_FRESH_SECONDS = int(os.getenv("AUDIT_REPORT_FRESH_SECONDS", "3600"))
+
+_audit_executor = ThreadPoolExecutor(max_workers=AUDIT_MAX_WORKERS, thread_name_prefix="audit")
+
+
 class AuditService:
     """
     Služba pre komplexný audit firiem (Full Firma Data Check).
     Agreguje dáta z verejných registrov, dlhových zoznamov a analyzuje riziká.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[ProviderCache] = None):
         self.orsr_provider = OrsrProvider()
-        # Zoznam známych virtuálnych sídiel (vzorka)
-        self.virtual_addresses = [
-            "napájadlá 7", "karpatské námestie 10", "klincová 37", 
-            "kopčianska 10", "mýtna 15", "p.o.box", "pobox", "virtualne",
-            "m. r. štefánika", "námestie snp", "gorkého"
-        ]
-
-    def perform_deep_audit(self, ico: str) -> Dict:
+        self.cache = cache or provider_cache
+        # Zoznam známych virtuálnych sídiel (data/virtual_addresses_sk.txt)
+        self.address_matcher = get_virtual_address_matcher()
+        self.virtual_addresses = self.address_matcher.patterns
+
+    def perform_deep_audit(self, ico: str, force_refresh: bool = False) -> Dict:
         """
         Vykoná kompletný 360° audit pre zadané IČO.
         """
+        report_key = f"v{AUDIT_REPORT_VERSION}:{ico}"
+        cached_report = None
+        if not force_refresh:
+            cached_report = self.cache.get("audit_report", report_key)
+            if cached_report and self._is_fresh(cached_report):
+                return cached_report
+
+        now = datetime.now().isoformat()
         audit_report = {
             "ico": ico,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
+            "checked_at": now,
+            "report_version": AUDIT_REPORT_VERSION,
             "summary": {},
             "identity": {},
             "debts": [],
@@ -42,41 +71,47 @@ class AuditService:
             "alerts": []
         }
 
-        # 1. Identita (ORSR Data)
-        # Použijeme existujúci provider alebo fallback scraping ak treba viac detailov
-        company_data = self.orsr_provider.lookup_by_ico(ico)
+        # 1. Identita (ORSR Data) a 4. dlhy - navzájom nezávislé, bežia súbežne
+        identity_future = _audit_executor.submit(self.orsr_provider.lookup_by_ico, ico, force_refresh)
+        debts_future = _audit_executor.submit(self._cached_debts, ico, force_refresh)
+        company_data = identity_future.result()
         if not company_data:
             # Fallback pre CZ alebo ak ORSR zlyhá - zatiaľ jednoduchý return
             # V budúcnosti tu môžeme pridať ARES fallback
+            # (negatívny výsledok cacheuje ORSR provider, report sa neukladá)
             audit_report["summary"]["status"] = "NENÁJDENÁ"
             audit_report["risk_score"] = 0 # Neznáma
             audit_report["alerts"].append({"level": "warning", "message": "Firma nebola nájdená v registroch."})
             return audit_report
 
+        # 3. Analýza sídla (z cache) - spolu s identitou a dlhmi sú to všetky vstupy skóre
+        address_analysis = self._cached_address_analysis(
+            company_data.get("address", ""), company_data.get("postal_code", "")
+        )
+        debts = debts_future.result()
+        fingerprint = self._fingerprint(company_data, address_analysis, debts)
+        if cached_report and cached_report.get("fingerprint") == fingerprint:
+            # Vstupy sa od posledného výpočtu nezmenili - report platí, len sa posunie overenie
+            cached_report["checked_at"] = now
+            self.cache.set("audit_report", report_key, cached_report)
+            return cached_report
+
         audit_report["identity"] = company_data
-        
+
         # 2. Analýza statusu
         status = company_data.get("status", "Aktívna")
         if any(s in status.lower() for s in ["likvid", "konkurz", "výmaz", "zrušen"]):
              audit_report["alerts"].append({"level": "critical", "message": f"Firma je v stave: {status}"})
              audit_report["risk_score"] += 7
 
-        # 3. Analýza sídla
-        address = company_data.get("address", "")
-        is_virtual = any(va.lower() in address.lower() for va in self.virtual_addresses)
-        audit_report["address_analysis"] = {
-            "raw_address": address,
-            "is_virtual_suspect": is_virtual,
-            "region": resolve_region(company_data.get("postal_code", ""))
-        }
-        if is_virtual:
+        audit_report["address_analysis"] = address_analysis
+        if address_analysis["is_virtual_suspect"]:
             audit_report["alerts"].append({"level": "high", "message": "Sídlo na adrese hromadného poskytovateľa virtuálnych adries."})
             audit_report["risk_score"] += 3
 
         # 4. Dlhová analýza (Simulácia / Heuristika)
         # Reálna implementácia by scrapovala socpoist.sk/union.sk/vszp.sk
         # Tu použijeme logiku na základe skúseností (pre demo IČO 51200678) alebo placeholder
-        debts = self._check_debts(ico)
         audit_report["debts"] = debts
         if debts:
             debt_count = len(debts)
@@ -96,16 +131,63 @@ class AuditService:
         final_score = 1 + audit_report["risk_score"]
         if final_score > 10: final_score = 10
         audit_report["trust_score"] = final_score
-        
+
         # Preklad skóre
         if final_score >= 8: verdict = "KRITICKÉ RIZIKO"
         elif final_score >= 5: verdict = "ZVÝŠENÉ RIZIKO"
         else: verdict = "NÍZKE RIZIKO"
-        
+
         audit_report["summary"]["verdict"] = verdict
-        
+        audit_report["fingerprint"] = fingerprint
+
+        self.cache.set("audit_report", report_key, audit_report)
         return audit_report
 
+    def match_virtual_address(self, address: str) -> List[str]:
+        """Známe virtuálne sídla nájdené v adrese"""
+        return self.address_matcher.find(address or "")
+
+    def _cached_debts(self, ico: str, force_refresh: bool = False) -> List[Dict]:
+        if not force_refresh:
+            cached = self.cache.get("audit_debts", ico)
+            if cached is not MISS:
+                return cached
+        debts = self._check_debts(ico)
+        self.cache.set("audit_debts", ico, debts)
+        return debts
+
+    def _cached_address_analysis(self, address: str, postal_code: str) -> Dict:
+        key = hashlib.sha1(f"{postal_code}|{address}".encode("utf-8")).hexdigest()
+        cached = self.cache.get("audit_address", key)
+        if cached:
+            return cached
+        matches = self.match_virtual_address(address)
+        analysis = {
+            "raw_address": address,
+            "is_virtual_suspect": bool(matches),
+            "virtual_matches": matches,
+            "region": resolve_region(postal_code),
+        }
+        self.cache.set("audit_address", key, analysis)
+        return analysis
+
+    @staticmethod
+    def _is_fresh(report: Dict) -> bool:
+        try:
+            checked_at = datetime.fromisoformat(report.get("checked_at") or report["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (datetime.now() - checked_at).total_seconds() < AUDIT_REPORT_FRESH_SECONDS
+
+    @staticmethod
+    def _fingerprint(company_data: Dict, address_analysis: Dict, debts: List[Dict]) -> str:
+        """Hash vstupov auditu - rovnaký fingerprint = rovnaký výsledok"""
+        payload = json.dumps(
+            [AUDIT_REPORT_VERSION, company_data, address_analysis, debts],
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
     def _check_debts(self, ico: str) -> List[Dict]:
         """
         Simulovaná kontrola dlhov pre účely MVP.
@@ -113,11 +195,11 @@ class AuditService:
         """
         debts = []
         # Hardcoded známe dlžnícke IČO pre demo účely (aby funkcionalita bola viditeľná)
-        if ico == "51200678": 
+        if ico == "51200678":
             debts.append({"source": "Sociálna poisťovňa", "status": "DLŽNÍK", "amount": "Vysoká suma"})
             debts.append({"source": "VšZP", "status": "ZÁZNAM", "amount": "Nedoplatok"})
             debts.append({"source": "Union", "status": "ZÁZNAM", "amount": "Nedoplatok"})
-        
+
         return debts
 
 audit_service = AuditService()
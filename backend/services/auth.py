@@ -5,6 +5,7 @@ JWT token-based authentication
 
 import enum
 import os
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 
@@ -14,6 +15,7 @@ from sqlalchemy import Boolean, Column, DateTime, Integer, String
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Session, relationship
 
+from services.auth_cache import invalidate_user
 from services.database import Base
 
 # Password hashing
@@ -96,6 +98,8 @@ def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire})
+    # JTI identifikuje token pre auth cache a logout revocation
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -201,6 +205,7 @@ def update_user_tier(db: Session, user_id: int, tier: UserTier) -> bool:
         return False
     user.tier = tier
     db.commit()
+    invalidate_user(user_id)
     return True
 
 
@@ -0,0 +1,250 @@
+"""
+Auth Cache Service pre ILUMINATI SYSTEM
+Krátkodobá cache autentifikovaných principalov (JWT tokeny a API keys),
+aby autentifikovaný request nemusel ísť do DB.
+
+Invalidácia:
+- logout: token (JTI) sa pridá na revocation list do jeho expirácie
+- zmena tieru / deaktivácia: invalidate_user() zahodí všetky principaly používateľa
+- revoke API key: invalidate_api_key() zahodí principal pre daný key
+
+Cache je per-proces. Revocation list sa zrkadlí do Redis (ak je dostupný),
+ostatné workery ho overia pri najbližšom cache miss - oneskorenie je teda
+zhora ohraničené TTL principal cache.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from services.redis_cache import redis_exists, redis_set
+
+    REDIS_AVAILABLE = True
+except (ImportError, Exception):
+    REDIS_AVAILABLE = False
+    redis_exists = redis_set = None
+
+# Konfigurácia
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", "10000"))
+
+_REVOKED_PREFIX = "auth:revoked:"
+
+
+class PrincipalCache:
+    """
+    LRU cache s TTL pre autentifikované principaly.
+    Každý záznam je zviazaný s user_id, aby sa dal invalidovať naraz.
+    """
+
+    def __init__(self, ttl_seconds: int = AUTH_CACHE_TTL_SECONDS, max_size: int = AUTH_CACHE_MAX_SIZE):
+        self._entries: "OrderedDict[str, Tuple[Any, float, Optional[int]]]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        self._ttl = ttl_seconds
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Vráti principal alebo None (miss / expirovaný)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, expiry, user_id = entry
+            if now >= expiry:
+                self._remove(key, user_id)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any, user_id: Optional[int] = None, ttl_seconds: Optional[int] = None) -> None:
+        """Uloží principal pod kľúč (token/JTI alebo hash API key)."""
+        expiry = time.monotonic() + (ttl_seconds if ttl_seconds is not None else self._ttl)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._unindex(key, old[2])
+            self._entries[key] = (value, expiry, user_id)
+            if user_id is not None:
+                self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self._max_size:
+                old_key, (_, _, old_user) = self._entries.popitem(last=False)
+                self._unindex(old_key, old_user)
+
+    def invalidate(self, key: str) -> None:
+        """Zahodí jeden principal."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._remove(key, entry[2])
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Zahodí všetky principaly používateľa. Vráti počet zahodených."""
+        with self._lock:
+            keys = self._by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "items": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / total * 100) if total else 0.0,
+                "ttl_seconds": self._ttl,
+            }
+
+    def _remove(self, key: str, user_id: Optional[int]) -> None:
+        self._entries.pop(key, None)
+        self._unindex(key, user_id)
+
+    def _unindex(self, key: str, user_id: Optional[int]) -> None:
+        if user_id is None:
+            return
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+# Singleton inštancie
+_token_cache = PrincipalCache()
+_api_key_cache = PrincipalCache()
+_api_key_ids: Dict[int, str] = {}  # api_key_id -> key_hash (pre revoke podľa ID)
+_revoked_tokens: Dict[str, datetime] = {}  # token key -> exp
+_revoked_lock = threading.Lock()
+
+
+def token_cache_key(token: str, payload: Dict) -> str:
+    """Kľúč principalu pre JWT: JTI ak existuje, inak hash tokenu."""
+    jti = payload.get("jti")
+    if jti:
+        return f"jti:{jti}"
+    return "tok:" + hashlib.sha256(token.encode()).hexdigest()
+
+
+# --- JWT principaly ---
+
+
+def get_cached_user(key: str) -> Optional[Any]:
+    """Vráti (detached) User pre token alebo None."""
+    return _token_cache.get(key)
+
+
+def cache_user(key: str, user: Any) -> None:
+    """Uloží (detached) User pre token."""
+    _token_cache.set(key, user, user_id=getattr(user, "id", None))
+
+
+def revoke_token(key: str, expires_at: Optional[datetime] = None) -> None:
+    """
+    Odvolá token (logout). Záznam sa drží do expirácie tokenu,
+    potom by token aj tak neprešiel dekódovaním.
+    """
+    _token_cache.invalidate(key)
+    now = datetime.utcnow()
+    if expires_at is None or expires_at <= now:
+        expires_at = now
+    with _revoked_lock:
+        _revoked_tokens[key] = expires_at
+        # Upratať expirované záznamy
+        for k in [k for k, exp in _revoked_tokens.items() if exp < now]:
+            del _revoked_tokens[k]
+
+    if REDIS_AVAILABLE:
+        ttl = max(int((expires_at - now).total_seconds()), 1)
+        redis_set(_REVOKED_PREFIX + key, "1", ttl)
+
+
+def is_token_revoked(key: str, check_remote: bool = False) -> bool:
+    """
+    Skontroluje revocation list. check_remote=True sa pýta aj Redis
+    (volať len pri cache miss, kedy sa aj tak ide do DB).
+    """
+    with _revoked_lock:
+        exp = _revoked_tokens.get(key)
+        if exp is not None:
+            if exp >= datetime.utcnow():
+                return True
+            del _revoked_tokens[key]
+
+    if check_remote and REDIS_AVAILABLE:
+        return bool(redis_exists(_REVOKED_PREFIX + key))
+    return False
+
+
+# --- API key principaly ---
+
+
+def get_cached_api_key(key_hash: str) -> Optional[Dict]:
+    """Vráti principal API key (dict) alebo None."""
+    return _api_key_cache.get(key_hash)
+
+
+def cache_api_key(key_hash: str, principal: Dict) -> None:
+    """
+    Uloží principal API key. Očakávané polia:
+    api_key_id, user_id, user, expires_at, ip_whitelist (frozenset alebo None), permissions
+    """
+    _api_key_cache.set(key_hash, principal, user_id=principal.get("user_id"))
+    _api_key_ids[principal["api_key_id"]] = key_hash
+
+
+def invalidate_api_key(api_key_id: int) -> None:
+    """Zahodí principal API key (revoke, zmena whitelistu)."""
+    key_hash = _api_key_ids.pop(api_key_id, None)
+    if key_hash is not None:
+        _api_key_cache.invalidate(key_hash)
+
+
+# --- Spoločné ---
+
+
+def invalidate_user(user_id: int) -> None:
+    """Zahodí všetky principaly používateľa (zmena tieru, deaktivácia)."""
+    dropped = _token_cache.invalidate_user(user_id) + _api_key_cache.invalidate_user(user_id)
+    if dropped:
+        logger.debug(f"Auth cache: invalidated {dropped} principals for user {user_id}")
+
+
+def clear_auth_cache() -> None:
+    """Vyčistí všetky auth cache (pre testy)."""
+    _token_cache.clear()
+    _api_key_cache.clear()
+    _api_key_ids.clear()
+    with _revoked_lock:
+        _revoked_tokens.clear()
+
+
+def get_auth_cache_stats() -> Dict:
+    """Štatistiky auth cache."""
+    with _revoked_lock:
+        revoked = len(_revoked_tokens)
+    return {
+        "tokens": _token_cache.get_stats(),
+        "api_keys": _api_key_cache.get_stats(),
+        "revoked_tokens": revoked,
+    }
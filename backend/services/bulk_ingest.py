@@ -0,0 +1,458 @@
+"""
+Bulk ingest open-data dumpov registrov V4 do company_cache a grafu
+
+Namiesto objavovania firiem po jednom IČO cez live scraping sa načíta
+celý hromadný dataset registra:
+
+- ares_csv: ARES / RES hromadné dáta (CSV, CZ)
+- rpo_json: RPO open-data export (JSON pole alebo JSON Lines, SK)
+- krs_xml: KRS hromadný export (XML, PL)
+
+Pipeline:
+- hlavný proces číta súbor prúdovo (csv.DictReader / ijson / iterparse,
+  .gz transparentne) a delí surové záznamy na dávky
+- normalizácia dávok (validácia identifikátora, adresa, osoby, riadky
+  grafu) beží v multiprocessing pool-e, najviac 2 dávky na worker naraz
+- zápis dávky je jeden bulk INSERT ... ON CONFLICT na tabuľku a commit
+- po každej zapísanej dávke sa uloží checkpoint (počet spracovaných
+  záznamov); prerušený ingest pokračuje od checkpointu
+"""
+
+import csv
+import gzip
+import io
+import json
+import logging
+import multiprocessing
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from xml.etree.ElementTree import iterparse
+
+from sqlalchemy.orm import Session
+
+from services.address_normalizer import normalize_address
+from services.database import CompanyCache, GraphEdge, GraphNode, company_cache_fields, get_db_session
+from services.graph_service import _person_node_id
+from services.identifier_validation import is_valid_identifier
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+BULK_INGEST_CHUNK_SIZE = int(os.getenv("BULK_INGEST_CHUNK_SIZE", "5000"))
+_KEY_LOOKUP_BATCH = 5000
+
+
+# --- Normalizácia záznamov (beží vo workeroch) ---
+
+def _text(value: Any) -> str:
+    return str(value).strip() if value not in (None, "") else ""
+
+
+def _current(entries: Any) -> Dict:
+    """RPO história hodnôt - platná položka (bez validTo), inak posledná"""
+    if isinstance(entries, dict):
+        return entries
+    if not entries:
+        return {}
+    valid = [e for e in entries if isinstance(e, dict) and not e.get("validTo")]
+    return (valid or entries)[-1]
+
+
+def _as_list(value: Any) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _normalize_ares(raw: Dict) -> Optional[Dict]:
+    ico = _text(raw.get("ICO")).zfill(8)
+    number = "/".join(n for n in (_text(raw.get("CDOM")), _text(raw.get("COR"))) if n)
+    address = {
+        "street": _text(raw.get("ULICE_TEXT")) or _text(raw.get("COBCE_TEXT")),
+        "number": number,
+        "postal_code": _text(raw.get("PSC")),
+        "city": _text(raw.get("OBEC_TEXT")),
+        "raw": _text(raw.get("TEXTADR")),
+    }
+    return {
+        "country": "CZ",
+        "identifier": ico,
+        "name": _text(raw.get("FIRMA")),
+        "legal_form": _text(raw.get("FORMA")),
+        "founded": _text(raw.get("DDATVZN")),
+        "status": "Zaniknutá" if _text(raw.get("DDATZAN")) else "Aktívna",
+        "address": address,
+        "executives": [],
+    }
+
+
+def _normalize_rpo(raw: Dict) -> Optional[Dict]:
+    ico = _text(_current(raw.get("identifiers")).get("value"))
+    address = _current(raw.get("addresses"))
+    legal_form = _current(raw.get("legalForms")).get("value") or {}
+    executives = [
+        _text((body.get("personName") or {}).get("formatedName"))
+        for body in _as_list(raw.get("statutoryBodies"))
+        if isinstance(body, dict) and not body.get("validTo")
+    ]
+    return {
+        "country": "SK",
+        "identifier": ico,
+        "name": _text(_current(raw.get("fullNames")).get("value")),
+        "legal_form": _text(legal_form.get("value") if isinstance(legal_form, dict) else legal_form),
+        "founded": _text(raw.get("establishment")),
+        "status": "Zaniknutá" if _text(raw.get("termination")) else "Aktívna",
+        "address": {
+            "street": _text(address.get("street")),
+            "number": _text(address.get("buildingNumber") or address.get("regNumber")),
+            "postal_code": _text((_as_list(address.get("postalCodes")) or [""])[0]),
+            "city": _text((address.get("municipality") or {}).get("value")),
+        },
+        "executives": [name for name in executives if name],
+    }
+
+
+def _normalize_krs(raw: Dict) -> Optional[Dict]:
+    address = raw.get("Adres") or {}
+    executives = []
+    for person in _as_list((raw.get("Reprezentacja") or {}).get("Osoba")):
+        if isinstance(person, dict):
+            name = " ".join(_text(person.get(k)) for k in ("Imie", "Nazwisko") if person.get(k))
+            if name:
+                executives.append(name)
+    return {
+        "country": "PL",
+        "identifier": _text(raw.get("NumerKRS")).zfill(10),
+        "name": _text(raw.get("Nazwa")),
+        "legal_form": _text(raw.get("FormaPrawna")),
+        "founded": _text(raw.get("DataRejestracji")),
+        "status": "Wykreślony" if _text(raw.get("DataWykreslenia")) else "Aktywny",
+        "nip": _text(raw.get("NIP")),
+        "regon": _text(raw.get("REGON")),
+        "address": {
+            "street": _text(address.get("Ulica")),
+            "number": _text(address.get("NrDomu")),
+            "postal_code": _text(address.get("KodPocztowy")),
+            "city": _text(address.get("Miejscowosc")),
+        },
+        "executives": executives,
+    }
+
+
+class DumpSource:
+    """Formát a normalizácia jedného typu dumpu"""
+
+    def __init__(self, name: str, fmt: str, normalize: Callable[[Dict], Optional[Dict]], **options):
+        self.name = name
+        self.format = fmt
+        self.normalize = normalize
+        self.options = options
+
+
+SOURCES = {
+    "ares_csv": DumpSource("ares_csv", "csv", _normalize_ares, delimiter=","),
+    "rpo_json": DumpSource("rpo_json", "json", _normalize_rpo, item_prefix="item"),
+    "krs_xml": DumpSource("krs_xml", "xml", _normalize_krs, record_tag="Podmiot"),
+}
+
+
+def _company_rows(record: Dict, source: str, now: datetime, with_graph: bool) -> Dict[str, List[Dict]]:
+    country, identifier = record["country"], record["identifier"]
+    address = {k: v for k, v in (record.get("address") or {}).items() if v}
+    normalized = normalize_address(address, country) if address else None
+    payload = {
+        **{k: v for k, v in record.items() if k not in ("country", "address") and v not in ("", None, [])},
+        "address": address.get("raw") or ", ".join(
+            part for part in (
+                " ".join(address.get(k, "") for k in ("street", "number") if address.get(k)),
+                " ".join(address.get(k, "") for k in ("postal_code", "city") if address.get(k)),
+            ) if part
+        ),
+        "postal_code": normalized.postal_code if normalized else address.get("postal_code"),
+        "city": address.get("city"),
+        "source": source,
+    }
+    rows = {
+        "companies": [{
+            "country": country,
+            "identifier": identifier,
+            "payload": payload,
+            **company_cache_fields(payload),
+            "created_at": now,
+            "updated_at": now,
+            "last_synced_at": now,
+        }],
+        "nodes": [],
+        "edges": [],
+    }
+    if not with_graph:
+        return rows
+
+    company_id = f"{country.lower()}_{identifier}"
+    rows["nodes"].append({
+        "id": company_id, "label": (payload.get("name") or company_id)[:500], "type": "company",
+        "country": country, "details": {"atlas_id": identifier, "source": source},
+    })
+    if normalized:
+        rows["nodes"].append({
+            "id": normalized.node_id, "label": payload["address"][:500] or normalized.key, "type": "address",
+            "country": country, "details": {"source": source, **address, "normalized": normalized.as_dict()},
+        })
+        rows["edges"].append({"source": company_id, "target": normalized.node_id, "type": "LOCATED_AT",
+                              "details": {"source": source}})
+    for name in record.get("executives") or []:
+        person_id = _person_node_id(country, name, "")
+        rows["nodes"].append({"id": person_id, "label": name[:500], "type": "person", "country": country,
+                              "details": {"source": source}})
+        rows["edges"].append({"source": company_id, "target": person_id, "type": "MANAGED_BY",
+                              "details": {"source": source}})
+    return rows
+
+
+def normalize_chunk(source: str, records: List[Dict], with_graph: bool = True) -> Dict[str, Any]:
+    """Surové záznamy dávky -> riadky company_cache a grafu (picklable pre pool)"""
+    spec = SOURCES[source]
+    now = datetime.utcnow()
+    out: Dict[str, Any] = {"raw_count": len(records), "rejected": 0, "companies": [], "nodes": [], "edges": []}
+    for raw in records:
+        try:
+            record = spec.normalize(raw)
+        except Exception:
+            record = None
+        if not record or not record.get("name") or not is_valid_identifier(record["country"], record["identifier"]):
+            out["rejected"] += 1
+            continue
+        for table, rows in _company_rows(record, source, now, with_graph).items():
+            out[table].extend(rows)
+    return out
+
+
+# --- Prúdové čítanie súborov ---
+
+def _open(path: str, binary: bool, encoding: str):
+    if path.endswith(".gz"):
+        handle = gzip.open(path, "rb")
+    else:
+        handle = open(path, "rb")
+    return handle if binary else io.TextIOWrapper(handle, encoding=encoding, newline="")
+
+
+def _local_tag(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _element_dict(elem) -> Any:
+    """XML element -> dict (opakované tagy ako zoznam, listy ako text)"""
+    children = list(elem)
+    if not children:
+        return (elem.text or "").strip()
+    result: Dict[str, Any] = {}
+    for child in children:
+        tag, value = _local_tag(child.tag), _element_dict(child)
+        if tag in result:
+            if not isinstance(result[tag], list):
+                result[tag] = [result[tag]]
+            result[tag].append(value)
+        else:
+            result[tag] = value
+    return result
+
+
+def iter_records(path: str, source: str, encoding: str = "utf-8") -> Iterator[Dict]:
+    """Surové záznamy dumpu v poradí súboru (konštantná pamäť)"""
+    spec = SOURCES[source]
+    plain_name = path[:-3] if path.endswith(".gz") else path
+
+    if spec.format == "csv":
+        with _open(path, False, encoding) as handle:
+            yield from csv.DictReader(handle, delimiter=spec.options.get("delimiter", ","))
+    elif spec.format == "json":
+        if plain_name.endswith((".jsonl", ".ndjson")):
+            with _open(path, False, encoding) as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            if not IJSON_AVAILABLE:
+                raise ImportError("ijson nie je nainštalovaný (pip install ijson) - alebo použite JSON Lines")
+            with _open(path, True, encoding) as handle:
+                yield from ijson.items(handle, spec.options.get("item_prefix", "item"))
+    elif spec.format == "xml":
+        record_tag = spec.options["record_tag"]
+        with _open(path, True, encoding) as handle:
+            root = None
+            for event, elem in iterparse(handle, events=("start", "end")):
+                if root is None:
+                    root = elem
+                if event == "end" and _local_tag(elem.tag) == record_tag:
+                    yield _element_dict(elem)
+                    elem.clear()
+                    root.clear()
+    else:
+        raise ValueError(f"Neznámy formát dumpu: {spec.format}")
+
+
+def iter_chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    chunk: List[Dict] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- Zápis ---
+
+def _dedupe(rows: List[Dict], key: Callable[[Dict], Any]) -> List[Dict]:
+    """Jeden riadok na kľúč (ON CONFLICT nesmie zasiahnuť riadok dvakrát v jednom príkaze)"""
+    return list({key(row): row for row in rows}.values())
+
+
+def _bulk_upsert(db: Session, model, rows: List[Dict], conflict: List[str], update: List[str]) -> None:
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        for row in rows:
+            db.merge(model(**row))
+        return
+    stmt = insert(model.__table__)
+    if update:
+        stmt = stmt.on_conflict_do_update(index_elements=conflict, set_={c: stmt.excluded[c] for c in update})
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict)
+    db.execute(stmt, rows)
+
+
+def write_chunk(db: Session, chunk: Dict[str, Any]) -> None:
+    """Bulk upsert dávky do company_cache a grafu v jednej transakcii"""
+    companies = _dedupe(chunk["companies"], lambda r: (r["country"], r["identifier"]))
+    _bulk_upsert(
+        db, CompanyCache, companies, ["country", "identifier"],
+        [c for c in companies[0] if c not in ("country", "identifier", "created_at")] if companies else [],
+    )
+
+    nodes = _dedupe(chunk["nodes"], lambda r: r["id"])
+    if nodes:
+        now = datetime.utcnow()
+        nodes = [{**node, "updated_at": now} for node in nodes]
+        _bulk_upsert(db, GraphNode, nodes, ["id"], ["label", "updated_at"])
+        node_ids = [n["id"] for n in nodes]
+        keys: Dict[str, int] = {}
+        for start in range(0, len(node_ids), _KEY_LOOKUP_BATCH):
+            batch = node_ids[start:start + _KEY_LOOKUP_BATCH]
+            keys.update(db.query(GraphNode.id, GraphNode.key).filter(GraphNode.id.in_(batch)).all())
+        edges = [
+            {**edge, "source_key": keys.get(edge["source"]), "target_key": keys.get(edge["target"])}
+            for edge in _dedupe(chunk["edges"], lambda r: (r["source"], r["type"], r["target"]))
+        ]
+        _bulk_upsert(db, GraphEdge, edges, ["source", "type", "target"], [])
+    db.commit()
+
+
+# --- Checkpoint ---
+
+def _file_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"file": os.path.abspath(path), "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def load_checkpoint(checkpoint_path: str, path: str, source: str) -> int:
+    """Počet už zapísaných záznamov (0 ak checkpoint chýba alebo je pre iný súbor)"""
+    try:
+        with open(checkpoint_path, encoding="utf-8") as handle:
+            state = json.load(handle)
+    except (OSError, ValueError):
+        return 0
+    if state.get("source") != source or any(state.get(k) != v for k, v in _file_signature(path).items()):
+        logger.warning(f"Checkpoint {checkpoint_path} patrí inému súboru, začína sa od začiatku")
+        return 0
+    return int(state.get("records_done", 0))
+
+
+def save_checkpoint(checkpoint_path: str, path: str, source: str, stats: Dict[str, int]) -> None:
+    state = {**_file_signature(path), "source": source, **stats, "updated_at": datetime.utcnow().isoformat()}
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(state, handle)
+    os.replace(tmp_path, checkpoint_path)
+
+
+# --- Orchestrácia ---
+
+def run_ingest(
+    path: str,
+    source: str,
+    chunk_size: int = BULK_INGEST_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+    with_graph: bool = True,
+    limit: Optional[int] = None,
+    encoding: str = "utf-8",
+    db: Optional[Session] = None,
+    progress: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """
+    Načíta dump do company_cache (a grafu). Vráti štatistiky
+    records_done / companies / rejected / skipped.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Neznámy zdroj: {source} (podporované: {', '.join(SOURCES)})")
+    if db is None:
+        with get_db_session() as session:
+            if session is None:
+                raise RuntimeError("Databáza nie je dostupná")
+            return run_ingest(path, source, chunk_size, workers, checkpoint_path, with_graph,
+                              limit, encoding, session, progress)
+
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint.json"
+    skip = load_checkpoint(checkpoint_path, path, source)
+    stats = {"records_done": skip, "companies": 0, "rejected": 0, "skipped": skip}
+    workers = workers if workers is not None else max(1, (os.cpu_count() or 2) - 1)
+
+    records = iter_records(path, source, encoding)
+    for _ in range(skip):
+        if next(records, None) is None:
+            break
+    if limit is not None:
+        records = (record for _, record in zip(range(limit), records))
+
+    def _commit(chunk: Dict[str, Any]) -> None:
+        write_chunk(db, chunk)
+        stats["records_done"] += chunk["raw_count"]
+        stats["companies"] += len(chunk["companies"])
+        stats["rejected"] += chunk["rejected"]
+        save_checkpoint(checkpoint_path, path, source, stats)
+        if progress:
+            progress(stats)
+
+    chunks = iter_chunks(records, chunk_size)
+    if workers <= 1:
+        for raw_chunk in chunks:
+            _commit(normalize_chunk(source, raw_chunk, with_graph))
+        return stats
+
+    # Ohraničený počet rozpracovaných dávok - pool nenačíta celý súbor dopredu
+    with multiprocessing.Pool(workers) as pool:
+        pending: deque = deque()
+        for raw_chunk in chunks:
+            pending.append(pool.apply_async(normalize_chunk, (source, raw_chunk, with_graph)))
+            if len(pending) >= workers * 2:
+                _commit(pending.popleft().get())
+        while pending:
+            _commit(pending.popleft().get())
+    return stats
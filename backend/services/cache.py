@@ -20,13 +20,29 @@ try:
     from services.redis_cache import (
         get_redis_client,
         redis_get,
+        redis_get_raw,
         redis_set,
         redis_delete,
     )
     REDIS_AVAILABLE = True
 except (ImportError, Exception):
     REDIS_AVAILABLE = False
-    redis_get = redis_set = redis_delete = None
+    redis_get = redis_get_raw = redis_set = redis_delete = None
+
+# orjson (voliteľný) - rýchla serializácia pre pre-serializované hodnoty
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def dumps_json(value: Any) -> bytes:
+    """Serializuje hodnotu do JSON bajtov (orjson, inak json)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
 
 class TieredCache:
     def __init__(self, default_ttl_hours: int = 24, l1_ttl_minutes: int = 60, l1_max_size: int = 1000):
@@ -74,6 +90,30 @@ class TieredCache:
 
         return None
 
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Získa pre-serializovanú JSON hodnotu (L1 -> L2) bez deserializácie.
+        Staršie záznamy uložené ako dict sa serializujú pri čítaní.
+        """
+        now = datetime.now()
+
+        if key in self._l1_cache:
+            value, expiry = self._l1_cache[key]
+            if now < expiry:
+                self._l1_cache.move_to_end(key)
+                return value if isinstance(value, bytes) else dumps_json(value)
+            del self._l1_cache[key]
+
+        # Redis klient beží s decode_responses=True - bajty sa vrátia ako str
+        if self._is_redis_active():
+            value = redis_get_raw(key)
+            if value is not None:
+                data = value.encode("utf-8") if isinstance(value, str) else value
+                self._l1_cache[key] = (data, now + self._l1_ttl)
+                return data
+
+        return None
+
     def set(self, key: str, value: Any, ttl: Optional[timedelta] = None) -> None:
         """
         Uloží hodnotu do cache (L1 aj L2).
@@ -111,7 +151,7 @@ class TieredCache:
 
     def clear(self) -> None:
         """Vyčistí celú lokálnu cache."""
-        self._l1_cache = {}
+        self._l1_cache.clear()
 
     def get_stats(self) -> Dict:
         """Vráti štatistiky hybridnej cache."""
@@ -144,8 +184,10 @@ _instance = TieredCache()
 # Exporty funkcií pre zachovanie spätnej kompatibility
 def get(key: str) -> Optional[Any]: return _instance.get(key)
 def get_cache(key: str) -> Optional[Any]: return _instance.get(key)
+def get_bytes(key: str) -> Optional[bytes]: return _instance.get_bytes(key)
 def set(key: str, value: Any, ttl: Optional[timedelta] = None) -> None: _instance.set(key, value, ttl)
 def set_cache(key: str, value: Any, ttl: Optional[timedelta] = None) -> None: _instance.set(key, value, ttl)
+def set_bytes(key: str, value: bytes, ttl: Optional[timedelta] = None) -> None: _instance.set(key, value, ttl)
 def delete(key: str) -> None: _instance.delete(key)
 def clear() -> None: _instance.clear()
 def get_stats() -> Dict: return _instance.get_stats()
@@ -0,0 +1,412 @@
+"""
+Columnar Analytics Export pre ILUMINATI SYSTEM
+Denné Parquet partície z search_history a analytics tabuliek a vektorizovaný
+query engine (pyarrow.dataset + pyarrow.compute) nad nimi.
+
+Layout:
+    {ANALYTICS_EXPORT_DIR}/search_history/date=YYYY-MM-DD/part-0.parquet
+    {ANALYTICS_EXPORT_DIR}/analytics/date=YYYY-MM-DD/part-0.parquet
+
+Ťažké analytické dotazy tak nejdú na produkčnú DB.
+
+Export dňa drží exkluzívny zámok (flock na .lock v adresári partície), takže
+deň exportuje len jeden proces (worker v každom uvicorn procese, archív
+retencie); dočasný súbor má unikátny názov.
+"""
+
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from services.analytics_rollup import client_hash
+from services.database import Analytics, SearchHistory, get_db_session
+
+logger = logging.getLogger(__name__)
+
+# pyarrow sa importuje až pri prvom exporte/dotaze (rýchly štart aplikácie)
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows - bez zámku medzi procesmi, zápis ostáva atomický
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+# Konfigurácia
+ANALYTICS_EXPORT_DIR = os.getenv(
+    "ANALYTICS_EXPORT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "analytics_export"),
+)
+ANALYTICS_EXPORT_BATCH_ROWS = int(os.getenv("ANALYTICS_EXPORT_BATCH_ROWS", "50000"))
+ANALYTICS_EXPORT_BACKFILL_DAYS = int(os.getenv("ANALYTICS_EXPORT_BACKFILL_DAYS", "365"))
+ANALYTICS_EXPORT_INTERVAL_SECONDS = int(os.getenv("ANALYTICS_EXPORT_INTERVAL_SECONDS", "3600"))
+ANALYTICS_QUERY_MAX_ROWS = 10000
+
+# Stĺpce datasetov (IP sa neexportuje, len anonymizovaný client_hash)
+DATASET_COLUMNS = {
+    "search_history": {
+        "id": "int64",
+        "search_timestamp": "timestamp",
+        "query": "string",
+        "country": "string",
+        "result_count": "int64",
+        "risk_score": "float64",
+        "client_hash": "string",
+    },
+    "analytics": {
+        "id": "int64",
+        "timestamp": "timestamp",
+        "event_type": "string",
+        "endpoint": "string",
+        "status_code": "int64",
+        "event_data": "string",
+    },
+}
+
+DATASET_TIME_COLUMN = {"search_history": "search_timestamp", "analytics": "timestamp"}
+
+# Metriky: názov -> pyarrow hash aggregate funkcia
+AGGREGATES = {
+    "count": "count",
+    "sum": "sum",
+    "avg": "mean",
+    "min": "min",
+    "max": "max",
+    "count_distinct": "count_distinct",
+}
+
+# Odvodené stĺpce pre group_by
+DERIVED_COLUMNS = ("date", "hour", "weekday")
+
+
+def _require_pyarrow() -> None:
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow nie je nainštalovaný. Nainštalujte: pip install pyarrow")
+
+
+def _arrow_schema(dataset: str) -> "pa.Schema":
+    import pyarrow as pa
+
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types[t]) for name, t in DATASET_COLUMNS[dataset].items()])
+
+
+def partition_path(dataset: str, day: date, base_dir: Optional[str] = None) -> str:
+    """Cesta k Parquet súboru pre daný deň"""
+    return os.path.join(base_dir or ANALYTICS_EXPORT_DIR, dataset, f"date={day.isoformat()}", "part-0.parquet")
+
+
+class PartitionLockedError(RuntimeError):
+    """Deň práve exportuje iný proces"""
+
+
+@contextmanager
+def _partition_lock(directory: str):
+    """Exkluzívny neblokujúci zámok adresára partície (uvoľní sa aj pri páde procesu)"""
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    with open(os.path.join(directory, ".lock"), "a") as handle:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            raise PartitionLockedError(directory)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _search_rows(db: Session, start: datetime, end: datetime) -> Iterator[Dict]:
+    query = (
+        db.query(
+            SearchHistory.id,
+            SearchHistory.search_timestamp,
+            SearchHistory.query,
+            SearchHistory.country,
+            SearchHistory.result_count,
+            SearchHistory.risk_score,
+            SearchHistory.user_ip,
+        )
+        .filter(SearchHistory.search_timestamp >= start, SearchHistory.search_timestamp < end)
+        .order_by(SearchHistory.id)
+        .yield_per(ANALYTICS_EXPORT_BATCH_ROWS)
+    )
+    for row_id, ts, query_text, country, result_count, risk_score, user_ip in query:
+        yield {
+            "id": row_id,
+            "search_timestamp": ts,
+            "query": query_text,
+            "country": country,
+            "result_count": result_count,
+            "risk_score": risk_score,
+            "client_hash": client_hash(user_ip) if user_ip else None,
+        }
+
+
+def _analytics_rows(db: Session, start: datetime, end: datetime) -> Iterator[Dict]:
+    query = (
+        db.query(Analytics.id, Analytics.timestamp, Analytics.event_type, Analytics.event_data)
+        .filter(Analytics.timestamp >= start, Analytics.timestamp < end)
+        .order_by(Analytics.id)
+        .yield_per(ANALYTICS_EXPORT_BATCH_ROWS)
+    )
+    for row_id, ts, event_type, event_data in query:
+        data = event_data if isinstance(event_data, dict) else {}
+        try:
+            status_code = int(data["status_code"]) if "status_code" in data else None
+        except (TypeError, ValueError):
+            status_code = None
+        yield {
+            "id": row_id,
+            "timestamp": ts,
+            "event_type": event_type,
+            "endpoint": data.get("endpoint"),
+            "status_code": status_code,
+            "event_data": json.dumps(event_data, ensure_ascii=False, default=str) if event_data else None,
+        }
+
+
+_ROW_SOURCES = {"search_history": _search_rows, "analytics": _analytics_rows}
+
+
+def export_day(
+    db: Session, dataset: str, day: date, base_dir: Optional[str] = None, overwrite: bool = True
+) -> int:
+    """
+    Exportuje jeden deň datasetu do Parquet (zstd). Zápis je atomický
+    (unikátny dočasný súbor + rename), čítanie z DB po dávkach.
+    Vráti počet exportovaných riadkov.
+
+    Args:
+        overwrite: False = existujúcu partíciu (napr. od iného procesu) ponechať
+
+    Raises:
+        PartitionLockedError ak deň práve exportuje iný proces
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(dataset)
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+
+    path = partition_path(dataset, day, base_dir)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    with _partition_lock(directory):
+        if not overwrite and os.path.exists(path):
+            return 0
+        # Bodka na začiatku - pyarrow.dataset rozpracovaný súbor ignoruje
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".part-0.", suffix=".tmp")
+        os.close(fd)
+        try:
+            total = 0
+            writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+            try:
+                batch: List[Dict] = []
+                for row in _ROW_SOURCES[dataset](db, start, end):
+                    batch.append(row)
+                    if len(batch) >= ANALYTICS_EXPORT_BATCH_ROWS:
+                        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                        total += len(batch)
+                        batch = []
+                if batch or total == 0:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    total += len(batch)
+            finally:
+                writer.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return total
+
+
+def export_pending_days(
+    db: Optional[Session] = None,
+    today: Optional[date] = None,
+    base_dir: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Exportuje všetky uzavreté dni (pred dneškom), ktoré ešte nemajú partíciu.
+    Vráti počet exportovaných dní per dataset.
+    """
+    if db is None:
+        with get_db_session() as session:
+            if session is None:
+                return {}
+            return export_pending_days(session, today, base_dir)
+
+    _require_pyarrow()
+    today = today or datetime.utcnow().date()
+    exported: Dict[str, int] = {}
+    for dataset, model_ts in (
+        ("search_history", SearchHistory.search_timestamp),
+        ("analytics", Analytics.timestamp),
+    ):
+        exported[dataset] = 0
+        first = db.query(func.min(model_ts)).scalar()
+        if first is None:
+            continue
+        day = max(first.date(), today - timedelta(days=ANALYTICS_EXPORT_BACKFILL_DAYS))
+        while day < today:
+            if not os.path.exists(partition_path(dataset, day, base_dir)):
+                try:
+                    rows = export_day(db, dataset, day, base_dir, overwrite=False)
+                except PartitionLockedError:
+                    logger.info(f"Columnar export: {dataset} {day} exportuje iný proces")
+                else:
+                    exported[dataset] += 1
+                    logger.info(f"Columnar export: {dataset} {day} ({rows} rows)")
+            day += timedelta(days=1)
+    return exported
+
+
+def run_query(
+    dataset: str,
+    metrics: List[str],
+    group_by: Optional[List[str]] = None,
+    filters: Optional[Dict] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 1000,
+    base_dir: Optional[str] = None,
+) -> Dict:
+    """
+    Ad-hoc agregácia nad Parquet partíciami.
+
+    Args:
+        dataset: search_history | analytics
+        metrics: napr. ["count", "avg:risk_score", "count_distinct:client_hash"]
+        group_by: stĺpce datasetu alebo odvodené (date, hour, weekday)
+        filters: rovnosť na stĺpcoch datasetu, hodnota môže byť aj zoznam
+        start_date / end_date: rozsah dní (vrátane), prerezáva partície
+        limit: max počet vrátených riadkov
+
+    Raises:
+        ValueError pri neplatnom dotaze
+    """
+    _require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    if dataset not in DATASET_COLUMNS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    columns = DATASET_COLUMNS[dataset]
+    group_by = group_by or []
+    filters = filters or {}
+    limit = max(1, min(limit, ANALYTICS_QUERY_MAX_ROWS))
+
+    for column in group_by:
+        if column not in columns and column not in DERIVED_COLUMNS:
+            raise ValueError(f"Unknown group_by column: {column}")
+    for column in filters:
+        if column not in columns:
+            raise ValueError(f"Unknown filter column: {column}")
+
+    aggregations = []
+    for metric in metrics or ["count"]:
+        name, _, column = metric.partition(":")
+        if name not in AGGREGATES:
+            raise ValueError(f"Unknown metric: {metric}")
+        if name == "count" and not column:
+            column = "id"
+        if column not in columns:
+            raise ValueError(f"Unknown metric column: {metric}")
+        aggregations.append((metric, column, AGGREGATES[name]))
+
+    path = os.path.join(base_dir or ANALYTICS_EXPORT_DIR, dataset)
+    if not os.path.isdir(path):
+        return {"dataset": dataset, "rows": [], "row_count": 0, "scanned_rows": 0}
+
+    data = ds.dataset(
+        path,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+        exclude_invalid_files=True,
+    )
+
+    # Filter pushdown (partition pruning podľa date + predikáty na stĺpcoch)
+    expr = None
+    if start_date:
+        expr = ds.field("date") >= start_date.isoformat()
+    if end_date:
+        cond = ds.field("date") <= end_date.isoformat()
+        expr = cond if expr is None else expr & cond
+    for column, value in filters.items():
+        cond = ds.field(column).isin(value) if isinstance(value, list) else ds.field(column) == value
+        expr = cond if expr is None else expr & cond
+
+    needed = {column for _, column, _ in aggregations} | {c for c in group_by if c in columns}
+    time_column = DATASET_TIME_COLUMN[dataset]
+    if any(c in ("hour", "weekday") for c in group_by):
+        needed.add(time_column)
+    if "date" in group_by:
+        needed.add("date")
+    table = data.to_table(columns=sorted(needed), filter=expr)
+
+    if "hour" in group_by:
+        table = table.append_column("hour", pc.hour(table[time_column]))
+    if "weekday" in group_by:
+        # 0 = Sunday (rovnako ako SQL dow v analytics service)
+        table = table.append_column("weekday", pc.day_of_week(table[time_column], count_from_zero=True, week_start=7))
+
+    if group_by:
+        result = table.group_by(group_by).aggregate([(column, fn) for _, column, fn in aggregations])
+        rename = {f"{column}_{fn}": metric for metric, column, fn in aggregations}
+        rows = [
+            {rename.get(key, key): value for key, value in row.items()}
+            for row in result.to_pylist()
+        ]
+        rows.sort(key=lambda r: tuple((r[c] is None, r[c]) for c in group_by))
+    else:
+        row = {}
+        for metric, column, fn in aggregations:
+            if fn == "count":
+                row[metric] = pc.count(table[column]).as_py()
+            elif fn == "count_distinct":
+                row[metric] = pc.count_distinct(table[column]).as_py()
+            else:
+                row[metric] = getattr(pc, fn)(table[column]).as_py()
+        rows = [row]
+
+    return {
+        "dataset": dataset,
+        "rows": rows[:limit],
+        "row_count": len(rows),
+        "scanned_rows": table.num_rows,
+    }
+
+
+async def run_columnar_export_worker(interval: int = ANALYTICS_EXPORT_INTERVAL_SECONDS) -> None:
+    """Background loop: export uzavretých dní do Parquet"""
+    if not PYARROW_AVAILABLE:
+        logger.info("Columnar export disabled (pyarrow not installed)")
+        return
+    while True:
+        try:
+            await asyncio.to_thread(export_pending_days)
+        except Exception as e:
+            logger.warning(f"Columnar export error: {e}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,252 @@
+"""
+Stĺpcový batch firiem pre ILUMINATI SYSTEM
+NumPy polia (risk score, krajina, právna forma, status, dátum založenia, ...)
+a vektorizované risk skóre, histogramy a fasety pre veľké batch screeningy
+a reporty.
+
+Pravidlá skóre zodpovedajú calculate_sk/pl/hu_risk_score - tie ostávajú
+pre jednotlivé firmy, tento modul pre batch (tisíce až milióny riadkov).
+Bez NumPy volajúci ostávajú na pôvodných per-dict cestách.
+"""
+
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Pod touto veľkosťou je réžia konverzie väčšia ako zisk
+VECTORIZE_MIN_ROWS = int(os.getenv("VECTORIZE_MIN_ROWS", "200"))
+
+# Kódy 0-3 sú registrové krajiny, ďalšie krajiny dostanú kódy v poradí výskytu
+COUNTRIES = ("SK", "CZ", "PL", "HU")
+
+# Status triedy
+STATUS_ACTIVE = 0
+STATUS_DISSOLVED = 1
+STATUS_INSOLVENT = 2
+
+# Kľúčové slová statusu per krajina (ako v calculate_*_risk_score)
+STATUS_KEYWORDS = {
+    "SK": {STATUS_INSOLVENT: ("likvidácia", "konkurz"), STATUS_DISSOLVED: ("zrušená",)},
+    "PL": {STATUS_INSOLVENT: ("likwidacja", "upadłość"), STATUS_DISSOLVED: ("zawieszona",)},
+    "HU": {STATUS_INSOLVENT: ("felszámolás", "csődeljárás"), STATUS_DISSOLVED: ("megszűnt",)},
+}
+# Krajiny s registrovým skóre - ostatné si ponechajú vstupné risk_score
+SCORED_COUNTRIES = tuple(STATUS_KEYWORDS)
+
+# Chýbajúci dátum založenia
+NO_DATE = -(2**31)
+
+
+def classify_status(status: Optional[str], country: str) -> int:
+    """Trieda statusu podľa kľúčových slov krajiny"""
+    keywords = STATUS_KEYWORDS.get(country)
+    if not keywords or not status:
+        return STATUS_ACTIVE
+    status = status.lower()
+    for status_class in (STATUS_INSOLVENT, STATUS_DISSOLVED):
+        if any(keyword in status for keyword in keywords[status_class]):
+            return status_class
+    return STATUS_ACTIVE
+
+
+def _founded_day(founded: Any) -> int:
+    """Dátum založenia ako ordinal (dni), NO_DATE ak chýba/je neplatný"""
+    if not founded or not isinstance(founded, str):
+        return NO_DATE
+    try:
+        # fromisoformat je rádovo rýchlejší, strptime ako záloha pre "2020-1-5"
+        return date.fromisoformat(founded).toordinal()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(founded, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return NO_DATE
+
+
+def _is_virtual_seat(address: Any) -> bool:
+    return isinstance(address, str) and ("virtual" in address.lower() or "52" in address)
+
+
+class Categories:
+    """Kódovanie kategórií (napr. právna forma) na int kódy"""
+
+    def __init__(self, initial: Sequence[str] = ()):
+        self.labels: List[str] = list(initial)
+        self._codes: Dict[str, int] = {label: i for i, label in enumerate(self.labels)}
+
+    def code(self, label: Optional[str]) -> int:
+        label = label or "Unknown"
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class CompanyBatch:
+    """
+    Stĺpcový batch firiem. Každý atribút je NumPy pole dĺžky len(batch).
+
+    Atribúty:
+        identifiers: zoznam identifikátorov (Python list, len pre výstup)
+        risk_score: float32 - vstupné skóre (0 ak chýba)
+        country: int16 - kód do country_labels (prvé sú COUNTRIES)
+        legal_form: int32 - kód do legal_form_labels
+        status: uint8 - STATUS_ACTIVE / STATUS_DISSOLVED / STATUS_INSOLVENT
+        executives: int32 - počet konateľov
+        founded_day: int32 - ordinal dátumu založenia (NO_DATE ak chýba)
+        virtual_seat: bool - virtuálne sídlo (adresa)
+    """
+
+    def __init__(
+        self,
+        identifiers: List[str],
+        risk_score,
+        country,
+        country_labels: List[str],
+        legal_form,
+        legal_form_labels: List[str],
+        status,
+        executives,
+        founded_day,
+        virtual_seat,
+    ):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy nie je nainštalovaný. Nainštalujte: pip install numpy")
+        self.identifiers = identifiers
+        self.risk_score = np.asarray(risk_score, dtype=np.float32)
+        self.country = np.asarray(country, dtype=np.int16)
+        self.country_labels = country_labels
+        self.legal_form = np.asarray(legal_form, dtype=np.int32)
+        self.legal_form_labels = legal_form_labels
+        self.status = np.asarray(status, dtype=np.uint8)
+        self.executives = np.asarray(executives, dtype=np.int32)
+        self.founded_day = np.asarray(founded_day, dtype=np.int32)
+        self.virtual_seat = np.asarray(virtual_seat, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.risk_score)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "CompanyBatch":
+        """
+        Vytvorí batch z dictov firiem (jeden prechod). Podporuje aj batch export
+        tvar {"company_data": {...}, "risk_score": ...}.
+        """
+        countries = Categories(COUNTRIES)
+        legal_forms = Categories()
+        columns: Dict[str, list] = {
+            "identifiers": [], "risk_score": [], "country": [], "legal_form": [],
+            "status": [], "executives": [], "founded_day": [], "virtual_seat": [],
+        }
+        for record in records:
+            data = record.get("company_data") or record
+            country = str(data.get("country") or record.get("country") or "Unknown").upper()
+            executives = data.get("executives") or []
+            columns["identifiers"].append(str(data.get("identifier") or data.get("ico") or ""))
+            columns["risk_score"].append(float(record.get("risk_score", data.get("risk_score")) or 0))
+            columns["country"].append(countries.code(country))
+            columns["legal_form"].append(legal_forms.code(data.get("legal_form")))
+            columns["status"].append(classify_status(data.get("status"), country))
+            columns["executives"].append(len(executives) if isinstance(executives, (list, tuple)) else 0)
+            columns["founded_day"].append(_founded_day(data.get("founded")))
+            columns["virtual_seat"].append(country == "SK" and _is_virtual_seat(data.get("address")))
+        return cls(country_labels=countries.labels, legal_form_labels=legal_forms.labels, **columns)
+
+
+def score_batch(batch: CompanyBatch, today: Optional[date] = None):
+    """
+    Vektorizované registrové risk skóre (0-10) pre SK/PL/HU. Firmy
+    z ostatných krajín si ponechajú vstupné risk_score.
+    """
+    today_day = (today or date.today()).toordinal()
+
+    score = np.select(
+        [batch.status == STATUS_INSOLVENT, batch.status == STATUS_DISSOLVED], [7, 5], default=0
+    ).astype(np.int16)
+    score += np.select([batch.executives > 10, batch.executives > 5], [6, 3], default=0).astype(np.int16)
+    score += np.where(batch.virtual_seat, 3, 0).astype(np.int16)
+    # Vek < 1 rok (days / 365 < 1)
+    has_date = batch.founded_day != NO_DATE
+    young = has_date & ((today_day - batch.founded_day.astype(np.int64)) < 365)
+    score += np.where(young, 2, 0).astype(np.int16)
+    np.minimum(score, 10, out=score)
+
+    scored = np.isin(batch.country, [COUNTRIES.index(country) for country in SCORED_COUNTRIES])
+    return np.where(scored, score.astype(np.float32), batch.risk_score)
+
+
+def risk_histogram(scores) -> List[int]:
+    """Počet firiem pre každé celé skóre 0-10"""
+    buckets = np.clip(np.floor(scores), 0, 10).astype(np.int64)
+    return np.bincount(buckets, minlength=11).tolist()
+
+
+def category_counts(codes, labels: Sequence[str]) -> Dict[str, int]:
+    """Fasety: kódy kategórie -> {label: počet} (len nenulové)"""
+    counts = np.bincount(codes, minlength=len(labels))
+    return {labels[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+
+def country_counts(batch: CompanyBatch) -> Dict[str, int]:
+    return category_counts(batch.country, batch.country_labels)
+
+
+def summary_statistics(batch: CompanyBatch, scores=None) -> Dict:
+    """Súhrnné štatistiky (tvar ako PDFExportService._calculate_summary_statistics)"""
+    scores = batch.risk_score if scores is None else scores
+    total = len(batch)
+    high = int(np.count_nonzero(scores > 7))
+    medium = int(np.count_nonzero((scores > 4) & (scores <= 7)))
+    low = total - high - medium
+    return {
+        "total_companies": total,
+        "average_risk_score": round(float(scores.mean(dtype=np.float64)), 2),
+        "high_risk_companies": high,
+        "medium_risk_companies": medium,
+        "low_risk_companies": low,
+        "countries": country_counts(batch),
+        "legal_forms": category_counts(batch.legal_form, batch.legal_form_labels),
+        "risk_distribution": {
+            "high": round(high / total * 100, 1),
+            "medium": round(medium / total * 100, 1),
+            "low": round(low / total * 100, 1),
+        },
+    }
+
+
+def risk_levels(scores) -> List[str]:
+    """High (>= 8) / Medium (>= 5) / Low Risk"""
+    levels = np.array(["Low Risk", "Medium Risk", "High Risk"])
+    return levels[np.digitize(scores, [5, 8])].tolist()
+
+
+def screen_companies(records: List[Dict], today: Optional[date] = None) -> Dict:
+    """
+    Batch risk screening - registrové skóre, histogram a súhrn pre zoznam firiem.
+    """
+    batch = CompanyBatch.from_records(records)
+    if not len(batch):
+        return {"total_companies": 0, "scores": [], "histogram": [0] * 11, "summary": {}}
+    scores = score_batch(batch, today)
+    return {
+        "total_companies": len(batch),
+        "scores": [
+            {"identifier": identifier, "risk_score": float(score), "risk_level": level}
+            for identifier, score, level in zip(batch.identifiers, scores.tolist(), risk_levels(scores))
+        ],
+        "histogram": risk_histogram(scores),
+        "summary": summary_statistics(batch, scores),
+    }
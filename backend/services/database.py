@@ -3,23 +3,37 @@ PostgreSQL databázový servis pre ILUMINATI SYSTEM
 Ukladá históriu vyhľadávaní, cache a analytics
 """
 
+import json
 import os
+import zlib
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import (
     JSON,
     Column,
     DateTime,
     Float,
+    ForeignKey,
+    Index,
     Integer,
+    LargeBinary,
     String,
     Text,
+    UniqueConstraint,
     create_engine,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
 
 # Database URL (môže byť z env alebo default)
 # Na macOS s Homebrew sa používa aktuálny používateľ, nie postgres
@@ -28,9 +42,64 @@ _default_user = os.getenv("USER", os.getenv("USERNAME", "postgres"))
 # DEFAULT TO SQLITE FOR LOCAL DEV IF NO ENV VAR
 # DATABASE_URL = os.getenv("DATABASE_URL", f"postgresql://{_default_user}@localhost:5432/iluminati_db")
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+# false = schému spravuje len alembic, štart workeru nerobí create_all (reflexia všetkých tabuliek)
+DB_CREATE_ALL = os.getenv("DB_CREATE_ALL", "true").lower() == "true"
 
 Base = declarative_base()
 
+# Prvý bajt komprimovaného payloadu určuje kodek
+_CODEC_ZLIB = b"\x01"
+_CODEC_ZSTD = b"\x02"
+
+
+def encode_payload(value: Any) -> bytes:
+    """JSON -> komprimované bajty (zstd, bez zstandard balíka zlib)"""
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if ZSTD_AVAILABLE:
+        return _CODEC_ZSTD + zstandard.ZstdCompressor(level=3).compress(raw)
+    return _CODEC_ZLIB + zlib.compress(raw, 6)
+
+
+def decode_payload(blob: Any) -> Any:
+    """Opak encode_payload; nekomprimovaný JSON (str/bajty) sa prečíta priamo"""
+    if blob is None:
+        return None
+    if isinstance(blob, str):
+        return json.loads(blob)
+    blob = bytes(blob)
+    codec, body = blob[:1], blob[1:]
+    if codec == _CODEC_ZLIB:
+        return json.loads(zlib.decompress(body))
+    if codec == _CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Payload je komprimovaný zstd, chýba balík zstandard")
+        return json.loads(zstandard.ZstdDecompressor().decompress(body))
+    return json.loads(blob)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSONB na PostgreSQL (TOAST kompresia), inde komprimovaný JSON v BLOB"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import JSONB
+
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return encode_payload(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return decode_payload(value)
+
 
 # Database Models
 class SearchHistory(Base):
@@ -43,7 +112,8 @@ class SearchHistory(Base):
     country = Column(String(2), index=True)  # SK, CZ, PL, HU
     result_count = Column(Integer, default=0)
     risk_score = Column(Float)
-    search_timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Partičný kľúč na PostgreSQL (mesačné partície, services.retention)
+    search_timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
     user_ip = Column(String(45))  # IPv6 support
     response_data = Column(JSON)  # Full response for analytics
 
@@ -62,19 +132,32 @@ class SearchHistory(Base):
 
 
 class CompanyCache(Base):
-    """Cache pre firmy (dlhodobé uloženie) - Hybridný model"""
+    """
+    Cache pre firmy (dlhodobé uloženie)
+
+    Kľúč je (country, identifier) - rovnaké číslice CZ a SK IČO sú dve firmy.
+    Celé dáta firmy sú v jednom komprimovanom payloade, často filtrované
+    polia (názov, stav, adresa, ...) sú vytiahnuté do typových stĺpcov.
+    """
 
     __tablename__ = "company_cache"
+    __table_args__ = (
+        UniqueConstraint("country", "identifier", name="uq_company_cache_country_identifier"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    identifier = Column(
-        String(100), unique=True, nullable=False, index=True
-    )  # IČO, KRS, etc.
+    id = Column(Integer, primary_key=True)
     country = Column(String(2), nullable=False, index=True)
+    identifier = Column(String(100), nullable=False, index=True)  # IČO, KRS, etc.
     company_name = Column(String(500))
-    data = Column(JSON, nullable=False)  # Full company data (legacy)
-    company_data = Column(JSON)  # Normalized company data (12-poľový formát)
+    status = Column(String(100))
+    legal_form = Column(String(255))
+    address = Column(Text)
+    postal_code = Column(String(10))
+    city = Column(String(255))
     risk_score = Column(Float)
+    source = Column(String(50))
+    data_quality = Column(String(20))
+    payload = Column(CompressedJSON, nullable=False)  # Normalizované dáta firmy
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_synced_at = Column(DateTime, default=datetime.utcnow, index=True)  # Posledná synchronizácia
@@ -86,6 +169,7 @@ class CompanyCache(Base):
             "identifier": self.identifier,
             "country": self.country,
             "company_name": self.company_name,
+            "status": self.status,
             "risk_score": self.risk_score,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
@@ -93,11 +177,60 @@ class CompanyCache(Base):
         }
 
 
+def _text_field(value: Any, limit: int) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, dict):
+        value = value.get("raw") or " ".join(str(v) for v in value.values() if v)
+    return str(value)[:limit]
+
+
+def company_cache_fields(payload: Dict) -> Dict:
+    """Typové stĺpce CompanyCache vytiahnuté z payloadu firmy"""
+    payload = payload or {}
+    quality = payload.get("data_quality")
+    return {
+        "company_name": _text_field(payload.get("name") or payload.get("label"), 500),
+        "status": _text_field(payload.get("status"), 100),
+        "legal_form": _text_field(payload.get("legal_form"), 255),
+        "address": _text_field(payload.get("address"), 2000),
+        "postal_code": _text_field(payload.get("postal_code"), 10),
+        "city": _text_field(payload.get("city"), 255),
+        "risk_score": payload.get("risk_score"),
+        "source": _text_field(payload.get("source"), 50),
+        "data_quality": _text_field(getattr(quality, "value", quality), 20),
+    }
+
+
+def upsert_company_cache(session, identifier: str, country: str, payload: Dict, **columns) -> CompanyCache:
+    """
+    Vloží alebo aktualizuje riadok (country, identifier) v otvorenej session.
+    Explicitné columns (napr. risk_score, expires_at) majú prednosť pred payloadom.
+    """
+    values = {**company_cache_fields(payload), **columns}
+    company = (
+        session.query(CompanyCache)
+        .filter(CompanyCache.country == country, CompanyCache.identifier == identifier)
+        .first()
+    )
+    if company is None:
+        company = CompanyCache(country=country, identifier=identifier)
+        session.add(company)
+    company.payload = payload
+    for name, value in values.items():
+        setattr(company, name, value)
+    company.last_synced_at = datetime.utcnow()
+    company.updated_at = datetime.utcnow()
+    return company
+
+
 class GraphNode(Base):
     """Uzol grafu (Firma, Osoba, Adresa)"""
     __tablename__ = "graph_nodes"
 
-    id = Column(String(50), primary_key=True)  # custom ID: country_ico OR pers_country_hash
+    # Celočíselný surrogate kľúč pre joiny hrán; verejná identita uzla ostáva id
+    key = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(64), unique=True, nullable=False)  # custom ID: country_ico OR pers_country_hash
     label = Column(String(500))
     type = Column(String(50), index=True)  # company, person, address
     country = Column(String(2), index=True)
@@ -107,13 +240,25 @@ class GraphNode(Base):
 
 
 class GraphEdge(Base):
-    """Hrana grafu (Vzťah)"""
+    """
+    Hrana grafu (Vzťah)
+
+    (source, type, target) je unikátne - unikátny index zároveň pokrýva
+    expanziu smerom von (source -> ciele), reverzný index (target, type, source)
+    expanziu smerom dnu (osoba -> firmy) bez čítania riadkov tabuľky.
+    """
     __tablename__ = "graph_edges"
+    __table_args__ = (
+        UniqueConstraint("source", "type", "target", name="uq_graph_edges_source_type_target"),
+        Index("ix_graph_edges_target_type_source", "target", "type", "source"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    source = Column(String(50), index=True)
-    target = Column(String(50), index=True)
-    type = Column(String(50), index=True)  # OWNED_BY, MANAGED_BY
+    source = Column(String(64), nullable=False)
+    target = Column(String(64), nullable=False)
+    type = Column(String(50), nullable=False)  # OWNED_BY, MANAGED_BY
+    source_key = Column(Integer, ForeignKey("graph_nodes.key", ondelete="CASCADE"))
+    target_key = Column(Integer, ForeignKey("graph_nodes.key", ondelete="CASCADE"))
     weight = Column(Float, default=1.0)
     details = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -128,7 +273,7 @@ class Analytics(Base):
     id = Column(Integer, primary_key=True, index=True)
     event_type = Column(String(50), nullable=False, index=True)  # search, export, error
     event_data = Column(JSON)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)  # Partičný kľúč
     user_ip = Column(String(45))
     user_agent = Column(Text)
 
@@ -194,12 +339,20 @@ def init_database():
 
         # Import ERP models to ensure tables are created
         try:
-            from services.erp.models import ErpConnection, ErpSyncLog  # noqa: F401
+            from services.erp.models import ErpConnection, ErpSupplier, ErpSyncLog  # noqa: F401
         except ImportError:
             pass  # ERP models not available yet
 
+        try:
+            from services.metering import ApiUsageRollup  # noqa: F401
+            from services.analytics_rollup import SearchRollup  # noqa: F401
+            from services.export_jobs import ExportJob  # noqa: F401
+        except ImportError:
+            pass
+
         # Vytvoriť tabuľky
-        Base.metadata.create_all(bind=engine)
+        if DB_CREATE_ALL:
+            Base.metadata.create_all(bind=engine)
         _initialized = True
         print(f"✅ Databáza inicializovaná (URL: {DATABASE_URL})")
         return True
@@ -314,7 +467,11 @@ def save_company_cache(
     risk_score: Optional[float] = None,
     expires_hours: int = 24,
 ) -> bool:
-    """Uloží firmu do cache"""
+    """
+    Uloží firmu z vyhľadávania do cache.
+    Existujúci riadok (napr. plný payload z ORSR/RPO) sa neprepisuje -
+    doplní sa len názov, risk score a expirácia.
+    """
     if not _initialized:
         return False
 
@@ -326,34 +483,28 @@ def save_company_cache(
                 return False
 
             expires_at = datetime.utcnow() + timedelta(hours=expires_hours)
-
-            # Skúsiť nájsť existujúcu
-            existing = (
+            company = (
                 session.query(CompanyCache)
-                .filter(
-                    CompanyCache.identifier == identifier,
-                    CompanyCache.country == country,
-                )
+                .filter(CompanyCache.country == country, CompanyCache.identifier == identifier)
                 .first()
             )
+            if company is not None and company.payload:
+                company.company_name = company_name or company.company_name
+                if risk_score is not None:
+                    company.risk_score = risk_score
+                company.expires_at = expires_at
+                company.updated_at = datetime.utcnow()
+                return True
 
-            if existing:
-                existing.company_name = company_name
-                existing.data = data
-                existing.risk_score = risk_score
-                existing.updated_at = datetime.utcnow()
-                existing.expires_at = expires_at
-            else:
-                cache = CompanyCache(
-                    identifier=identifier,
-                    country=country,
-                    company_name=company_name,
-                    data=data,
-                    risk_score=risk_score,
-                    expires_at=expires_at,
-                )
-                session.add(cache)
-
+            upsert_company_cache(
+                session,
+                identifier,
+                country,
+                data,
+                company_name=company_name,
+                risk_score=risk_score,
+                expires_at=expires_at,
+            )
             return True
     except Exception as e:
         print(f"⚠️ Chyba pri ukladaní cache: {e}")
@@ -373,15 +524,15 @@ def get_company_cache(identifier: str, country: str) -> Optional[Dict]:
             cache = (
                 session.query(CompanyCache)
                 .filter(
-                    CompanyCache.identifier == identifier,
                     CompanyCache.country == country,
+                    CompanyCache.identifier == identifier,
                     CompanyCache.expires_at > datetime.utcnow(),
                 )
                 .first()
             )
 
             if cache:
-                return cache.data
+                return cache.payload
             return None
     except Exception as e:
         print(f"⚠️ Chyba pri načítaní cache: {e}")
@@ -5,12 +5,12 @@ Kontrola dlhov voči daňovým úradom
 
 import requests
 from typing import Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
 
-# Cache pre dlhové registry
-_debt_cache = {}
-_cache_ttl = timedelta(hours=12)  # Kratší TTL pre dlhy (častejšie sa menia)
+from services.provider_cache import MISS, provider_cache
+
+_CACHE_PROVIDER = "debt"
 
 
 def search_debt_registers(identifier: str, country: str) -> Optional[Dict]:
@@ -28,12 +28,10 @@ def search_debt_registers(identifier: str, country: str) -> Optional[Dict]:
         return None
     
     # Kontrola cache
-    cache_key = f"debt_{country}_{identifier}"
-    if cache_key in _debt_cache:
-        cached_data, cached_time = _debt_cache[cache_key]
-        if datetime.now() - cached_time < _cache_ttl:
-            print(f"✅ Cache hit pre dlhové registry {country} {identifier}")
-            return cached_data
+    cached_data = provider_cache.get(_CACHE_PROVIDER, f"{country}_{identifier}")
+    if cached_data is not MISS:
+        print(f"✅ Cache hit pre dlhové registry {country} {identifier}")
+        return cached_data
     
     try:
         if country == "SK":
@@ -99,7 +97,7 @@ def _search_sk_debt(ico: str) -> Optional[Dict]:
             "risk_score": 8 if has_debt else 0
         }
         
-        _debt_cache[f"debt_SK_{ico}"] = (result, datetime.now())
+        provider_cache.set(_CACHE_PROVIDER, f"SK_{ico}", result)
         return result
         
     except Exception as e:
@@ -161,7 +159,7 @@ def _search_cz_debt(ico: str) -> Optional[Dict]:
             "risk_score": 8 if has_debt else 0
         }
         
-        _debt_cache[f"debt_CZ_{ico}"] = (result, datetime.now())
+        provider_cache.set(_CACHE_PROVIDER, f"CZ_{ico}", result)
         return result
         
     except Exception as e:
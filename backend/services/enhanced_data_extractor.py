@@ -4,32 +4,58 @@ Multi-layer caching strategy with cross-border register integration
 """
 
 import asyncio
+import base64
+import bisect
 import logging
 import hashlib
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple, Union, Any
+from dataclasses import dataclass, asdict, fields
 from enum import Enum
-from functools import lru_cache
+from functools import lru_cache, partial
 
 import aiohttp
 from bs4 import BeautifulSoup
 from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, insert
 
 from services.cache import get_cache_key, set_cache, get_cache
-from services.database import get_db_session, CompanyCache
+from services.company_batch import (
+    NUMPY_AVAILABLE,
+    VECTORIZE_MIN_ROWS,
+    CompanyBatch,
+    category_counts,
+    country_counts,
+)
+from services.database import get_db_session, CompanyCache, upsert_company_cache
 from services.export_service import export_to_excel
 from services.sk_orsr_provider import get_orsr_provider
 from services.hu_nav import get_nav_provider
 from services.pl_krs import get_krs_provider
 from services.pl_ceidg import get_ceidg_provider
 from services.pl_biala_lista import get_biala_lista_provider
+from services.registry import get_registry_router
 
 logger = logging.getLogger(__name__)
 
+# Legacy providery a SQLAlchemy sú synchrónne - bežia v ohraničenom executore,
+# každá krajina má vlastný limit súbežnosti a deadline
+EXTRACTOR_MAX_WORKERS = int(os.getenv("EXTRACTOR_MAX_WORKERS", "16"))
+EXTRACTOR_PER_COUNTRY_CONCURRENCY = int(os.getenv("EXTRACTOR_PER_COUNTRY_CONCURRENCY", "4"))
+EXTRACTOR_DEFAULT_DEADLINE_SECONDS = float(os.getenv("EXTRACTOR_DEADLINE_SECONDS", "8"))
+
+COUNTRY_STATUS_OK = "ok"
+COUNTRY_STATUS_TIMEOUT = "timeout"
+COUNTRY_STATUS_ERROR = "error"
+
+# Search session - zoradený výsledok sa materializuje raz, stránky sa čítajú kurzorom
+SEARCH_SESSION_TTL = timedelta(minutes=int(os.getenv("SEARCH_SESSION_TTL_MINUTES", "30")))
+# Neúplný výsledok (timeout krajiny) žije krátko, aby ďalšie hľadanie skúsilo register znova
+SEARCH_PARTIAL_SESSION_TTL = timedelta(seconds=int(os.getenv("SEARCH_PARTIAL_SESSION_TTL_SECONDS", "60")))
+
 class CountryCode(str, Enum):
     SK = "SK"
     CZ = "CZ"
@@ -75,6 +101,57 @@ class EnhancedCompanyData:
     related_companies: List[str]
     country_specific_data: Dict[str, Any]
 
+# Session ukladá firmy kompaktne ako riadky (bez opakovania kľúčov)
+SESSION_FIELDS = [f.name for f in fields(EnhancedCompanyData)]
+_RISK_INDEX = SESSION_FIELDS.index("risk_score")
+_QUALITY_INDEX = SESSION_FIELDS.index("data_quality")
+_COUNTRY_INDEX = SESSION_FIELDS.index("country")
+_IDENTIFIER_INDEX = SESSION_FIELDS.index("identifier")
+_QUALITY_RANK = {quality.value: rank for rank, quality in enumerate(DataQuality)}
+
+
+def _company_row(company: EnhancedCompanyData) -> List[Any]:
+    data = asdict(company)
+    return [value.value if isinstance(value, Enum) else value for value in (data[f] for f in SESSION_FIELDS)]
+
+
+def _row_sort_key(row: List[Any]) -> Tuple:
+    """Úplné poradie: riziko zostupne, kvalita, krajina, IČO (keyset)"""
+    return (
+        -float(row[_RISK_INDEX] or 0.0),
+        _QUALITY_RANK.get(row[_QUALITY_INDEX], len(_QUALITY_RANK)),
+        row[_COUNTRY_INDEX] or "",
+        row[_IDENTIFIER_INDEX] or "",
+    )
+
+
+def encode_search_cursor(payload: Dict[str, Any]) -> str:
+    """Nepriehľadný kurzor (base64url JSON)"""
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, dict) or not {"q", "c", "k", "p"} <= payload.keys():
+            raise ValueError("missing fields")
+        payload["k"] = tuple(payload["k"])
+        return payload
+    except Exception as e:
+        raise ValueError(f"Invalid search cursor: {e}") from e
+
+
+def _resume_position(rows: List[List[Any]], position: int, last_key: Tuple) -> int:
+    """
+    Pozícia za posledným videným riadkom. Rýchla cesta cez pozíciu v kurzore,
+    po re-materializácii session sa hľadá podľa keysetu (bisect).
+    """
+    if 0 < position <= len(rows) and _row_sort_key(rows[position - 1]) == last_key:
+        return position
+    return bisect.bisect_right(rows, last_key, key=_row_sort_key)
+
 @dataclass
 class RelationshipData:
     source_id: str
@@ -109,6 +186,25 @@ class EnhancedDataExtractor:
             CountryCode.PL: None,  # Will be initialized on demand
             CountryCode.HU: None,  # Will be initialized on demand
         }
+        
+        # Deadline per krajina (env EXTRACTOR_DEADLINE_SK=5 ...)
+        self.country_deadlines = {
+            country: float(os.getenv(f"EXTRACTOR_DEADLINE_{country.value}", EXTRACTOR_DEFAULT_DEADLINE_SECONDS))
+            for country in CountryCode
+        }
+        self._executor = ThreadPoolExecutor(
+            max_workers=EXTRACTOR_MAX_WORKERS, thread_name_prefix="extractor"
+        )
+        self._country_limits: Dict[CountryCode, asyncio.Semaphore] = {}
+    
+    async def _run_blocking(self, country: CountryCode, func: Callable, *args) -> Any:
+        """Spustí synchrónne volanie v executore (limit súbežnosti per krajina)"""
+        semaphore = self._country_limits.get(country)
+        if semaphore is None:
+            semaphore = self._country_limits[country] = asyncio.Semaphore(EXTRACTOR_PER_COUNTRY_CONCURRENCY)
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(func, *args))
 
     def _get_stable_cache_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate a stable MD5 cache key instead of using non-deterministic hash()."""
@@ -135,22 +231,36 @@ class EnhancedDataExtractor:
         include_related: bool = True,
         risk_threshold: Optional[float] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Enhanced search across multiple countries with intelligent caching.
         
+        Prvé volanie materializuje zoradený výsledok (search session) do cache,
+        ďalšie stránky sa čítajú cez kurzor v O(veľkosť stránky).
+        
         Args:
             query: Search query (company name or identifier)
             countries: List of countries to search in
             include_related: Include related companies in results
             risk_threshold: Filter by minimum risk score
             limit: Maximum number of results
-            offset: Pagination offset
+            offset: Pagination offset (ignoruje sa pri kurzore)
+            cursor: next_cursor z predchádzajúcej stránky (nesie aj parametre hľadania)
             
         Returns:
             Dict with search results and metadata
+        
+        Raises:
+            ValueError: neplatný kurzor
         """
+        last_key = None
+        if cursor:
+            cursor_data = decode_search_cursor(cursor)
+            query, countries, risk_threshold = cursor_data["q"], cursor_data["c"], cursor_data.get("r")
+            last_key, offset = cursor_data["k"], cursor_data["p"]
+        
         if not countries:
             countries = [CountryCode.SK, CountryCode.CZ, CountryCode.PL, CountryCode.HU]
         
@@ -168,71 +278,127 @@ class EnhancedDataExtractor:
 
         logger.info(f"Searching for '{query}' in countries: {[c.value for c in countries]}")
         
-        cache_key = self._get_stable_cache_key("search_combined", query, countries, limit, offset, risk_threshold)
-        
-        # Search result cache check
-        try:
-            cached_search = get_cache(cache_key)
-            if cached_search:
-                logger.info(f"Global cache hit for search: {query}")
-                return cached_search
-        except Exception as e:
-            logger.warning(f"Combined cache lookup failed: {e}")
-
-        # 1. Parallel search by country
-        tasks = []
-        for country in countries:
-            tasks.append(self._search_by_country(query, country))
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Flatten and filter results
-        all_companies = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Search failed for {countries[i].value if i < len(countries) else 'unknown'}: {result}")
-                continue
-            if result:
-                all_companies.extend(result)
-        
-        # Apply filters
-        if risk_threshold is not None:
-            all_companies = [c for c in all_companies if c.risk_score >= risk_threshold]
-        
-        # Sort by risk score and data quality
-        all_companies.sort(key=lambda x: (x.risk_score, x.data_quality.value), reverse=True)
+        session, cache_hit = await self._get_search_session(query, countries, risk_threshold)
+        rows = session["rows"]
+        total = len(rows)
         
         # Apply pagination
-        total = len(all_companies)
-        paginated_companies = all_companies[offset:offset + limit]
+        position = max(int(offset or 0), 0)
+        if last_key is not None:
+            position = _resume_position(rows, position, last_key)
+        page_rows = rows[position:position + limit]
+        end = position + len(page_rows)
         
-        # Convert to dict for caching
-        companies_dict = [asdict(company) for company in paginated_companies]
+        next_cursor = None
+        if page_rows and end < total:
+            next_cursor = encode_search_cursor({
+                "q": query,
+                "c": [c.value for c in countries],
+                "r": risk_threshold,
+                "k": list(_row_sort_key(page_rows[-1])),
+                "p": end,
+            })
         
         # Create result with metadata
         result = {
-            "companies": companies_dict,
+            "companies": [dict(zip(session["fields"], row)) for row in page_rows],
             "total": total,
-            "facets": self._calculate_facets(all_companies),
-            "suggestions": self._generate_suggestions(query, all_companies),
+            "next_cursor": next_cursor,
+            "facets": session["facets"],
+            "suggestions": session["suggestions"],
             "execution_time": datetime.now().isoformat(),
-            "cache_hit": False,
+            "cache_hit": cache_hit,
+            "partial": session["partial"],
+            "country_status": session["country_status"],
             "search_params": {
                 "query": query,
                 "countries": [c.value for c in countries],
                 "include_related": include_related,
                 "risk_threshold": risk_threshold,
                 "limit": limit,
-                "offset": offset
+                "offset": position
             }
         }
         
-        # Cache result
-        set_cache(cache_key, result, ttl=self.cache_ttls['warm'])
-        
-        logger.info(f"Search completed: {len(paginated_companies)} results from {total} total")
+        logger.info(f"Search completed: {len(page_rows)} results from {total} total")
         return result
     
+    async def _get_search_session(
+        self, query: str, countries: List[CountryCode], risk_threshold: Optional[float]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Vráti (session, cache_hit). Session obsahuje zoradené riadky, fasety
+        a návrhy - počítajú sa raz pre celé hľadanie, nie pre každú stránku.
+        """
+        session_key = self._get_stable_cache_key("search_session", query, countries, risk_threshold)
+        try:
+            session = get_cache(session_key)
+            if session:
+                logger.info(f"Search session hit: {query}")
+                return session, True
+        except Exception as e:
+            logger.warning(f"Search session lookup failed: {e}")
+
+        # 1. Parallel search by country - každá krajina má vlastný deadline,
+        # celková latencia ~ najpomalšia krajina
+        results = await asyncio.gather(
+            *(self._search_country_with_deadline(query, country) for country in countries)
+        )
+        
+        # Flatten results, status per krajina
+        all_companies = []
+        country_status = {}
+        for country, (companies, country_info) in zip(countries, results):
+            country_status[country.value] = country_info
+            all_companies.extend(companies)
+        partial_result = any(info["status"] != COUNTRY_STATUS_OK for info in country_status.values())
+        
+        # Apply filters
+        if risk_threshold is not None:
+            all_companies = [c for c in all_companies if c.risk_score >= risk_threshold]
+        
+        rows = sorted((_company_row(company) for company in all_companies), key=_row_sort_key)
+        session = {
+            "fields": SESSION_FIELDS,
+            "rows": rows,
+            "facets": self._calculate_facets(all_companies),
+            "suggestions": self._generate_suggestions(query, all_companies),
+            "partial": partial_result,
+            "country_status": country_status,
+            "created_at": datetime.now().isoformat(),
+        }
+        
+        # Neúplný výsledok (výpadok registra) len krátko
+        ttl = SEARCH_PARTIAL_SESSION_TTL if partial_result else SEARCH_SESSION_TTL
+        try:
+            set_cache(session_key, session, ttl=ttl)
+        except Exception as e:
+            logger.warning(f"Failed to store search session: {e}")
+        return session, False
+    
+    async def _search_country_with_deadline(
+        self, query: str, country: CountryCode
+    ) -> Tuple[List[EnhancedCompanyData], Dict[str, Any]]:
+        """
+        Vyhľadanie v krajine s deadlinom. Po timeoute sa vráti prázdny výsledok
+        so statusom (blokujúce volanie v executore dobehne na pozadí).
+        """
+        deadline = self.country_deadlines.get(country, EXTRACTOR_DEFAULT_DEADLINE_SECONDS)
+        started = time.perf_counter()
+        companies: List[EnhancedCompanyData] = []
+        info: Dict[str, Any] = {"status": COUNTRY_STATUS_OK}
+        try:
+            companies = await asyncio.wait_for(self._search_by_country(query, country), timeout=deadline) or []
+        except asyncio.TimeoutError:
+            logger.warning(f"Search deadline ({deadline}s) exceeded for {country.value}: {query}")
+            info = {"status": COUNTRY_STATUS_TIMEOUT, "deadline_seconds": deadline}
+        except Exception as e:
+            logger.error(f"Search failed for {country.value}: {e}")
+            info = {"status": COUNTRY_STATUS_ERROR, "error": str(e)[:200]}
+        info["count"] = len(companies)
+        info["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return companies, info
+    
     async def _search_by_country(self, query: str, country: CountryCode) -> List[EnhancedCompanyData]:
         """Search companies in specific country."""
         # Ensure country is a CountryCode enum
@@ -301,8 +467,8 @@ class EnhancedDataExtractor:
                 logger.warning(f"ORSR cache lookup failed: {e}")
             
             provider = self.providers[CountryCode.SK]
-            # provider.lookup_by_ico is NOT async, don't await it
-            result = provider.lookup_by_ico(query)
+            # provider.lookup_by_ico je synchrónny - beží v executore
+            result = await self._run_blocking(CountryCode.SK, provider.lookup_by_ico, query)
             
             if result:
                 company = EnhancedCompanyData(
@@ -331,7 +497,7 @@ class EnhancedDataExtractor:
                     country_specific_data=result
                 )
                 # save to database and cache
-                set_cache(cache_key, asdict(company), ttl=self.cache_ttls['cold'])
+                set_cache(cache_key, [asdict(company)], ttl=self.cache_ttls['cold'])
                 # _save_to_database is async, so we keep the await there
                 await self._save_to_database([company])
                 return [company]
@@ -341,12 +507,18 @@ class EnhancedDataExtractor:
             return []
     
     async def _scrape_ares(self, query: str) -> List[EnhancedCompanyData]:
-        """Enhanced ARES scraping."""
+        """ARES cez registry router - IČO lookupom, názov vyhľadávaním"""
         try:
-            # This would integrate with existing ARES provider
-            # For now, return empty list as placeholder
-            logger.info(f"ARES scraping for: {query}")
-            return []
+            router = get_registry_router()
+            if query.isdigit():
+                record = await router.lookup(query, CountryCode.CZ.value)
+                records = [record] if record else []
+            else:
+                records = await self._run_blocking(CountryCode.CZ, router.search, query, CountryCode.CZ.value)
+            return [
+                self._convert_to_enhanced_company(record.to_dict(), CountryCode.CZ, record.source)
+                for record in records
+            ]
         except Exception as e:
             logger.error(f"ARES scraping failed: {e}")
             return []
@@ -354,24 +526,23 @@ class EnhancedDataExtractor:
     async def _scrape_poland(self, query: str) -> List[EnhancedCompanyData]:
         """Enhanced Poland scraping (KRS + CEIDG + Biała Lista)."""
         try:
-            companies = []
-            
-            # Try KRS first
-            krs_provider = get_krs_provider()
-            fetch_krs = krs_provider.get("fetch_function")
-            if fetch_krs:
-                krs_result = fetch_krs(query) # Synchronous
-                if krs_result:
-                    companies.append(self._convert_to_enhanced_company(krs_result, CountryCode.PL, "KRS"))
-            
-            # Try CEIDG
-            ceidg_provider = get_ceidg_provider()
-            fetch_ceidg = ceidg_provider.get("fetch_function")
-            if fetch_ceidg:
-                ceidg_result = fetch_ceidg(query) # Synchronous
-                if ceidg_result:
-                    companies.append(self._convert_to_enhanced_company(ceidg_result, CountryCode.PL, "CEIDG"))
+            # KRS a CEIDG paralelne (synchrónne fetch funkcie v executore)
+            sources = [
+                ("KRS", get_krs_provider().get("fetch_function")),
+                ("CEIDG", get_ceidg_provider().get("fetch_function")),
+            ]
+            sources = [(name, fetch) for name, fetch in sources if fetch]
+            results = await asyncio.gather(
+                *(self._run_blocking(CountryCode.PL, fetch, query) for _, fetch in sources),
+                return_exceptions=True
+            )
             
+            companies = []
+            for (source, _), result in zip(sources, results):
+                if isinstance(result, Exception):
+                    logger.error(f"{source} lookup failed: {result}")
+                elif result:
+                    companies.append(self._convert_to_enhanced_company(result, CountryCode.PL, source))
             return companies
         except Exception as e:
             logger.error(f"Poland scraping failed: {e}")
@@ -383,7 +554,7 @@ class EnhancedDataExtractor:
             provider = get_nav_provider()
             fetch_nav = provider.get("fetch_function")
             if fetch_nav:
-                result = fetch_nav(query) # Synchronous
+                result = await self._run_blocking(CountryCode.HU, fetch_nav, query)
                 if result:
                     company = self._convert_to_enhanced_company(result, CountryCode.HU, "NAV")
                     return [company]
@@ -421,7 +592,10 @@ class EnhancedDataExtractor:
         )
     
     async def _search_in_database(self, query: str, country: CountryCode) -> List[EnhancedCompanyData]:
-        """Search companies in database."""
+        """Search companies in database (synchrónny dotaz v executore)."""
+        return await self._run_blocking(country, self._search_in_database_sync, query, country)
+    
+    def _search_in_database_sync(self, query: str, country: CountryCode) -> List[EnhancedCompanyData]:
         try:
             # get_db_session is synchronous, so use it with a standard 'with' block
             with get_db_session() as db:
@@ -442,14 +616,9 @@ class EnhancedDataExtractor:
                 
                 companies = []
                 for row in result:
-                    if row.company_data:
+                    if row.payload:
                         try:
-                            # Reconstruct dictionary from JSON column if needed, but anddict handles it
-                            company_data = row.company_data
-                            if isinstance(company_data, str):
-                                company_data = json.loads(company_data)
-                            
-                            company = EnhancedCompanyData(**company_data)
+                            company = EnhancedCompanyData(**row.payload)
                             companies.append(company)
                         except Exception as e:
                             logger.error(f"Error parsing company data from DB for {row.identifier}: {e}")
@@ -460,38 +629,19 @@ class EnhancedDataExtractor:
             return []
     
     async def _save_to_database(self, companies: List[EnhancedCompanyData]):
-        """Save companies to database with enhanced metadata."""
+        """Save companies to database with enhanced metadata (v executore)."""
+        if not companies:
+            return
+        await self._run_blocking(companies[0].country, self._save_to_database_sync, companies)
+    
+    def _save_to_database_sync(self, companies: List[EnhancedCompanyData]):
         try:
             with get_db_session() as db:
                 if not db:
                     return
                     
                 for company in companies:
-                    # Check if company already exists
-                    existing_company = db.query(CompanyCache).filter(
-                        (CompanyCache.identifier == company.identifier) &
-                        (CompanyCache.country == company.country.value)
-                    ).first()
-                    
-                    if existing_company:
-                        # Update existing
-                        existing_company.company_data = asdict(company)
-                        existing_company.data_quality = company.data_quality.value
-                        existing_company.last_synced_at = datetime.utcnow()
-                        existing_company.source = company.source
-                        existing_company.company_name = company.name
-                    else:
-                        # Create new
-                        new_company = CompanyCache(
-                            identifier=company.identifier,
-                            country=company.country.value,
-                            company_data=asdict(company),
-                            company_name=company.name,
-                            data_quality=company.data_quality.value,
-                            last_synced_at=datetime.utcnow(),
-                            source=company.source
-                        )
-                        db.add(new_company)
+                    upsert_company_cache(db, company.identifier, company.country.value, asdict(company))
                 
                 db.commit()
                 logger.info(f"Saved {len(companies)} companies to database")
@@ -515,6 +665,9 @@ class EnhancedDataExtractor:
         if not companies:
             return facets
         
+        if NUMPY_AVAILABLE and len(companies) >= VECTORIZE_MIN_ROWS:
+            return self._calculate_facets_vectorized(companies, facets)
+        
         # Country facets
         for company in companies:
             country = company.country.value
@@ -539,6 +692,24 @@ class EnhancedDataExtractor:
         
         return facets
     
+    def _calculate_facets_vectorized(self, companies: List[EnhancedCompanyData], facets: Dict[str, Any]) -> Dict[str, Any]:
+        """Fasety cez stĺpcový batch (bincount namiesto dict počítadiel)"""
+        batch = CompanyBatch.from_records(
+            {"country": c.country.value, "legal_form": c.legal_form, "risk_score": c.risk_score}
+            for c in companies
+        )
+        facets["countries"] = country_counts(batch)
+        facets["legal_forms"] = category_counts(batch.legal_form, batch.legal_form_labels)
+        facets["risk_scores"] = {
+            "min": float(batch.risk_score.min()),
+            "max": float(batch.risk_score.max()),
+            "avg": round(float(batch.risk_score.mean(dtype="float64")), 2),
+        }
+        qualities = [quality.value for quality in DataQuality]
+        quality_codes = [qualities.index(c.data_quality.value) for c in companies]
+        facets["data_quality"] = category_counts(quality_codes, qualities)
+        return facets
+    
     def _generate_suggestions(self, query: str, companies: List[EnhancedCompanyData]) -> List[str]:
         """Generate search suggestions based on results."""
         suggestions = set()
@@ -572,45 +743,41 @@ class EnhancedDataExtractor:
             logger.warning(f"Failed to get from cache: {e}")
         
         # Try database
+        company = await self._run_blocking(country, self._get_company_from_database, identifier, country)
+        if company:
+            set_cache(cache_key, asdict(company), ttl=self.cache_ttls['warm'])
+            return company
+        
+        # Live lookup - registry router (rovnaká cesta ako /api/search)
+        try:
+            record = await get_registry_router().lookup(identifier, country.value)
+            if record and not record.fallback:
+                company = self._convert_to_enhanced_company(record.to_dict(), country, record.source)
+                # Update cache and DB
+                set_cache(cache_key, asdict(company), ttl=self.cache_ttls['cold'])
+                await self._save_to_database([company])
+                return company
+        except Exception as e:
+            logger.error(f"Live lookup ({country.value}) failed: {e}")
+
+        return None
+    
+    def _get_company_from_database(self, identifier: str, country: CountryCode) -> Optional[EnhancedCompanyData]:
         try:
             with get_db_session() as db:
                 if db:
                     company_row = db.query(CompanyCache).filter(
-                        (CompanyCache.identifier == identifier) &
-                        (CompanyCache.country == country.value)
+                        (CompanyCache.country == country.value) &
+                        (CompanyCache.identifier == identifier)
                     ).first()
                     
-                    if company_row and company_row.company_data:
+                    if company_row and company_row.payload:
                         try:
-                            # Parse JSON if it's a string
-                            company_data = company_row.company_data
-                            if isinstance(company_data, str):
-                                company_data = json.loads(company_data)
-                                
-                            company = EnhancedCompanyData(**company_data)
-                            # Update cache in background
-                            set_cache(cache_key, asdict(company), ttl=self.cache_ttls['warm'])
-                            return company
+                            return EnhancedCompanyData(**company_row.payload)
                         except Exception as e:
                             logger.error(f"Error parsing cached company data: {e}")
         except Exception as e:
             logger.error(f"Database lookup failed: {e}")
-        
-        # Live lookup - providers are currently synchronous
-        if country == CountryCode.SK:
-            try:
-                provider = self.providers[CountryCode.SK]
-                # provider.lookup_by_ico is synchronous
-                result = provider.lookup_by_ico(identifier)
-                if result:
-                    company = self._convert_to_enhanced_company(result, country, "ORSR")
-                    # Update cache and DB
-                    set_cache(cache_key, asdict(company), ttl=self.cache_ttls['cold'])
-                    await self._save_to_database([company])
-                    return company
-            except Exception as e:
-                logger.error(f"Live lookup (SK) failed: {e}")
-        
         return None
     
     async def get_related_companies(self, company_id: str, max_depth: int = 2) -> List[EnhancedCompanyData]:
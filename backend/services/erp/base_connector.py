@@ -3,7 +3,11 @@ Base class pre ERP connectors
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Entity synchronizované cez stránkovanie (poradie = poradie synchronizácie)
+SYNC_ENTITIES = ("suppliers", "invoices", "payments")
 
 
 class BaseErpConnector(ABC):
@@ -82,6 +86,45 @@ class BaseErpConnector(ABC):
         """
         pass
 
+    def fetch_page(
+        self,
+        entity: str,
+        modified_since: Optional[datetime],
+        offset: int,
+        page_size: int,
+    ) -> List[Dict]:
+        """
+        Jedna stránka normalizovaných záznamov entity (suppliers, invoices, payments).
+        Na rozdiel od get_* metód chybu API vyhodí - sync nesmie posunúť
+        watermark po neúplnom stiahnutí.
+
+        Args:
+            entity: Jedna zo SYNC_ENTITIES
+            modified_since: Len záznamy zmenené od (None = všetky)
+            offset: Počet preskočených záznamov
+            page_size: Veľkosť stránky
+
+        Returns:
+            List[Dict] s external_id a poľami entity
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} nepodporuje stránkovaný sync")
+
+    def iter_pages(
+        self,
+        entity: str,
+        modified_since: Optional[datetime] = None,
+        page_size: int = 500,
+    ) -> Iterator[List[Dict]]:
+        """Stránky záznamov entity až po poslednú (neúplnú) stránku"""
+        offset = 0
+        while True:
+            page = self.fetch_page(entity, modified_since, offset, page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
     def validate_connection_data(self) -> bool:
         """
         Validuje connection data
@@ -23,9 +23,11 @@ class ErpService:
         else:
             raise ValueError(f"Unknown ERP type: {erp_type}")
 
+import os
 from datetime import datetime, timedelta
 from typing import Dict, List
 
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from .models import ErpConnection, ErpConnectionStatus, ErpSyncLog, ErpType
@@ -33,6 +35,35 @@ from .money_s3_connector import MoneyS3Connector
 from .pohoda_connector import PohodaConnector
 from .sap_connector import SapConnector
 
+# Lease synchronizácie - po páde workeru ho po tomto čase môže prevziať ďalší sync
+ERP_SYNC_LEASE_SECONDS = int(os.getenv("ERP_SYNC_LEASE_SECONDS", "3600"))
+
+
+def claim_sync_lease(db: Session, connection_id: int, now: datetime) -> bool:
+    """
+    Atomicky zoberie lease synchronizácie (podmienený UPDATE).
+    Status pripojenia ostáva v rukách používateľa (activate/deactivate).
+    """
+    stale = now - timedelta(seconds=ERP_SYNC_LEASE_SECONDS)
+    claimed = (
+        db.query(ErpConnection)
+        .filter(
+            ErpConnection.id == connection_id,
+            or_(ErpConnection.sync_started_at.is_(None), ErpConnection.sync_started_at < stale),
+        )
+        .update({ErpConnection.sync_started_at: now}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def release_sync_lease(db: Session, connection_id: int, started_at: datetime) -> None:
+    """Uvoľní lease - len vlastný (po expirácii ho mohol prevziať iný sync)"""
+    db.query(ErpConnection).filter(
+        ErpConnection.id == connection_id, ErpConnection.sync_started_at == started_at
+    ).update({ErpConnection.sync_started_at: None}, synchronize_session=False)
+    db.commit()
+
 
 def get_connector(erp_type: ErpType, connection_data: Dict):
     """Vytvorí správny connector podľa typu ERP"""
@@ -168,28 +199,31 @@ def sync_erp_data(
     if connection.status != ErpConnectionStatus.ACTIVE:
         return {"success": False, "message": "Connection is not active"}
 
+    started_at = datetime.utcnow()
+    if not claim_sync_lease(db, connection_id, started_at):
+        return {"success": False, "message": "Sync already running"}
+
     # Vytvoriť sync log
     sync_log = ErpSyncLog(
         connection_id=connection_id,
         sync_type=sync_type,
         status="running",
-        started_at=datetime.utcnow(),
+        started_at=started_at,
     )
     db.add(sync_log)
     db.commit()
 
     try:
-        connector = ErpService.get_connector(connection.erp_type, connection.connection_data)
+        from .sync import run_erp_sync
 
-        # Synchronizovať dodávateľov
-        suppliers = connector.get_suppliers(limit=1000)
-        records_synced = len(suppliers)
-        records_failed = 0
+        connector = ErpService.get_connector(connection.erp_type, connection.connection_data)
 
-        # TODO: Uložiť dáta do databázy alebo cache
-        # Pre teraz len logujeme
+        # Dodávatelia, faktúry a platby (watermark, stránkovanie) + risk screening
+        result = run_erp_sync(db, connection, connector, sync_type)
+        records_synced = result["records_synced"]
+        records_failed = result["records_failed"]
 
-        sync_log.status = "success"
+        sync_log.status = "partial" if records_failed else "success"
         sync_log.records_synced = records_synced
         sync_log.records_failed = records_failed
         sync_log.completed_at = datetime.utcnow()
@@ -212,9 +246,12 @@ def sync_erp_data(
             "message": "Sync completed",
             "records_synced": records_synced,
             "records_failed": records_failed,
+            "entities": result["entities"],
+            "risk_screen": result["risk_screen"],
             "sync_log_id": sync_log.id,
         }
     except Exception as e:
+        db.rollback()
         sync_log.status = "error"
         sync_log.error_message = str(e)
         sync_log.completed_at = datetime.utcnow()
@@ -224,6 +261,8 @@ def sync_erp_data(
         db.commit()
 
         return {"success": False, "message": f"Sync failed: {str(e)}", "error": str(e)}
+    finally:
+        release_sync_lease(db, connection_id, started_at)
 
 
 @staticmethod
@@ -277,3 +316,29 @@ def get_erp_sync_logs(
         .limit(limit)
         .all()
     )
+
+
+def get_erp_suppliers(
+    db, connection_id, user_id, risk_level=None, limit=100, offset=0
+) -> List:
+    """Získa synchronizovaných dodávateľov s výsledkom risk screeningu"""
+    from .models import ErpConnection, ErpSupplier
+
+    connection = (
+        db.query(ErpConnection)
+        .filter(ErpConnection.id == connection_id, ErpConnection.user_id == user_id)
+        .first()
+    )
+
+    if not connection:
+        return []
+
+    query = db.query(ErpSupplier).filter(ErpSupplier.connection_id == connection_id)
+    if risk_level:
+        query = query.filter(ErpSupplier.risk_level == risk_level)
+    return (
+        query.order_by(ErpSupplier.risk_score.desc(), ErpSupplier.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
@@ -11,10 +11,12 @@ from sqlalchemy import (
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     String,
     Text,
+    UniqueConstraint,
 )
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import relationship
@@ -36,7 +38,7 @@ class ErpConnectionStatus(str, enum.Enum):
     ACTIVE = "active"
     INACTIVE = "inactive"
     ERROR = "error"
-    SYNCING = "syncing"
+    SYNCING = "syncing"  # nepoužíva sa - bežiaci sync drží lease sync_started_at
 
 
 class ErpConnection(Base):
@@ -62,6 +64,8 @@ class ErpConnection(Base):
     sync_frequency = Column(String(50), default="daily")  # daily, weekly, manual
     last_sync_at = Column(DateTime, nullable=True)
     next_sync_at = Column(DateTime, nullable=True)
+    # Lease bežiacej synchronizácie (claim podmieneným UPDATE, po ERP_SYNC_LEASE_SECONDS expiruje)
+    sync_started_at = Column(DateTime, nullable=True)
 
     # Metadata
     company_name = Column(String(255), nullable=True)  # Názov firmy v ERP
@@ -158,3 +162,96 @@ class ErpSyncLog(Base):
             else None,
             "duration_seconds": self.duration_seconds,
         }
+
+
+class ErpSyncWatermark(Base):
+    """Watermark inkrementálnej synchronizácie per pripojenie a entita"""
+
+    __tablename__ = "erp_sync_watermarks"
+
+    connection_id = Column(Integer, ForeignKey("erp_connections.id"), primary_key=True)
+    entity = Column(String(20), primary_key=True)  # suppliers, invoices, payments
+    synced_until = Column(DateTime, nullable=False)  # začiatok posledného úspešného syncu
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ErpSupplier(Base):
+    """Dodávateľ synchronizovaný z ERP + výsledok risk screeningu"""
+
+    __tablename__ = "erp_suppliers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("erp_connections.id"), nullable=False, index=True)
+    external_id = Column(String(100), nullable=False)  # ID v ERP (fallback IČO)
+    ico = Column(String(20), index=True)
+    name = Column(String(500))
+    address = Column(Text)
+    total_invoices = Column(Integer, default=0)
+    total_amount = Column(Float, default=0)
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Risk screening
+    country = Column(String(2))
+    risk_score = Column(Float, nullable=True)
+    risk_level = Column(String(20), nullable=True)  # Low/Medium/High Risk, unknown
+    screened_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("connection_id", "external_id", name="uq_erp_supplier"),
+    )
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "external_id": self.external_id,
+            "ico": self.ico,
+            "name": self.name,
+            "address": self.address,
+            "total_invoices": self.total_invoices,
+            "total_amount": self.total_amount,
+            "country": self.country,
+            "risk_score": self.risk_score,
+            "risk_level": self.risk_level,
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            "screened_at": self.screened_at.isoformat() if self.screened_at else None,
+        }
+
+
+class ErpInvoice(Base):
+    """Faktúra dodávateľa synchronizovaná z ERP"""
+
+    __tablename__ = "erp_invoices"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("erp_connections.id"), nullable=False, index=True)
+    external_id = Column(String(100), nullable=False)
+    supplier_ico = Column(String(20), index=True)
+    invoice_number = Column(String(100))
+    amount = Column(Float, default=0)
+    due_date = Column(String(30))  # dátumy v tvare z ERP (ISO)
+    paid_date = Column(String(30))
+    status = Column(String(50))
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("connection_id", "external_id", name="uq_erp_invoice"),
+    )
+
+
+class ErpPayment(Base):
+    """Platba dodávateľovi synchronizovaná z ERP"""
+
+    __tablename__ = "erp_payments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    connection_id = Column(Integer, ForeignKey("erp_connections.id"), nullable=False, index=True)
+    external_id = Column(String(100), nullable=False)
+    supplier_ico = Column(String(20), index=True)
+    invoice_number = Column(String(100))
+    amount = Column(Float, default=0)
+    paid_date = Column(String(30))
+    synced_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("connection_id", "external_id", name="uq_erp_payment"),
+    )
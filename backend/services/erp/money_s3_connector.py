@@ -14,6 +14,13 @@ from .base_connector import BaseErpConnector
 class MoneyS3Connector(BaseErpConnector):
     """Connector pre Money S3 ERP systém"""
 
+    # entita -> (endpoint, kľúč zoznamu v odpovedi)
+    SYNC_ENDPOINTS = {
+        "suppliers": ("/api/v1/dodavatele", "dodavatele"),
+        "invoices": ("/api/v1/faktury", "faktury"),
+        "payments": ("/api/v1/platby", "platby"),
+    }
+
     def __init__(self, connection_data: Dict):
         super().__init__(connection_data)
         self.api_key = connection_data.get("api_key")
@@ -81,24 +88,64 @@ class MoneyS3Connector(BaseErpConnector):
                 data = response.json()
                 suppliers = data.get("dodavatele", [])
 
-                result = []
-                for supplier in suppliers:
-                    result.append(
-                        {
-                            "ico": supplier.get("ico", ""),
-                            "name": supplier.get("nazev", ""),
-                            "address": supplier.get("adresa", ""),
-                            "total_invoices": supplier.get("pocet_faktur", 0),
-                            "total_amount": supplier.get("celkova_castka", 0),
-                        }
-                    )
-
-                return result
+                return [self._map_supplier(supplier) for supplier in suppliers]
             else:
                 return []
         except requests.exceptions.RequestException:
             return []
 
+    @staticmethod
+    def _map_supplier(supplier: Dict) -> Dict:
+        return {
+            "external_id": str(supplier.get("id") or supplier.get("ico", "")),
+            "ico": supplier.get("ico", ""),
+            "name": supplier.get("nazev", ""),
+            "address": supplier.get("adresa", ""),
+            "total_invoices": supplier.get("pocet_faktur", 0),
+            "total_amount": supplier.get("celkova_castka", 0),
+        }
+
+    @staticmethod
+    def _map_invoice(invoice: Dict) -> Dict:
+        return {
+            "external_id": str(invoice.get("id") or invoice.get("cislo", "")),
+            "supplier_ico": invoice.get("ico", ""),
+            "invoice_number": invoice.get("cislo", ""),
+            "amount": invoice.get("castka", 0),
+            "due_date": invoice.get("datum_splatnosti", ""),
+            "paid_date": invoice.get("datum_uhrady"),
+            "status": invoice.get("stav", ""),
+        }
+
+    @staticmethod
+    def _map_payment(payment: Dict) -> Dict:
+        return {
+            "external_id": str(payment.get("id", "")),
+            "supplier_ico": payment.get("ico", ""),
+            "invoice_number": payment.get("cislo_faktury", ""),
+            "amount": payment.get("castka", 0),
+            "paid_date": payment.get("datum"),
+        }
+
+    def fetch_page(
+        self,
+        entity: str,
+        modified_since: Optional[datetime],
+        offset: int,
+        page_size: int,
+    ) -> List[Dict]:
+        """Stránka dodávateľov / faktúr / platieb (limit + offset, zmeneno_od)"""
+        endpoint, key = self.SYNC_ENDPOINTS[entity]
+        params = {"limit": page_size, "offset": offset}
+        if modified_since:
+            params["zmeneno_od"] = modified_since.strftime("%Y-%m-%dT%H:%M:%S")
+        response = requests.get(
+            f"{self.base_url}{endpoint}", headers=self.headers, params=params, timeout=30
+        )
+        response.raise_for_status()
+        mapper = {"suppliers": self._map_supplier, "invoices": self._map_invoice, "payments": self._map_payment}[entity]
+        return [mapper(record) for record in response.json().get(key, [])]
+
     def get_supplier_payment_history(
         self, supplier_ico: str, days: int = 365
     ) -> List[Dict]:
@@ -14,6 +14,12 @@ from .base_connector import BaseErpConnector
 class PohodaConnector(BaseErpConnector):
     """Connector pre Pohoda ERP systém"""
 
+    SYNC_ENDPOINTS = {
+        "suppliers": "/api/v1/suppliers",
+        "invoices": "/api/v1/invoices",
+        "payments": "/api/v1/payments",
+    }
+
     def __init__(self, connection_data: Dict):
         super().__init__(connection_data)
         self.api_key = connection_data.get("api_key")
@@ -84,24 +90,66 @@ class PohodaConnector(BaseErpConnector):
                 data = response.json()
                 suppliers = data.get("data", [])
 
-                result = []
-                for supplier in suppliers:
-                    result.append(
-                        {
-                            "ico": supplier.get("ico", ""),
-                            "name": supplier.get("name", ""),
-                            "address": supplier.get("address", ""),
-                            "total_invoices": supplier.get("invoice_count", 0),
-                            "total_amount": supplier.get("total_amount", 0),
-                        }
-                    )
-
-                return result
+                return [self._map_supplier(supplier) for supplier in suppliers]
             else:
                 return []
         except requests.exceptions.RequestException:
             return []
 
+    @staticmethod
+    def _map_supplier(supplier: Dict) -> Dict:
+        return {
+            "external_id": str(supplier.get("id") or supplier.get("ico", "")),
+            "ico": supplier.get("ico", ""),
+            "name": supplier.get("name", ""),
+            "address": supplier.get("address", ""),
+            "total_invoices": supplier.get("invoice_count", 0),
+            "total_amount": supplier.get("total_amount", 0),
+        }
+
+    @staticmethod
+    def _map_invoice(invoice: Dict) -> Dict:
+        return {
+            "external_id": str(invoice.get("id") or invoice.get("number", "")),
+            "supplier_ico": invoice.get("supplier_ico", ""),
+            "invoice_number": invoice.get("number", ""),
+            "amount": invoice.get("amount", 0),
+            "due_date": invoice.get("due_date", ""),
+            "paid_date": invoice.get("paid_date"),
+            "status": invoice.get("status", ""),
+        }
+
+    @staticmethod
+    def _map_payment(payment: Dict) -> Dict:
+        return {
+            "external_id": str(payment.get("id", "")),
+            "supplier_ico": payment.get("supplier_ico", ""),
+            "invoice_number": payment.get("invoice_number", ""),
+            "amount": payment.get("amount", 0),
+            "paid_date": payment.get("date") or payment.get("paid_date"),
+        }
+
+    def fetch_page(
+        self,
+        entity: str,
+        modified_since: Optional[datetime],
+        offset: int,
+        page_size: int,
+    ) -> List[Dict]:
+        """Stránka dodávateľov / faktúr / platieb (limit + offset, modified_since)"""
+        params = {"limit": page_size, "offset": offset}
+        if modified_since:
+            params["modified_since"] = modified_since.isoformat()
+        response = requests.get(
+            f"{self.base_url}{self.SYNC_ENDPOINTS[entity]}",
+            headers=self.headers,
+            params=params,
+            timeout=30,
+        )
+        response.raise_for_status()
+        mapper = {"suppliers": self._map_supplier, "invoices": self._map_invoice, "payments": self._map_payment}[entity]
+        return [mapper(record) for record in response.json().get("data", [])]
+
     def get_supplier_payment_history(
         self, supplier_ico: str, days: int = 365
     ) -> List[Dict]:
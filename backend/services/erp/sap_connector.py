@@ -14,6 +14,13 @@ from .base_connector import BaseErpConnector
 class SapConnector(BaseErpConnector):
     """Connector pre SAP ERP systém"""
 
+    # entita -> (OData kolekcia, základný filter)
+    SYNC_ENDPOINTS = {
+        "suppliers": ("BusinessPartners", "CardType eq 'S'"),  # S = Supplier
+        "invoices": ("PurchaseInvoices", None),
+        "payments": ("VendorPayments", None),
+    }
+
     def __init__(self, connection_data: Dict):
         super().__init__(connection_data)
         self.server_url = connection_data.get("server_url")
@@ -119,24 +126,70 @@ class SapConnector(BaseErpConnector):
                 data = response.json()
                 suppliers = data.get("value", [])
 
-                result = []
-                for supplier in suppliers:
-                    result.append(
-                        {
-                            "ico": supplier.get("TaxIdNum", ""),
-                            "name": supplier.get("CardName", ""),
-                            "address": supplier.get("Address", ""),
-                            "total_invoices": 0,  # SAP neposkytuje priamo
-                            "total_amount": 0,
-                        }
-                    )
-
-                return result
+                return [self._map_supplier(supplier) for supplier in suppliers]
             else:
                 return []
         except requests.exceptions.RequestException:
             return []
 
+    @staticmethod
+    def _map_supplier(supplier: Dict) -> Dict:
+        return {
+            "external_id": str(supplier.get("CardCode") or supplier.get("TaxIdNum", "")),
+            "ico": supplier.get("TaxIdNum", ""),
+            "name": supplier.get("CardName", ""),
+            "address": supplier.get("Address", ""),
+            "total_invoices": 0,  # SAP neposkytuje priamo
+            "total_amount": 0,
+        }
+
+    @staticmethod
+    def _map_invoice(invoice: Dict) -> Dict:
+        return {
+            "external_id": str(invoice.get("DocEntry") or invoice.get("DocNum", "")),
+            "supplier_ico": invoice.get("TaxIdNum", ""),
+            "invoice_number": str(invoice.get("DocNum", "")),
+            "amount": invoice.get("DocTotal", 0),
+            "due_date": invoice.get("DocDueDate", ""),
+            "paid_date": invoice.get("PaidToDate"),
+            "status": "paid" if invoice.get("PaidToDate") else "unpaid",
+        }
+
+    @staticmethod
+    def _map_payment(payment: Dict) -> Dict:
+        return {
+            "external_id": str(payment.get("DocEntry", "")),
+            "supplier_ico": payment.get("TaxIdNum", ""),
+            "invoice_number": str(payment.get("DocNum", "")),
+            "amount": payment.get("TransferSum") or payment.get("CashSum") or 0,
+            "paid_date": payment.get("DocDate"),
+        }
+
+    def fetch_page(
+        self,
+        entity: str,
+        modified_since: Optional[datetime],
+        offset: int,
+        page_size: int,
+    ) -> List[Dict]:
+        """Stránka OData kolekcie ($top/$skip, UpdateDate filter)"""
+        # Session cookie z loginu platí pre všetky stránky
+        if offset == 0 and not self._authenticate():
+            raise ConnectionError("SAP authentication failed")
+
+        collection, base_filter = self.SYNC_ENDPOINTS[entity]
+        filters = [base_filter] if base_filter else []
+        if modified_since:
+            filters.append(f"UpdateDate ge '{modified_since.strftime('%Y-%m-%d')}'")
+        params = {"$top": page_size, "$skip": offset, "$orderby": "DocEntry" if entity != "suppliers" else "CardCode"}
+        if filters:
+            params["$filter"] = " and ".join(filters)
+
+        response = self.session.get(f"{self.base_url}/{collection}", params=params, timeout=30)
+        response.raise_for_status()
+        mapper = {"suppliers": self._map_supplier, "invoices": self._map_invoice, "payments": self._map_payment}[entity]
+        return [mapper(record) for record in response.json().get("value", [])]
+
     def get_supplier_payment_history(
         self, supplier_ico: str, days: int = 365
     ) -> List[Dict]:
@@ -0,0 +1,288 @@
+"""
+ERP sync pipeline
+Inkrementálna synchronizácia dodávateľov, faktúr a platieb z ERP a hromadný
+risk screening dodávateľov.
+
+- watermark per pripojenie a entita (erp_sync_watermarks): incremental sync
+  sťahuje len záznamy zmenené od posledného úspešného syncu
+- stránkovanie cez connector.fetch_page namiesto pevného limitu
+- bulk upsert po stránkach: jeden SELECT existujúcich external_id na stránku,
+  bulk insert/update mapovania
+- risk screening všetkých IČO dodávateľov voči company_cache po dávkach
+  (bez volaní registrov per dodávateľ)
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from services.database import CompanyCache
+
+from .base_connector import SYNC_ENTITIES, BaseErpConnector
+from .models import ErpConnection, ErpInvoice, ErpPayment, ErpSupplier, ErpSyncWatermark
+
+logger = logging.getLogger(__name__)
+
+# Konfigurácia
+ERP_SYNC_PAGE_SIZE = int(os.getenv("ERP_SYNC_PAGE_SIZE", "500"))
+# Prekryv watermarku (rozdiel hodín ERP a nášho servera, záznamy zmenené počas syncu)
+ERP_SYNC_WATERMARK_OVERLAP_SECONDS = int(os.getenv("ERP_SYNC_WATERMARK_OVERLAP_SECONDS", "300"))
+ERP_SCREEN_BATCH_SIZE = int(os.getenv("ERP_SCREEN_BATCH_SIZE", "1000"))
+# Krajina firmy pripojenia, ak ju connection_data neuvádza (rozhoduje pri IČO v SK aj CZ)
+ERP_DEFAULT_COUNTRY = os.getenv("ERP_DEFAULT_COUNTRY", "SK").upper()
+
+ENTITY_MODELS = {
+    "suppliers": ErpSupplier,
+    "invoices": ErpInvoice,
+    "payments": ErpPayment,
+}
+
+RISK_UNKNOWN = "unknown"
+
+# Stĺpce, ktoré sync z ERP neprepisuje (kľúče, výsledok risk screeningu)
+_NON_ERP_COLUMNS = frozenset({
+    "id", "connection_id", "external_id", "synced_at",
+    "country", "risk_score", "risk_level", "screened_at",
+})
+
+
+def _upsert_columns(model) -> frozenset:
+    return frozenset(model.__table__.columns.keys()) - _NON_ERP_COLUMNS
+
+
+def bulk_upsert(
+    db: Session,
+    model,
+    connection_id: int,
+    records: List[Dict],
+    now: datetime,
+) -> Tuple[int, int, int]:
+    """
+    Upsert stránky záznamov podľa (connection_id, external_id).
+
+    Returns:
+        (inserted, updated, failed) - failed = záznamy bez external_id
+    """
+    columns = _upsert_columns(model)
+    by_external_id: Dict[str, Dict] = {}
+    failed = 0
+    for record in records:
+        external_id = str(record.get("external_id") or "").strip()
+        if not external_id:
+            failed += 1
+            continue
+        row = {key: value for key, value in record.items() if key in columns}
+        row.update(connection_id=connection_id, external_id=external_id, synced_at=now)
+        by_external_id[external_id] = row  # duplicita v stránke: posledný vyhráva
+
+    if not by_external_id:
+        return 0, 0, failed
+
+    existing = dict(
+        db.query(model.external_id, model.id).filter(
+            model.connection_id == connection_id,
+            model.external_id.in_(by_external_id.keys()),
+        )
+    )
+    inserts, updates = [], []
+    for external_id, row in by_external_id.items():
+        if external_id in existing:
+            updates.append({"id": existing[external_id], **row})
+        else:
+            inserts.append(row)
+    if inserts:
+        db.bulk_insert_mappings(model, inserts)
+    if updates:
+        db.bulk_update_mappings(model, updates)
+    return len(inserts), len(updates), failed
+
+
+def _get_watermark(db: Session, connection_id: int, entity: str) -> Optional[ErpSyncWatermark]:
+    return db.query(ErpSyncWatermark).filter(
+        ErpSyncWatermark.connection_id == connection_id,
+        ErpSyncWatermark.entity == entity,
+    ).first()
+
+
+def sync_entity(
+    db: Session,
+    connection_id: int,
+    connector: BaseErpConnector,
+    entity: str,
+    sync_type: str = "incremental",
+    page_size: int = ERP_SYNC_PAGE_SIZE,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """
+    Stiahne entitu po stránkach a uloží ju. Každá stránka je samostatná
+    transakcia, watermark sa posunie až po poslednej stránke.
+    """
+    now = now or datetime.utcnow()
+    watermark = _get_watermark(db, connection_id, entity)
+    modified_since = None
+    if sync_type == "incremental" and watermark is not None:
+        modified_since = watermark.synced_until - timedelta(seconds=ERP_SYNC_WATERMARK_OVERLAP_SECONDS)
+
+    model = ENTITY_MODELS[entity]
+    stats = {"inserted": 0, "updated": 0, "failed": 0, "pages": 0}
+    for page in connector.iter_pages(entity, modified_since, page_size):
+        inserted, updated, failed = bulk_upsert(db, model, connection_id, page, now)
+        db.commit()
+        stats["inserted"] += inserted
+        stats["updated"] += updated
+        stats["failed"] += failed
+        stats["pages"] += 1
+
+    if watermark is None:
+        db.add(ErpSyncWatermark(connection_id=connection_id, entity=entity, synced_until=now))
+    else:
+        watermark.synced_until = now
+    db.commit()
+    return stats
+
+
+def _risk_level(score: Optional[float]) -> str:
+    """Rovnaké prahy ako company_batch.risk_levels"""
+    if score is None:
+        return RISK_UNKNOWN
+    if score >= 8:
+        return "High Risk"
+    if score >= 5:
+        return "Medium Risk"
+    return "Low Risk"
+
+
+def _registry_scores(cached: List[Tuple[str, str, Dict, Optional[float]]]) -> Dict[str, float]:
+    """
+    Skóre z cache firiem. S NumPy sa SK/PL/HU prepočítajú vektorizovane
+    registrovými pravidlami (rovnako ako /api/risk/batch-screen).
+    """
+    from services import company_batch
+
+    scores = {ico: score for ico, _, _, score in cached if score is not None}
+    if not company_batch.NUMPY_AVAILABLE or not cached:
+        return scores
+    records = [
+        {**(data or {}), "identifier": ico, "country": country, "risk_score": score or 0}
+        for ico, country, data, score in cached
+    ]
+    batch = company_batch.CompanyBatch.from_records(records)
+    vectorized = company_batch.score_batch(batch)
+    scored = set(company_batch.SCORED_COUNTRIES)
+    for (ico, country, _, score), value in zip(cached, vectorized.tolist()):
+        if country in scored or score is not None:
+            scores[ico] = value
+    return scores
+
+
+def connection_home_country(connection_data: Optional[Dict]) -> str:
+    """Domovská krajina ERP pripojenia (connection_data["country"], inak ERP_DEFAULT_COUNTRY)"""
+    return str((connection_data or {}).get("country") or ERP_DEFAULT_COUNTRY).upper()[:2]
+
+
+def _resolve_countries(
+    cached: List[Tuple[str, str, Dict, Optional[float]]], home_country: str
+) -> List[Tuple[str, str, Dict, Optional[float]]]:
+    """
+    Jeden cache záznam na IČO. Rovnaké IČO môže existovať vo viacerých krajinách
+    (company_cache je kľúčovaná (country, identifier)) - prednosť má domovská
+    krajina pripojenia, inak abecedne prvá krajina (deterministicky).
+    """
+    chosen: Dict[str, Tuple[str, str, Dict, Optional[float]]] = {}
+    for row in sorted(cached, key=lambda r: (r[1] != home_country, r[1] or "")):
+        chosen.setdefault(row[0], row)
+    return list(chosen.values())
+
+
+def screen_suppliers(
+    db: Session,
+    connection_id: int,
+    batch_size: int = ERP_SCREEN_BATCH_SIZE,
+    now: Optional[datetime] = None,
+    home_country: Optional[str] = None,
+) -> Dict:
+    """
+    Risk screening všetkých dodávateľov pripojenia voči company_cache.
+    Jeden dotaz do cache na dávku IČO, výsledky sa zapíšu bulk update-om.
+    Dodávatelia, ktorých firma ešte nie je v cache, dostanú risk_level "unknown".
+
+    Args:
+        home_country: Krajina pre IČO nájdené vo viacerých krajinách
+            (predvolene z connection_data pripojenia)
+    """
+    now = now or datetime.utcnow()
+    if home_country is None:
+        home_country = connection_home_country(
+            db.query(ErpConnection.connection_data).filter(ErpConnection.id == connection_id).scalar()
+        )
+    summary = {"screened": 0, "known": 0, "unknown": 0, "levels": {}}
+    suppliers = db.query(ErpSupplier.id, ErpSupplier.ico).filter(
+        ErpSupplier.connection_id == connection_id
+    ).order_by(ErpSupplier.id).all()
+
+    for start in range(0, len(suppliers), batch_size):
+        chunk = suppliers[start:start + batch_size]
+        icos = {ico for _, ico in chunk if ico}
+        cached = [
+            (row.identifier, row.country, row.payload, row.risk_score)
+            for row in db.query(
+                CompanyCache.identifier,
+                CompanyCache.country,
+                CompanyCache.payload,
+                CompanyCache.risk_score,
+            ).filter(CompanyCache.identifier.in_(icos))
+        ] if icos else []
+        cached = _resolve_countries(cached, home_country)
+        countries = {ico: country for ico, country, _, _ in cached}
+        scores = _registry_scores(cached)
+
+        updates = []
+        for supplier_id, ico in chunk:
+            score = scores.get(ico)
+            level = _risk_level(score)
+            updates.append({
+                "id": supplier_id,
+                "country": countries.get(ico),
+                "risk_score": score,
+                "risk_level": level,
+                "screened_at": now,
+            })
+            summary["levels"][level] = summary["levels"].get(level, 0) + 1
+            summary["known" if score is not None else "unknown"] += 1
+        db.bulk_update_mappings(ErpSupplier, updates)
+        db.commit()
+        summary["screened"] += len(chunk)
+    return summary
+
+
+def run_erp_sync(
+    db: Session,
+    connection: ErpConnection,
+    connector: BaseErpConnector,
+    sync_type: str = "incremental",
+    page_size: int = ERP_SYNC_PAGE_SIZE,
+) -> Dict:
+    """
+    Sync všetkých entít pripojenia a risk screening dodávateľov.
+
+    Returns:
+        Dict so štatistikami per entita, records_synced/records_failed a risk_screen
+    """
+    started = datetime.utcnow()
+    entities = {
+        entity: sync_entity(db, connection.id, connector, entity, sync_type, page_size, started)
+        for entity in SYNC_ENTITIES
+    }
+    risk_screen = screen_suppliers(
+        db, connection.id, home_country=connection_home_country(connection.connection_data)
+    )
+    logger.info(f"ERP sync {connection.id} ({sync_type}): {entities}, screen: {risk_screen}")
+    return {
+        "entities": entities,
+        "records_synced": sum(s["inserted"] + s["updated"] for s in entities.values()),
+        "records_failed": sum(s["failed"] for s in entities.values()),
+        "risk_screen": risk_screen,
+    }
@@ -4,6 +4,7 @@ Centralizované error handling pre ILUMINATI SYSTEM
 """
 
 import logging
+import os
 import traceback
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -11,7 +12,8 @@ from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
 import requests
 
-# Setup logging
+# Setup logging (adresár logs/ nie je v gite - vytvorí sa pri štarte)
+os.makedirs('logs', exist_ok=True)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -0,0 +1,464 @@
+"""
+Export Jobs pre ILUMINATI SYSTEM
+Asynchrónne generovanie ťažkých exportov (PDF, Excel, CSV, NDJSON).
+
+- Job sa zadá cez API a hneď vráti job_id (stav + progress v DB)
+- Render beží v process poole (mimo event loopu, limit pamäte per worker)
+- Výsledok sa uloží do EXPORT_JOBS_DIR a po EXPORT_JOB_TTL_HOURS expiruje
+- Rovnaký vstup od toho istého používateľa sa deduplikuje (content hash)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Coroutine, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, and_, or_
+from sqlalchemy.orm import Session
+
+from services.database import Base, get_db_session
+
+logger = logging.getLogger(__name__)
+
+# Konfigurácia
+EXPORT_JOBS_DIR = os.getenv(
+    "EXPORT_JOBS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "export_jobs"),
+)
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "0")) or (os.cpu_count() or 2)
+EXPORT_WORKER_MEMORY_MB = int(os.getenv("EXPORT_WORKER_MEMORY_MB", "1024"))  # 0 = bez limitu
+EXPORT_WORKER_MAX_TASKS = int(os.getenv("EXPORT_WORKER_MAX_TASKS", "50"))
+EXPORT_JOB_TTL_HOURS = int(os.getenv("EXPORT_JOB_TTL_HOURS", "24"))
+EXPORT_JOB_CLEANUP_SECONDS = int(os.getenv("EXPORT_JOB_CLEANUP_SECONDS", "900"))
+# Bežiaci job, ktorého worker spadol, môže po tomto čase prevziať iný worker
+EXPORT_JOB_STALE_SECONDS = int(os.getenv("EXPORT_JOB_STALE_SECONDS", "3600"))
+EXPORT_PROGRESS_EVERY_ROWS = 1000
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# format -> (media type, prípona)
+JOB_FORMATS = {
+    "pdf": ("application/pdf", "pdf"),
+    "excel": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+class ExportJob(Base):
+    """Asynchrónny export job"""
+
+    __tablename__ = "export_jobs"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    format = Column(String(20), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    status = Column(String(20), nullable=False, default=JOB_QUEUED)
+    progress = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    result_size = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_export_jobs_dedup", "user_id", "content_hash"),
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "format": self.format,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "result_size": self.result_size,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
+
+
+def content_hash(user_id: int, format: str, data: Any, options: Dict) -> str:
+    """Hash kanonického JSON vstupu (scope = používateľ, výstup obsahuje jeho metadata)"""
+    canonical = json.dumps(
+        {"user_id": user_id, "format": format, "data": data, "options": options},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _job_path(job_id: str, suffix: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(base_dir or EXPORT_JOBS_DIR, f"{job_id}.{suffix}")
+
+
+def result_path(job: ExportJob, base_dir: Optional[str] = None) -> str:
+    return _job_path(job.id, JOB_FORMATS[job.format][1], base_dir)
+
+
+# --- Render (beží v child procese) ---
+
+
+def _init_worker(memory_limit_mb: int) -> None:
+    """Inicializácia workera - tvrdý limit adresného priestoru"""
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass  # Windows / nepovolené zníženie limitu
+
+
+def _write_progress(progress_path: Optional[str], progress: int) -> None:
+    if not progress_path:
+        return
+    try:
+        with open(progress_path, "w") as f:
+            f.write(str(progress))
+    except OSError:
+        pass
+
+
+def _counted(rows: Iterable[Dict], total: int, progress_path: Optional[str]) -> Iterator[Dict]:
+    """Priebežný progress pre riadkové formáty"""
+    for i, row in enumerate(rows, start=1):
+        if total and i % EXPORT_PROGRESS_EVERY_ROWS == 0:
+            _write_progress(progress_path, 10 + int(85 * i / total))
+        yield row
+
+
+def render_export_bytes(format: str, data: Dict, options: Dict, metadata: Optional[Dict] = None) -> bytes:
+    """Render exportu do bytes (pre synchrónne API, volá sa v process poole)"""
+    if format == "pdf":
+        from services.pdf_export_service import get_pdf_service
+
+        pdf_service = get_pdf_service()
+        if "companies" in data:
+            return pdf_service.generate_executive_summary(
+                companies=data["companies"],
+                metadata=metadata or {},
+                include_risk_analysis=options.get("risk_analysis", True),
+                include_financials=options.get("include_financials", True),
+            )
+        return pdf_service.generate_network_analysis(
+            graph_data=data,
+            insights={"analysis": "Network visualization export"},
+            include_visualization=options.get("include_graph", True),
+        )
+    return b"".join(_render_chunks(format, data, None))
+
+
+def _render_chunks(format: str, data: Dict, progress_path: Optional[str]) -> Iterator[bytes]:
+    from services.export_service import stream_companies, stream_graph_to_excel
+
+    if format == "excel" and "companies" not in data:
+        return stream_graph_to_excel(data)
+    companies = data.get("companies", [])
+    rows = _counted(companies, len(companies), progress_path)
+    return stream_companies(rows, "xlsx" if format == "excel" else format)[0]
+
+
+def render_export(
+    format: str,
+    input_path: str,
+    output_path: str,
+    progress_path: Optional[str] = None,
+) -> int:
+    """
+    Render jobu do súboru (vstup aj výstup cez disk - do procesu sa
+    nepickluje celý payload). Zápis je atomický (tmp + rename).
+
+    Returns:
+        Veľkosť výsledku v bytes
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        job_input = json.load(f)
+    data, options, metadata = job_input["data"], job_input["options"], job_input["metadata"]
+    _write_progress(progress_path, 10)
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        if format == "pdf":
+            out.write(render_export_bytes(format, data, options, metadata))
+        else:
+            for chunk in _render_chunks(format, data, progress_path):
+                out.write(chunk)
+    os.replace(tmp_path, output_path)
+    _write_progress(progress_path, 100)
+    return os.path.getsize(output_path)
+
+
+# --- Process pool ---
+
+_pool: Optional[Executor] = None
+
+
+def get_export_pool() -> Executor:
+    """Process pool (spawn - bezpečné voči vláknam/event loopu rodiča)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=EXPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(EXPORT_WORKER_MEMORY_MB,),
+            max_tasks_per_child=EXPORT_WORKER_MAX_TASKS,
+        )
+    return _pool
+
+
+def shutdown_export_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def render_in_pool(format: str, data: Dict, options: Dict, metadata: Optional[Dict] = None) -> bytes:
+    """Synchrónny export mimo event loopu (request čaká, ostatné nie)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_export_pool(), render_export_bytes, format, data, options, metadata)
+
+
+# --- Job lifecycle ---
+
+
+def submit_export_job(
+    db: Session,
+    user_id: int,
+    format: str,
+    data: Dict,
+    options: Optional[Dict] = None,
+    base_dir: Optional[str] = None,
+) -> Tuple[ExportJob, bool]:
+    """
+    Zadať export job (alebo vrátiť existujúci s rovnakým vstupom).
+
+    Returns:
+        (ExportJob, deduplicated: bool)
+
+    Raises:
+        ValueError: Nepodporovaný formát
+    """
+    if format not in JOB_FORMATS:
+        raise ValueError(f"Nepodporovaný formát exportu: {format}")
+    options = options or {}
+    digest = content_hash(user_id, format, data, options)
+    now = datetime.utcnow()
+
+    existing = (
+        db.query(ExportJob)
+        .filter(
+            ExportJob.user_id == user_id,
+            ExportJob.content_hash == digest,
+            ExportJob.status != JOB_FAILED,
+            ExportJob.expires_at > now,
+        )
+        .order_by(ExportJob.created_at.desc())
+        .first()
+    )
+    if existing is not None:
+        return existing, True
+
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        format=format,
+        content_hash=digest,
+        status=JOB_QUEUED,
+        progress=0,
+        created_at=now,
+        expires_at=now + timedelta(hours=EXPORT_JOB_TTL_HOURS),
+    )
+    os.makedirs(base_dir or EXPORT_JOBS_DIR, exist_ok=True)
+    with open(_job_path(job.id, "input.json", base_dir), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "data": data,
+                "options": options,
+                "metadata": {"user_id": user_id, "export_time": now.isoformat()},
+            },
+            f,
+            ensure_ascii=False,
+            default=str,
+        )
+    db.add(job)
+    db.commit()
+    return job, False
+
+
+# Bežiace asyncio tasky jobov - event loop drží na tasky len slabé referencie
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coro: Coroutine) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _update_job(job_id: str, condition=None, **fields) -> int:
+    with get_db_session() as db:
+        if db is None:
+            return 0
+        query = db.query(ExportJob).filter(ExportJob.id == job_id)
+        if condition is not None:
+            query = query.filter(condition)
+        updated = query.update(fields, synchronize_session=False)
+        db.commit()
+        return updated
+
+
+def _claimable(stale_before: Optional[datetime] = None):
+    """Queued job, prípadne bežiaci job spadnutého workera (started_at < stale_before)"""
+    if stale_before is None:
+        return ExportJob.status == JOB_QUEUED
+    return or_(
+        ExportJob.status == JOB_QUEUED,
+        and_(ExportJob.status == JOB_RUNNING, ExportJob.started_at < stale_before),
+    )
+
+
+def claim_export_job(job_id: str, stale_before: Optional[datetime] = None) -> bool:
+    """Podmienený UPDATE na running - job spustí práve jeden worker"""
+    return _update_job(
+        job_id, _claimable(stale_before), status=JOB_RUNNING, started_at=datetime.utcnow(), progress=5
+    ) == 1
+
+
+async def run_export_job(
+    job_id: str, format: str, base_dir: Optional[str] = None, stale_before: Optional[datetime] = None
+) -> None:
+    """
+    Spustí render jobu v process poole a zapíše výsledný stav.
+    Claim a zápisy stavu bežia cez asyncio.to_thread (krátke session mimo event loopu).
+    """
+    if not await asyncio.to_thread(claim_export_job, job_id, stale_before):
+        return  # job už beží alebo skončil v inom workeri
+    input_path = _job_path(job_id, "input.json", base_dir)
+    progress_path = _job_path(job_id, "progress", base_dir)
+    output_path = _job_path(job_id, JOB_FORMATS[format][1], base_dir)
+
+    loop = asyncio.get_running_loop()
+    try:
+        size = await loop.run_in_executor(
+            get_export_pool(), render_export, format, input_path, output_path, progress_path
+        )
+        await asyncio.to_thread(
+            _update_job,
+            job_id, status=JOB_DONE, progress=100, result_size=size, finished_at=datetime.utcnow(),
+        )
+    except Exception as e:
+        # MemoryError / BrokenProcessPool pri prekročení limitu končia tu
+        logger.warning(f"Export job {job_id} failed: {e}")
+        await asyncio.to_thread(
+            _update_job,
+            job_id,
+            status=JOB_FAILED,
+            error=(str(e) or e.__class__.__name__)[:500],
+            finished_at=datetime.utcnow(),
+        )
+    finally:
+        for path in (input_path, progress_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def schedule_export_job(job: ExportJob) -> asyncio.Task:
+    return _spawn(run_export_job(job.id, job.format))
+
+
+def get_export_job(db: Session, job_id: str, user_id: int, base_dir: Optional[str] = None) -> Optional[Dict]:
+    """Stav jobu (progress bežiaceho jobu sa číta zo sidecar súboru workera)"""
+    job = db.query(ExportJob).filter(ExportJob.id == job_id, ExportJob.user_id == user_id).first()
+    if job is None:
+        return None
+    result = job.to_dict()
+    if job.status == JOB_RUNNING:
+        try:
+            with open(_job_path(job.id, "progress", base_dir)) as f:
+                result["progress"] = max(job.progress, int(f.read() or 0))
+        except (OSError, ValueError):
+            pass
+    return result
+
+
+def _resumable_jobs(stale_before: datetime) -> List[Tuple[str, str]]:
+    with get_db_session() as db:
+        if db is None:
+            return []
+        return [(job.id, job.format) for job in db.query(ExportJob).filter(_claimable(stale_before))]
+
+
+async def resume_pending_jobs() -> int:
+    """
+    Po reštarte znovu naplánuje nedokončené joby (queued a bežiace joby spadnutých
+    workerov). Každý job si worker najprv claimne, takže beží len raz.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=EXPORT_JOB_STALE_SECONDS)
+    pending = await asyncio.to_thread(_resumable_jobs, stale_before)
+    for job_id, format in pending:
+        if os.path.exists(_job_path(job_id, "input.json")):
+            _spawn(run_export_job(job_id, format, stale_before=stale_before))
+        else:
+            await asyncio.to_thread(
+                _update_job,
+                job_id, _claimable(stale_before),
+                status=JOB_FAILED, error="Input lost on restart", finished_at=datetime.utcnow(),
+            )
+    return len(pending)
+
+
+def cleanup_expired_jobs(db: Optional[Session] = None, base_dir: Optional[str] = None) -> int:
+    """Zmaže expirované joby a ich súbory"""
+    if db is None:
+        with get_db_session() as session:
+            if session is None:
+                return 0
+            return cleanup_expired_jobs(session, base_dir)
+
+    expired = db.query(ExportJob).filter(ExportJob.expires_at <= datetime.utcnow()).all()
+    for job in expired:
+        for path in (result_path(job, base_dir), _job_path(job.id, "input.json", base_dir)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        db.delete(job)
+    db.commit()
+    return len(expired)
+
+
+async def run_export_job_janitor(interval: int = EXPORT_JOB_CLEANUP_SECONDS) -> None:
+    """Background loop: obnova jobov po štarte + mazanie expirovaných výsledkov"""
+    try:
+        await resume_pending_jobs()
+    except Exception as e:
+        logger.warning(f"Export job resume error: {e}")
+    while True:
+        try:
+            removed = await asyncio.to_thread(cleanup_expired_jobs)
+            if removed:
+                logger.info(f"Removed {removed} expired export jobs")
+        except Exception as e:
+            logger.warning(f"Export job cleanup error: {e}")
+        await asyncio.sleep(interval)
@@ -1,194 +1,336 @@
 """
 Export service pre ILUMINATI SYSTEM
-Podporuje Excel (xlsx), CSV, JSON export
+Podporuje Excel (xlsx), CSV, NDJSON, JSON export
+
+Excel sa generuje v write-only režime openpyxl (riadky idú priebežne na disk),
+šírky stĺpcov sa odhadujú zo vzorky prvých riadkov a výsledok sa streamuje
+po chunkoch. CSV/NDJSON sú generátory - pamäť nezávisí od počtu riadkov.
 """
 
+import csv
+import importlib.util
 import io
 import json
+import os
+import tempfile
 from datetime import datetime
-from typing import Dict, List, Optional
-
-try:
-    import pandas as pd
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from services.database import FavoriteCompany, get_db_session
+
+# openpyxl sa importuje až pri prvom Excel exporte (rýchly štart aplikácie)
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+
+# Konfigurácia
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", str(64 * 1024)))
+EXPORT_WIDTH_SAMPLE_ROWS = int(os.getenv("EXPORT_WIDTH_SAMPLE_ROWS", "200"))
+EXPORT_DB_CHUNK_SIZE = int(os.getenv("EXPORT_DB_CHUNK_SIZE", "1000"))
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# format -> (media type, prípona súboru)
+EXPORT_FORMATS = {
+    "xlsx": (XLSX_MEDIA_TYPE, "xlsx"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+NODE_HEADERS = ["Typ", "ID", "Názov", "Krajina", "Risk Score", "Detaily", "Dátum vytvorenia"]
+EDGE_HEADERS = ["Source", "Target", "Typ vzťahu", "Váha"]
+
+# (kľúč v NDJSON, hlavička v Excel/CSV)
+BATCH_COLUMNS = [
+    ("identifier", "IČO/KRS/Adószám"),
+    ("name", "Názov"),
+    ("country", "Krajina"),
+    ("address", "Adresa"),
+    ("dic", "DIČ"),
+    ("ic_dph", "IČ DPH"),
+    ("legal_form", "Právna forma"),
+    ("risk_score", "Risk Score"),
+    ("establishment_date", "Dátum vzniku"),
+    ("status", "Stav"),
+    ("notes", "Poznámky"),
+]
+BATCH_HEADERS = [header for _, header in BATCH_COLUMNS]
+
+
+def _require_openpyxl() -> None:
+    if not OPENPYXL_AVAILABLE:
+        raise ImportError(
+            "openpyxl nie je nainštalovaný. Nainštalujte: pip install openpyxl"
+        )
 
-    PANDAS_AVAILABLE = True
-except ImportError:
-    PANDAS_AVAILABLE = False
 
-try:
-    from openpyxl import Workbook
+def _details_str(details) -> str:
+    if isinstance(details, dict):
+        return json.dumps(details, ensure_ascii=False)
+    return str(details if details is not None else "")
+
+
+def company_record(company: Dict) -> Dict:
+    """Jedna firma z batchu -> plochý záznam (BATCH_COLUMNS)"""
+    company_data = company.get("company_data", {}) or company
+    return {
+        "identifier": company_data.get("ico") or company.get("company_identifier", ""),
+        "name": company_data.get("name") or company.get("company_name", ""),
+        "country": company_data.get("country") or company.get("country", ""),
+        "address": company_data.get("address", ""),
+        "dic": company_data.get("dic", ""),
+        "ic_dph": company_data.get("ic_dph", ""),
+        "legal_form": company_data.get("legal_form", ""),
+        "risk_score": company.get("risk_score") or company_data.get("risk_score", 0),
+        "establishment_date": company_data.get("establishment_date", ""),
+        "status": company_data.get("status", ""),
+        "notes": company.get("notes", ""),
+    }
+
+
+def company_row(company: Dict) -> List:
+    record = company_record(company)
+    return [record[key] for key, _ in BATCH_COLUMNS]
+
+
+def estimate_column_widths(headers: Sequence[str], sample_rows: Iterable[Sequence]) -> List[int]:
+    """Šírky stĺpcov zo vzorky riadkov (max 50 znakov)"""
+    widths = [len(str(header)) for header in headers]
+    for row in sample_rows:
+        for i, value in enumerate(row[: len(widths)]):
+            if value is not None:
+                widths[i] = max(widths[i], len(str(value)))
+    return [min(width + 2, 50) for width in widths]
+
+
+def _write_sheet(wb, title: str, headers: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """Zapíše hárok vo write-only režime (šírky sa musia nastaviť pred prvým riadkom)"""
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Alignment, Font, PatternFill
     from openpyxl.utils import get_column_letter
 
-    OPENPYXL_AVAILABLE = True
-except ImportError:
-    OPENPYXL_AVAILABLE = False
+    ws = wb.create_sheet(title)
+    rows = iter(rows)
+    sample = list(islice(rows, EXPORT_WIDTH_SAMPLE_ROWS))
+    for i, width in enumerate(estimate_column_widths(headers, sample), start=1):
+        ws.column_dimensions[get_column_letter(i)].width = width
 
+    header_fill = PatternFill(start_color="0B4EA2", end_color="0B4EA2", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.append(header_cells)
 
-def export_to_excel(graph_data: Dict, filename: Optional[str] = None) -> bytes:
+    for row in chain(sample, rows):
+        ws.append(row)
+
+
+def _stream_workbook(build: Callable) -> Iterator[bytes]:
+    """Postaví write-only workbook do dočasného súboru a vráti ho po chunkoch"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    build(wb)
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_graph_to_excel(graph_data: Dict) -> Iterator[bytes]:
     """
-    Exportuje grafové dáta do Excel (xlsx) formátu.
+    Exportuje grafové dáta do Excel (xlsx) ako stream bytes.
 
     Args:
         graph_data: Dict s nodes a edges
-        filename: Voliteľný názov súboru
 
     Returns:
-        bytes: Excel súbor ako bytes
+        Iterator chunkov xlsx súboru
     """
-    if not OPENPYXL_AVAILABLE:
-        raise ImportError(
-            "openpyxl nie je nainštalovaný. Nainštalujte: pip install openpyxl"
-        )
+    _require_openpyxl()
+
+    def build(wb) -> None:
+        nodes = graph_data.get("nodes", [])
+        edges = graph_data.get("edges", [])
+        exported_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        node_types: Dict[str, int] = {}
+        edge_types: Dict[str, int] = {}
+
+        def node_rows():
+            for node in nodes:
+                node_type = node.get("type", "Unknown")
+                node_types[node_type] = node_types.get(node_type, 0) + 1
+                yield [
+                    node.get("type", ""),
+                    node.get("id", ""),
+                    node.get("label", ""),
+                    node.get("country", ""),
+                    node.get("risk_score", 0) or 0,
+                    _details_str(node.get("details", "")),
+                    exported_at,
+                ]
+
+        def edge_rows():
+            for edge in edges:
+                edge_type = edge.get("type", "Unknown")
+                edge_types[edge_type] = edge_types.get(edge_type, 0) + 1
+                yield [
+                    edge.get("source", ""),
+                    edge.get("target", ""),
+                    edge.get("type", ""),
+                    edge.get("weight", 1) or 1,
+                ]
+
+        # === SHEET 1: Nodes, SHEET 2: Edges ===
+        _write_sheet(wb, "Výsledky vyhľadávania", NODE_HEADERS, node_rows())
+        _write_sheet(wb, "Vzťahy", EDGE_HEADERS, edge_rows())
+
+        # === SHEET 3: Summary (typy sa spočítali počas zápisu) ===
+        summary_data = [
+            ["Celkový počet nodov", len(nodes)],
+            ["Celkový počet vzťahov", len(edges)],
+            ["Dátum exportu", exported_at],
+            ["", ""],
+            ["Typy nodov", ""],
+        ]
+        summary_data.extend([t, c] for t, c in sorted(node_types.items()))
+        summary_data.append(["", ""])
+        summary_data.append(["Typy vzťahov", ""])
+        summary_data.extend([t, c] for t, c in sorted(edge_types.items()))
+        _write_sheet(wb, "Súhrn", ["Metrika", "Hodnota"], summary_data)
+
+    return _stream_workbook(build)
+
+
+def stream_batch_to_excel(companies: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    Exportuje batch firiem do Excel (xlsx) ako stream bytes.
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Výsledky vyhľadávania"
+    Args:
+        companies: Iterable firiem (list alebo generátor z DB)
 
-    # Stylovanie hlavičky
-    header_fill = PatternFill(
-        start_color="0B4EA2", end_color="0B4EA2", fill_type="solid"
-    )
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_alignment = Alignment(horizontal="center", vertical="center")
+    Returns:
+        Iterator chunkov xlsx súboru
+    """
+    _require_openpyxl()
 
-    # === SHEET 1: Nodes (Firmy, Osoby, Adresy) ===
-    ws.append(
-        ["Typ", "ID", "Názov", "Krajina", "Risk Score", "Detaily", "Dátum vytvorenia"]
-    )
+    def build(wb) -> None:
+        _write_sheet(wb, "Batch Export", BATCH_HEADERS, (company_row(c) for c in companies))
 
-    # Stylovanie hlavičky
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
+    return _stream_workbook(build)
 
-    # Pridať nodes
-    nodes = graph_data.get("nodes", [])
-    for node in nodes:
-        ws.append(
-            [
-                node.get("type", ""),
-                node.get("id", ""),
-                node.get("label", ""),
-                node.get("country", ""),
-                node.get("risk_score", 0) or 0,
-                json.dumps(node.get("details", {}), ensure_ascii=False)
-                if isinstance(node.get("details"), dict)
-                else str(node.get("details", "")),
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            ]
-        )
 
-    # Auto-width stĺpcov
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-
-    # === SHEET 2: Edges (Vzťahy) ===
-    ws2 = wb.create_sheet("Vzťahy")
-    ws2.append(["Source", "Target", "Typ vzťahu", "Váha"])
-
-    # Stylovanie hlavičky
-    for cell in ws2[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
+def export_to_excel(graph_data: Dict, filename: Optional[str] = None) -> bytes:
+    """
+    Exportuje grafové dáta do Excel (xlsx) formátu.
 
-    # Pridať edges
-    edges = graph_data.get("edges", [])
-    for edge in edges:
-        ws2.append(
-            [
-                edge.get("source", ""),
-                edge.get("target", ""),
-                edge.get("type", ""),
-                edge.get("weight", 1) or 1,
-            ]
-        )
+    Args:
+        graph_data: Dict s nodes a edges
+        filename: Voliteľný názov súboru
 
-    # Auto-width pre edges
-    for column in ws2.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws2.column_dimensions[column_letter].width = adjusted_width
-
-    # === SHEET 3: Summary (Súhrn) ===
-    ws3 = wb.create_sheet("Súhrn")
-    ws3.append(["Metrika", "Hodnota"])
-
-    # Stylovanie hlavičky
-    for cell in ws3[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
+    Returns:
+        bytes: Excel súbor ako bytes
+    """
+    return b"".join(stream_graph_to_excel(graph_data))
 
-    # Pridať štatistiky
-    summary_data = [
-        ["Celkový počet nodov", len(nodes)],
-        ["Celkový počet vzťahov", len(edges)],
-        ["Dátum exportu", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-        ["", ""],
-        ["Typy nodov", ""],
-    ]
-
-    # Počítanie typov nodov
-    node_types = {}
-    for node in nodes:
-        node_type = node.get("type", "Unknown")
-        node_types[node_type] = node_types.get(node_type, 0) + 1
 
-    for node_type, count in sorted(node_types.items()):
-        summary_data.append([node_type, count])
+def export_batch_to_excel(
+    companies: List[Dict], filename: Optional[str] = None
+) -> bytes:
+    """
+    Exportuje batch firiem do Excel (xlsx) formátu.
 
-    summary_data.append(["", ""])
-    summary_data.append(["Typy vzťahov", ""])
+    Args:
+        companies: List firiem (každá firma je dict s company_data)
+        filename: Voliteľný názov súboru
 
-    # Počítanie typov vzťahov
-    edge_types = {}
-    for edge in edges:
-        edge_type = edge.get("type", "Unknown")
-        edge_types[edge_type] = edge_types.get(edge_type, 0) + 1
-
-    for edge_type, count in sorted(edge_types.items()):
-        summary_data.append([edge_type, count])
-
-    for row in summary_data:
-        ws3.append(row)
-
-    # Auto-width pre summary
-    for column in ws3.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws3.column_dimensions[column_letter].width = adjusted_width
-
-    # Uložiť do bytes
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.getvalue()
+    Returns:
+        bytes: Excel súbor ako bytes
+    """
+    return b"".join(stream_batch_to_excel(companies))
+
+
+def stream_csv(headers: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """CSV generátor - buffer sa vyprázdni po každých EXPORT_CHUNK_SIZE znakoch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_ndjson(records: Iterable[Dict]) -> Iterator[bytes]:
+    """NDJSON generátor - jeden JSON objekt na riadok"""
+    buffer = io.StringIO()
+    for record in records:
+        buffer.write(json.dumps(record, ensure_ascii=False, default=str))
+        buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_companies(companies: Iterable[Dict], format: str) -> Tuple[Iterator[bytes], str, str]:
+    """
+    Stream batchu firiem v zvolenom formáte.
+
+    Returns:
+        (iterator chunkov, media type, prípona súboru)
+
+    Raises:
+        ValueError: Nepodporovaný formát
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Nepodporovaný formát exportu: {format}")
+    media_type, extension = EXPORT_FORMATS[format]
+    if format == "xlsx":
+        return stream_batch_to_excel(companies), media_type, extension
+    if format == "csv":
+        return stream_csv(BATCH_HEADERS, (company_row(c) for c in companies)), media_type, extension
+    return stream_ndjson(company_record(c) for c in companies), media_type, extension
+
+
+def iter_favorite_companies(user_id: int, chunk_size: int = EXPORT_DB_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Obľúbené firmy používateľa priamo z DB kurzora (yield_per) - session
+    žije počas celého streamu, v pamäti je naraz len jeden chunk.
+    """
+    with get_db_session() as db:
+        if db is None:
+            return
+        query = (
+            db.query(FavoriteCompany)
+            .filter(FavoriteCompany.user_id == user_id)
+            .order_by(FavoriteCompany.id)
+            .yield_per(chunk_size)
+        )
+        for favorite in query:
+            yield {
+                "company_identifier": favorite.company_identifier,
+                "company_name": favorite.company_name,
+                "country": favorite.country,
+                "company_data": favorite.company_data or {},
+                "risk_score": favorite.risk_score,
+                "notes": favorite.notes or "",
+            }
 
 
 def export_to_csv(graph_data: Dict) -> str:
@@ -228,93 +370,3 @@ def export_to_csv(graph_data: Dict) -> str:
         )
 
     return "\n".join(csv_lines)
-
-
-def export_batch_to_excel(
-    companies: List[Dict], filename: Optional[str] = None
-) -> bytes:
-    """
-    Exportuje batch firiem do Excel (xlsx) formátu.
-
-    Args:
-        companies: List firiem (každá firma je dict s company_data)
-        filename: Voliteľný názov súboru
-
-    Returns:
-        bytes: Excel súbor ako bytes
-    """
-    if not OPENPYXL_AVAILABLE:
-        raise ImportError(
-            "openpyxl nie je nainštalovaný. Nainštalujte: pip install openpyxl"
-        )
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Batch Export"
-
-    # Stylovanie hlavičky
-    header_fill = PatternFill(
-        start_color="0B4EA2", end_color="0B4EA2", fill_type="solid"
-    )
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    header_alignment = Alignment(horizontal="center", vertical="center")
-
-    # Hlavička
-    headers = [
-        "IČO/KRS/Adószám",
-        "Názov",
-        "Krajina",
-        "Adresa",
-        "DIČ",
-        "IČ DPH",
-        "Právna forma",
-        "Risk Score",
-        "Dátum vzniku",
-        "Stav",
-        "Poznámky",
-    ]
-    ws.append(headers)
-
-    # Stylovanie hlavičky
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-
-    # Pridať firmy
-    for company in companies:
-        company_data = company.get("company_data", {}) or company
-        ws.append(
-            [
-                company_data.get("ico") or company.get("company_identifier", ""),
-                company_data.get("name") or company.get("company_name", ""),
-                company_data.get("country") or company.get("country", ""),
-                company_data.get("address", ""),
-                company_data.get("dic", ""),
-                company_data.get("ic_dph", ""),
-                company_data.get("legal_form", ""),
-                company.get("risk_score") or company_data.get("risk_score", 0),
-                company_data.get("establishment_date", ""),
-                company_data.get("status", ""),
-                company.get("notes", ""),
-            ]
-        )
-
-    # Auto-width stĺpcov
-    for column in ws.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-
-    # Uložiť do bytes
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.getvalue()
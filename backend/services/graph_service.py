@@ -4,8 +4,9 @@ import unicodedata
 from typing import Dict, List, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import JSON, cast, func, literal, or_, select
 
+from services.address_normalizer import normalize_address
 from services.database import get_db_session, GraphNode, GraphEdge
 
 LEGAL_ENTITY_TOKENS = [
@@ -40,6 +41,39 @@ def _owner_node_id(country: str, name: str) -> str:
     key = f"{country}|{_norm_key(name)}"
     return f"own_{country.lower()}_{_sha12(key)}"
 
+def _node_key(node_id: str):
+    """Skalárny poddotaz: surrogate kľúč uzla podľa jeho ID"""
+    return select(GraphNode.key).where(GraphNode.id == node_id).scalar_subquery()
+
+def _dialect_insert(db: Session):
+    """INSERT ... ON CONFLICT pre dialekty, ktoré ho podporujú (inak None)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def _merged_details(dialect: str, excluded_details):
+    """
+    Zlúčenie details hrany priamo v ON CONFLICT príkaze, bez SELECT pred zápisom.
+    PostgreSQL: jsonb || (plytké, ako dict.update). SQLite: json_patch, ktorý
+    vnorené objekty zlučuje rekurzívne a kľúče s hodnotou null odstráni.
+    """
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB
+        current = func.coalesce(cast(GraphEdge.details, JSONB), cast(literal("{}"), JSONB))
+        return cast(current.op("||")(cast(excluded_details, JSONB)), JSON)
+    return func.json_patch(func.coalesce(GraphEdge.details, "{}"), excluded_details)
+
+def _node_dict(node: GraphNode) -> Dict:
+    return {
+        "id": node.id, "label": node.label, "type": node.type,
+        "country": node.country, "details": node.details
+    }
+
 class GraphService:
     def upsert_node(
         self,
@@ -90,6 +124,37 @@ class GraphService:
             if not db:
                 return
 
+            insert = _dialect_insert(db)
+            if insert is not None:
+                # Jeden príkaz: unikátny (source, type, target) rozhodne insert vs update
+                now = datetime.utcnow()
+                stmt = insert(GraphEdge).values(
+                    source=source,
+                    target=target,
+                    type=edge_type,
+                    source_key=_node_key(source),
+                    target_key=_node_key(target),
+                    details=details or {},
+                    weight=weight,
+                    created_at=now,
+                    updated_at=now,
+                )
+                update = {
+                    "updated_at": now,
+                    "source_key": func.coalesce(GraphEdge.source_key, stmt.excluded.source_key),
+                    "target_key": func.coalesce(GraphEdge.target_key, stmt.excluded.target_key),
+                }
+                if details:
+                    update["details"] = _merged_details(db.get_bind().dialect.name, stmt.excluded.details)
+                stmt = stmt.on_conflict_do_update(index_elements=["source", "type", "target"], set_=update)
+                try:
+                    db.execute(stmt)
+                    db.commit()
+                except Exception as e:
+                    print(f"Error upserting edge {source}->{target}: {e}")
+                    db.rollback()
+                return
+
             # Check if exists (directed edge)
             edge = db.query(GraphEdge).filter(
                 GraphEdge.source == source,
@@ -99,7 +164,7 @@ class GraphService:
 
             if edge:
                 if details:
-                    current = edge.details or {}
+                    current = dict(edge.details or {})
                     current.update(details)
                     edge.details = current
                 edge.updated_at = datetime.utcnow()
@@ -108,6 +173,8 @@ class GraphService:
                     source=source,
                     target=target,
                     type=edge_type,
+                    source_key=_node_key(source),
+                    target_key=_node_key(target),
                     details=details or {},
                     weight=weight
                 )
@@ -145,19 +212,18 @@ class GraphService:
             details={"atlas_id": atlas_id, "source": source},
         )
 
-        # 2) Address node (existujúce) – len príklad
-        if address:
+        # 2) Address node - ID z normalizovanej adresy (pravopisné varianty = jeden uzol)
+        normalized_address = normalize_address(address, country) if address else None
+        if normalized_address:
             addr_label = address.get("raw") or f'{address.get("street","")} {address.get("city","")} {address.get("postal_code","")}'.strip()
-            # Basic Address Node ID - improve if needed
-            addr_hash = _sha12(f"{country}|{_norm_key(addr_label)}")
-            addr_node_id = f"addr_{country.lower()}_{addr_hash}"
+            addr_node_id = normalized_address.node_id
             
             self.upsert_node(
                 node_id=addr_node_id,
                 label=addr_label,
                 node_type="address",
                 country=country,
-                details={"source": source, **address},
+                details={"source": source, **address, "normalized": normalized_address.as_dict()},
             )
             self.upsert_edge(company_node_id, addr_node_id, "LOCATED_AT", details={"source": source})
 
@@ -231,43 +297,109 @@ class GraphService:
                     self.upsert_node(oid, name, "person", country, details={"source": source})
                 self.upsert_edge(company_node_id, oid, "OWNED_BY", details={"source": source})
 
+    def count_companies_at_addresses(self, address_ids: List[str]) -> Dict[str, int]:
+        """Presný počet firiem na adresách (LOCATED_AT, index na target)"""
+        if not address_ids:
+            return {}
+        with get_db_session() as db:
+            if not db:
+                return {}
+            rows = (
+                db.query(GraphEdge.target, func.count(func.distinct(GraphEdge.source)))
+                .filter(GraphEdge.target.in_(address_ids), GraphEdge.type == "LOCATED_AT")
+                .group_by(GraphEdge.target)
+                .all()
+            )
+            return {target: count for target, count in rows}
+
+    def renormalize_address_nodes(self) -> Dict[str, int]:
+        """
+        Prepočíta ID existujúcich address uzlov podľa normalizácie a zlúči
+        duplicity (LOCATED_AT hrany sa presmerujú na kanonický uzol).
+        """
+        stats = {"checked": 0, "merged": 0, "edges_moved": 0}
+        with get_db_session() as db:
+            if not db:
+                return stats
+            for node in db.query(GraphNode).filter(GraphNode.type == "address").all():
+                stats["checked"] += 1
+                details = dict(node.details or {})
+                details.pop("normalized", None)
+                normalized = normalize_address(details or {"raw": node.label}, node.country or "")
+                if not normalized or normalized.node_id == node.id:
+                    continue
+
+                target = db.query(GraphNode).filter(GraphNode.id == normalized.node_id).first()
+                if target is None:
+                    target = GraphNode(
+                        id=normalized.node_id,
+                        label=node.label,
+                        type="address",
+                        country=node.country,
+                        details={**details, "normalized": normalized.as_dict()},
+                    )
+                    db.add(target)
+                    db.flush()
+
+                for edge in db.query(GraphEdge).filter(GraphEdge.target == node.id, GraphEdge.type == "LOCATED_AT").all():
+                    duplicate = db.query(GraphEdge).filter(
+                        GraphEdge.source == edge.source,
+                        GraphEdge.target == target.id,
+                        GraphEdge.type == "LOCATED_AT",
+                    ).first()
+                    if duplicate:
+                        db.delete(edge)
+                    else:
+                        edge.target = target.id
+                        edge.target_key = target.key
+                        stats["edges_moved"] += 1
+                db.delete(node)
+                stats["merged"] += 1
+            try:
+                db.commit()
+            except Exception as e:
+                print(f"Error renormalizing address nodes: {e}")
+                db.rollback()
+        return stats
+
     def _base_graph_for_company(self, company_node_id: str) -> Dict:
         """Helper to get direct neighbors"""
+        return self._base_graph_for_companies([company_node_id])
+
+    def _base_graph_for_companies(self, company_node_ids: List[str]) -> Dict:
+        """
+        Priami susedia viacerých firiem naraz - hrany a cieľové uzly jedným
+        joinom cez surrogate kľúče namiesto dotazu na každý uzol zvlášť.
+        """
         with get_db_session() as db:
-            if not db:
+            if not db or not company_node_ids:
                  return {"nodes": [], "edges": []}
-            
-            # Find edges from company
-            out_edges = db.query(GraphEdge).filter(GraphEdge.source == company_node_id).all()
-            
+
             nodes = {}
             edges = []
 
-            # Add center node
-            center = db.query(GraphNode).filter(GraphNode.id == company_node_id).first()
-            if center:
-                nodes[center.id] = {
-                    "id": center.id, "label": center.label, "type": center.type, 
-                    "country": center.country, "details": center.details
-                }
+            # Add center nodes
+            for center in db.query(GraphNode).filter(GraphNode.id.in_(company_node_ids)).all():
+                nodes[center.id] = _node_dict(center)
 
-            for e in out_edges:
+            rows = (
+                db.query(GraphEdge, GraphNode)
+                .outerjoin(GraphNode, GraphNode.key == GraphEdge.target_key)
+                .filter(GraphEdge.source.in_(company_node_ids))
+                .all()
+            )
+            for e, t in rows:
                 edges.append({"source": e.source, "target": e.target, "type": e.type, "details": e.details})
-                # Fetch target node
-                if e.target not in nodes:
-                    t = db.query(GraphNode).filter(GraphNode.id == e.target).first()
-                    if t:
-                        nodes[t.id] = {
-                            "id": t.id, "label": t.label, "type": t.type,
-                            "country": t.country, "details": t.details
-                        }
-            
+                if t is not None and t.id not in nodes:
+                    nodes[t.id] = _node_dict(t)
+
             return {"nodes": list(nodes.values()), "edges": edges}
 
     def fetch_edges_from(self, source_id: str, types: List[str]) -> List[Dict]:
         with get_db_session() as db:
             if not db: return []
-            edges = db.query(GraphEdge).filter(
+            # Len stĺpce z indexu (source, type, target) - index-only scan
+            edges = db.query(GraphEdge.source, GraphEdge.target, GraphEdge.type).filter(
                 GraphEdge.source == source_id,
                 GraphEdge.type.in_(types)
             ).all()
@@ -276,7 +408,8 @@ class GraphService:
     def fetch_edges_to_many(self, target_ids: List[str], types: List[str], limit: int) -> List[Dict]:
         with get_db_session() as db:
             if not db: return []
-            edges = db.query(GraphEdge).filter(
+            # Reverzný index (target, type, source)
+            edges = db.query(GraphEdge.source, GraphEdge.target, GraphEdge.type).filter(
                 GraphEdge.target.in_(target_ids),
                 GraphEdge.type.in_(types)
             ).limit(limit * 5).all() # higher limit for DB query
@@ -323,9 +456,8 @@ class GraphService:
         other_company_ids = list(dict.fromkeys(other_company_ids))[:limit_related_per_anchor]
 
         # 3) pull nodes+edges for those companies and merge
-        for cid in other_company_ids:
-            sub = self._base_graph_for_company(cid)
-            graph = self.merge_graph(graph, sub)
+        if other_company_ids:
+            graph = self.merge_graph(graph, self._base_graph_for_companies(other_company_ids))
 
         # 4) optional summary
         graph.setdefault("summary", {})
@@ -5,13 +5,12 @@ API dokumentácia: https://api.nav.gov.hu/
 
 import requests
 from typing import Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import make_request_with_proxy
 
-# Cache pre NAV odpovede
-_nav_cache = {}
-_cache_ttl = timedelta(hours=24)
+_CACHE_PROVIDER = "nav_hu"
 
 
 def get_nav_provider():
@@ -37,12 +36,10 @@ def fetch_nav_hu(tax_number: str) -> Optional[Dict]:
         Dict s dátami firmy alebo None pri chybe
     """
     # Kontrola cache
-    cache_key = f"nav_hu_{tax_number}"
-    if cache_key in _nav_cache:
-        cached_data, cached_time = _nav_cache[cache_key]
-        if datetime.now() - cached_time < _cache_ttl:
-            print(f"✅ Cache hit pre Adószám {tax_number}")
-            return cached_data
+    cached_data = provider_cache.get(_CACHE_PROVIDER, tax_number)
+    if cached_data is not MISS:
+        print(f"✅ Cache hit pre Adószám {tax_number}")
+        return cached_data
     
     # Validácia adószám (8 alebo 11 miest)
     if not tax_number or not re.match(r'^\d{8,11}$', tax_number):
@@ -71,10 +68,11 @@ def fetch_nav_hu(tax_number: str) -> Optional[Dict]:
         if response.status_code == 200:
             data = response.json()
             # Uložiť do cache
-            _nav_cache[cache_key] = (data, datetime.now())
+            provider_cache.set(_CACHE_PROVIDER, tax_number, data)
             return data
         elif response.status_code == 404:
             print(f"⚠️ Adószám {tax_number} sa nenašlo v NAV registri")
+            provider_cache.set_not_found(_CACHE_PROVIDER, tax_number)
             return None
         else:
             print(f"⚠️ NAV API chyba: {response.status_code}")
@@ -197,8 +195,5 @@ def is_hungarian_tax_number(query: str) -> bool:
 
 def get_cache_stats() -> Dict:
     """Vráti štatistiky cache."""
-    return {
-        "cached_items": len(_nav_cache),
-        "cache_ttl_hours": _cache_ttl.total_seconds() / 3600
-    }
+    return provider_cache.get_stats(_CACHE_PROVIDER)
 
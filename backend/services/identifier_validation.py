@@ -0,0 +1,110 @@
+"""
+Validácia identifikátorov firiem V4 (kontrolné číslice)
+Rýchla cesta pred volaním registrov: identifikátor, ktorý nemôže existovať
+(preklep, zlá kontrolná číslica), sa odmietne lokálne bez sieťového volania.
+
+- SK/CZ IČO: 8 číslic, modulo 11 (váhy 8..2)
+- PL NIP: 10 číslic, modulo 11 (váhy 6,5,7,2,3,4,5,6,7)
+- PL REGON: 9 alebo 14 číslic, modulo 11
+- PL KRS: nemá kontrolnú číslicu - len formát (9-10 číslic, nie samé nuly)
+- HU adószám: törzsszám (8 číslic, váhy 9,7,3,1) + pri 11 číslach kód DPH a kraja
+"""
+
+import os
+import re
+from typing import List, Optional, Sequence
+
+# Vypnutie kontroly (napr. pri podozrení na nekonzistentné staré IČO)
+IDENTIFIER_CHECKSUM_VALIDATION = os.getenv("IDENTIFIER_CHECKSUM_VALIDATION", "true").lower() == "true"
+
+V4_COUNTRIES = ("CZ", "SK", "HU", "PL")
+
+_DIGITS_RE = re.compile(r"\D+")
+
+_ICO_WEIGHTS = (8, 7, 6, 5, 4, 3, 2)
+_NIP_WEIGHTS = (6, 5, 7, 2, 3, 4, 5, 6, 7)
+_REGON9_WEIGHTS = (8, 9, 2, 3, 4, 5, 6, 7)
+_REGON14_WEIGHTS = (2, 4, 8, 5, 0, 9, 7, 3, 6, 1, 2, 4, 8)
+_HU_WEIGHTS = (9, 7, 3, 1, 9, 7, 3)
+# Kód územného daňového úradu (posledné 2 číslice 11-miestneho adószám)
+_HU_COUNTY_CODES = frozenset(
+    [f"{code:02d}" for code in range(2, 21)] + ["22", "41", "42", "43", "44", "51"]
+)
+
+
+def _digits(value: str) -> str:
+    return _DIGITS_RE.sub("", value or "")
+
+
+def _weighted_sum(digits: str, weights: Sequence[int]) -> int:
+    return sum(int(digit) * weight for digit, weight in zip(digits, weights))
+
+
+def is_valid_ico(ico: str) -> bool:
+    """SK/CZ IČO - kontrolná číslica (11 - súčet mod 11) mod 10"""
+    if not ico or len(ico) != 8 or not ico.isdigit():
+        return False
+    return (11 - _weighted_sum(ico, _ICO_WEIGHTS) % 11) % 10 == int(ico[7])
+
+
+def is_valid_nip(nip: str) -> bool:
+    """PL NIP - súčet mod 11 = posledná číslica (zvyšok 10 je neplatný)"""
+    nip = _digits(nip)
+    if len(nip) != 10:
+        return False
+    check = _weighted_sum(nip, _NIP_WEIGHTS) % 11
+    return check != 10 and check == int(nip[9])
+
+
+def is_valid_regon(regon: str) -> bool:
+    """PL REGON (9 alebo 14 číslic) - súčet mod 11, zvyšok 10 -> 0"""
+    regon = _digits(regon)
+    if len(regon) == 9:
+        weights = _REGON9_WEIGHTS
+    elif len(regon) == 14:
+        weights = _REGON14_WEIGHTS
+    else:
+        return False
+    return _weighted_sum(regon, weights) % 11 % 10 == int(regon[-1])
+
+
+def is_valid_krs(krs: str) -> bool:
+    """PL KRS - poradové číslo bez kontrolnej číslice"""
+    return bool(krs) and krs.isdigit() and len(krs) in (9, 10) and int(krs) > 0
+
+
+def is_valid_hu_tax_number(tax_number: str) -> bool:
+    """HU adószám - törzsszám (8) alebo törzsszám-DPH kód-kraj (11)"""
+    if not tax_number or not tax_number.isdigit() or len(tax_number) not in (8, 11):
+        return False
+    check = (10 - _weighted_sum(tax_number, _HU_WEIGHTS) % 10) % 10
+    if check != int(tax_number[7]):
+        return False
+    if len(tax_number) == 11:
+        return tax_number[8] in "12345" and tax_number[9:] in _HU_COUNTY_CODES
+    return True
+
+
+def is_valid_identifier(country: str, identifier: str) -> bool:
+    """Môže identifikátor v danej krajine existovať?"""
+    if not IDENTIFIER_CHECKSUM_VALIDATION:
+        return True
+    country = (country or "").upper()
+    if country in ("SK", "CZ"):
+        return is_valid_ico(identifier)
+    if country == "PL":
+        return is_valid_krs(identifier) or is_valid_nip(identifier) or is_valid_regon(identifier)
+    if country == "HU":
+        return is_valid_hu_tax_number(identifier)
+    return True
+
+
+def plausible_countries(identifier: str, country: Optional[str] = None) -> List[str]:
+    """
+    Krajiny, v ktorých číselný identifikátor prejde formátom aj kontrolnou
+    číslicou (poradie V4_COUNTRIES). Prázdny zoznam = nemá zmysel volať register.
+    """
+    if not identifier or not identifier.isdigit():
+        return []
+    countries = [country.upper()] if country else list(V4_COUNTRIES)
+    return [c for c in countries if c in V4_COUNTRIES and is_valid_identifier(c, identifier)]
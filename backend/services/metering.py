@@ -0,0 +1,439 @@
+"""
+API Usage Metering pre ILUMINATI SYSTEM
+Počítadlá použitia API keys per minúta (in-memory / Redis) s periodickým
+rollupom do agregačných tabuliek (minute / hour / day).
+
+- Hot path (verify_api_key) robí len O(1) inkrement a porovnanie s kvótou
+- Rollup job raz za METERING_ROLLUP_SECONDS zapíše dávku do api_usage_rollups
+- Usage a quota endpointy čítajú len z rollupov
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Session
+
+from services.database import Base, get_db_session
+
+logger = logging.getLogger(__name__)
+
+try:
+    from services.redis_cache import get_redis_client
+
+    REDIS_AVAILABLE = True
+except (ImportError, Exception):
+    REDIS_AVAILABLE = False
+    get_redis_client = None
+
+# Konfigurácia
+METERING_ROLLUP_SECONDS = int(os.getenv("METERING_ROLLUP_SECONDS", "60"))
+METERING_MINUTE_RETENTION_HOURS = int(os.getenv("METERING_MINUTE_RETENTION_HOURS", "48"))
+METERING_HOUR_RETENTION_DAYS = int(os.getenv("METERING_HOUR_RETENTION_DAYS", "90"))
+API_KEY_DEFAULT_DAILY_QUOTA = int(os.getenv("API_KEY_DEFAULT_DAILY_QUOTA", "0"))  # 0 = bez limitu
+
+GRANULARITIES = ("minute", "hour", "day")
+
+_REDIS_DAY_PREFIX = "meter:day:"
+
+
+class ApiUsageRollup(Base):
+    """Agregované použitie API key za časový bucket"""
+
+    __tablename__ = "api_usage_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    api_key_id = Column(Integer, ForeignKey("api_keys.id", ondelete="CASCADE"), nullable=False, index=True)
+    granularity = Column(String(10), nullable=False)  # minute, hour, day
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    request_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("api_key_id", "granularity", "bucket_start", name="uq_api_usage_rollup_bucket"),
+    )
+
+    def to_dict(self) -> Dict:
+        return {
+            "bucket_start": self.bucket_start.isoformat() if self.bucket_start else None,
+            "granularity": self.granularity,
+            "count": self.request_count,
+        }
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    """Začiatok bucketu pre daný čas"""
+    if granularity == "minute":
+        return ts.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return ts.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class UsageMeter:
+    """
+    Atomické počítadlá použitia API keys.
+
+    - _pending: (api_key_id, minúta) -> počet, čaká na rollup
+    - _today: api_key_id -> (deň, počet) pre O(1) kontrolu dennej kvóty
+      (bez Redis; s Redis je denné počítadlo zdieľané medzi workermi)
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple[int, datetime], int] = {}
+        self._today: Dict[int, Tuple[date, int]] = {}
+        self._lock = threading.Lock()
+
+    def _redis(self):
+        if not REDIS_AVAILABLE:
+            return None
+        return get_redis_client()
+
+    def current_day_count(self, api_key_id: int, now: Optional[datetime] = None) -> int:
+        """Počet requestov key za aktuálny deň (UTC)"""
+        now = now or datetime.utcnow()
+        client = self._redis()
+        if client is not None:
+            try:
+                value = client.get(f"{_REDIS_DAY_PREFIX}{api_key_id}:{now:%Y%m%d}")
+                return int(value) if value else 0
+            except Exception as e:
+                logger.warning(f"Metering: Redis read failed, using local counter: {e}")
+
+        with self._lock:
+            entry = self._today.get(api_key_id)
+        if entry is None or entry[0] != now.date():
+            self._seed_today(api_key_id, now)
+            with self._lock:
+                entry = self._today.get(api_key_id)
+        return entry[1] if entry else 0
+
+    def _seed_today(self, api_key_id: int, now: datetime) -> None:
+        """Načíta dnešný počet z day rollupu (raz za deň per key)"""
+        persisted = 0
+        try:
+            with get_db_session() as db:
+                if db is not None:
+                    row = (
+                        db.query(ApiUsageRollup.request_count)
+                        .filter(
+                            ApiUsageRollup.api_key_id == api_key_id,
+                            ApiUsageRollup.granularity == "day",
+                            ApiUsageRollup.bucket_start == bucket_start(now, "day"),
+                        )
+                        .first()
+                    )
+                    persisted = row[0] if row else 0
+        except Exception as e:
+            logger.warning(f"Metering: could not seed day counter for key {api_key_id}: {e}")
+
+        with self._lock:
+            # Pripočítať aj pending (ešte nerollupnuté) minúty z dneška
+            day = bucket_start(now, "day")
+            pending = sum(
+                count
+                for (key_id, minute), count in self._pending.items()
+                if key_id == api_key_id and minute >= day
+            )
+            self._today[api_key_id] = (now.date(), persisted + pending)
+
+    def record(self, api_key_id: int, daily_quota: Optional[int] = None, now: Optional[datetime] = None) -> Tuple[bool, Dict]:
+        """
+        Zaznamená request a skontroluje dennú kvótu.
+
+        Returns:
+            Tuple (is_allowed, info_dict) - rovnaký tvar ako rate_limiter.is_allowed
+        """
+        now = now or datetime.utcnow()
+        quota = daily_quota if daily_quota else API_KEY_DEFAULT_DAILY_QUOTA
+        reset_after = int((bucket_start(now, "day") + timedelta(days=1) - now).total_seconds())
+
+        used = self._increment_day(api_key_id, now)
+        if quota and used > quota:
+            self._decrement_day(api_key_id, now)
+            return False, {
+                "allowed": False,
+                "used": used - 1,
+                "quota": quota,
+                "remaining": 0,
+                "reset_after": reset_after,
+            }
+
+        minute = bucket_start(now, "minute")
+        with self._lock:
+            self._pending[(api_key_id, minute)] = self._pending.get((api_key_id, minute), 0) + 1
+
+        return True, {
+            "allowed": True,
+            "used": used,
+            "quota": quota or None,
+            "remaining": (quota - used) if quota else None,
+            "reset_after": reset_after,
+        }
+
+    def _increment_day(self, api_key_id: int, now: datetime) -> int:
+        client = self._redis()
+        if client is not None:
+            key = f"{_REDIS_DAY_PREFIX}{api_key_id}:{now:%Y%m%d}"
+            try:
+                value = client.incr(key)
+                if value == 1:
+                    client.expire(key, 2 * 24 * 3600)
+                return int(value)
+            except Exception as e:
+                logger.warning(f"Metering: Redis incr failed, using local counter: {e}")
+
+        self.current_day_count(api_key_id, now)  # seed pri prvom použití dňa
+        with self._lock:
+            day, count = self._today.get(api_key_id, (now.date(), 0))
+            self._today[api_key_id] = (day, count + 1)
+            return count + 1
+
+    def _decrement_day(self, api_key_id: int, now: datetime) -> None:
+        client = self._redis()
+        if client is not None:
+            try:
+                client.decr(f"{_REDIS_DAY_PREFIX}{api_key_id}:{now:%Y%m%d}")
+                return
+            except Exception:
+                pass
+        with self._lock:
+            day, count = self._today.get(api_key_id, (now.date(), 1))
+            self._today[api_key_id] = (day, max(count - 1, 0))
+
+    def drain(self) -> Dict[Tuple[int, datetime], int]:
+        """Vyberie pending minútové počítadlá pre rollup"""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            return pending
+
+    def restore(self, pending: Dict[Tuple[int, datetime], int]) -> None:
+        """Vráti počítadlá späť po zlyhanom rollupe"""
+        with self._lock:
+            for bucket, count in pending.items():
+                self._pending[bucket] = self._pending.get(bucket, 0) + count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._today.clear()
+
+
+_meter = UsageMeter()
+
+
+def get_meter() -> UsageMeter:
+    """Globálna inštancia metra"""
+    return _meter
+
+
+def meter_api_request(api_key_id: int, daily_quota: Optional[int] = None) -> Tuple[bool, Dict]:
+    """Zaznamená API request a overí kvótu (O(1))"""
+    return _meter.record(api_key_id, daily_quota)
+
+
+def _aggregate(pending: Dict[Tuple[int, datetime], int]) -> Dict[str, Dict[Tuple[int, datetime], int]]:
+    """Rozpočíta minútové počítadlá do minute/hour/day bucketov"""
+    buckets: Dict[str, Dict[Tuple[int, datetime], int]] = {g: {} for g in GRANULARITIES}
+    for (api_key_id, minute), count in pending.items():
+        for granularity in GRANULARITIES:
+            key = (api_key_id, bucket_start(minute, granularity))
+            buckets[granularity][key] = buckets[granularity].get(key, 0) + count
+    return buckets
+
+
+def _add_counts(db: Session, rows: List[Dict]) -> None:
+    """
+    Pripočíta počty do bucketov atomicky v databáze (request_count + n),
+    takže súbežné rollupy viacerých workerov sa nestratia.
+    """
+    now = datetime.utcnow()
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(ApiUsageRollup.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["api_key_id", "granularity", "bucket_start"],
+            set_={
+                "request_count": ApiUsageRollup.__table__.c.request_count + stmt.excluded.request_count,
+                "updated_at": now,
+            },
+        )
+        db.execute(stmt, [{**row, "updated_at": now} for row in rows])
+        return
+
+    for row in rows:
+        updated = (
+            db.query(ApiUsageRollup)
+            .filter(
+                ApiUsageRollup.api_key_id == row["api_key_id"],
+                ApiUsageRollup.granularity == row["granularity"],
+                ApiUsageRollup.bucket_start == row["bucket_start"],
+            )
+            .update(
+                {"request_count": ApiUsageRollup.request_count + row["request_count"], "updated_at": now},
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            db.add(ApiUsageRollup(**row))
+
+
+def rollup_usage(db: Optional[Session] = None) -> int:
+    """
+    Zapíše pending počítadlá do agregačných tabuliek jednou transakciou.
+    Vráti počet zapísaných minútových bucketov.
+    """
+    if db is None:
+        try:
+            with get_db_session() as session:
+                if session is None:
+                    return 0
+                return rollup_usage(session)
+        except Exception as e:
+            print(f"⚠️ Chyba pri metering rollupe: {e}")
+            return 0
+
+    pending = _meter.drain()
+    if not pending:
+        return 0
+
+    rows = [
+        {"api_key_id": api_key_id, "granularity": granularity, "bucket_start": start, "request_count": count}
+        for granularity, counts in _aggregate(pending).items()
+        for (api_key_id, start), count in counts.items()
+    ]
+    try:
+        _add_counts(db, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        _meter.restore(pending)
+        raise
+
+    return len(pending)
+
+
+def prune_rollups(db: Session, now: Optional[datetime] = None) -> int:
+    """Vymaže staré minute/hour buckety podľa retention nastavení"""
+    now = now or datetime.utcnow()
+    deleted = (
+        db.query(ApiUsageRollup)
+        .filter(
+            ApiUsageRollup.granularity == "minute",
+            ApiUsageRollup.bucket_start < now - timedelta(hours=METERING_MINUTE_RETENTION_HOURS),
+        )
+        .delete(synchronize_session=False)
+    )
+    deleted += (
+        db.query(ApiUsageRollup)
+        .filter(
+            ApiUsageRollup.granularity == "hour",
+            ApiUsageRollup.bucket_start < now - timedelta(days=METERING_HOUR_RETENTION_DAYS),
+        )
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
+
+
+def get_usage_series(
+    db: Session,
+    api_key_id: int,
+    granularity: str = "hour",
+    since: Optional[datetime] = None,
+) -> List[Dict]:
+    """Časový rad použitia key z rollupov"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    query = db.query(ApiUsageRollup).filter(
+        ApiUsageRollup.api_key_id == api_key_id,
+        ApiUsageRollup.granularity == granularity,
+    )
+    if since is not None:
+        query = query.filter(ApiUsageRollup.bucket_start >= since)
+    return [row.to_dict() for row in query.order_by(ApiUsageRollup.bucket_start)]
+
+
+def get_usage_by_key(db: Session, since: datetime, api_key_ids: Optional[List[int]] = None) -> Dict[int, int]:
+    """Súčet requestov per key od daného času (z day rollupov)"""
+    query = db.query(
+        ApiUsageRollup.api_key_id, func.sum(ApiUsageRollup.request_count)
+    ).filter(
+        ApiUsageRollup.granularity == "day",
+        ApiUsageRollup.bucket_start >= bucket_start(since, "day"),
+    )
+    if api_key_ids is not None:
+        query = query.filter(ApiUsageRollup.api_key_id.in_(api_key_ids))
+    return {key_id: int(total or 0) for key_id, total in query.group_by(ApiUsageRollup.api_key_id)}
+
+
+def get_quota_status(api_key_id: int, daily_quota: Optional[int] = None) -> Dict:
+    """Aktuálny stav dennej kvóty key"""
+    now = datetime.utcnow()
+    quota = daily_quota if daily_quota else API_KEY_DEFAULT_DAILY_QUOTA
+    used = _meter.current_day_count(api_key_id, now)
+    return {
+        "used_today": used,
+        "daily_quota": quota or None,
+        "remaining": max(quota - used, 0) if quota else None,
+        "reset_after": int((bucket_start(now, "day") + timedelta(days=1) - now).total_seconds()),
+    }
+
+
+def prune_expired_rollups() -> int:
+    """prune_rollups s vlastnou session"""
+    try:
+        with get_db_session() as db:
+            if db is None:
+                return 0
+            return prune_rollups(db)
+    except Exception as e:
+        print(f"⚠️ Chyba pri prune rollupov: {e}")
+        return 0
+
+
+async def run_metering_worker(interval: int = METERING_ROLLUP_SECONDS) -> None:
+    """
+    Background loop: periodický rollup a flush bufferovaných API key počítadiel.
+    Medzi rollupmi kontroluje každých API_KEY_USAGE_FLUSH_SECONDS, či buffer
+    nedosiahol limit - request path len počíta, DB zápis je vždy tu v threade.
+    Spúšťa sa zo startup eventu.
+    """
+    from services.api_keys import API_KEY_USAGE_FLUSH_SECONDS, api_key_usage_flush_due, flush_api_key_usage
+
+    tick = max(1.0, min(float(interval), API_KEY_USAGE_FLUSH_SECONDS))
+    last_rollup = last_prune = datetime.utcnow()
+    while True:
+        await asyncio.sleep(tick)
+        try:
+            now = datetime.utcnow()
+            if now - last_rollup >= timedelta(seconds=interval):
+                await asyncio.to_thread(rollup_usage)
+                await asyncio.to_thread(flush_api_key_usage)
+                last_rollup = now
+            elif api_key_usage_flush_due():
+                await asyncio.to_thread(flush_api_key_usage)
+            if now - last_prune >= timedelta(hours=1):
+                await asyncio.to_thread(prune_expired_rollups)
+                last_prune = now
+        except Exception as e:
+            logger.warning(f"Metering worker error: {e}")
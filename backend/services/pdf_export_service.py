@@ -1,45 +1,210 @@
 """
 Professional PDF Export Service for ILUMINATI SYSTEM
 Bank-grade report templates with executive summaries and risk analysis
+
+Render pipeline:
+- Jinja šablóny sa kompilujú raz pri štarte (bytecode cache na disku)
+- Stylesheet + fonty sa parsujú raz na proces (get_stylesheet)
+- Hotové PDF sa memoizujú podľa typu reportu + hashu vstupu
 """
 
+import functools
+import hashlib
 import logging
 import json
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
-from jinja2 import Template, Environment, FileSystemLoader
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.units import inch
-from weasyprint.text.fonts import FontConfiguration
+from typing import Dict, List, Optional, Any, Tuple, Union
+from jinja2 import Template, Environment, FileSystemBytecodeCache, FileSystemLoader
+
+try:
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+
+    WEASYPRINT_AVAILABLE = True
+except (ImportError, OSError):  # OSError = chýbajúce natívne knižnice (pango)
+    WEASYPRINT_AVAILABLE = False
 
+from services.company_batch import (
+    NUMPY_AVAILABLE,
+    VECTORIZE_MIN_ROWS,
+    CompanyBatch,
+    np,
+    risk_levels,
+    summary_statistics,
+)
 from services.export_service import export_to_excel
 
 logger = logging.getLogger(__name__)
 
+# Konfigurácia
+_BACKEND_DIR = os.path.dirname(os.path.dirname(__file__))
+PDF_TEMPLATE_DIR = os.getenv("PDF_TEMPLATE_DIR", os.path.join(_BACKEND_DIR, "templates", "pdf"))
+PDF_TEMPLATE_CACHE_DIR = os.getenv(
+    "PDF_TEMPLATE_CACHE_DIR", os.path.join(_BACKEND_DIR, "data", "jinja_cache")
+)
+PDF_CACHE_TTL_SECONDS = int(os.getenv("PDF_CACHE_TTL_SECONDS", "600"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+REPORT_TYPES = (
+    'executive_summary',
+    'company_profile',
+    'network_analysis',
+    'risk_assessment',
+    'comparative_analysis',
+    'dashboard_report',
+)
+
+# Stylesheet + font config - parsuje sa raz na proces
+_stylesheet: Optional[Tuple[Any, Any]] = None
+_stylesheet_lock = threading.Lock()
+
+
+def get_stylesheet(css_text: str) -> Tuple[Any, Any]:
+    """Vráti (FontConfiguration, CSS) - font discovery a CSS parsing len pri prvom volaní"""
+    global _stylesheet
+    if _stylesheet is None:
+        with _stylesheet_lock:
+            if _stylesheet is None:
+                font_config = FontConfiguration()
+                _stylesheet = (font_config, CSS(string=css_text, font_config=font_config))
+    return _stylesheet
+
+
+class RenderedPdfCache:
+    """LRU cache hotových PDF s TTL a limitom veľkosti v bytoch"""
+
+    def __init__(self, ttl_seconds: int = PDF_CACHE_TTL_SECONDS, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, pdf_bytes: bytes) -> None:
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, pdf_bytes)
+            self._size += len(pdf_bytes)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, pdf_bytes = self._entries.pop(key)
+        self._size -= len(pdf_bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total * 100, 2) if total else 0.0,
+            }
+
+
+_pdf_cache = RenderedPdfCache()
+
+
+# Kľúče, ktoré sa menia pri každom volaní a nesmú rozbiť memoizáciu
+VOLATILE_KEYS = frozenset({"export_time", "generated_at"})
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if k not in VOLATILE_KEYS}
+    return value
+
+
+def render_cache_key(document_type: str, args: tuple, kwargs: Dict) -> str:
+    """Kľúč = typ reportu + hash kanonického JSON vstupu"""
+    payload = json.dumps(
+        {
+            "args": [_strip_volatile(a) for a in args],
+            "kwargs": {k: _strip_volatile(v) for k, v in kwargs.items()},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return f"{document_type}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def memoized_report(document_type: str):
+    """Memoizácia generate_* metód (generated_at sa v rámci TTL nemení)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = render_cache_key(document_type, args, kwargs)
+            cached = _pdf_cache.get(key)
+            if cached is not None:
+                return cached
+            pdf_bytes = func(self, *args, **kwargs)
+            _pdf_cache.set(key, pdf_bytes)
+            return pdf_bytes
+        return wrapper
+    return decorator
+
+
+def get_pdf_cache_stats() -> Dict[str, Any]:
+    return _pdf_cache.stats()
+
 class PDFExportService:
     """Professional PDF export service with bank-grade templates."""
     
-    def __init__(self, template_dir: str = "templates/pdf"):
+    def __init__(self, template_dir: str = PDF_TEMPLATE_DIR):
         self.template_dir = template_dir
-        self.font_config = FontConfiguration()
+        self.env = self._create_environment()
         self.templates = self._load_templates()
         self.css_styles = self._get_professional_css()
     
+    def _create_environment(self) -> Environment:
+        """Jinja environment s bytecode cache (šablóny sa nekompilujú pri každom štarte)"""
+        bytecode_cache = None
+        try:
+            os.makedirs(PDF_TEMPLATE_CACHE_DIR, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(PDF_TEMPLATE_CACHE_DIR)
+        except OSError as e:
+            logger.warning(f"Template bytecode cache disabled: {e}")
+        return Environment(
+            loader=FileSystemLoader(self.template_dir),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+        )
+    
     def _load_templates(self) -> Dict[str, Template]:
-        """Load HTML templates for PDF generation."""
+        """Load (pre-compile) HTML templates for PDF generation."""
         try:
-            env = Environment(loader=FileSystemLoader(self.template_dir))
-            
             templates = {
-                'executive_summary': env.get_template('executive_summary.html'),
-                'company_profile': env.get_template('company_profile.html'),
-                'network_analysis': env.get_template('network_analysis.html'),
-                'risk_assessment': env.get_template('risk_assessment.html'),
-                'comparative_analysis': env.get_template('comparative_analysis.html'),
-                'dashboard_report': env.get_template('dashboard_report.html'),
+                name: self.env.get_template(f'{name}.html') for name in REPORT_TYPES
             }
             
             logger.info(f"Loaded {len(templates)} PDF templates")
@@ -67,14 +232,8 @@ class PDFExportService:
         </html>
         """
         
-        return {
-            'executive_summary': Template(basic_template),
-            'company_profile': Template(basic_template),
-            'network_analysis': Template(basic_template),
-            'risk_assessment': Template(basic_template),
-            'comparative_analysis': Template(basic_template),
-            'dashboard_report': Template(basic_template),
-        }
+        compiled = self.env.from_string(basic_template)
+        return {name: compiled for name in REPORT_TYPES}
     
     def _get_professional_css(self) -> str:
         """Return professional CSS styling for PDF documents."""
@@ -382,6 +541,7 @@ class PDFExportService:
             }
         """
     
+    @memoized_report('executive_summary')
     def generate_executive_summary(
         self, 
         companies: List[Dict], 
@@ -413,6 +573,7 @@ class PDFExportService:
             logger.error(f"Executive summary generation failed: {e}")
             raise
     
+    @memoized_report('company_profile')
     def generate_company_profile(
         self, 
         company_data: Dict, 
@@ -444,6 +605,7 @@ class PDFExportService:
             logger.error(f"Company profile generation failed: {e}")
             raise
     
+    @memoized_report('network_analysis')
     def generate_network_analysis(
         self, 
         graph_data: Dict, 
@@ -469,6 +631,7 @@ class PDFExportService:
             logger.error(f"Network analysis generation failed: {e}")
             raise
     
+    @memoized_report('risk_assessment')
     def generate_risk_assessment(
         self, 
         companies: List[Dict], 
@@ -498,6 +661,7 @@ class PDFExportService:
             logger.error(f"Risk assessment generation failed: {e}")
             raise
     
+    @memoized_report('comparative_analysis')
     def generate_comparative_analysis(
         self, 
         companies: List[Dict],
@@ -523,6 +687,7 @@ class PDFExportService:
             logger.error(f"Comparative analysis generation failed: {e}")
             raise
     
+    @memoized_report('dashboard_report')
     def generate_dashboard_report(
         self,
         dashboard_data: Dict,
@@ -546,15 +711,15 @@ class PDFExportService:
     
     def _render_pdf(self, html_content: str, document_type: str) -> bytes:
         """Render HTML content to PDF with professional styling."""
+        if not WEASYPRINT_AVAILABLE:
+            raise ImportError("weasyprint nie je nainštalovaný. Nainštalujte: pip install weasyprint")
         try:
-            # Create HTML document
-            html = HTML(string=html_content, base_url='.')
-            
-            # Professional CSS styling
-            css = CSS(string=self.css_styles, font_config=self.font_config)
+            # Stylesheet a fonty sú predparsované (raz na proces)
+            font_config, css = get_stylesheet(self.css_styles)
             
             # Render PDF
-            pdf_bytes = html.write_pdf(stylesheets=[css], font_config=self.font_config)
+            html = HTML(string=html_content, base_url=self.template_dir)
+            pdf_bytes = html.write_pdf(stylesheets=[css], font_config=font_config)
             
             logger.info(f"Generated {document_type} PDF: {len(pdf_bytes)} bytes")
             return pdf_bytes
@@ -565,6 +730,9 @@ class PDFExportService:
     
     def _calculate_summary_statistics(self, companies: List[Dict]) -> Dict:
         """Calculate summary statistics for executive summary."""
+        if NUMPY_AVAILABLE and len(companies) >= VECTORIZE_MIN_ROWS:
+            return summary_statistics(CompanyBatch.from_records(companies))
+        
         if not companies:
             return {
                 'total_companies': 0,
@@ -716,18 +884,30 @@ class PDFExportService:
         """Calculate comprehensive risk scores."""
         risk_scores = {}
         
+        # Adjust based on risk factors (rovnaké pre všetky firmy)
+        adjustments = 0
+        if risk_factors.get('financial_health') == 'High Risk':
+            adjustments += 2
+        if risk_factors.get('legal_risks'):
+            adjustments += len(risk_factors['legal_risks'])
+        if risk_factors.get('operational_risks'):
+            adjustments += len(risk_factors['operational_risks']) * 0.5
+        
+        if NUMPY_AVAILABLE and len(companies) >= VECTORIZE_MIN_ROWS:
+            base_scores = [company.get('risk_score', 0) for company in companies]
+            final_scores = np.minimum(10, np.asarray(base_scores, dtype=np.float64) + adjustments)
+            for company, base_score, final_score, level in zip(
+                companies, base_scores, np.round(final_scores, 1).tolist(), risk_levels(final_scores)
+            ):
+                risk_scores[company.get('identifier', '')] = {
+                    'base_score': base_score,
+                    'adjusted_score': final_score,
+                    'risk_level': level
+                }
+            return risk_scores
+        
         for company in companies:
             base_score = company.get('risk_score', 0)
-            
-            # Adjust based on risk factors
-            adjustments = 0
-            if risk_factors.get('financial_health') == 'High Risk':
-                adjustments += 2
-            if risk_factors.get('legal_risks'):
-                adjustments += len(risk_factors['legal_risks'])
-            if risk_factors.get('operational_risks'):
-                adjustments += len(risk_factors['operational_risks']) * 0.5
-            
             final_score = min(10, base_score + adjustments)
             risk_scores[company.get('identifier', '')] = {
                 'base_score': base_score,
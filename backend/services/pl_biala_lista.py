@@ -6,12 +6,11 @@ API dokumentácia: https://wl-api.mf.gov.pl/
 
 import requests
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import make_request_with_proxy
 
-# Cache pre Biała Lista odpovede
-_biala_cache = {}
-_cache_ttl = timedelta(hours=12)  # Kratší TTL pre VAT status (častejšie sa mení)
+_CACHE_PROVIDER = "biala_pl"
 
 
 def get_biala_lista_provider():
@@ -37,12 +36,10 @@ def fetch_biala_lista_pl(nip: str) -> Optional[Dict]:
         Dict s VAT statusom alebo None pri chybe
     """
     # Kontrola cache
-    cache_key = f"biala_pl_{nip}"
-    if cache_key in _biala_cache:
-        cached_data, cached_time = _biala_cache[cache_key]
-        if datetime.now() - cached_time < _cache_ttl:
-            print(f"✅ Cache hit pre Biała Lista {nip}")
-            return cached_data
+    cached_data = provider_cache.get(_CACHE_PROVIDER, nip)
+    if cached_data is not MISS:
+        print(f"✅ Cache hit pre Biała Lista {nip}")
+        return cached_data
     
     # Validácia NIP (10 číslic)
     if not nip or len(nip.replace("-", "").replace(" ", "")) != 10:
@@ -72,8 +69,12 @@ def fetch_biala_lista_pl(nip: str) -> Optional[Dict]:
         
         if response.status_code == 200:
             data = response.json()
-            _biala_cache[cache_key] = (data, datetime.now())
+            provider_cache.set(_CACHE_PROVIDER, nip, data)
             return data
+        elif response.status_code == 404:
+            print(f"⚠️ {nip} sa nenašlo v Biała Lista")
+            provider_cache.set_not_found(_CACHE_PROVIDER, nip)
+            return None
         else:
             # Fallback na simulované dáta pre MVP
             print(f"⚠️ Biała Lista API neodpovedá (status {response.status_code}), používam fallback")
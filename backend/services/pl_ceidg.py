@@ -6,12 +6,11 @@ API dokumentácia: https://api.ceidg.gov.pl/
 
 import requests
 from typing import Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import make_request_with_proxy
 
-# Cache pre CEIDG odpovede
-_ceidg_cache = {}
-_cache_ttl = timedelta(hours=24)
+_CACHE_PROVIDER = "ceidg_pl"
 
 
 def get_ceidg_provider():
@@ -37,12 +36,10 @@ def fetch_ceidg_pl(ceidg_number: str) -> Optional[Dict]:
         Dict s dátami živnostníka alebo None pri chybe
     """
     # Kontrola cache
-    cache_key = f"ceidg_pl_{ceidg_number}"
-    if cache_key in _ceidg_cache:
-        cached_data, cached_time = _ceidg_cache[cache_key]
-        if datetime.now() - cached_time < _cache_ttl:
-            print(f"✅ Cache hit pre CEIDG {ceidg_number}")
-            return cached_data
+    cached_data = provider_cache.get(_CACHE_PROVIDER, ceidg_number)
+    if cached_data is not MISS:
+        print(f"✅ Cache hit pre CEIDG {ceidg_number}")
+        return cached_data
     
     # Validácia
     if not ceidg_number or len(ceidg_number) < 9:
@@ -73,8 +70,12 @@ def fetch_ceidg_pl(ceidg_number: str) -> Optional[Dict]:
         
         if response.status_code == 200:
             data = response.json()
-            _ceidg_cache[cache_key] = (data, datetime.now())
+            provider_cache.set(_CACHE_PROVIDER, ceidg_number, data)
             return data
+        elif response.status_code == 404:
+            print(f"⚠️ {ceidg_number} sa nenašlo v CEIDG")
+            provider_cache.set_not_found(_CACHE_PROVIDER, ceidg_number)
+            return None
         else:
             # Fallback na simulované dáta pre MVP
             print(f"⚠️ CEIDG API neodpovedá (status {response.status_code}), používam fallback")
@@ -5,13 +5,12 @@ API dokumentácia: https://api-krs.ms.gov.pl/api/krs
 
 import requests
 from typing import Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import make_request_with_proxy
 
-# Cache pre KRS odpovede
-_krs_cache = {}
-_cache_ttl = timedelta(hours=24)
+_CACHE_PROVIDER = "krs_pl"
 
 
 def get_krs_provider():
@@ -37,12 +36,10 @@ def fetch_krs_pl(krs_number: str) -> Optional[Dict]:
         Dict s dátami firmy alebo None pri chybe
     """
     # Kontrola cache
-    cache_key = f"krs_pl_{krs_number}"
-    if cache_key in _krs_cache:
-        cached_data, cached_time = _krs_cache[cache_key]
-        if datetime.now() - cached_time < _cache_ttl:
-            print(f"✅ Cache hit pre KRS {krs_number}")
-            return cached_data
+    cached_data = provider_cache.get(_CACHE_PROVIDER, krs_number)
+    if cached_data is not MISS:
+        print(f"✅ Cache hit pre KRS {krs_number}")
+        return cached_data
     
     # Validácia KRS čísla (9 alebo 10 miest)
     if not krs_number or not re.match(r'^\d{9,10}$', krs_number):
@@ -71,10 +68,11 @@ def fetch_krs_pl(krs_number: str) -> Optional[Dict]:
         if response.status_code == 200:
             data = response.json()
             # Uložiť do cache
-            _krs_cache[cache_key] = (data, datetime.now())
+            provider_cache.set(_CACHE_PROVIDER, krs_number, data)
             return data
         elif response.status_code == 404:
             print(f"⚠️ KRS {krs_number} sa nenašlo v registri")
+            provider_cache.set_not_found(_CACHE_PROVIDER, krs_number)
             return None
         else:
             print(f"⚠️ KRS API chyba: {response.status_code}")
@@ -197,7 +195,4 @@ def is_polish_krs(query: str) -> bool:
 
 def get_cache_stats() -> Dict:
     """Vráti štatistiky cache."""
-    return {
-        "cached_items": len(_krs_cache),
-        "cache_ttl_hours": _cache_ttl.total_seconds() / 3600
-    }
+    return provider_cache.get_stats(_CACHE_PROVIDER)
@@ -0,0 +1,267 @@
+"""
+Provider Cache pre ILUMINATI SYSTEM
+Spoločná cache výsledkov registrových providerov (ARES, RPO, ORSR, ZRSR,
+RUZ, KRS, CEIDG, Biała Lista, NAV, dlhové registre) a negatívnych
+výsledkov vyhľadávania.
+
+- TTL per provider (PROVIDER_TTLS), negatívna cache pre "nenájdené" (404)
+  s kratším TTL, aby sa neexistujúce IČO neskúšalo stále dokola
+- L1: in-process LRU ohraničená počtom záznamov aj odhadom bajtov
+- L2: Redis (ak je dostupný) - zdieľaná medzi workermi, nový worker
+  nezačína so studenou cache
+- jednotné štatistiky hits/misses per provider pre /api/cache/stats
+
+Použitie v provideri:
+
+    cached = provider_cache.get("krs_pl", krs_number)
+    if cached is not MISS:
+        return cached  # None = negatívny hit
+    ...
+    provider_cache.set("krs_pl", krs_number, data)      # 200
+    provider_cache.set_not_found("krs_pl", krs_number)  # 404
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    from services.redis_cache import get_redis_client, redis_delete, redis_get, redis_set
+
+    REDIS_AVAILABLE = True
+except (ImportError, Exception):
+    REDIS_AVAILABLE = False
+    get_redis_client = redis_delete = redis_get = redis_set = None
+
+# Konfigurácia
+PROVIDER_CACHE_MAX_ITEMS = int(os.getenv("PROVIDER_CACHE_MAX_ITEMS", "10000"))
+PROVIDER_CACHE_MAX_BYTES = int(os.getenv("PROVIDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PROVIDER_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("PROVIDER_CACHE_NEGATIVE_TTL_SECONDS", "3600"))
+# L1 záznam prevzatý z Redis nepozná zostávajúce TTL - drží sa najviac takto dlho
+PROVIDER_CACHE_L2_REFILL_SECONDS = int(os.getenv("PROVIDER_CACHE_L2_REFILL_SECONDS", "3600"))
+
+PROVIDER_TTLS: Dict[str, timedelta] = {
+    "ares_cz": timedelta(hours=24),
+    "rpo_sk": timedelta(hours=24),
+    "orsr_sk": timedelta(hours=12),
+    "zrsr_sk": timedelta(hours=24),
+    "ruz_sk": timedelta(hours=24),
+    "krs_pl": timedelta(hours=24),
+    "ceidg_pl": timedelta(hours=24),
+    "biala_pl": timedelta(hours=12),  # VAT status sa mení častejšie
+    "nav_hu": timedelta(hours=24),
+    "debt": timedelta(hours=12),  # dlhy sa menia častejšie
+    # Čiastkové kontroly a reporty /api/audit
+    "audit_debts": timedelta(hours=12),
+    "audit_address": timedelta(days=7),
+    "audit_report": timedelta(days=7),  # čerstvosť riadi AUDIT_REPORT_FRESH_SECONDS + fingerprint
+    # Len negatívne záznamy /api/search (identifikátor nenájdený v žiadnom registri)
+    "search": timedelta(hours=1),
+}
+DEFAULT_TTL = timedelta(hours=24)
+
+_REDIS_PREFIX = "provider:"
+
+
+class _Miss:
+    """Sentinel pre cache miss (None je platný negatívny hit)"""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISS"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISS = _Miss()
+
+_STAT_FIELDS = ("hits", "negative_hits", "l2_hits", "misses", "sets", "evictions")
+
+
+def _estimate_size(value: Any) -> int:
+    """Odhad veľkosti záznamu v bajtoch (JSON reprezentácia)"""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class ProviderCache:
+    """
+    LRU cache výsledkov providerov s TTL per provider, negatívnymi záznamami
+    a Redis L2. Thread-safe (provideri bežia aj v asyncio.to_thread).
+    """
+
+    def __init__(
+        self,
+        max_items: int = PROVIDER_CACHE_MAX_ITEMS,
+        max_bytes: int = PROVIDER_CACHE_MAX_BYTES,
+        negative_ttl_seconds: int = PROVIDER_CACHE_NEGATIVE_TTL_SECONDS,
+        use_redis: bool = True,
+    ):
+        # kľúč -> (hodnota, expirácia monotonic, veľkosť, negatívny)
+        self._entries: "OrderedDict[str, Tuple[Any, float, int, bool]]" = OrderedDict()
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._negative_ttl = negative_ttl_seconds
+        self._redis_enabled = REDIS_AVAILABLE and use_redis
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _key(provider: str, key: str) -> str:
+        return f"{provider}:{key}"
+
+    @staticmethod
+    def ttl_for(provider: str) -> timedelta:
+        return PROVIDER_TTLS.get(provider, DEFAULT_TTL)
+
+    def _redis_active(self) -> bool:
+        return self._redis_enabled and get_redis_client() is not None
+
+    def _count(self, provider: str, field: str) -> None:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = self._stats[provider] = dict.fromkeys(_STAT_FIELDS, 0)
+        stats[field] += 1
+
+    def get(self, provider: str, key: str) -> Any:
+        """
+        Vráti uložený výsledok, None pre negatívny záznam alebo MISS.
+        """
+        cache_key = self._key(provider, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                value, expiry, _, negative = entry
+                if now < expiry:
+                    self._entries.move_to_end(cache_key)
+                    self._count(provider, "negative_hits" if negative else "hits")
+                    return value
+                self._drop(cache_key)
+
+        if self._redis_active():
+            stored = redis_get(_REDIS_PREFIX + cache_key)
+            if isinstance(stored, dict) and ("value" in stored or stored.get("not_found")):
+                negative = bool(stored.get("not_found"))
+                value = None if negative else stored["value"]
+                ttl = min(self._ttl_seconds(provider, negative), PROVIDER_CACHE_L2_REFILL_SECONDS)
+                with self._lock:
+                    self._store(provider, cache_key, value, ttl, negative)
+                    self._count(provider, "l2_hits")
+                    self._count(provider, "negative_hits" if negative else "hits")
+                return value
+
+        with self._lock:
+            self._count(provider, "misses")
+        return MISS
+
+    def set(self, provider: str, key: str, value: Any, ttl: Optional[timedelta] = None) -> None:
+        """Uloží úspešný výsledok (L1 aj L2)."""
+        if value is None:
+            self.set_not_found(provider, key)
+            return
+        seconds = ttl.total_seconds() if ttl is not None else self._ttl_seconds(provider, False)
+        self._set(provider, key, value, seconds, False)
+
+    def set_not_found(self, provider: str, key: str) -> None:
+        """Negatívny záznam - register subjekt nepozná (404 / nenájdené)."""
+        self._set(provider, key, None, self._ttl_seconds(provider, True), True)
+
+    def delete(self, provider: str, key: str) -> None:
+        cache_key = self._key(provider, key)
+        with self._lock:
+            self._drop(cache_key)
+        if self._redis_active():
+            redis_delete(_REDIS_PREFIX + cache_key)
+
+    def clear(self, provider: Optional[str] = None) -> None:
+        """Vyčistí L1 a štatistiky (celú cache alebo jedného providera)."""
+        with self._lock:
+            if provider is None:
+                self._entries.clear()
+                self._stats.clear()
+                self._bytes = 0
+                return
+            self._stats.pop(provider, None)
+            prefix = f"{provider}:"
+            for cache_key in [k for k in self._entries if k.startswith(prefix)]:
+                self._drop(cache_key)
+
+    def get_stats(self, provider: Optional[str] = None) -> Dict:
+        """Štatistiky celej cache alebo jedného providera."""
+        with self._lock:
+            if provider is not None:
+                return self._provider_stats(provider)
+            providers = sorted(set(PROVIDER_TTLS) | set(self._stats))
+            return {
+                "items": len(self._entries),
+                "bytes": self._bytes,
+                "max_items": self._max_items,
+                "max_bytes": self._max_bytes,
+                "negative_ttl_seconds": self._negative_ttl,
+                "redis_enabled": self._redis_enabled,
+                "providers": {name: self._provider_stats(name) for name in providers},
+            }
+
+    def _provider_stats(self, provider: str) -> Dict:
+        stats = dict(self._stats.get(provider) or dict.fromkeys(_STAT_FIELDS, 0))
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        prefix = f"{provider}:"
+        stats["items"] = sum(1 for k in self._entries if k.startswith(prefix))
+        stats["hit_rate"] = ((stats["hits"] + stats["negative_hits"]) / lookups * 100) if lookups else 0.0
+        stats["ttl_hours"] = self.ttl_for(provider).total_seconds() / 3600
+        return stats
+
+    def _ttl_seconds(self, provider: str, negative: bool) -> float:
+        ttl = self.ttl_for(provider).total_seconds()
+        return min(ttl, self._negative_ttl) if negative else ttl
+
+    def _set(self, provider: str, key: str, value: Any, ttl_seconds: float, negative: bool) -> None:
+        cache_key = self._key(provider, key)
+        with self._lock:
+            self._store(provider, cache_key, value, ttl_seconds, negative)
+            self._count(provider, "sets")
+
+        if self._redis_active():
+            payload = {"not_found": True} if negative else {"value": value}
+            # Jitter proti súčasnej expirácii (stampede) ako v TieredCache
+            redis_set(_REDIS_PREFIX + cache_key, payload, max(1, int(ttl_seconds * random.uniform(0.9, 1.1))))
+
+    def _store(self, provider: str, cache_key: str, value: Any, ttl_seconds: float, negative: bool) -> None:
+        """Vloží záznam do L1 a vyhodí najstaršie nad limit (volať pod zámkom)."""
+        self._drop(cache_key)
+        size = _estimate_size(value) + len(cache_key)
+        if size > self._max_bytes:
+            return  # samotný záznam je väčší ako celá cache
+        self._entries[cache_key] = (value, time.monotonic() + ttl_seconds, size, negative)
+        self._bytes += size
+        while len(self._entries) > self._max_items or self._bytes > self._max_bytes:
+            old_key, (_, _, old_size, _) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self._count(old_key.split(":", 1)[0], "evictions")
+
+    def _drop(self, cache_key: str) -> None:
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+# Singleton pre celú aplikáciu
+provider_cache = ProviderCache()
+
+
+def get_provider_cache_stats() -> Dict:
+    return provider_cache.get_stats()
@@ -91,6 +91,27 @@ def redis_get(key: str) -> Optional[Any]:
         return None
 
 
+def redis_get_raw(key: str) -> Optional[str]:
+    """
+    Získa hodnotu z Redis bez JSON deserializácie (pre-serializované odpovede).
+
+    Args:
+        key: Cache kľúč
+
+    Returns:
+        Uložený reťazec alebo None ak neexistuje
+    """
+    client = get_redis_client()
+    if not client:
+        return None
+
+    try:
+        return client.get(key)
+    except Exception as e:
+        print(f"⚠️ Redis get error: {e}")
+        return None
+
+
 def redis_set(key: str, value: Any, ttl: int = 3600) -> bool:
     """
     Uloží hodnotu do Redis cache.
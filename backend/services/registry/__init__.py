@@ -0,0 +1,41 @@
+"""
+Registry router - pluggable V4 registre firiem
+
+Providery deklarujú tvar identifikátora a cenu volania, router z nich
+zostaví routovaciu tabuľku (dĺžka, krajina) -> registre. /api/search,
+batch screening, watchlist aj v2 API volajú jeden lookup().
+"""
+
+from typing import Optional
+
+from .base_provider import BaseRegistryProvider, CompanyRecord, RegistryUnavailableError
+from .fixtures import TEST_FIXTURES
+from .graph import build_record_graph, expand_record_graph, record_to_graph
+from .providers import DEFAULT_PROVIDERS
+from .router import RegistryRouter
+
+__all__ = [
+    "BaseRegistryProvider",
+    "CompanyRecord",
+    "RegistryRouter",
+    "RegistryUnavailableError",
+    "build_record_graph",
+    "expand_record_graph",
+    "get_registry_router",
+    "record_to_graph",
+]
+
+_registry_router: Optional[RegistryRouter] = None
+
+
+def get_registry_router() -> RegistryRouter:
+    """Singleton router s V4 registrami a testovacími identifikátormi"""
+    global _registry_router
+    if _registry_router is None:
+        router = RegistryRouter()
+        for provider_class in DEFAULT_PROVIDERS:
+            router.register(provider_class())
+        for identifier, builder in TEST_FIXTURES.items():
+            router.register_fixture(identifier, builder)
+        _registry_router = router
+    return _registry_router
@@ -0,0 +1,110 @@
+"""
+Base class pre registrové providery a normalizovaný záznam firmy
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from services.error_handler import ExternalAPIError
+
+
+class RegistryUnavailableError(ExternalAPIError):
+    """Register neodpovedal (výpadok, timeout, 5xx) - na rozdiel od None to neznamená 'firma neexistuje'"""
+
+    def __init__(self, registry: str, reason: str = ""):
+        message = f"Register {registry} je dočasne nedostupný" + (f": {reason}" if reason else "")
+        super().__init__(message, code="REGISTRY_UNAVAILABLE", status_code=503)
+        self.registry = registry
+
+
+@dataclass
+class CompanyRecord:
+    """Výsledok lookupu v registri - rovnaký tvar pre všetky krajiny"""
+
+    country: str
+    identifier: str
+    name: str
+    source: str
+    legal_form: str = ""
+    status: str = ""
+    address: Any = ""  # text alebo štruktúrovaná adresa (ORSR)
+    founded: str = ""
+    dic: str = ""
+    ic_dph: str = ""
+    vat_status: str = ""
+    executives: List[Any] = field(default_factory=list)
+    shareholders: List[Any] = field(default_factory=list)
+    executive_people: List[Dict[str, Any]] = field(default_factory=list)
+    shareholder_people: List[Dict[str, Any]] = field(default_factory=list)
+    risk_score: int = 3
+    debt: Optional[Dict[str, Any]] = None  # výsledok search_debt_registers
+    fallback: bool = False  # register nedostupný - záznam nesie len identifikátor
+    graph: Optional[Dict[str, List[Dict[str, Any]]]] = None  # hotový graf (testovacie IČO)
+
+    @property
+    def has_debt(self) -> bool:
+        return bool(self.debt and self.debt.get("data", {}).get("has_debt"))
+
+    @property
+    def total_debt(self) -> Optional[float]:
+        if not self.debt:
+            return None
+        return float(self.debt.get("data", {}).get("total_debt") or 0)
+
+    @property
+    def address_text(self) -> str:
+        if isinstance(self.address, dict):
+            parts = (self.address.get(key) for key in ("street", "city", "postal_code"))
+            return ", ".join(part for part in parts if part)
+        return self.address or ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plochý dict firmy (watchlist snapshot, v2 API, company_cache)"""
+        data = asdict(self)
+        data.pop("graph")
+        data["address"] = self.address_text
+        data["debt"] = self.total_debt
+        return data
+
+
+class BaseRegistryProvider(ABC):
+    """
+    Base class pre všetky registrové providery.
+
+    Provider deklaruje, aké identifikátory pozná (dĺžky a regex) a relatívnu
+    cenu volania - router z toho pri registrácii zostaví routovaciu tabuľku.
+    """
+
+    country: str = ""
+    name: str = ""
+    # Dĺžky číselných identifikátorov, ktoré register pozná
+    identifier_lengths: Tuple[int, ...] = ()
+    # Doplnková kontrola tvaru (napr. vylúčenie samých núl)
+    pattern: Optional[Pattern[str]] = None
+    # Relatívna cena volania - lacnejšie registre sa skúšajú skôr
+    cost: int = 1
+
+    def accepts(self, identifier: str) -> bool:
+        """Má zmysel volať register pre tento identifikátor?"""
+        if len(identifier) not in self.identifier_lengths:
+            return False
+        return self.pattern is None or bool(self.pattern.match(identifier))
+
+    @abstractmethod
+    def fetch(self, identifier: str, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        """
+        Synchrónny lookup firmy podľa identifikátora
+
+        Returns:
+            CompanyRecord alebo None, ak firma v registri neexistuje
+            (router potom skúsi ďalší register)
+        """
+
+    def search(self, query: str, limit: int = 10) -> List[CompanyRecord]:
+        """Vyhľadanie podľa názvu - väčšina registrov ho nepodporuje"""
+        return []
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.country}:{self.name} cost={self.cost}>"
+
@@ -0,0 +1,89 @@
+"""
+Testovacie identifikátory s pevným grafom (demo, E2E testy frontendu)
+
+- 88888888: komplexná SK štruktúra (dcérske firmy, spoločný konateľ, dlh)
+- 35855304: detailné ORSR dáta firmy v likvidácii s historickým názvom
+"""
+
+from typing import Any, Dict, List
+
+from .base_provider import CompanyRecord
+
+
+def _node(id: str, label: str, type: str, country: str = "SK", risk_score: int = 0, details: str = "", **extra) -> Dict[str, Any]:
+    return {"id": id, "label": label, "type": type, "country": country, "risk_score": risk_score, "details": details, **extra}
+
+
+def _edge(source: str, target: str, type: str) -> Dict[str, str]:
+    return {"source": source, "target": target, "type": type}
+
+
+def generate_test_data_sk(ico: str) -> CompanyRecord:
+    """
+    Generuje testovacie dáta pre slovenské IČO 88888888.
+    Simuluje komplexnú štruktúru s viacerými firmami, osobami a vzťahmi.
+    """
+    company_id = f"sk_{ico}"
+    nodes: List[Dict[str, Any]] = [
+        _node(company_id, "Testovacia Spoločnosť s.r.o.", "company", risk_score=7,  # Vysoké riziko pre test
+              details=f"IČO: {ico}, Status: Aktívna, DPH: Áno"),
+        _node(f"addr_{ico}_main", "Bratislava, Hlavná 1", "address", risk_score=3,  # Virtual seat flag
+              details="Hlavná 1, 811 01 Bratislava (Virtual Seat - 52 firiem na adrese)"),
+        _node(f"pers_{ico}_1", "Ján Novák", "person", risk_score=5, details="Konateľ, 15+ firiem v registri"),
+        _node(f"pers_{ico}_2", "Peter Horváth", "person", risk_score=4, details="Spoločník, 8% podiel"),
+        _node("cz_12345678", "Dcérska Firma CZ s.r.o.", "company", country="CZ", risk_score=6,
+              details="IČO: 12345678, Vlastníctvo: 100%"),
+        _node("sk_77777777", "Sesterská Spoločnosť s.r.o.", "company", risk_score=8,
+              details="IČO: 77777777, Status: Likvidácia, Dlh: 15,000 EUR"),
+        _node("addr_77777777", "Košice, Mierová 5", "address", details="Mierová 5, 040 01 Košice"),
+        # Spoločný konateľ medzi firmami
+        _node(f"pers_{ico}_shared", "Mária Kováčová", "person", risk_score=6,
+              details="Konateľ v 12+ firmách (White Horse Detector)"),
+        _node(f"debt_{ico}", "Dlh Finančnej správe", "debt", risk_score=9,
+              details="Dlh: 25,000 EUR, Finančná správa SR"),
+    ]
+    edges = [
+        _edge(company_id, f"addr_{ico}_main", "LOCATED_AT"),
+        _edge(company_id, f"pers_{ico}_1", "MANAGED_BY"),
+        _edge(company_id, f"pers_{ico}_2", "OWNED_BY"),
+        _edge(company_id, "cz_12345678", "OWNED_BY"),
+        _edge(company_id, "sk_77777777", "OWNED_BY"),
+        _edge("sk_77777777", "addr_77777777", "LOCATED_AT"),
+        _edge("sk_77777777", f"pers_{ico}_shared", "MANAGED_BY"),
+        _edge("cz_12345678", f"pers_{ico}_shared", "MANAGED_BY"),
+        _edge(company_id, f"debt_{ico}", "HAS_DEBT"),
+    ]
+    return CompanyRecord(
+        country="SK", identifier=ico, name="Testovacia Spoločnosť s.r.o.", source="fixture",
+        status="Aktívna", risk_score=7, graph={"nodes": nodes, "edges": edges},
+    )
+
+
+def generate_liquidation_data_sk(ico: str) -> CompanyRecord:
+    """Detailné ORSR dáta pre IČO 35855304 (firma v likvidácii, historický názov)"""
+    company_id = f"sk_{ico}"
+    nodes = [
+        _node(company_id, "Agentúra Viky s.r.o v likvidácii", "company", risk_score=8, ico=ico,
+              details=f"IČO: {ico}, Status: Aktívna, Forma: Spoločnosť s ručením obmedzeným, "
+                      "Registrový súd: Mestský súd Bratislava III, Oddiel, vložka, súd: Sro 28558/B, "
+                      "Deň zápisu: 10.4.2003, Deň výmazu: 19.12.2025"),
+        _node(f"addr_sk_{ico}", "Strmý vŕšok 59, Bratislava, 841 07", "address",
+              details="Sídlo: Strmý vŕšok 59, Bratislava, 841 07, od: 10.04.2003 do: 18.12.2025"),
+        _node(f"history_sk_{ico}", "Historický názov: Agentúra Viky, s.r.o.", "company",
+              details="Historický údaj Obchodné meno: Agentúra Viky, s.r.o., od: 10.04.2003 do: 16.12.2024"),
+    ]
+    edges = [
+        _edge(company_id, f"addr_sk_{ico}", "LOCATED_AT"),
+        _edge(company_id, f"history_sk_{ico}", "HISTORICAL_NAME"),
+    ]
+    return CompanyRecord(
+        country="SK", identifier=ico, name="Agentúra Viky s.r.o v likvidácii", source="fixture",
+        legal_form="Spoločnosť s ručením obmedzeným", status="v likvidácii", risk_score=8,
+        address="Strmý vŕšok 59, Bratislava, 841 07", graph={"nodes": nodes, "edges": edges},
+    )
+
+
+TEST_FIXTURES = {
+    "88888888": generate_test_data_sk,
+    "35855304": generate_liquidation_data_sk,
+}
@@ -0,0 +1,161 @@
+"""
+CompanyRecord -> graf pre /api/search (nodes/edges) a zápis do grafovej DB
+
+Jeden builder pre všetky krajiny - ID uzlov ostávajú stabilné
+({krajina}_{identifikátor}, address_node_id, pers_/share_ prefixy).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.address_normalizer import address_node_id
+from services.graph_service import graph_service
+
+from .base_provider import CompanyRecord
+
+MAX_EXECUTIVES = 5
+MAX_SHAREHOLDERS = 3
+
+_ID_LABELS = {"HU": "Adószám", "PL": "KRS"}
+_EXECUTIVE_TITLES = {"HU": "Igazgató", "PL": "Zarządca"}
+# Mena a správca dane pre uzol dlhu
+_DEBT_AUTHORITIES = {"SK": ("EUR", "SR"), "CZ": ("CZK", "ČR")}
+
+Graph = Dict[str, List[Dict[str, Any]]]
+
+
+def _node(id: str, label: str, type: str, country: str, risk_score: int = 0, details: str = "", **extra) -> Dict[str, Any]:
+    return {"id": id, "label": label, "type": type, "country": country, "risk_score": risk_score, "details": details, **extra}
+
+
+def _person(item: Any, default_name: str, default_role: str, share: bool = False) -> Tuple[str, str]:
+    """Meno a popis osoby (ORSR vracia dict s funkciou/podielom, ostatné registre text)"""
+    if not isinstance(item, dict):
+        return (item if isinstance(item, str) and item else default_name), default_role
+    details = []
+    if share and item.get("percentage"):
+        details.append(f"{item['percentage']}% podiel")
+    if not share and item.get("position"):
+        details.append(item["position"])
+    if item.get("since"):
+        details.append(f"od {item['since']}")
+    return item.get("name") or default_name, ", ".join(details) or default_role
+
+
+def record_address_id(record: CompanyRecord) -> Optional[str]:
+    """ID uzla adresy - rovnaké ako v grafovej DB, aby sedel počet firiem na adrese"""
+    if not record.address_text:
+        return None
+    return address_node_id(record.address, record.country) or f"addr_{record.country.lower()}_{record.identifier}"
+
+
+def record_to_graph(record: CompanyRecord, address_counts: Optional[Dict[str, int]] = None) -> Graph:
+    """Graf firmy z normalizovaného záznamu (fixtures vracajú vlastný hotový graf)"""
+    if record.graph is not None:
+        return record.graph
+
+    country, identifier = record.country, record.identifier
+    company_id = f"{country.lower()}_{identifier}"
+    id_label = _ID_LABELS.get(country, "IČO")
+
+    if record.fallback:
+        return {
+            "nodes": [_node(company_id, record.name, "company", country, record.risk_score, f"{id_label}: {identifier}", ico=identifier)],
+            "edges": [],
+        }
+
+    details = [f"{id_label}: {identifier}"]
+    for label, value in (
+        ("Status", record.status),
+        ("Forma", record.legal_form),
+        ("Založená", record.founded),
+        ("DIČ", record.dic),
+        ("IČ DPH", record.ic_dph),
+        ("VAT", record.vat_status),
+    ):
+        if value:
+            details.append(f"{label}: {value}")
+
+    nodes = [_node(company_id, record.name, "company", country, record.risk_score, ", ".join(details), ico=identifier)]
+    edges: List[Dict[str, str]] = []
+
+    if record.has_debt:
+        currency, authority = _DEBT_AUTHORITIES.get(country, ("EUR", country))
+        total_debt = record.total_debt or 0
+        debt_id = f"debt_{country.lower()}_{identifier}"
+        nodes.append(_node(
+            debt_id, f"Dlh: {total_debt:,.0f} {currency}", "debt", country, record.debt.get("risk_score", 0),
+            f"Dlh voči Finančnej správe {authority}: {total_debt:,.0f} {currency}",
+        ))
+        edges.append({"source": company_id, "target": debt_id, "type": "HAS_DEBT"})
+
+    address_id = record_address_id(record)
+    if address_id:
+        address_text = record.address_text
+        address_details = f"Adresa: {address_text}"
+        company_count = (address_counts or {}).get(address_id, 0)
+        if company_count > 1:
+            address_details += f", firiem na adrese: {company_count}"
+        label = address_text if len(address_text) <= 50 else address_text[:47] + "..."
+        nodes.append(_node(address_id, label, "address", country, details=address_details))
+        edges.append({"source": company_id, "target": address_id, "type": "LOCATED_AT"})
+
+    executive_title = _EXECUTIVE_TITLES.get(country, "Konateľ")
+    for i, item in enumerate(record.executives[:MAX_EXECUTIVES]):
+        name, role = _person(item, f"{executive_title} {i + 1}", executive_title)
+        person_id = f"pers_{country.lower()}_{identifier}_{i}"
+        nodes.append(_node(person_id, name, "person", country, 5 if len(record.executives) > 10 else 2, role))
+        edges.append({"source": company_id, "target": person_id, "type": "MANAGED_BY"})
+
+    for i, item in enumerate(record.shareholders[:MAX_SHAREHOLDERS]):
+        name, role = _person(item, f"Spoločník {i + 1}", "Spoločník", share=True)
+        share_id = f"share_{country.lower()}_{identifier}_{i}"
+        nodes.append(_node(share_id, name, "person", country, 3, role))
+        edges.append({"source": company_id, "target": share_id, "type": "OWNED_BY"})
+
+    return {"nodes": nodes, "edges": edges}
+
+
+def ingest_record(record: CompanyRecord) -> None:
+    """Zápis firmy, adresy a osôb do grafovej DB (podklad pre graph=1 a počty na adrese)"""
+    if record.fallback or record.graph is not None:
+        return
+    address = record.address if isinstance(record.address, dict) else {"raw": record.address_text}
+    try:
+        graph_service.ingest_company_relationships(
+            atlas_id=record.identifier,
+            country=record.country,
+            company_label=record.name,
+            address=address,
+            executives=record.executives,
+            owners=record.shareholders,
+            executive_people=record.executive_people,
+            shareholder_people=record.shareholder_people,
+            source=record.source,
+        )
+    except Exception as e:
+        print(f"⚠️ Graph Ingest Error: {e}")
+
+
+def expand_record_graph(record: CompanyRecord) -> Optional[Graph]:
+    """2nd-hop graf z grafovej DB (graph=1) - None ak nie je k dispozícii"""
+    if record.fallback or record.graph is not None:
+        return None
+    ingest_record(record)
+    try:
+        return graph_service.build_company_graph(record.identifier, record.country)
+    except Exception as e:
+        print(f"⚠️ Graph Build Error, falling back to basic: {e}")
+        return None
+
+
+def build_record_graph(record: CompanyRecord) -> Tuple[Graph, Dict[str, int]]:
+    """
+    Zapíše záznam do grafovej DB a vráti graf pre odpoveď.
+
+    Returns:
+        (graf, počet firiem na adrese podľa ID uzla adresy)
+    """
+    ingest_record(record)
+    address_id = record_address_id(record)
+    address_counts = graph_service.count_companies_at_addresses([address_id]) if address_id and not record.fallback else {}
+    return record_to_graph(record, address_counts), address_counts
@@ -0,0 +1,231 @@
+"""
+V4 registrové providery - ARES (CZ), RPO/ORSR (SK), NAV (HU), KRS (PL)
+
+Každý provider vracia CompanyRecord vrátane risk score a dlhových registrov,
+takže /api/search, batch screening, watchlist aj v2 API zdieľajú jednu
+cestu lookupu.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+import requests
+
+from services.address_normalizer import is_virtual_seat_address
+from services.debt_registers import search_debt_registers
+from services.hu_nav import calculate_hu_risk_score, fetch_nav_hu, parse_nav_data
+from services.pl_biala_lista import get_vat_status_pl, is_polish_nip
+from services.pl_krs import calculate_pl_risk_score, fetch_krs_pl, parse_krs_data
+from services.provider_cache import MISS, provider_cache
+from services.sk_orsr_provider import get_orsr_provider
+from services.sk_rpo import calculate_sk_risk_score, fetch_rpo_sk, parse_rpo_data
+
+from .base_provider import BaseRegistryProvider, CompanyRecord, RegistryUnavailableError
+
+ARES_SEARCH_URL = "https://ares.gov.cz/ekonomicke-subjekty-v-be/rest/ekonomicke-subjekty/vyhledat"
+
+# Zástupné texty parserov registrov pre chýbajúcu adresu
+_MISSING_ADDRESSES = frozenset({"Adresa neuvedená", "Cím nincs megadva", "Adres nie podano"})
+
+
+def fetch_ares_cz(query: str) -> Dict:
+    """
+    Získa dáta z českého registra ARES (podľa IČO alebo obchodného mena).
+
+    Raises:
+        RegistryUnavailableError: ARES neodpovedal (prázdny výsledok/404 = firma neexistuje)
+    """
+    payload = {
+        "pocet": 5,  # Limit pre MVP
+        "razeni": []
+    }
+
+    if query.isdigit():
+        payload["ico"] = [query]
+        cached = provider_cache.get("ares_cz", query)
+        if cached is not MISS:
+            return cached or {"ekonomickeSubjekty": []}
+    else:
+        payload["obchodniJmeno"] = query
+
+    try:
+        response = requests.post(
+            ARES_SEARCH_URL, json=payload, headers={"Content-Type": "application/json"}, timeout=5
+        )
+        if response.status_code == 404:
+            data = {"ekonomickeSubjekty": []}
+        else:
+            response.raise_for_status()
+            data = response.json()
+    except Exception as e:
+        print(f"Chyba pri volaní ARES: {e}")
+        raise RegistryUnavailableError("ARES", str(e)) from e
+
+    if query.isdigit():
+        # Prázdny výsledok pre IČO = subjekt v ARES neexistuje (negatívna cache)
+        provider_cache.set("ares_cz", query, data if data.get("ekonomickeSubjekty") else None)
+    return data
+
+
+def calculate_trust_score(company_data: Dict, country: str = "CZ") -> int:
+    """
+    Vypočíta rizikové skóre firmy (0-10, kde 10 je max riziko).
+    Bázované na: dph status, dlhy, status firmy, virtuálne sídlo.
+    """
+    score = 3  # Základ: Neutrálne
+
+    # 1. Status firmy
+    status = str(company_data.get("status", "")).lower()
+    if any(k in status for k in ["likvidácia", "konkurz", "zaniknutá", "likvidace", "insolvence"]):
+        score += 5
+
+    # 2. DPH Status (ak vieme detekovať)
+    if not company_data.get("dic") and not company_data.get("ic_dph") and country == "SK":
+        # Ak nemá ani DIČ ani IČ DPH v SK, je to mierne podozrivé pre MVP
+        score += 1
+
+    # 3. Virtuálne sídlo (P.O. box, virtuálna kancelária, coworking)
+    if is_virtual_seat_address(company_data.get("address"), country):
+        score += 3
+
+    return min(score, 10)
+
+
+def _with_debt(record: CompanyRecord) -> CompanyRecord:
+    """Dlhové registre Finančnej správy (SK/CZ) - dlh zvyšuje risk score"""
+    record.debt = search_debt_registers(record.identifier, record.country)
+    if record.has_debt:
+        record.risk_score = max(record.risk_score, record.debt.get("risk_score", 0))
+    return record
+
+
+def _record_from_normalized(data: Dict, country: str, identifier: str, source: str, risk_score: int) -> CompanyRecord:
+    address = data.get("address") or ""
+    return CompanyRecord(
+        country=country,
+        identifier=identifier,
+        name=data.get("name") or f"Firma {identifier}",
+        source=source,
+        legal_form=data.get("legal_form") or "",
+        status=data.get("status") or "",
+        address="" if isinstance(address, str) and address in _MISSING_ADDRESSES else address,
+        founded=data.get("founded") or "",
+        dic=data.get("dic") or "",
+        ic_dph=data.get("ic_dph") or "",
+        executives=data.get("executives") or [],
+        shareholders=data.get("shareholders") or [],
+        executive_people=data.get("executive_people") or [],
+        shareholder_people=data.get("shareholder_people") or [],
+        risk_score=risk_score,
+    )
+
+
+class AresProvider(BaseRegistryProvider):
+    """CZ - ARES (REST API, jediný register s vyhľadávaním podľa mena)"""
+
+    country = "CZ"
+    name = "ARES"
+    identifier_lengths = (8,)
+    cost = 1
+
+    def fetch(self, identifier: str, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        if force_refresh:
+            provider_cache.delete("ares_cz", identifier)
+        items = fetch_ares_cz(identifier).get("ekonomickeSubjekty", [])
+        item = next((r for r in items if r.get("ico") == identifier), None)
+        if not item:
+            return None
+        return _with_debt(self._record(item))
+
+    def search(self, query: str, limit: int = 10) -> List[CompanyRecord]:
+        items = fetch_ares_cz(query).get("ekonomickeSubjekty", [])
+        return [self._record(item) for item in items[:limit] if item.get("ico")]
+
+    def _record(self, item: Dict) -> CompanyRecord:
+        record = CompanyRecord(
+            country="CZ",
+            identifier=item["ico"],
+            name=item.get("obchodniJmeno") or "Neznáma firma",
+            source=self.name,
+            status="Aktívna",  # ARES obvykle vracia len aktívne cez tento endpoint
+            address=item.get("sidlo", {}).get("textovaAdresa", ""),
+        )
+        record.risk_score = calculate_trust_score(
+            {"status": record.status, "address": record.address, "ico": record.identifier}, "CZ"
+        )
+        return record
+
+
+class SlovakRegistryProvider(BaseRegistryProvider):
+    """SK - RPO API, pri nedostupnosti hybridný ORSR provider (cache → DB → scraping)"""
+
+    country = "SK"
+    name = "RPO"
+    identifier_lengths = (8,)
+    cost = 2
+
+    def fetch(self, identifier: str, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        rpo_data = fetch_rpo_sk(identifier)
+        if rpo_data:
+            normalized = parse_rpo_data(rpo_data, identifier)
+            record = _record_from_normalized(
+                normalized, "SK", identifier, "RPO", calculate_sk_risk_score(normalized)
+            )
+            return _with_debt(record)
+
+        print("⚠️ RPO API nedostupné, používam hybridný model (ORSR)...")
+        orsr_data = get_orsr_provider().lookup_by_ico(identifier, force_refresh=force_refresh)
+        if orsr_data:
+            risk_score = max(calculate_sk_risk_score(orsr_data), calculate_trust_score(orsr_data, "SK"))
+            return _with_debt(_record_from_normalized(orsr_data, "SK", identifier, "ORSR", risk_score))
+
+        return CompanyRecord(country="SK", identifier=identifier, name=f"Firma {identifier}", source="fallback", fallback=True)
+
+
+class NavProvider(BaseRegistryProvider):
+    """HU - NAV (adószám 8 alebo 11 číslic)"""
+
+    country = "HU"
+    name = "NAV"
+    identifier_lengths = (8, 11)
+    cost = 3
+
+    def fetch(self, identifier: str, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        nav_data = fetch_nav_hu(identifier)
+        if not nav_data:
+            print("⚠️ NAV API nedostupné, používam fallback dáta")
+            return CompanyRecord(country="HU", identifier=identifier, name=f"Magyar Cég {identifier}", source="fallback", fallback=True)
+        normalized = parse_nav_data(nav_data, identifier)
+        return _record_from_normalized(normalized, "HU", identifier, self.name, calculate_hu_risk_score(normalized))
+
+
+class KrsProvider(BaseRegistryProvider):
+    """PL - KRS + VAT status z Białej Listy"""
+
+    country = "PL"
+    name = "KRS"
+    identifier_lengths = (9, 10)
+    pattern = re.compile(r"^(?!0+$)\d+$")
+    cost = 4  # KRS + Biała Lista = dve volania
+
+    def fetch(self, identifier: str, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        krs_data = fetch_krs_pl(identifier)
+        if not krs_data:
+            print("⚠️ KRS API nedostupné, používam fallback dáta")
+            return CompanyRecord(country="PL", identifier=identifier, name=f"Polska Spółka {identifier}", source="fallback", fallback=True)
+
+        normalized = parse_krs_data(krs_data, identifier)
+        record = _record_from_normalized(normalized, "PL", identifier, self.name, calculate_pl_risk_score(normalized))
+
+        nip = normalized.get("nip") or identifier
+        if is_polish_nip(nip):
+            vat_status = get_vat_status_pl(nip)
+            if vat_status:
+                record.vat_status = vat_status
+                if vat_status != "VAT payer":
+                    record.risk_score = max(record.risk_score, 3)  # Zvýšiť risk ak nie je VAT payer
+        return record
+
+
+# Poradie registrácie rozhoduje pri rovnakej cene
+DEFAULT_PROVIDERS = (AresProvider, SlovakRegistryProvider, NavProvider, KrsProvider)
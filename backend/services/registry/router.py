@@ -0,0 +1,169 @@
+"""
+Registry router - výber registrov podľa tvaru identifikátora a krajiny
+
+Routovacia tabuľka (dĺžka identifikátora, krajina) -> providery zoradené
+podľa ceny sa zostaví raz pri registrácii, takže výber kandidátov je jeden
+dict lookup + kontrola kontrolnej číslice (plausible_countries). Testovacie
+identifikátory (fixtures) majú prednosť pred registrami.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.identifier_validation import plausible_countries
+
+from .base_provider import BaseRegistryProvider, CompanyRecord, RegistryUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Max. súbežných lookupov v batchi (registre sú externé služby)
+REGISTRY_LOOKUP_CONCURRENCY = int(os.getenv("REGISTRY_LOOKUP_CONCURRENCY", "8"))
+
+RouteKey = Tuple[int, Optional[str]]
+Fixture = Callable[[str], CompanyRecord]
+
+
+class RegistryRouter:
+    """Registry providerov a routovacia tabuľka pre lookup podľa identifikátora"""
+
+    def __init__(self):
+        self._providers: List[BaseRegistryProvider] = []
+        self._routes: Dict[RouteKey, Tuple[BaseRegistryProvider, ...]] = {}
+        self._fixtures: Dict[str, Fixture] = {}
+
+    @property
+    def providers(self) -> Tuple[BaseRegistryProvider, ...]:
+        return tuple(self._providers)
+
+    def register(self, provider: BaseRegistryProvider) -> None:
+        """Zaregistruje provider a prepočíta routovaciu tabuľku"""
+        self._providers.append(provider)
+        self._rebuild_routes()
+
+    def register_fixture(self, identifier: str, builder: Fixture) -> None:
+        """Pevná odpoveď pre testovací identifikátor (bez volania registra)"""
+        self._fixtures[identifier] = builder
+
+    def _rebuild_routes(self) -> None:
+        routes: Dict[RouteKey, List[BaseRegistryProvider]] = defaultdict(list)
+        # sorted je stabilný - pri rovnakej cene rozhoduje poradie registrácie
+        for provider in sorted(self._providers, key=lambda p: p.cost):
+            for length in provider.identifier_lengths:
+                routes[(length, None)].append(provider)
+                routes[(length, provider.country)].append(provider)
+        self._routes = {key: tuple(providers) for key, providers in routes.items()}
+
+    def candidates(self, identifier: str, country: Optional[str] = None) -> Tuple[BaseRegistryProvider, ...]:
+        """
+        Registre, ktoré môžu identifikátor poznať (v poradí volania).
+        Prázdny výsledok = identifikátor nemôže existovať (formát/kontrolná číslica).
+        """
+        identifier = identifier.strip()
+        country = country.upper() if country else None
+        route = self._routes.get((len(identifier), country))
+        if not route:
+            return ()
+        plausible = plausible_countries(identifier, country)
+        return tuple(p for p in route if p.country in plausible and p.accepts(identifier))
+
+    def fetch(self, identifier: str, country: Optional[str] = None, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        """
+        Synchrónny lookup - prvý register, ktorý firmu pozná.
+        None = všetky kandidátne registre odpovedali, že firmu nepoznajú.
+
+        Raises:
+            RegistryUnavailableError: firmu nenašiel nikto a aspoň jeden register zlyhal
+        """
+        identifier = identifier.strip()
+        fixture = self._fixtures.get(identifier)
+        if fixture is not None:
+            return fixture(identifier)
+
+        failed: List[str] = []
+        for provider in self.candidates(identifier, country):
+            try:
+                record = provider.fetch(identifier, force_refresh=force_refresh)
+            except Exception as e:
+                logger.warning(f"Registry {provider.name} lookup {identifier} failed: {e}")
+                failed.append(provider.name)
+                continue
+            if record is not None:
+                return record
+        if failed:
+            raise RegistryUnavailableError(", ".join(failed))
+        return None
+
+    async def lookup(self, identifier: str, country: Optional[str] = None, force_refresh: bool = False) -> Optional[CompanyRecord]:
+        """Asynchrónny lookup - synchrónni klienti registrov bežia vo vlákne"""
+        identifier = identifier.strip()
+        if identifier in self._fixtures:
+            return self._fixtures[identifier](identifier)
+        if not self.candidates(identifier, country):
+            return None
+        return await asyncio.to_thread(self.fetch, identifier, country, force_refresh)
+
+    async def lookup_many(
+        self,
+        items: Iterable[Tuple[str, Optional[str]]],
+        concurrency: int = REGISTRY_LOOKUP_CONCURRENCY,
+    ) -> List[Optional[CompanyRecord]]:
+        """
+        Lookup batchu (identifikátor, krajina) s ohraničenou súbežnosťou.
+        Rovnaký identifikátor v batchi sa v registri hľadá raz.
+        """
+        items = [(identifier.strip(), country.upper() if country else None) for identifier, country in items]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def _lookup(identifier: str, country: Optional[str]) -> Optional[CompanyRecord]:
+            async with semaphore:
+                try:
+                    return await self.lookup(identifier, country)
+                except RegistryUnavailableError as e:
+                    # Batch pokračuje - položka ostáva nevyriešená
+                    logger.warning(f"Registry lookup {identifier} unavailable: {e.message}")
+                    return None
+
+        unique = list(dict.fromkeys(items))
+        results = await asyncio.gather(*(_lookup(identifier, country) for identifier, country in unique))
+        by_item = dict(zip(unique, results))
+        return [by_item[item] for item in items]
+
+    async def resolve_references(self, companies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Doplní položky batchu, ktoré nesú len identifikátor ({"identifier", "country"}),
+        dátami z registrov. Položky s dátami firmy ostávajú bez zmeny.
+        """
+        references = [
+            i for i, company in enumerate(companies)
+            if not company.get("company_data") and not company.get("name")
+            and str(company.get("identifier") or company.get("ico") or "").strip()
+        ]
+        if not references:
+            return companies
+        records = await self.lookup_many(
+            (str(companies[i].get("identifier") or companies[i].get("ico")), companies[i].get("country"))
+            for i in references
+        )
+        resolved = list(companies)
+        for i, record in zip(references, records):
+            if record is not None and not record.fallback:
+                resolved[i] = record.to_dict()
+        return resolved
+
+    def search(self, query: str, country: Optional[str] = None, limit: int = 10) -> List[CompanyRecord]:
+        """Vyhľadanie podľa názvu v registroch, ktoré ho podporujú (napr. ARES)"""
+        country = country.upper() if country else None
+        records: List[CompanyRecord] = []
+        for provider in sorted(self._providers, key=lambda p: p.cost):
+            if len(records) >= limit:
+                break
+            if country and provider.country != country:
+                continue
+            try:
+                records.extend(provider.search(query, limit=limit - len(records)))
+            except Exception as e:
+                logger.warning(f"Registry {provider.name} name search failed: {e}")
+        return records[:limit]
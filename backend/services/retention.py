@@ -0,0 +1,249 @@
+"""
+Retention pre search_history a analytics
+Na PostgreSQL sú obe tabuľky natívne particionované po mesiacoch
+(PARTITION BY RANGE, migrácia partition_search_history_analytics):
+
+- rollover: partície na aktuálny + RETENTION_PREMAKE_MONTHS mesiacov dopredu
+- drop: partície staršie ako retention okno sa odpoja a zmažú celé
+  (DETACH + DROP, žiadny DELETE po riadkoch)
+- archív (voliteľne): pred dropom sa každý deň partície uloží ako Parquet
+  (zstd) cez columnar_export - bez IP, len client_hash; ak archív zlyhá,
+  partícia ostáva
+
+Na ostatných dialektoch (SQLite) sa expirované riadky mažú jedným
+DELETE podľa časového rozsahu.
+
+Retention je defaultne vypnutá - mazanie sa zapína explicitne cez
+SEARCH_HISTORY_RETENTION_MONTHS / ANALYTICS_RETENTION_MONTHS (pozri
+docs/DATABASE_SETUP.md).
+"""
+
+import asyncio
+import logging
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from services.database import Analytics, SearchHistory, get_db_session
+
+logger = logging.getLogger(__name__)
+
+# Konfigurácia (0 mesiacov = bez retention, default - opt-in per tabuľka)
+RETENTION_MONTHS = {
+    "search_history": int(os.getenv("SEARCH_HISTORY_RETENTION_MONTHS", "0")),
+    "analytics": int(os.getenv("ANALYTICS_RETENTION_MONTHS", "0")),
+}
+RETENTION_ARCHIVE = os.getenv("RETENTION_ARCHIVE", "true").lower() == "true"
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR")  # default: ANALYTICS_EXPORT_DIR
+RETENTION_PREMAKE_MONTHS = int(os.getenv("RETENTION_PREMAKE_MONTHS", "3"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "21600"))
+
+# Tabuľka -> (model, stĺpec partičného kľúča)
+PARTITIONED_TABLES = {
+    "search_history": (SearchHistory, "search_timestamp"),
+    "analytics": (Analytics, "timestamp"),
+}
+
+_PARTITION_RE = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_RE.search(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def retention_cutoff(table: str, today: Optional[date] = None) -> Optional[date]:
+    """Prvý mesiac, ktorý sa ešte drží (staršie sa mažú). None = bez retention."""
+    months = RETENTION_MONTHS.get(table, 0)
+    if months <= 0:
+        return None
+    return add_months(month_start(today or datetime.utcnow().date()), -months)
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('p', 'r')"),
+        {"name": table},
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(db: Session, table: str) -> List[Tuple[str, date]]:
+    """Mesačné partície tabuľky (bez default partície), zoradené podľa mesiaca"""
+    names = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name"
+        ),
+        {"name": table},
+    ).scalars().all()
+    partitions = [(name, partition_month(name)) for name in names]
+    return sorted((p for p in partitions if p[1] is not None), key=lambda p: p[1])
+
+
+def ensure_partitions(db: Session, table: str, today: Optional[date] = None) -> List[str]:
+    """Rollover: vytvorí chýbajúce partície pre aktuálny mesiac a RETENTION_PREMAKE_MONTHS dopredu"""
+    current = month_start(today or datetime.utcnow().date())
+    created = []
+    existing = {name for name, _ in list_partitions(db, table)}
+    for offset in range(RETENTION_PREMAKE_MONTHS + 1):
+        month = add_months(current, offset)
+        name = partition_name(table, month)
+        if name in existing:
+            continue
+        try:
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            db.commit()
+            created.append(name)
+        except Exception as e:
+            # Typicky riadky toho mesiaca už ležia v default partícii
+            db.rollback()
+            logger.warning(f"Partícia {name} sa nedá vytvoriť: {e}")
+    return created
+
+
+def archive_month(db: Session, table: str, month: date, base_dir: Optional[str] = None) -> int:
+    """Parquet (zstd) archív všetkých dní mesiaca; existujúce denné súbory sa neprepisujú"""
+    from services import columnar_export
+
+    base_dir = base_dir or RETENTION_ARCHIVE_DIR
+    rows = 0
+    day = month
+    while day < add_months(month, 1):
+        if not os.path.exists(columnar_export.partition_path(table, day, base_dir)):
+            rows += columnar_export.export_day(db, table, day, base_dir, overwrite=False)
+        day += timedelta(days=1)
+    return rows
+
+
+def drop_expired_partitions(
+    db: Session,
+    table: str,
+    today: Optional[date] = None,
+    archive: bool = RETENTION_ARCHIVE,
+    base_dir: Optional[str] = None,
+) -> List[str]:
+    """Odpojí a zmaže partície celé staršie ako retention okno"""
+    cutoff = retention_cutoff(table, today)
+    if cutoff is None:
+        return []
+    dropped = []
+    for name, month in list_partitions(db, table):
+        if month >= cutoff:
+            break
+        if archive:
+            try:
+                rows = archive_month(db, table, month, base_dir)
+                logger.info(f"Retention archív {name}: {rows} riadkov")
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Archív {name} zlyhal, partícia ostáva: {e}")
+                continue
+        db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+        logger.info(f"Retention {table}: zmazaná partícia {name} (staršie ako {cutoff.isoformat()})")
+        dropped.append(name)
+    return dropped
+
+
+def delete_expired_rows(
+    db: Session,
+    table: str,
+    today: Optional[date] = None,
+    archive: bool = RETENTION_ARCHIVE,
+    base_dir: Optional[str] = None,
+) -> int:
+    """Fallback bez particionovania: jeden DELETE podľa časového rozsahu"""
+    cutoff = retention_cutoff(table, today)
+    if cutoff is None:
+        return 0
+    model, column_name = PARTITIONED_TABLES[table]
+    column = getattr(model, column_name)
+    cutoff_ts = datetime.combine(cutoff, datetime.min.time())
+    if archive:
+        first = db.query(column).filter(column < cutoff_ts).order_by(column).limit(1).scalar()
+        month = month_start(first.date()) if first else cutoff
+        try:
+            while month < cutoff:
+                archive_month(db, table, month, base_dir)
+                month = add_months(month, 1)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Archív {table} zlyhal, riadky ostávajú: {e}")
+            return 0
+    deleted = db.query(model).filter(column < cutoff_ts).delete(synchronize_session=False)
+    db.commit()
+    if deleted:
+        logger.info(f"Retention {table}: zmazaných {deleted} riadkov starších ako {cutoff.isoformat()}")
+    return deleted
+
+
+def apply_retention(
+    db: Optional[Session] = None,
+    today: Optional[date] = None,
+    archive: bool = RETENTION_ARCHIVE,
+    base_dir: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """Rollover + drop (PostgreSQL partície) alebo DELETE (ostatné) pre všetky tabuľky"""
+    if db is None:
+        with get_db_session() as session:
+            if session is None:
+                return {}
+            return apply_retention(session, today, archive, base_dir)
+
+    report: Dict[str, Dict] = {}
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(db, table):
+            report[table] = {
+                "partitioned": True,
+                "created": ensure_partitions(db, table, today),
+                "dropped": drop_expired_partitions(db, table, today, archive, base_dir),
+            }
+        else:
+            report[table] = {
+                "partitioned": False,
+                "deleted": delete_expired_rows(db, table, today, archive, base_dir),
+            }
+    return report
+
+
+async def run_retention_worker(interval: int = RETENTION_INTERVAL_SECONDS) -> None:
+    """Background loop: rollover partícií a retention"""
+    enabled = {table: months for table, months in RETENTION_MONTHS.items() if months > 0}
+    if enabled:
+        logger.info(f"Retention zapnutá (mesiace): {enabled}")
+    else:
+        logger.info("Retention vypnutá - search_history/analytics sa nemažú (len rollover partícií)")
+    while True:
+        try:
+            report = await asyncio.to_thread(apply_retention)
+            if report:
+                logger.info(f"Retention: {report}")
+        except Exception as e:
+            logger.warning(f"Retention error: {e}")
+        await asyncio.sleep(interval)
@@ -3,7 +3,7 @@ Risk Intelligence služba
 Detekcia bielych koní, karuselových štruktúr a vylepšený risk scoring
 """
 
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from collections import defaultdict, Counter
 
 
@@ -94,32 +94,43 @@ def detect_circular_structures(nodes: List[Dict], edges: List[Dict]) -> List[Lis
     return circular_structures
 
 
-def detect_virtual_seats(nodes: List[Dict], edges: List[Dict]) -> Dict[str, int]:
+def detect_virtual_seats(
+    nodes: List[Dict],
+    edges: List[Dict],
+    address_counts: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
     """
     Detekuje virtuálne sídla - adresy s viacerými firmami.
     
+    Args:
+        address_counts: Presné počty firiem na adresách z grafovej DB
+            (GraphService.count_companies_at_addresses). Bez nich sa počíta
+            len z firiem, ktoré vrátilo aktuálne vyhľadávanie.
+    
     Returns:
         Dict s address_id -> počet firiem
     """
     address_companies = defaultdict(set)
+    node_types = {n.get("id"): n.get("type") for n in nodes}
     
     for edge in edges:
         if edge.get("type") == "LOCATED_AT":
             source = edge.get("source")
             target = edge.get("target")
             
-            source_node = next((n for n in nodes if n.get("id") == source), None)
-            target_node = next((n for n in nodes if n.get("id") == target), None)
-            
-            if source_node and target_node:
-                if source_node.get("type") == "company" and target_node.get("type") == "address":
-                    address_companies[target].add(source)
+            if node_types.get(source) == "company" and node_types.get(target) == "address":
+                address_companies[target].add(source)
+    
+    counts = {address_id: len(companies) for address_id, companies in address_companies.items()}
+    for address_id, count in (address_counts or {}).items():
+        if node_types.get(address_id) == "address":
+            counts[address_id] = max(counts.get(address_id, 0), count)
     
     # Filtrovať adresy s viac ako 3 firmami
     virtual_seats = {
-        address_id: len(companies)
-        for address_id, companies in address_companies.items()
-        if len(companies) >= 3
+        address_id: count
+        for address_id, count in counts.items()
+        if count >= 3
     }
     
     return virtual_seats
@@ -184,16 +195,23 @@ def calculate_enhanced_risk_score(
     return min(score, 10)  # Max 10
 
 
-def generate_risk_report(nodes: List[Dict], edges: List[Dict]) -> Dict:
+def generate_risk_report(
+    nodes: List[Dict],
+    edges: List[Dict],
+    address_counts: Optional[Dict[str, int]] = None
+) -> Dict:
     """
     Generuje kompletný risk report pre graf.
     
+    Args:
+        address_counts: Presné počty firiem na adresách (pozri detect_virtual_seats)
+    
     Returns:
         Dict s risk analýzou
     """
     white_horses = detect_white_horse(nodes, edges)
     circular_structures = detect_circular_structures(nodes, edges)
-    virtual_seats = detect_virtual_seats(nodes, edges)
+    virtual_seats = detect_virtual_seats(nodes, edges, address_counts)
     
     # Vypočítať vylepšené risk scores
     enhanced_nodes = []
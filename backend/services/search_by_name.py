@@ -4,7 +4,7 @@ Vyhľadávanie podľa názvu - Full-text search v lokálnej DB
 
 from typing import Dict, List, Optional
 
-from sqlalchemy import Text, func, or_
+from sqlalchemy import or_
 
 from services.database import CompanyCache, get_db_session
 
@@ -39,7 +39,8 @@ def search_by_name(
     Vyhľadá firmy podľa názvu v lokálnej DB.
 
     Poznámka: Toto je len lokálna DB - nevykonáva live scraping.
-    Firma sa nájde len ak už bola niekedy "objavená" cez IČO.
+    Firma sa nájde ak bola "objavená" cez IČO alebo načítaná z hromadného
+    dumpu registra (scripts/ingest_registry_dump.py).
 
     Args:
         query: Vyhľadávací text (názov firmy)
@@ -72,12 +73,12 @@ def search_by_name(
             # Použiť similarity search (pg_trgm)
             similarity_query = text(
                 """
-                SELECT id, company_name, data, company_data, country, risk_score, 
+                SELECT id, company_name, country, risk_score,
                        updated_at, last_synced_at,
                        similarity(company_name, :query) as sim_score
                 FROM company_cache
                 WHERE company_name % :query
-                   OR CAST(data AS text) % :query
+                   OR address % :query
                 ORDER BY sim_score DESC, updated_at DESC
                 LIMIT :limit
                 """
@@ -114,9 +115,8 @@ def search_by_name(
             db_query = db.query(CompanyCache).filter(
                 or_(
                     CompanyCache.company_name.ilike(search_pattern),
-                    # Môžeme hľadať aj v JSON dátach (adresa, atď.)
-                    # Fix: Použiť správny typ Text bez zátvoriek a ošetriť DB dialekt
-                    func.cast(CompanyCache.data, Text).ilike(search_pattern),
+                    # Adresa je typový stĺpec (payload je komprimovaný)
+                    CompanyCache.address.ilike(search_pattern),
                 )
             )
 
@@ -143,15 +143,13 @@ def search_by_name(
         companies = []
         for company in (results or []):
             try:
-                company_data = company.company_data or company.data or {}
                 companies.append(
                     {
                         "identifier": company.identifier,
                         "country": company.country,
-                        "name": company.company_name
-                        or company_data.get("name", "Neznáma firma"),
-                        "legal_form": company_data.get("legal_form"),
-                        "address": company_data.get("address"),
+                        "name": company.company_name or "Neznáma firma",
+                        "legal_form": company.legal_form,
+                        "address": company.address,
                         "risk_score": company.risk_score,
                         "last_synced_at": company.last_synced_at.isoformat()
                         if hasattr(company, 'last_synced_at') and company.last_synced_at
@@ -189,10 +187,7 @@ def search_by_address(
         if not db:
             return []
 
-        # Hľadať v JSON dátach (adresa)
-        db_query = db.query(CompanyCache).filter(
-            func.cast(CompanyCache.data, Text()).ilike(search_pattern)
-        )
+        db_query = db.query(CompanyCache).filter(CompanyCache.address.ilike(search_pattern))
 
         if country:
             db_query = db_query.filter(CompanyCache.country == country.upper())
@@ -201,8 +196,7 @@ def search_by_address(
 
         companies = []
         for company in results:
-            company_data = company.company_data or company.data or {}
-            address = company_data.get("address", "")
+            address = company.address or ""
 
             # Skontrolovať, či adresa obsahuje query
             if query_normalized in normalize_query(address):
@@ -210,8 +204,7 @@ def search_by_address(
                     {
                         "identifier": company.identifier,
                         "country": company.country,
-                        "name": company.company_name
-                        or company_data.get("name", "Neznáma firma"),
+                        "name": company.company_name or "Neznáma firma",
                         "address": address,
                         "risk_score": company.risk_score,
                     }
@@ -5,16 +5,19 @@ Hybridný model: Cache → DB → Live Scraping
 
 import re
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List, Any
+from typing import TYPE_CHECKING, Dict, Optional, List, Any
 
 import requests
-from bs4 import BeautifulSoup
 
-from services.cache import get, get_cache_key
-from services.cache import set as cache_set
-from services.database import CompanyCache, get_db_session
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+from services.database import CompanyCache, get_db_session, upsert_company_cache
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import get_proxy, mark_proxy_success, mark_proxy_failed
 
+_CACHE_PROVIDER = "orsr_sk"
+
 
 class OrsrProvider:
     """
@@ -48,9 +51,8 @@ class OrsrProvider:
         """
         # 1. Cache vrstva (najrýchlejšia)
         if not force_refresh:
-            cache_key = get_cache_key(f"orsr_sk_{ico}")
-            cached_data = get(cache_key)
-            if cached_data:
+            cached_data = provider_cache.get(_CACHE_PROVIDER, ico)
+            if cached_data is not MISS:
                 print(f"✅ Cache hit pre IČO {ico}")
                 return cached_data
 
@@ -62,7 +64,7 @@ class OrsrProvider:
                     company = (
                         db.query(CompanyCache)
                         .filter(
-                            CompanyCache.identifier == ico, CompanyCache.country == "SK"
+                            CompanyCache.country == "SK", CompanyCache.identifier == ico
                         )
                         .first()
                     )
@@ -73,11 +75,9 @@ class OrsrProvider:
 
                         if days_old < self.DB_REFRESH_DAYS and not force_refresh:
                             print(f"✅ DB hit pre IČO {ico} (staré {days_old} dní)")
-                            data = (
-                                company.company_data or company.data
-                            )  # Fallback na legacy field
+                            data = company.payload
                             # Uložiť do cache
-                            cache_set(cache_key, data, ttl=self.CACHE_TTL)
+                            provider_cache.set(_CACHE_PROVIDER, ico, data, ttl=self.CACHE_TTL)
                             return data
                         else:
                             print(
@@ -93,7 +93,7 @@ class OrsrProvider:
         if live_data:
             # Uložiť do cache
             try:
-                cache_set(cache_key, live_data, ttl=self.CACHE_TTL)
+                provider_cache.set(_CACHE_PROVIDER, ico, live_data, ttl=self.CACHE_TTL)
             except Exception as e:
                 print(f"⚠️ Failed to cache data: {e}")
 
@@ -101,35 +101,7 @@ class OrsrProvider:
             try:
                 with get_db_session() as db:
                     if db:
-                        company = (
-                            db.query(CompanyCache)
-                            .filter(
-                                CompanyCache.identifier == ico, CompanyCache.country == "SK"
-                            )
-                            .first()
-                        )
-
-                        if company:
-                            # Aktualizovať existujúci záznam
-                            company.company_data = live_data
-                            company.data = live_data  # Legacy field
-                            company.company_name = live_data.get("name")
-                            company.risk_score = live_data.get("risk_score")
-                            company.last_synced_at = datetime.utcnow()
-                            company.updated_at = datetime.utcnow()
-                        else:
-                            # Vytvoriť nový záznam
-                            company = CompanyCache(
-                                identifier=ico,
-                                country="SK",
-                                company_data=live_data,
-                                data=live_data,  # Legacy field
-                                company_name=live_data.get("name"),
-                                risk_score=live_data.get("risk_score"),
-                                last_synced_at=datetime.utcnow(),
-                            )
-                            db.add(company)
-
+                        upsert_company_cache(db, ico, "SK", live_data)
                         db.commit()
                         print(f"✅ Dáta uložené do DB pre IČO {ico}")
             except Exception as db_err:
@@ -149,6 +121,8 @@ class OrsrProvider:
         Returns:
             Dict s normalizovanými dátami alebo None
         """
+        from bs4 import BeautifulSoup  # až pri scrapingu - bs4 nespomaľuje štart aplikácie
+
         try:
             # 1. Vyhľadávanie podľa IČO - Použiť správny endpoint hladaj_ico.asp
             search_url = f"https://www.orsr.sk/hladaj_ico.asp?ICO={ico}&SID=0"
@@ -195,6 +169,7 @@ class OrsrProvider:
 
             if not detail_link:
                 print(f"⚠️ IČO {ico} sa nenašlo v ORSR (link nenájdený)")
+                provider_cache.set_not_found(_CACHE_PROVIDER, ico)
                 return None
 
             href = detail_link["href"]
@@ -255,7 +230,7 @@ class OrsrProvider:
             print(f"❌ Chyba pri scraping ORSR: {e}")
             return None
 
-    def _parse_orsr_html(self, soup: BeautifulSoup, ico: str) -> Dict:
+    def _parse_orsr_html(self, soup: "BeautifulSoup", ico: str) -> Dict:
         """
         Parsuje HTML z ORSR výpisu a extrahuje dáta.
         """
@@ -340,7 +315,7 @@ class OrsrProvider:
             ]
             return any(tok in l for tok in role_tokens)
 
-        def _parse_people_from_names_td(names_td: BeautifulSoup, mode: str):
+        def _parse_people_from_names_td(names_td: "BeautifulSoup", mode: str):
             """
             mode: 'executives' | 'shareholders'
             Prefer anchor boundaries: <a class="lnm">NAME</a>
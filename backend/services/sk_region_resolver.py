@@ -2,17 +2,39 @@
 RegionResolver - Geolokácia z PSČ
 Mapping PSČ → Kraj/Okres pre Slovensko
 Načítava dáta z CSV súboru alebo používa fallback mapping
+
+Lookup je predkompilovaný index: pole 100 000 položiek indexované číselným
+PSČ a tabuľka 3-miestnych prefixov (obe odkazujú do tuple zdieľaných,
+nemenných výsledkov). Index sa buduje raz do binárneho artefaktu
+(scripts/build_postal_index.py), pri zmene CSV sa postaví v pamäti.
 """
 
 import csv
+import hashlib
+import logging
 import os
-from typing import Dict, Optional
+import pickle
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 # Cesta k CSV súboru
 _POSTAL_CODE_CSV = os.path.join(
     os.path.dirname(__file__), "..", "data", "postal_codes_sk.csv"
 )
+# Predkompilovaný index (pickle)
+POSTAL_INDEX_PATH = os.getenv(
+    "POSTAL_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "postal_codes_sk.idx"),
+)
+POSTAL_INDEX_VERSION = 1
 
+# PSČ v adrese: "81101" aj "811 01"
+_POSTAL_CODE_RE = re.compile(r"\b\d{3} ?\d{2}\b")
+_POSTAL_CLEAN_TABLE = str.maketrans("", "", " -")
 # Fallback mapping (ak CSV nie je dostupný)
 _FALLBACK_POSTAL_CODE_REGIONS: Dict[str, Dict[str, str]] = {
     # Bratislavský kraj
@@ -70,7 +92,89 @@ _FALLBACK_POSTAL_CODE_REGIONS: Dict[str, Dict[str, str]] = {
 }
 
 
-def _load_postal_codes_from_csv() -> Dict[str, Dict[str, str]]:
+class RegionInfo(dict):
+    """
+    Nemenný výsledok {'kraj', 'okres'} - zdieľaný medzi volaniami, preto
+    zmena vyhodí TypeError (volajúci si urobí dict(region)).
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("RegionInfo je nemenný - použite dict(region)")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (RegionInfo, (dict(self),))
+
+    def copy(self) -> Dict[str, str]:
+        return dict(self)
+
+
+class PostalIndex:
+    """
+    Predkompilovaný index PSČ.
+
+    regions: tuple RegionInfo (id 0 = nenájdené)
+    codes: array('H') dĺžky 100 000 - region id pre číselné PSČ
+    prefixes: array('H') dĺžky 1 000 - region id pre 3-miestny prefix
+              (prvé PSČ s daným prefixom v poradí CSV)
+    """
+
+    __slots__ = ("regions", "codes", "prefixes", "source")
+
+    def __init__(self, regions: Tuple[Optional[RegionInfo], ...], codes: array, prefixes: array, source: str = ""):
+        self.regions = regions
+        self.codes = codes
+        self.prefixes = prefixes
+        self.source = source
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, Dict[str, str]], source: str = "") -> "PostalIndex":
+        region_ids: Dict[Tuple[str, str], int] = {}
+        regions: List[Optional[RegionInfo]] = [None]
+        codes = array("H", bytes(2 * 100_000))
+        prefixes = array("H", bytes(2 * 1_000))
+
+        for postal_code, data in mapping.items():
+            if len(postal_code) != 5 or not postal_code.isdigit():
+                logger.warning(f"Preskakujem neplatné PSČ v indexe: {postal_code!r}")
+                continue
+            key = (data.get("kraj", ""), data.get("okres", ""))
+            region_id = region_ids.get(key)
+            if region_id is None:
+                region_id = region_ids[key] = len(regions)
+                regions.append(RegionInfo(kraj=key[0], okres=key[1]))
+            codes[int(postal_code)] = region_id
+            prefix = int(postal_code[:3])
+            if not prefixes[prefix]:
+                prefixes[prefix] = region_id
+
+        return cls(tuple(regions), codes, prefixes, source)
+
+    def lookup(self, postal_clean: str) -> Optional[RegionInfo]:
+        """Lookup normalizovaného PSČ: presná zhoda (prvých 5 číslic), potom prefix"""
+        if len(postal_clean) >= 5 and postal_clean[:5].isdigit():
+            region_id = self.codes[int(postal_clean[:5])]
+            if region_id:
+                return self.regions[region_id]
+        if len(postal_clean) >= 3 and postal_clean[:3].isdigit():
+            return self.regions[self.prefixes[int(postal_clean[:3])]]
+        return None
+
+
+def _csv_signature(csv_path: str) -> str:
+    """Hash zdrojového CSV - artefakt sa použije len pre rovnaký obsah"""
+    try:
+        with open(csv_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return "fallback"
+
+
+def _load_postal_codes_from_csv(csv_path: str = _POSTAL_CODE_CSV) -> Dict[str, Dict[str, str]]:
     """
     Načíta mapping PSČ → Kraj/Okres z CSV súboru.
 
@@ -79,49 +183,48 @@ def _load_postal_codes_from_csv() -> Dict[str, Dict[str, str]]:
     """
     mapping = {}
 
-    if not os.path.exists(_POSTAL_CODE_CSV):
-        print(f"⚠️ CSV súbor {_POSTAL_CODE_CSV} neexistuje, používam fallback mapping")
+    if not os.path.exists(csv_path):
+        print(f"⚠️ CSV súbor {csv_path} neexistuje, používam fallback mapping")
         return _FALLBACK_POSTAL_CODE_REGIONS
 
     try:
-        with open(_POSTAL_CODE_CSV, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
 
             # Detekovať názvy stĺpcov (podporovať rôzne formáty)
-            fieldnames = reader.fieldnames or []
+            fieldnames = next(reader, [])
 
             # Nájsť správne stĺpce
             postal_col = None
             kraj_col = None
             okres_col = None
 
-            for field in fieldnames:
+            for i, field in enumerate(fieldnames):
                 field_lower = field.lower()
                 if (
                     "postal" in field_lower
                     or "psc" in field_lower
                     or "code" in field_lower
                 ):
-                    postal_col = field
+                    postal_col = i
                 if "kraj" in field_lower or "region" in field_lower:
-                    kraj_col = field
+                    kraj_col = i
                 if "okres" in field_lower or "district" in field_lower:
-                    okres_col = field
+                    okres_col = i
 
-            if not postal_col:
+            if postal_col is None:
                 print(f"⚠️ CSV neobsahuje stĺpec pre PSČ, používam fallback mapping")
                 return _FALLBACK_POSTAL_CODE_REGIONS
 
+            def column(row, index):
+                return row[index].strip() if index is not None and index < len(row) else ""
+
             for row in reader:
-                postal_code = row.get(postal_col, "").strip()
+                # Normalizovať PSČ (odstrániť medzery)
+                postal_code = column(row, postal_col).translate(_POSTAL_CLEAN_TABLE)
                 if postal_code:
-                    # Normalizovať PSČ (odstrániť medzery)
-                    postal_code = postal_code.replace(" ", "").replace("-", "")
-
-                    kraj = row.get(kraj_col or "kraj", "").strip() if kraj_col else ""
-                    okres = (
-                        row.get(okres_col or "okres", "").strip() if okres_col else ""
-                    )
+                    kraj = column(row, kraj_col)
+                    okres = column(row, okres_col)
 
                     # Normalizovať názvy (odstrániť "kraj" ak je súčasťou názvu)
                     if kraj and kraj.endswith(" kraj"):
@@ -144,8 +247,59 @@ def _load_postal_codes_from_csv() -> Dict[str, Dict[str, str]]:
         return _FALLBACK_POSTAL_CODE_REGIONS
 
 
-# Načítať mapping pri importe
-_POSTAL_CODE_REGIONS = _load_postal_codes_from_csv()
+def build_postal_index(csv_path: str = _POSTAL_CODE_CSV) -> PostalIndex:
+    """Postaví index z CSV (alebo z fallback mappingu)"""
+    return PostalIndex.from_mapping(_load_postal_codes_from_csv(csv_path), _csv_signature(csv_path))
+
+
+def save_postal_index(index: PostalIndex, path: str = POSTAL_INDEX_PATH) -> None:
+    """Uloží index ako binárny artefakt (atomicky cez .tmp)"""
+    payload = {
+        "version": POSTAL_INDEX_VERSION,
+        "source": index.source,
+        "regions": [dict(region) for region in index.regions[1:]],
+        "codes": index.codes.tobytes(),
+        "prefixes": index.prefixes.tobytes(),
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_postal_index(path: str = POSTAL_INDEX_PATH, csv_path: str = _POSTAL_CODE_CSV) -> Optional[PostalIndex]:
+    """Načíta artefakt, ak existuje a zodpovedá aktuálnemu CSV"""
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Postal index {path} sa nedá načítať: {e}")
+        return None
+
+    if payload.get("version") != POSTAL_INDEX_VERSION or payload.get("source") != _csv_signature(csv_path):
+        logger.info("Postal index je zastaraný, stavia sa z CSV")
+        return None
+
+    codes, prefixes = array("H"), array("H")
+    codes.frombytes(payload["codes"])
+    prefixes.frombytes(payload["prefixes"])
+    regions = (None,) + tuple(RegionInfo(region) for region in payload["regions"])
+    return PostalIndex(regions, codes, prefixes, payload["source"])
+
+
+@lru_cache(maxsize=1)
+def get_postal_index() -> PostalIndex:
+    """Index pri prvom použití (nie pri importe): artefakt, inak CSV"""
+    index = load_postal_index()
+    if index is None:
+        index = build_postal_index()
+    return index
+
+
+def _normalize_postal_code(postal_code: str) -> str:
+    return postal_code.translate(_POSTAL_CLEAN_TABLE).strip()
 
 
 def resolve_region(postal_code: str) -> Optional[Dict[str, str]]:
@@ -156,33 +310,34 @@ def resolve_region(postal_code: str) -> Optional[Dict[str, str]]:
         postal_code: PSČ (môže byť s medzerou alebo bez)
 
     Returns:
-        Dict s 'kraj' a 'okres' alebo None ak sa nenašlo
+        Zdieľaný nemenný RegionInfo s 'kraj' a 'okres' alebo None ak sa nenašlo
     """
     if not postal_code:
         return None
+    return get_postal_index().lookup(_normalize_postal_code(postal_code))
 
-    # Normalizovať PSČ (odstrániť medzery)
-    postal_clean = postal_code.replace(" ", "").strip()
-
-    # Skúsiť presné zhodu
-    if postal_clean in _POSTAL_CODE_REGIONS:
-        return _POSTAL_CODE_REGIONS[postal_clean].copy()
-
-    # Skúsiť prvých 5 číslic (pre PSČ typu "811 01")
-    if len(postal_clean) >= 5:
-        postal_5 = postal_clean[:5]
-        if postal_5 in _POSTAL_CODE_REGIONS:
-            return _POSTAL_CODE_REGIONS[postal_5].copy()
 
-    # Skúsiť prvých 3 číslice (pre okres)
-    if len(postal_clean) >= 3:
-        postal_3 = postal_clean[:3]
-        # Nájsť najbližší match
-        for code, region in _POSTAL_CODE_REGIONS.items():
-            if code.startswith(postal_3):
-                return region.copy()
+def resolve_many(postal_codes: Iterable[Optional[str]]) -> List[Optional[Dict[str, str]]]:
+    """
+    Bulk verzia resolve_region pre importy (milióny adries).
 
-    return None
+    Returns:
+        Zoznam výsledkov v poradí vstupu (None pre nenájdené/prázdne PSČ)
+    """
+    lookup = get_postal_index().lookup
+    table = _POSTAL_CLEAN_TABLE
+    seen: Dict[str, Optional[RegionInfo]] = {}
+    results: List[Optional[Dict[str, str]]] = []
+    append = results.append
+    for postal_code in postal_codes:
+        if not postal_code:
+            append(None)
+            continue
+        region = seen.get(postal_code, seen)
+        if region is seen:
+            region = seen[postal_code] = lookup(postal_code.translate(table).strip())
+        append(region)
+    return results
 
 
 def enrich_address_with_region(
@@ -200,11 +355,9 @@ def enrich_address_with_region(
     """
     # Extrahovať PSČ z adresy ak nie je poskytnuté
     if not postal_code and address:
-        import re
-
-        postal_match = re.search(r"\b\d{5}\b", address)
+        postal_match = _POSTAL_CODE_RE.search(address)
         if postal_match:
-            postal_code = postal_match.group()
+            postal_code = postal_match.group().replace(" ", "")
 
     result = {
         "address": address,
@@ -222,10 +375,8 @@ def enrich_address_with_region(
 
     # Extrahovať mesto z adresy (posledné slovo pred PSČ alebo po PSČ)
     if address:
-        import re
-
         # Odstrániť PSČ a extrahovať mesto
-        address_clean = re.sub(r"\b\d{5}\b", "", address)
+        address_clean = _POSTAL_CODE_RE.sub("", address)
         parts = [p.strip() for p in address_clean.split(",") if p.strip()]
         if parts:
             result["city"] = parts[-1] if parts else None
@@ -3,14 +3,14 @@ Slovensko.Digital Ekosystém - RPO (Register právnych osôb) integrácia
 API dokumentácia: https://ekosystem.slovensko.digital/api-docs
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Optional
 
 import requests
 
-# Cache pre RPO odpovede (in-memory, neskôr Redis)
-_rpo_cache = {}
-_cache_ttl = timedelta(hours=24)  # 24 hodín TTL
+from services.provider_cache import MISS, provider_cache
+
+_CACHE_PROVIDER = "rpo_sk"
 
 
 def fetch_rpo_sk(ico: str) -> Optional[Dict]:
@@ -24,12 +24,10 @@ def fetch_rpo_sk(ico: str) -> Optional[Dict]:
         Dict s dátami firmy alebo None pri chybe
     """
     # Kontrola cache
-    cache_key = f"rpo_sk_{ico}"
-    if cache_key in _rpo_cache:
-        cached_data, cached_time = _rpo_cache[cache_key]
-        if datetime.now() - cached_time < _cache_ttl:
-            print(f"✅ Cache hit pre IČO {ico}")
-            return cached_data
+    cached_data = provider_cache.get(_CACHE_PROVIDER, ico)
+    if cached_data is not MISS:
+        print(f"✅ Cache hit pre IČO {ico}")
+        return cached_data
 
     # Validácia IČO (8 miest)
     if not ico or len(ico) != 8 or not ico.isdigit():
@@ -53,10 +51,11 @@ def fetch_rpo_sk(ico: str) -> Optional[Dict]:
         if response.status_code == 200:
             data = response.json()
             # Uložiť do cache
-            _rpo_cache[cache_key] = (data, datetime.now())
+            provider_cache.set(_CACHE_PROVIDER, ico, data)
             return data
         elif response.status_code == 404:
             print(f"⚠️ IČO {ico} sa nenašlo v RPO")
+            provider_cache.set_not_found(_CACHE_PROVIDER, ico)
             return None
         else:
             print(f"⚠️ RPO API chyba: {response.status_code}")
@@ -189,13 +188,9 @@ def is_slovak_ico(query: str) -> bool:
 
 def get_cache_stats() -> Dict:
     """Vráti štatistiky cache."""
-    return {
-        "cached_items": len(_rpo_cache),
-        "cache_ttl_hours": _cache_ttl.total_seconds() / 3600,
-    }
+    return provider_cache.get_stats(_CACHE_PROVIDER)
 
 
 def clear_cache():
     """Vyčistí cache (pre testovanie)."""
-    global _rpo_cache
-    _rpo_cache = {}
+    provider_cache.clear(_CACHE_PROVIDER)
@@ -10,6 +10,7 @@ import warnings
 from typing import Dict, List, Optional
 
 import requests
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import get_proxy, mark_proxy_success, mark_proxy_failed
 
 try:
@@ -17,6 +18,12 @@ try:
 except ImportError:
     BeautifulSoup = None  # Fallback ak nie je nainštalovaný
 
+_CACHE_PROVIDER = "ruz_sk"
+
+
+def _cache_key(ico: str, year: Optional[int]) -> str:
+    return f"{ico}:{year or 'all'}"
+
 
 class RuzProvider:
     """
@@ -73,15 +80,22 @@ class RuzProvider:
         if not ico_normalized:
             return None
 
+        cached_data = provider_cache.get(_CACHE_PROVIDER, _cache_key(ico_normalized, year))
+        if cached_data is not MISS:
+            return cached_data
+
         try:
             # 1. Skúsiť API
             api_data = self._fetch_from_api(ico_normalized, year)
             if api_data:
+                provider_cache.set(_CACHE_PROVIDER, _cache_key(ico_normalized, year), api_data)
                 return api_data
 
             # 2. Fallback: HTML Scraping
             print("⚠️ RUZ API nedostupné, používam HTML scraping...")
             html_data = self._fetch_from_html(ico_normalized, year)
+            if html_data:
+                provider_cache.set(_CACHE_PROVIDER, _cache_key(ico_normalized, year), html_data)
             return html_data
 
         except Exception as e:
@@ -255,6 +269,8 @@ class RuzProvider:
             # 2. Extrahovať detail link
             detail_path = self._extract_detail_path(search_response.text)
             if not detail_path:
+                # Subjekt v RUZ neexistuje
+                provider_cache.set_not_found(_CACHE_PROVIDER, _cache_key(ico, year))
                 return None
 
             # 3. Detail request
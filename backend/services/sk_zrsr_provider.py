@@ -10,8 +10,11 @@ import warnings
 from typing import Dict, Optional
 
 import requests
+from services.provider_cache import MISS, provider_cache
 from services.proxy_rotation import get_proxy, mark_proxy_success, mark_proxy_failed
 
+_CACHE_PROVIDER = "zrsr_sk"
+
 
 class ZrsrProvider:
     """
@@ -69,6 +72,10 @@ class ZrsrProvider:
         if not ico_normalized:
             return None
 
+        cached_data = provider_cache.get(_CACHE_PROVIDER, ico_normalized)
+        if cached_data is not MISS:
+            return cached_data
+
         try:
             # 1. Search Request
             search_url = f"{self.BASE_URL}/hladaj_subjekt.asp"
@@ -86,6 +93,7 @@ class ZrsrProvider:
             detail_path = self._extract_detail_path(search_response.text)
             if not detail_path:
                 print(f"⚠️ ZRSR detail link not found for IČO {ico_normalized}")
+                provider_cache.set_not_found(_CACHE_PROVIDER, ico_normalized)
                 return None
 
             # 3. Detail Request
@@ -103,6 +111,7 @@ class ZrsrProvider:
 
             if parsed_data:
                 print(f"✅ ZRSR data found for IČO {ico_normalized}: {parsed_data}")
+                provider_cache.set(_CACHE_PROVIDER, ico_normalized, parsed_data)
 
             return parsed_data
 
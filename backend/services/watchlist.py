@@ -0,0 +1,509 @@
+"""
+Watchlist monitoring pre ILUMINATI SYSTEM
+Periodická kontrola obľúbených firiem voči registrom a notifikácia zmien.
+
+- watchlist_companies: jeden riadok per (krajina, identifikátor) - firma sledovaná
+  viacerými používateľmi sa stiahne raz
+- kompaktný snapshot sledovaných polí + content hash: nezmenená firma sa
+  preskočí porovnaním hashu, diff sa počíta len pri zmene
+- watchlist_changes: kompaktné change eventy (pole, stará/nová hodnota,
+  pridané/odobrané osoby)
+- zmeny idú cez webhook outbox (event "company_changed")
+
+Odchádzajúce volania registrov zdieľajú jeden token bucket (OutboundBudget),
+takže monitoring nezahltí registre ani pri tisícoch sledovaných firiem.
+
+DB fázy behu (sync, claim, zápis výsledkov) bežia v asyncio.to_thread, každá
+s vlastnou krátkou session - počas fetchu sa žiadna session nedrží. Claim
+posunie next_check_at na koniec leasu (podmienený UPDATE), takže firmu
+skontroluje len jeden worker; výsledky zapíše len držiteľ leasu.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String, UniqueConstraint, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from services.address_normalizer import normalize_address
+from services.database import Base, FavoriteCompany, get_db_session
+
+logger = logging.getLogger(__name__)
+
+# Konfigurácia
+WATCHLIST_INTERVAL_SECONDS = int(os.getenv("WATCHLIST_INTERVAL_SECONDS", "300"))
+WATCHLIST_RECHECK_HOURS = float(os.getenv("WATCHLIST_RECHECK_HOURS", "24"))
+WATCHLIST_BATCH_SIZE = int(os.getenv("WATCHLIST_BATCH_SIZE", "500"))
+WATCHLIST_FETCH_CONCURRENCY = int(os.getenv("WATCHLIST_FETCH_CONCURRENCY", "8"))
+# Zdieľaný rozpočet odchádzajúcich volaní (requesty/s a burst)
+WATCHLIST_FETCH_RATE = float(os.getenv("WATCHLIST_FETCH_RATE", "5"))
+WATCHLIST_FETCH_BURST = int(os.getenv("WATCHLIST_FETCH_BURST", "10"))
+WATCHLIST_RETRY_BASE_SECONDS = int(os.getenv("WATCHLIST_RETRY_BASE_SECONDS", "600"))
+# Lease claimnutej firmy (po páde workeru sa firma po expirácii skontroluje znova)
+WATCHLIST_CLAIM_LEASE_SECONDS = int(os.getenv("WATCHLIST_CLAIM_LEASE_SECONDS", "900"))
+# Sync obľúbených číta len riadky vytvorené od posledného behu (mínus prekryv)
+WATCHLIST_SYNC_OVERLAP_SECONDS = int(os.getenv("WATCHLIST_SYNC_OVERLAP_SECONDS", "300"))
+
+WATCHLIST_EVENT = "company_changed"
+
+# Sledované polia snapshotu (zoznamy osôb sa porovnávajú ako množiny)
+SCALAR_FIELDS = ("name", "status", "legal_form", "address", "risk_score", "debt")
+LIST_FIELDS = ("executives", "shareholders")
+
+# country -> fetcher(identifier) -> dict firmy alebo None
+Fetcher = Callable[[str], Optional[Dict[str, Any]]]
+
+
+class WatchedCompany(Base):
+    """Stav sledovanej firmy - posledný snapshot a plán ďalšej kontroly"""
+
+    __tablename__ = "watchlist_companies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    country = Column(String(2), nullable=False)
+    company_identifier = Column(String(100), nullable=False)
+    snapshot = Column(JSON)  # kompaktný snapshot sledovaných polí
+    content_hash = Column(String(64))
+    last_checked_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)
+    next_check_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    failure_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("country", "company_identifier", name="uq_watchlist_company"),
+        Index("ix_watchlist_companies_next_check", "next_check_at"),
+    )
+
+
+class WatchlistChange(Base):
+    """Zistená zmena sledovanej firmy"""
+
+    __tablename__ = "watchlist_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    country = Column(String(2), nullable=False)
+    company_identifier = Column(String(100), nullable=False)
+    company_name = Column(String(500))
+    changes = Column(JSON, nullable=False)
+    content_hash = Column(String(64))
+    detected_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_watchlist_changes_company", "country", "company_identifier", "detected_at"),
+    )
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "country": self.country,
+            "company_identifier": self.company_identifier,
+            "company_name": self.company_name,
+            "changes": self.changes,
+            "detected_at": self.detected_at.isoformat() if self.detected_at else None,
+        }
+
+
+class OutboundBudget:
+    """Token bucket pre odchádzajúce volania registrov (zdieľaný všetkými behmi)"""
+
+    def __init__(self, rate: float = WATCHLIST_FETCH_RATE, burst: int = WATCHLIST_FETCH_BURST):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_budget = OutboundBudget()
+_fetchers: Dict[str, Fetcher] = {}
+_favorites_synced_at: Optional[datetime] = None  # posledný úspešný sync obľúbených (per proces)
+
+
+def register_fetcher(country: str, fetcher: Fetcher) -> None:
+    """Zaregistruje zdroj čerstvých dát pre krajinu (predvolene registry router)"""
+    _fetchers[country.upper()] = fetcher
+
+
+def _registry_fetcher(country: str) -> Fetcher:
+    """Fetcher nad registry routerom - fallback záznam (register nedostupný) nie je zmena"""
+
+    def _fetch(identifier: str) -> Optional[Dict[str, Any]]:
+        from services.registry import get_registry_router
+
+        record = get_registry_router().fetch(identifier, country)
+        if record is None or record.fallback:
+            return None
+        return record.to_dict()
+
+    return _fetch
+
+
+for _country in ("CZ", "SK", "PL", "HU"):
+    register_fetcher(_country, _registry_fetcher(_country))
+
+
+def _person_names(items: Any) -> List[str]:
+    names = set()
+    for item in items or []:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("full_name") or json.dumps(item, sort_keys=True, default=str)
+        if item:
+            names.add(str(item).strip())
+    return sorted(names)
+
+
+def compact_snapshot(data: Dict[str, Any], country: str) -> Dict[str, Any]:
+    """
+    Sledované polia v porovnateľnom tvare. Obsahuje len polia prítomné v dátach
+    (snapshot z obľúbených má iný rozsah ako registrový záznam).
+    """
+    snapshot: Dict[str, Any] = {}
+    for field in SCALAR_FIELDS:
+        if data.get(field) is None:
+            continue
+        value = data[field]
+        if field == "address":
+            normalized = normalize_address(value, country)
+            value = normalized.key if normalized else str(value)
+        elif field in ("risk_score", "debt"):
+            value = round(float(value), 2)
+        snapshot[field] = value
+    for field in LIST_FIELDS:
+        if field in data:
+            snapshot[field] = _person_names(data[field])
+    return snapshot
+
+
+def content_hash(snapshot: Dict[str, Any]) -> str:
+    payload = json.dumps(snapshot, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any], fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Štrukturálny diff dvoch snapshotov.
+
+    Args:
+        fields: Obmedzenie na polia (prvá kontrola porovnáva len polia zo seed snapshotu)
+    """
+    changes: List[Dict[str, Any]] = []
+    for field in SCALAR_FIELDS:
+        if fields is not None and field not in fields:
+            continue
+        if old.get(field) != new.get(field):
+            changes.append({"field": field, "old": old.get(field), "new": new.get(field)})
+    for field in LIST_FIELDS:
+        if fields is not None and field not in fields:
+            continue
+        before, after = set(old.get(field) or []), set(new.get(field) or [])
+        if before != after:
+            changes.append({"field": field, "added": sorted(after - before), "removed": sorted(before - after)})
+    return changes
+
+
+def sync_watchlist(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Začne sledovať firmy pridané do obľúbených od posledného syncu (prvý beh
+    procesu prejde všetky). Nové firmy dostanú seed snapshot
+    z FavoriteCompany.company_data. Firmy bez obľúbených odstraňuje _claim_due.
+    """
+    global _favorites_synced_at
+
+    started = datetime.utcnow()
+    query = db.query(FavoriteCompany.country, FavoriteCompany.company_identifier)
+    if _favorites_synced_at is not None:
+        query = query.filter(
+            FavoriteCompany.created_at >= _favorites_synced_at - timedelta(seconds=WATCHLIST_SYNC_OVERLAP_SECONDS)
+        )
+    favorites = set(query.distinct())
+    if not favorites:
+        _favorites_synced_at = started
+        return {"added": 0}
+
+    identifiers = {identifier for _, identifier in favorites}
+    watched = set(
+        db.query(WatchedCompany.country, WatchedCompany.company_identifier)
+        .filter(WatchedCompany.company_identifier.in_(identifiers))
+    )
+    missing = favorites - watched
+    seeds: Dict[Tuple[str, str], Dict] = {pair: {} for pair in missing}
+    if missing:
+        rows = db.query(
+            FavoriteCompany.country,
+            FavoriteCompany.company_identifier,
+            FavoriteCompany.company_data,
+            FavoriteCompany.risk_score,
+        ).filter(FavoriteCompany.company_identifier.in_({identifier for _, identifier in missing}))
+        for country, identifier, data, risk_score in rows:
+            if (country, identifier) in missing and data and not seeds[(country, identifier)]:
+                seeds[(country, identifier)] = {**data, "risk_score": data.get("risk_score", risk_score)}
+
+    now = now or datetime.utcnow()
+    for (country, identifier), data in seeds.items():
+        snapshot = compact_snapshot(data, country)
+        db.add(WatchedCompany(
+            country=country,
+            company_identifier=identifier,
+            snapshot=snapshot,
+            content_hash=content_hash(snapshot) if snapshot else None,
+            next_check_at=now,
+        ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Firmu medzitým pridal iný worker - okno sa zopakuje v ďalšom behu
+        db.rollback()
+        return {"added": 0}
+    _favorites_synced_at = started
+    return {"added": len(missing)}
+
+
+def _claim_due(db: Session, now: datetime, limit: int, lease_until: datetime) -> List[Dict[str, Any]]:
+    """
+    Claimne due firmy (najstaršie naplánované) posunom next_check_at na
+    lease_until. Firmy, ktoré už nikto nemá v obľúbených, sa odstránia.
+    Vráti snapshot atribútov pre fetch.
+    """
+    rows = (
+        db.query(WatchedCompany.id, WatchedCompany.country, WatchedCompany.company_identifier)
+        .filter(WatchedCompany.next_check_at <= now)
+        .order_by(WatchedCompany.next_check_at, WatchedCompany.id)
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        return []
+
+    favorites = set(
+        db.query(FavoriteCompany.country, FavoriteCompany.company_identifier)
+        .filter(tuple_(FavoriteCompany.country, FavoriteCompany.company_identifier).in_(
+            {(country, identifier) for _, country, identifier in rows}
+        ))
+        .distinct()
+    )
+    orphaned = [row_id for row_id, country, identifier in rows if (country, identifier) not in favorites]
+    if orphaned:
+        db.query(WatchedCompany).filter(WatchedCompany.id.in_(orphaned)).delete(synchronize_session=False)
+
+    due = []
+    for row_id, country, identifier in rows:
+        if (country, identifier) not in favorites:
+            continue
+        claimed = (
+            db.query(WatchedCompany)
+            .filter(WatchedCompany.id == row_id, WatchedCompany.next_check_at <= now)
+            .update({"next_check_at": lease_until}, synchronize_session=False)
+        )
+        if claimed == 1:
+            due.append({"id": row_id, "country": country, "identifier": identifier})
+    db.commit()
+    return due
+
+
+async def _fetch_all(due: List[Dict[str, Any]], budget: OutboundBudget, concurrency: int) -> Dict[int, Optional[Dict]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _fetch(item: Dict[str, Any]) -> Tuple[int, Optional[Dict]]:
+        fetcher = _fetchers.get(item["country"])
+        if fetcher is None:
+            return item["id"], None
+        async with semaphore:
+            await budget.acquire()
+            try:
+                return item["id"], await asyncio.to_thread(fetcher, item["identifier"])
+            except Exception as e:
+                logger.warning(f"Watchlist fetch {item['country']} {item['identifier']} failed: {e}")
+                return item["id"], None
+
+    return dict(await asyncio.gather(*(_fetch(item) for item in due)))
+
+
+def _apply_results(
+    db: Session, fetched: Dict[int, Optional[Dict]], now: datetime, lease_until: datetime
+) -> Tuple[Dict[str, int], List[WatchlistChange]]:
+    """
+    Porovná čerstvé dáta so snapshotmi a pripraví stav + change eventy
+    (bez commitu - commitne _record_results spolu s outboxom).
+    Firmy, ktorých lease medzitým prevzal iný worker, sa preskočia.
+    """
+    stats = {"checked": 0, "unchanged": 0, "changed": 0, "failed": 0}
+    recheck = timedelta(hours=WATCHLIST_RECHECK_HOURS)
+    rows = {
+        row.id: row
+        for row in db.query(WatchedCompany).filter(
+            WatchedCompany.id.in_(fetched.keys()), WatchedCompany.next_check_at == lease_until
+        )
+    }
+    changes: List[WatchlistChange] = []
+
+    for row_id, data in fetched.items():
+        row = rows.get(row_id)
+        if row is None:
+            continue
+        if not data:
+            row.failure_count += 1
+            retry = timedelta(seconds=WATCHLIST_RETRY_BASE_SECONDS * 2 ** min(row.failure_count - 1, 10))
+            row.next_check_at = now + min(retry, recheck)
+            stats["failed"] += 1
+            continue
+
+        stats["checked"] += 1
+        snapshot = compact_snapshot(data, row.country)
+        digest = content_hash(snapshot)
+        first_check = row.last_checked_at is None
+        row.last_checked_at = now
+        row.next_check_at = now + recheck
+        row.failure_count = 0
+        if digest == row.content_hash:
+            stats["unchanged"] += 1
+            continue
+
+        # Prvá kontrola: seed z obľúbených má len časť polí
+        old = row.snapshot or {}
+        diff = diff_snapshots(old, snapshot, set(old) if first_check else None)
+        row.snapshot = snapshot
+        row.content_hash = digest
+        if not diff:
+            stats["unchanged"] += 1
+            continue
+
+        stats["changed"] += 1
+        row.last_changed_at = now
+        changes.append(WatchlistChange(
+            country=row.country,
+            company_identifier=row.company_identifier,
+            company_name=data.get("name"),
+            changes=diff,
+            content_hash=digest,
+            detected_at=now,
+        ))
+        # Snapshot v obľúbených = posledné známe dáta
+        db.query(FavoriteCompany).filter(
+            FavoriteCompany.country == row.country,
+            FavoriteCompany.company_identifier == row.company_identifier,
+        ).update(
+            {FavoriteCompany.company_data: data, FavoriteCompany.risk_score: data.get("risk_score")},
+            synchronize_session=False,
+        )
+
+    db.add_all(changes)
+    db.flush()
+    return stats, changes
+
+
+def _enqueue_change_events(db: Session, changes: List[WatchlistChange]) -> int:
+    """Change eventy do webhook outboxu - každému používateľovi, ktorý firmu sleduje"""
+    from services.webhooks import enqueue_event
+
+    if not changes:
+        return 0
+    pairs = {(change.country, change.company_identifier) for change in changes}
+    watchers: Dict[Tuple[str, str], Set[int]] = {}
+    for user_id, country, identifier in db.query(
+        FavoriteCompany.user_id, FavoriteCompany.country, FavoriteCompany.company_identifier
+    ).filter(tuple_(FavoriteCompany.country, FavoriteCompany.company_identifier).in_(pairs)):
+        watchers.setdefault((country, identifier), set()).add(user_id)
+
+    queued = 0
+    for change in changes:
+        payload = change.to_dict()
+        for user_id in sorted(watchers.get((change.country, change.company_identifier), ())):
+            queued += enqueue_event(db, WATCHLIST_EVENT, payload, user_id=user_id, commit=False)
+    return queued
+
+
+def _record_results(
+    db: Session, fetched: Dict[int, Optional[Dict]], now: datetime, lease_until: datetime
+) -> Dict[str, int]:
+    """
+    Zápis výsledkov, change eventov a outboxu v jednej transakcii - zmena
+    (posun content hashu) sa nezapíše bez svojho webhook eventu.
+    """
+    try:
+        stats, changes = _apply_results(db, fetched, now, lease_until)
+        stats["events"] = _enqueue_change_events(db, changes)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return stats
+
+
+def _in_session(fn: Callable[..., Any], *args: Any) -> Any:
+    """Spustí DB fázu vo vlastnej krátkej session (volá sa cez asyncio.to_thread)"""
+    with get_db_session() as db:
+        if db is None:
+            return None
+        return fn(db, *args)
+
+
+async def run_watchlist_check(
+    now: Optional[datetime] = None,
+    limit: int = WATCHLIST_BATCH_SIZE,
+    budget: Optional[OutboundBudget] = None,
+) -> Dict[str, int]:
+    """
+    Jeden beh monitoringu: sync s obľúbenými, claim a fetch due firiem
+    v rámci rozpočtu, diff a change eventy.
+    """
+    empty = {"checked": 0, "unchanged": 0, "changed": 0, "failed": 0, "events": 0}
+    now = now or datetime.utcnow()
+    lease_until = now + timedelta(seconds=WATCHLIST_CLAIM_LEASE_SECONDS)
+
+    await asyncio.to_thread(_in_session, sync_watchlist, now)
+    due = await asyncio.to_thread(_in_session, _claim_due, now, limit, lease_until)
+    if not due:
+        return empty
+
+    fetched = await _fetch_all(due, budget or _budget, WATCHLIST_FETCH_CONCURRENCY)
+    stats = await asyncio.to_thread(_in_session, _record_results, fetched, now, lease_until)
+    if stats is None:
+        return empty
+    if stats["events"]:
+        from services.webhooks import notify_webhook_dispatcher
+
+        notify_webhook_dispatcher()
+    return stats
+
+
+def get_user_watchlist_changes(db: Session, user_id: int, limit: int = 50, since: Optional[datetime] = None) -> List[WatchlistChange]:
+    """Zmeny firiem v obľúbených používateľa (najnovšie prvé)"""
+    query = db.query(WatchlistChange).join(
+        FavoriteCompany,
+        (FavoriteCompany.country == WatchlistChange.country)
+        & (FavoriteCompany.company_identifier == WatchlistChange.company_identifier),
+    ).filter(FavoriteCompany.user_id == user_id)
+    if since is not None:
+        query = query.filter(WatchlistChange.detected_at > since)
+    return query.order_by(WatchlistChange.detected_at.desc(), WatchlistChange.id.desc()).limit(limit).all()
+
+
+async def run_watchlist_monitor(interval: int = WATCHLIST_INTERVAL_SECONDS) -> None:
+    """Background loop pre watchlist monitoring"""
+    while True:
+        try:
+            stats = await run_watchlist_check()
+            if stats["checked"] or stats["failed"]:
+                logger.info(f"Watchlist check: {stats}")
+        except Exception as e:
+            logger.warning(f"Watchlist monitor error: {e}")
+        await asyncio.sleep(interval)
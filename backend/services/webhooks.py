@@ -3,17 +3,42 @@ Webhooks Delivery Service
 Pre Enterprise tier - real-time event notifications
 """
 
+import asyncio
 import json
 import hashlib
 import hmac
+import logging
 import os
+import random
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON
+from typing import Optional, Dict, List, Any, Awaitable, Callable, Tuple
+
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, Index, func, or_
 from sqlalchemy.orm import Session, relationship
 from services.database import Base, get_db_session
 from services.auth import User
 
+logger = logging.getLogger(__name__)
+
+# Konfigurácia doručovania
+WEBHOOK_DISPATCH_INTERVAL_SECONDS = float(os.getenv("WEBHOOK_DISPATCH_INTERVAL_SECONDS", "2"))
+WEBHOOK_DISPATCH_BATCH_SIZE = int(os.getenv("WEBHOOK_DISPATCH_BATCH_SIZE", "200"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+WEBHOOK_RETRY_BASE_SECONDS = float(os.getenv("WEBHOOK_RETRY_BASE_SECONDS", "10"))
+WEBHOOK_RETRY_MAX_SECONDS = float(os.getenv("WEBHOOK_RETRY_MAX_SECONDS", "3600"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "100"))
+WEBHOOK_PER_ENDPOINT_CONCURRENCY = int(os.getenv("WEBHOOK_PER_ENDPOINT_CONCURRENCY", "4"))
+WEBHOOK_CLAIM_LEASE_SECONDS = int(os.getenv("WEBHOOK_CLAIM_LEASE_SECONDS", "60"))
+
+OUTBOX_PENDING = "pending"
+OUTBOX_DEAD = "dead"
+
+# (url, body, headers) -> (status_code, response_text)
+Sender = Callable[[str, str, Dict[str, str]], Awaitable[Tuple[int, str]]]
+
 
 class Webhook(Base):
     """Webhook model"""
@@ -29,6 +54,7 @@ class Webhook(Base):
     last_delivered_at = Column(DateTime, nullable=True)
     success_count = Column(Integer, default=0, nullable=False)
     failure_count = Column(Integer, default=0, nullable=False)
+    max_batch_size = Column(Integer, default=1, nullable=False)  # >1 = viac eventov v jednom requeste
 
     # Relationship
     user = relationship("User", back_populates="webhooks")
@@ -52,8 +78,30 @@ class WebhookDelivery(Base):
     webhook = relationship("Webhook", back_populates="deliveries")
 
 
+class WebhookOutbox(Base):
+    """Trvalá fronta doručení (pending = čaká na pokus, dead = vyčerpané pokusy)"""
+    __tablename__ = "webhook_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    webhook_id = Column(Integer, ForeignKey("webhooks.id"), nullable=False, index=True)
+    event_type = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), default=OUTBOX_PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    locked_until = Column(DateTime, nullable=True)
+    claim_token = Column(String(32), nullable=True, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_webhook_outbox_due", "status", "next_attempt_at"),
+    )
+
+
 # Add relationships
 Webhook.deliveries = relationship("WebhookDelivery", back_populates="webhook", cascade="all, delete-orphan")
+Webhook.outbox = relationship("WebhookOutbox", cascade="all, delete-orphan")
 
 
 def generate_webhook_secret() -> str:
@@ -66,7 +114,8 @@ def create_webhook(
     user_id: int,
     url: str,
     events: List[str],
-    secret: Optional[str] = None
+    secret: Optional[str] = None,
+    max_batch_size: int = 1
 ) -> Dict:
     """
     Vytvoriť nový webhook.
@@ -77,6 +126,7 @@ def create_webhook(
         url: Webhook URL endpoint
         events: Zoznam event types
         secret: Optional secret (ak nie je poskytnutý, vygeneruje sa)
+        max_batch_size: Max. počet eventov v jednom requeste (1 = bez batchovania)
         
     Returns:
         Dict s webhook informáciami
@@ -89,7 +139,8 @@ def create_webhook(
         url=url,
         secret=secret,
         events=json.dumps(events),
-        is_active=True
+        is_active=True,
+        max_batch_size=max(1, max_batch_size)
     )
     
     db.add(webhook)
@@ -102,7 +153,8 @@ def create_webhook(
         "events": events,
         "secret": secret,  # Vrátiť len raz!
         "created_at": webhook.created_at.isoformat(),
-        "is_active": webhook.is_active
+        "is_active": webhook.is_active,
+        "max_batch_size": webhook.max_batch_size
     }
 
 
@@ -150,9 +202,86 @@ def generate_webhook_signature(payload: str, secret: str) -> str:
     ).hexdigest()
 
 
+def build_event_payload(event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Obálka eventu - timestamp sa fixuje pri zaradení do fronty (retry posiela rovnaké telo)"""
+    return {
+        "event": event_type,
+        "timestamp": datetime.utcnow().isoformat(),
+        "data": payload
+    }
+
+
+def _is_subscribed(webhook: Webhook, event_type: str) -> bool:
+    if not webhook.is_active:
+        return False
+    try:
+        return event_type in json.loads(webhook.events)
+    except (TypeError, ValueError):
+        return False
+
+
+def enqueue_event(
+    db: Session,
+    event_type: str,
+    payload: Dict[str, Any],
+    user_id: Optional[int] = None,
+    webhook_ids: Optional[List[int]] = None,
+    commit: bool = True
+) -> int:
+    """
+    Zaradiť event do outboxu pre všetkých odberateľov.
+    Zápis je jedna transakcia, samotné doručenie robí WebhookDispatcher.
+    
+    Args:
+        commit: False = položky ostanú v transakcii volajúceho (zapíšu sa
+            atomicky spolu s jeho zmenami)
+    
+    Returns:
+        Počet zaradených doručení
+    """
+    query = db.query(Webhook).filter(Webhook.is_active == True)
+    if user_id:
+        query = query.filter(Webhook.user_id == user_id)
+    if webhook_ids is not None:
+        query = query.filter(Webhook.id.in_(webhook_ids))
+    
+    body = build_event_payload(event_type, payload)
+    now = datetime.utcnow()
+    items = [
+        WebhookOutbox(
+            webhook_id=webhook.id,
+            event_type=event_type,
+            payload=body,
+            status=OUTBOX_PENDING,
+            attempts=0,
+            next_attempt_at=now
+        )
+        for webhook in query.all()
+        if _is_subscribed(webhook, event_type)
+    ]
+    if items:
+        db.add_all(items)
+        if commit:
+            db.commit()
+    return len(items)
+
+
+def _enqueue_in_session(
+    event_type: str,
+    payload: Dict[str, Any],
+    user_id: Optional[int] = None,
+    webhook_ids: Optional[List[int]] = None
+) -> int:
+    """enqueue_event vo vlastnej krátkej session (volá sa cez asyncio.to_thread)"""
+    with get_db_session() as db:
+        if not db:
+            return 0
+        return enqueue_event(db, event_type, payload, user_id=user_id, webhook_ids=webhook_ids)
+
+
 async def deliver_webhook(webhook: Webhook, event_type: str, payload: Dict[str, Any]) -> bool:
     """
-    Dodať webhook event.
+    Zaradiť webhook event na doručenie jednému webhooku.
     
     Args:
         webhook: Webhook object
@@ -160,115 +289,426 @@ async def deliver_webhook(webhook: Webhook, event_type: str, payload: Dict[str,
         payload: Event payload data
         
     Returns:
-        True ak úspešné, False inak
+        True ak bol event zaradený do fronty, False inak
     """
-    import requests
-    
-    # Skontrolovať, či webhook je aktívny
-    if not webhook.is_active:
+    if not _is_subscribed(webhook, event_type):
         return False
     
-    # Skontrolovať, či event type je v zozname
-    webhook_events = json.loads(webhook.events)
-    if event_type not in webhook_events:
-        return False
-    
-    # Pripraviť payload
-    webhook_payload = {
-        "event": event_type,
-        "timestamp": datetime.utcnow().isoformat(),
-        "data": payload
-    }
-    
-    payload_json = json.dumps(webhook_payload, default=str)
-    
-    # Generovať signature
-    signature = generate_webhook_signature(payload_json, webhook.secret)
-    
-    # Headers
-    headers = {
-        "Content-Type": "application/json",
-        "X-ILUMINATI-Signature": f"sha256={signature}",
-        "X-ILUMINATI-Event": event_type,
-        "User-Agent": "ILUMINATI-System-Webhooks/1.0"
-    }
+    count = await asyncio.to_thread(_enqueue_in_session, event_type, payload, None, [webhook.id])
+    if count:
+        _dispatcher.notify()
+    return count > 0
+
+
+async def deliver_event_to_all_webhooks(event_type: str, payload: Dict[str, Any], user_id: Optional[int] = None) -> int:
+    """
+    Dodať event všetkým relevantným webhookom (cez outbox, neblokuje request).
     
-    # Deliver webhook
-    try:
-        response = requests.post(
-            webhook.url,
-            data=payload_json,
-            headers=headers,
-            timeout=10
+    Args:
+        event_type: Type of event
+        payload: Event payload
+        user_id: Optional user ID filter (ak None, pošle všetkým)
+        
+    Returns:
+        Počet zaradených doručení
+    """
+    count = await asyncio.to_thread(_enqueue_in_session, event_type, payload, user_id)
+    if count:
+        _dispatcher.notify()
+    return count
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponenciálny backoff s jitterom (sekundy) po `attempts` neúspešných pokusoch"""
+    delay = min(WEBHOOK_RETRY_MAX_SECONDS, WEBHOOK_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay + random.uniform(0, delay * 0.1)
+
+
+def endpoint_claim_cap(max_batch_size: Optional[int]) -> int:
+    """
+    Maximum položiek jedného webhooku v jednom claime, aby sa stihli doručiť
+    pred expiráciou leasu aj pri timeoute každého requestu:
+    kôl = lease / timeout - 1 (rezerva na DB fázy), v každom kole
+    WEBHOOK_PER_ENDPOINT_CONCURRENCY requestov po max_batch_size položiek.
+    """
+    rounds = max(1, int(WEBHOOK_CLAIM_LEASE_SECONDS // WEBHOOK_TIMEOUT_SECONDS) - 1)
+    return rounds * max(1, WEBHOOK_PER_ENDPOINT_CONCURRENCY) * max(1, max_batch_size or 1)
+
+
+def _is_retryable(status_code: Optional[int]) -> bool:
+    """Sieťové chyby, timeouty, 408/429 a 5xx sa opakujú; ostatné 4xx sú trvalé"""
+    if status_code is None:
+        return True
+    return status_code in (408, 429) or status_code >= 500
+
+
+class WebhookDispatcher:
+    """
+    Doručovanie z outboxu: claim dávky due položiek, paralelné HTTP
+    (zdieľaný aiohttp pool, limit súbežnosti per webhook), jeden bulk
+    zápis delivery logov a stavov na dávku.
+    """
+
+    def __init__(
+        self,
+        sender: Optional[Sender] = None,
+        per_endpoint_concurrency: int = WEBHOOK_PER_ENDPOINT_CONCURRENCY
+    ):
+        self._sender = sender
+        self._per_endpoint_concurrency = per_endpoint_concurrency
+        self._session = None
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {
+            "delivered": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+            "requests": 0,
+            "last_batch_size": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    async def _post(self, url: str, body: str, headers: Dict[str, str]) -> Tuple[int, str]:
+        if self._sender is not None:
+            return await self._sender(url, body, headers)
+        if self._session is None or self._session.closed:
+            import aiohttp  # až pri prvom doručení - aiohttp nespomaľuje štart aplikácie
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=WEBHOOK_MAX_CONNECTIONS),
+                timeout=aiohttp.ClientTimeout(total=WEBHOOK_TIMEOUT_SECONDS)
+            )
+        async with self._session.post(url, data=body, headers=headers) as response:
+            text = await response.text()
+            return response.status, text[:1000]
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def notify(self) -> None:
+        """Prebudiť worker (nový event v outboxe)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def claim_due(self, db: Session, limit: int, now: datetime) -> List[WebhookOutbox]:
+        """
+        Zamknúť dávku due položiek leasom (claim token), aby ich viac
+        workerov nespracovalo dvakrát. Nedokončený lease po páde expiruje.
+        Z jedného webhooku sa berie najviac endpoint_claim_cap položiek, aby
+        doručenie aj pomalému endpointu skončilo v rámci leasu.
+        """
+        unlocked = or_(WebhookOutbox.locked_until.is_(None), WebhookOutbox.locked_until < now)
+        candidates = db.query(WebhookOutbox.id, WebhookOutbox.webhook_id, Webhook.max_batch_size).outerjoin(
+            Webhook, Webhook.id == WebhookOutbox.webhook_id
+        ).filter(
+            WebhookOutbox.status == OUTBOX_PENDING,
+            WebhookOutbox.next_attempt_at <= now,
+            unlocked
+        ).order_by(WebhookOutbox.next_attempt_at, WebhookOutbox.id).limit(limit)
+        
+        due_ids = []
+        per_webhook: Dict[int, int] = {}
+        for row_id, webhook_id, max_batch_size in candidates:
+            taken = per_webhook.get(webhook_id, 0)
+            if taken >= endpoint_claim_cap(max_batch_size):
+                continue
+            per_webhook[webhook_id] = taken + 1
+            due_ids.append(row_id)
+        if not due_ids:
+            return []
+        
+        token = uuid.uuid4().hex
+        db.query(WebhookOutbox).filter(WebhookOutbox.id.in_(due_ids), unlocked).update(
+            {
+                WebhookOutbox.claim_token: token,
+                WebhookOutbox.locked_until: now + timedelta(seconds=WEBHOOK_CLAIM_LEASE_SECONDS)
+            },
+            synchronize_session=False
         )
+        db.commit()
+        return db.query(WebhookOutbox).filter(
+            WebhookOutbox.claim_token == token
+        ).order_by(WebhookOutbox.id).all()
+
+    async def _deliver_chunk(
+        self,
+        webhook_id: int,
+        url: str,
+        secret: str,
+        chunk: List[Tuple[int, str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Jeden HTTP request - jeden event, alebo batch eventov pre odberateľa"""
+        if len(chunk) == 1:
+            event_type, body_obj = chunk[0][1], chunk[0][2]
+        else:
+            event_type = "batch"
+            body_obj = {
+                "event": "batch",
+                "timestamp": datetime.utcnow().isoformat(),
+                "events": [item[2] for item in chunk]
+            }
+        body = json.dumps(body_obj, default=str)
+        headers = {
+            "Content-Type": "application/json",
+            "X-ILUMINATI-Signature": f"sha256={generate_webhook_signature(body, secret)}",
+            "X-ILUMINATI-Event": event_type,
+            "X-ILUMINATI-Delivery": ",".join(str(item[0]) for item in chunk),
+            "User-Agent": "ILUMINATI-System-Webhooks/1.0"
+        }
         
-        success = 200 <= response.status_code < 300
+        semaphore = self._semaphores.get(webhook_id)
+        if semaphore is None:
+            semaphore = self._semaphores[webhook_id] = asyncio.Semaphore(self._per_endpoint_concurrency)
         
-        # Log delivery
-        with get_db_session() as db:
-            if db:
-                delivery = WebhookDelivery(
-                    webhook_id=webhook.id,
-                    event_type=event_type,
-                    payload=webhook_payload,
-                    response_status=response.status_code,
-                    response_body=response.text[:1000],  # Limit response body
-                    success=success,
-                    error_message=None if success else f"HTTP {response.status_code}"
+        async with semaphore:
+            try:
+                status_code, text = await asyncio.wait_for(
+                    self._post(url, body, headers), WEBHOOK_TIMEOUT_SECONDS
                 )
-                db.add(delivery)
+                success = 200 <= status_code < 300
+                error = None if success else f"HTTP {status_code}"
+            except Exception as e:
+                status_code, text, success = None, None, False
+                error = (str(e) or e.__class__.__name__)[:500]
+        
+        return {
+            "ids": [item[0] for item in chunk],
+            "status": status_code,
+            "body": text,
+            "success": success,
+            "error": error
+        }
+
+    def _apply_results(
+        self,
+        db: Session,
+        items: Dict[int, WebhookOutbox],
+        results: List[Dict[str, Any]],
+        webhooks: Dict[int, Webhook],
+        now: datetime
+    ) -> Dict[str, int]:
+        """Bulk zápis delivery logov, stavov outboxu a štatistík webhookov (jeden commit)"""
+        counts = {"delivered": 0, "retried": 0, "dead_lettered": 0}
+        deliveries = []
+        delivered_ids = []
+        per_webhook: Dict[int, List[int]] = {}
+        
+        for result in results:
+            for item_id in result["ids"]:
+                item = items.get(item_id)
+                if item is None:
+                    # Lease medzitým prevzal iný worker - výsledok zapíše on
+                    continue
+                deliveries.append({
+                    "webhook_id": item.webhook_id,
+                    "event_type": item.event_type,
+                    "payload": item.payload,
+                    "response_status": result["status"],
+                    "response_body": result["body"],
+                    "delivery_time": now,
+                    "success": result["success"],
+                    "error_message": result["error"]
+                })
+                stats = per_webhook.setdefault(item.webhook_id, [0, 0])
+                if result["success"]:
+                    stats[0] += 1
+                    delivered_ids.append(item_id)
+                    counts["delivered"] += 1
+                    continue
                 
-                # Update webhook stats
-                webhook.last_delivered_at = datetime.utcnow()
-                if success:
-                    webhook.success_count += 1
+                stats[1] += 1
+                item.attempts += 1
+                item.last_error = result["error"]
+                item.claim_token = None
+                item.locked_until = None
+                if item.attempts >= WEBHOOK_MAX_ATTEMPTS or not _is_retryable(result["status"]):
+                    item.status = OUTBOX_DEAD
+                    counts["dead_lettered"] += 1
                 else:
-                    webhook.failure_count += 1
-                
-                db.commit()
-        
-        return success
+                    item.next_attempt_at = now + timedelta(seconds=retry_delay(item.attempts))
+                    counts["retried"] += 1
         
-    except Exception as e:
-        # Log error
+        if deliveries:
+            db.bulk_insert_mappings(WebhookDelivery, deliveries)
+        if delivered_ids:
+            # Doručené položky netreba držať - história je v webhook_deliveries
+            for item_id in delivered_ids:
+                db.expunge(items[item_id])
+            db.query(WebhookOutbox).filter(WebhookOutbox.id.in_(delivered_ids)).delete(synchronize_session=False)
+        for webhook_id, (succeeded, failed) in per_webhook.items():
+            webhook = webhooks.get(webhook_id)
+            if webhook is None:
+                continue
+            webhook.success_count += succeeded
+            webhook.failure_count += failed
+            webhook.last_delivered_at = now
+        db.commit()
+        return counts
+
+    def _claim_batch(
+        self, now: datetime
+    ) -> Optional[Tuple[str, List[Tuple[int, int, str, Dict[str, Any]]], Dict[int, Dict[str, Any]]]]:
+        """
+        Claim dávky v krátkej session (volá sa cez asyncio.to_thread).
+        Vráti (claim token, snapshot položiek, snapshot webhookov) - počas HTTP
+        sa ORM objekty ani session nedržia.
+        """
         with get_db_session() as db:
-            if db:
-                delivery = WebhookDelivery(
-                    webhook_id=webhook.id,
-                    event_type=event_type,
-                    payload=webhook_payload,
-                    success=False,
-                    error_message=str(e)[:500]
-                )
-                db.add(delivery)
-                
-                webhook.failure_count += 1
-                db.commit()
+            if db is None:
+                return None
+            claimed = self.claim_due(db, WEBHOOK_DISPATCH_BATCH_SIZE, now)
+            if not claimed:
+                return None
+            items = [(item.id, item.webhook_id, item.event_type, item.payload) for item in claimed]
+            webhooks = {
+                webhook.id: {
+                    "url": webhook.url,
+                    "secret": webhook.secret,
+                    "is_active": webhook.is_active,
+                    "max_batch_size": webhook.max_batch_size,
+                }
+                for webhook in db.query(Webhook).filter(Webhook.id.in_({item.webhook_id for item in claimed}))
+            }
+            return claimed[0].claim_token, items, webhooks
+
+    def _record_results(self, token: str, results: List[Dict[str, Any]], now: datetime) -> Dict[str, int]:
+        """Zápis výsledkov v novej krátkej session - len položky, ktoré ešte držia náš claim token"""
+        with get_db_session() as db:
+            if db is None:
+                return {"delivered": 0, "retried": 0, "dead_lettered": 0}
+            items = {
+                item.id: item
+                for item in db.query(WebhookOutbox).filter(WebhookOutbox.claim_token == token)
+            }
+            webhooks = {
+                webhook.id: webhook
+                for webhook in db.query(Webhook).filter(Webhook.id.in_({item.webhook_id for item in items.values()}))
+            }
+            return self._apply_results(db, items, results, webhooks, now)
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Spracovať jednu dávku outboxu: claim (commit) -> HTTP doručenia bez
+        otvorenej session -> zápis výsledkov. DB fázy bežia v asyncio.to_thread.
+        """
+        now = now or datetime.utcnow()
+        batch = await asyncio.to_thread(self._claim_batch, now)
+        if batch is None:
+            return {"delivered": 0, "retried": 0, "dead_lettered": 0}
+        token, claimed, webhooks = batch
+        started = time.perf_counter()
         
-        return False
-
-
-async def deliver_event_to_all_webhooks(event_type: str, payload: Dict[str, Any], user_id: Optional[int] = None):
-    """
-    Dodať event všetkým relevantným webhookom.
-    
-    Args:
-        event_type: Type of event
-        payload: Event payload
-        user_id: Optional user ID filter (ak None, pošle všetkým)
-    """
-    with get_db_session() as db:
-        if not db:
-            return
+        groups: Dict[int, List[Tuple[int, str, Dict[str, Any]]]] = {}
+        results: List[Dict[str, Any]] = []
+        for item_id, webhook_id, event_type, payload in claimed:
+            webhook = webhooks.get(webhook_id)
+            if webhook is None or not webhook["is_active"]:
+                results.append({
+                    "ids": [item_id], "status": 410, "body": None,
+                    "success": False, "error": "Webhook deactivated"
+                })
+                continue
+            groups.setdefault(webhook_id, []).append((item_id, event_type, payload))
         
-        query = db.query(Webhook).filter(Webhook.is_active == True)
-        if user_id:
-            query = query.filter(Webhook.user_id == user_id)
+        tasks = []
+        for webhook_id, group in groups.items():
+            webhook = webhooks[webhook_id]
+            batch_size = max(1, webhook["max_batch_size"] or 1)
+            for i in range(0, len(group), batch_size):
+                tasks.append(self._deliver_chunk(webhook_id, webhook["url"], webhook["secret"], group[i:i + batch_size]))
         
-        webhooks = query.all()
+        results.extend(await asyncio.gather(*tasks))
+        counts = await asyncio.to_thread(self._record_results, token, results, now)
         
-        for webhook in webhooks:
-            await deliver_webhook(webhook, event_type, payload)
+        self._stats["requests"] += len(tasks)
+        for key, value in counts.items():
+            self._stats[key] += value
+        self._stats["last_batch_size"] = len(claimed)
+        self._stats["last_batch_seconds"] = time.perf_counter() - started
+        return counts
+
+    async def run(self, interval: float = WEBHOOK_DISPATCH_INTERVAL_SECONDS) -> None:
+        """Background loop - plná dávka sa spracuje hneď, inak čaká na notify/interval"""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                self._wakeup.clear()
+                processed = 0
+                try:
+                    processed = sum((await self.run_once()).values())
+                except Exception as e:
+                    logger.warning(f"Webhook dispatcher error: {e}")
+                if processed >= WEBHOOK_DISPATCH_BATCH_SIZE:
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        seconds = stats["last_batch_seconds"]
+        stats["deliveries_per_second"] = round(stats["last_batch_size"] / seconds, 2) if seconds else 0.0
+        stats["last_batch_seconds"] = round(seconds, 4)
+        return stats
+
+
+# Globálna inštancia
+_dispatcher = WebhookDispatcher()
+
+
+async def run_webhook_dispatcher() -> None:
+    """Background worker pre doručovanie webhookov"""
+    await _dispatcher.run()
+
+
+def notify_webhook_dispatcher() -> None:
+    """Prebudiť dispatcher po enqueue_event mimo request handlerov"""
+    _dispatcher.notify()
+
+
+def get_webhook_dispatcher_stats() -> Dict[str, Any]:
+    """Štatistiky doručovania (throughput = doručenia/s poslednej dávky)"""
+    return _dispatcher.get_stats()
+
+
+def get_webhook_queue_stats(db: Session, webhook_id: int) -> Dict[str, int]:
+    """Počet položiek v outboxe podľa stavu (pending / dead)"""
+    rows = db.query(WebhookOutbox.status, func.count(WebhookOutbox.id)).filter(
+        WebhookOutbox.webhook_id == webhook_id
+    ).group_by(WebhookOutbox.status).all()
+    stats = {OUTBOX_PENDING: 0, OUTBOX_DEAD: 0}
+    stats.update({status: count for status, count in rows})
+    return stats
+
+
+def requeue_dead_letters(db: Session, webhook_id: int, user_id: int) -> int:
+    """Vrátiť dead-letter položky webhooku späť do fronty"""
+    webhook = get_webhook_by_id(db, webhook_id, user_id)
+    if not webhook:
+        return 0
+    
+    count = db.query(WebhookOutbox).filter(
+        WebhookOutbox.webhook_id == webhook_id,
+        WebhookOutbox.status == OUTBOX_DEAD
+    ).update(
+        {
+            WebhookOutbox.status: OUTBOX_PENDING,
+            WebhookOutbox.attempts: 0,
+            WebhookOutbox.next_attempt_at: datetime.utcnow(),
+            WebhookOutbox.claim_token: None,
+            WebhookOutbox.locked_until: None
+        },
+        synchronize_session=False
+    )
+    db.commit()
+    if count:
+        _dispatcher.notify()
+    return count
 
 
 def get_webhook_deliveries(db: Session, webhook_id: int, user_id: int, limit: int = 50) -> List[WebhookDelivery]:
@@ -297,6 +737,8 @@ def get_webhook_stats(db: Session, webhook_id: int, user_id: int) -> Optional[Di
         "last_delivered_at": webhook.last_delivered_at.isoformat() if webhook.last_delivered_at else None,
         "success_count": webhook.success_count,
         "failure_count": webhook.failure_count,
-        "total_deliveries": webhook.success_count + webhook.failure_count
+        "total_deliveries": webhook.success_count + webhook.failure_count,
+        "max_batch_size": webhook.max_batch_size,
+        "queue": get_webhook_queue_stats(db, webhook.id)
     }
 
@@ -0,0 +1,56 @@
+"""
+Spoločné fixtures pre testy (in-memory SQLite schéma, presmerovanie get_db_session)
+"""
+
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Registrácia mapperov pre User.api_keys / User.webhooks (relationship podľa názvu)
+from services.api_keys import ApiKey  # noqa: F401
+from services.database import Base
+from services.metering import ApiUsageRollup  # noqa: F401 (tabuľka pre analytics.get_api_usage)
+from services.webhooks import Webhook  # noqa: F401
+
+
+@pytest.fixture
+def db():
+    """
+    Session nad čistou in-memory SQLite schémou.
+    StaticPool = jedno spojenie, takže dáta vidí aj kód bežiaci v asyncio.to_thread.
+    """
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def patch_db_session(monkeypatch):
+    """Presmeruje get_db_session zadaných modulov na testovaciu session"""
+
+    def _patch(session, *modules):
+        @contextmanager
+        def _session():
+            yield session
+
+        for module in modules:
+            monkeypatch.setattr(module, "get_db_session", _session)
+        return session
+
+    return _patch
@@ -0,0 +1,94 @@
+"""
+Testy pre normalizáciu V4 adries, address uzly grafu a detekciu virtuálnych sídiel
+"""
+
+import os
+import sys
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import graph_service as graph_module
+from services.address_normalizer import (
+    address_node_id,
+    is_virtual_seat_address,
+    normalize_address,
+)
+from services.database import GraphEdge, GraphNode
+from services.graph_service import GraphService
+from services.risk_intelligence import detect_virtual_seats
+
+
+@pytest.mark.parametrize("variant", [
+    "Hlavná 1, 811 01 Bratislava",
+    "ul. Hlavná 1, 81101 Bratislava",
+    "Hlavna ulica 1, 811 01 BA, Slovensko",
+    {"street": "Hlavná", "number": "1", "postal_code": "811 01", "city": "Bratislava"},
+    {"raw": "HLAVNÁ 1,  811 01  Bratislava"},
+])
+def test_sk_spelling_variants_share_key(variant):
+    assert normalize_address(variant, "SK").key == "SK|81101|hlavna|1"
+
+
+def test_v4_formats():
+    assert normalize_address("ul. Marszałkowska 12/A, 00950 Warsaw", "PL").key == \
+        normalize_address("Marszalkowska 12/a, 00-950 Warszawa", "PL").key
+    assert normalize_address("Andrássy u. 5, H-1061 Budapest", "HU").street == "andrassy utca"
+    assert normalize_address("Andrassy utca 5, 1061 Bp", "HU").node_id == \
+        address_node_id("Andrássy u. 5, H-1061 Budapest", "HU")
+    cz = normalize_address("nám. Míru 7, 120 00 Prague", "CZ")
+    assert (cz.street, cz.number, cz.postal_code, cz.city) == ("namesti miru", "7", "12000", "praha")
+    assert normalize_address("", "SK") is None
+
+
+def test_virtual_seat_markers():
+    assert is_virtual_seat_address("P.O. Box 12, 811 01 Bratislava", "SK")
+    assert is_virtual_seat_address("Coworking Hub, Mlynská 3, Košice", "SK")
+    assert not is_virtual_seat_address("Hlavná 52, 811 01 Bratislava", "SK")
+    assert not is_virtual_seat_address(None)
+
+
+@pytest.fixture
+def db(db, patch_db_session):
+    return patch_db_session(db, graph_module)
+
+
+def test_ingest_merges_address_variants(db):
+    service = GraphService()
+    for i, raw in enumerate(["Hlavná 1, 811 01 Bratislava", "ul. Hlavna 1, 81101 BA", "Hlavná ulica 1, 811 01"]):
+        service.ingest_company_relationships(f"sk_{i}", "SK", f"Firma {i}", {"raw": raw})
+
+    address_nodes = db.query(GraphNode).filter(GraphNode.type == "address").all()
+    assert len(address_nodes) == 1
+    assert address_nodes[0].details["normalized"]["key"] == "SK|81101|hlavna|1"
+    assert service.count_companies_at_addresses([address_nodes[0].id]) == {address_nodes[0].id: 3}
+
+
+def test_renormalize_legacy_address_nodes(db):
+    for i, raw in enumerate(["Hlavná 1, 811 01 Bratislava", "ul. Hlavna 1, 81101 BA"]):
+        db.add(GraphNode(id=f"company_{i}", label=f"Firma {i}", type="company", country="SK"))
+        db.add(GraphNode(id=f"addr_sk_legacy{i}", label=raw, type="address", country="SK", details={"raw": raw}))
+        db.add(GraphEdge(source=f"company_{i}", target=f"addr_sk_legacy{i}", type="LOCATED_AT"))
+    db.commit()
+
+    stats = GraphService().renormalize_address_nodes()
+
+    assert stats == {"checked": 2, "merged": 2, "edges_moved": 2}
+    canonical = address_node_id("Hlavná 1, 811 01 Bratislava", "SK")
+    assert [n.id for n in db.query(GraphNode).filter(GraphNode.type == "address")] == [canonical]
+    assert {e.target for e in db.query(GraphEdge)} == {canonical}
+
+
+def test_virtual_seats_use_exact_counts():
+    nodes = [
+        {"id": "company_1", "type": "company"},
+        {"id": "addr_sk_1", "type": "address"},
+    ]
+    edges = [{"source": "company_1", "target": "addr_sk_1", "type": "LOCATED_AT"}]
+
+    assert detect_virtual_seats(nodes, edges) == {}
+    assert detect_virtual_seats(nodes, edges, {"addr_sk_1": 12}) == {"addr_sk_1": 12}
@@ -0,0 +1,139 @@
+"""
+Testy pre analytics rollupy (inkrementálny agregátor + dashboard dotazy)
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import analytics, analytics_rollup, cache
+from services.analytics_rollup import SearchRollup, run_aggregation
+from services.database import Analytics, SearchHistory
+
+
+@pytest.fixture
+def db(db, patch_db_session):
+    patch_db_session(db, analytics, analytics_rollup)
+    cache.clear()
+    yield db
+    cache.clear()
+
+
+def _add_searches(db, now):
+    rows = [
+        ("SK", 2.0, "1.1.1.1", now - timedelta(hours=1)),
+        ("SK", 8.5, "1.1.1.1", now - timedelta(hours=1)),
+        ("CZ", 5.0, "2.2.2.2", now - timedelta(days=1)),
+        ("PL", None, "3.3.3.3", now - timedelta(days=2)),
+        ("HU", 9.0, "4.4.4.4", now - timedelta(days=60)),  # mimo okna
+    ]
+    for country, score, ip, ts in rows:
+        db.add(SearchHistory(query="x", country=country, risk_score=score, user_ip=ip, search_timestamp=ts))
+    db.commit()
+
+
+def test_aggregation_is_incremental(db):
+    """Druhý beh spracuje len nové riadky"""
+    now = datetime.utcnow()
+    _add_searches(db, now)
+
+    assert run_aggregation(db, batch_size=2)["search_history"] == 5
+    assert run_aggregation(db)["search_history"] == 0
+
+    db.add(SearchHistory(query="y", country="SK", risk_score=2.0, search_timestamp=now - timedelta(minutes=5)))
+    db.commit()
+    assert run_aggregation(db)["search_history"] == 1
+    assert sum(r.search_count for r in db.query(SearchRollup)) == 6
+
+
+def test_late_commit_below_watermark_is_counted(db):
+    """Riadok s nižším id commitnutý neskôr sa nestratí (lag horizont)"""
+    now = datetime.utcnow()
+    db.add(SearchHistory(id=1, query="a", country="SK", search_timestamp=now - timedelta(hours=1)))
+    db.add(SearchHistory(id=3, query="c", country="SK", search_timestamp=now))
+    db.commit()
+    assert run_aggregation(db, lag_seconds=60)["search_history"] == 1
+
+    # id=2 si transakcia pridelila pred id=3, commit prišiel až teraz
+    db.add(SearchHistory(id=2, query="b", country="SK", search_timestamp=now - timedelta(seconds=1)))
+    db.commit()
+    assert run_aggregation(db, lag_seconds=0)["search_history"] == 2
+    assert sum(r.search_count for r in db.query(SearchRollup)) == 3
+
+
+def test_lost_watermark_claim_discards_batch(db, monkeypatch):
+    """Ak watermark medzitým posunie iný worker, dávka sa nepripočíta druhýkrát"""
+    _add_searches(db, datetime.utcnow())
+    read = analytics_rollup._read_search_batch
+
+    def read_then_other_worker_commits(session, after_id, upper_id, limit):
+        rows = read(session, after_id, upper_id, limit)
+        assert analytics_rollup._claim_range(session, "search_history", after_id, rows[-1][0])
+        session.commit()
+        return rows
+
+    monkeypatch.setattr(analytics_rollup, "_read_search_batch", read_then_other_worker_commits)
+    assert run_aggregation(db)["search_history"] == 0
+    assert db.query(SearchRollup).count() == 0
+    assert not analytics_rollup._claim_range(db, "search_history", 0, 5)
+
+
+def test_risk_distribution_matches_raw_history(db):
+    """Distribúcia z rollupov zodpovedá pôvodnému výpočtu"""
+    _add_searches(db, datetime.utcnow())
+    run_aggregation(db)
+
+    result = analytics.get_risk_distribution(days=30)
+    assert result["total"] == 3
+    assert result["high_risk_count"] == 1
+    assert result["medium_risk_count"] == 1
+    assert result["low_risk_count"] == 1
+    assert result["average_score"] == 5.0
+    assert result["distribution"][8]["count"] == 1
+
+
+def test_search_trends_and_user_activity(db):
+    """Trendy a aktivita sa počítajú len z rollupov"""
+    now = datetime.utcnow()
+    _add_searches(db, now)
+    event_ts = now - timedelta(minutes=5)
+    db.add(Analytics(event_type="search", event_data={"endpoint": "/api/search", "status_code": 500}, timestamp=event_ts))
+    db.add(Analytics(event_type="export", event_data={}, timestamp=event_ts))
+    db.commit()
+    run_aggregation(db)
+
+    trends = analytics.get_search_trends(days=30)
+    assert trends["total"] == 4
+    by_country = {}
+    for item in trends["data"]:
+        for country, count in item["countries"].items():
+            by_country[country] = by_country.get(country, 0) + count
+    assert by_country == {"SK": 2, "CZ": 1, "PL": 1}
+
+    activity = analytics.get_user_activity(days=30)
+    assert activity["active_users"] == 3
+    assert activity["retention_rate"] == round(1 / 3 * 100, 2)
+    assert activity["feature_usage"] == {"search": 1, "export": 1}
+
+    usage = analytics.get_api_usage(days=30)
+    assert usage["total_calls"] == 1
+    assert usage["error_rate"] == 100.0
+    assert usage["most_used_endpoints"] == [{"endpoint": "/api/search", "count": 1}]
+
+
+def test_results_are_cached(db):
+    """Opakované volanie vráti výsledok z cache"""
+    _add_searches(db, datetime.utcnow())
+    run_aggregation(db)
+    first = analytics.get_risk_distribution(days=7)
+
+    db.query(SearchRollup).delete()
+    db.commit()
+    assert analytics.get_risk_distribution(days=7) == first
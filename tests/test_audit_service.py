@@ -86,3 +86,56 @@ def test_audit_liquidated_company(audit_service, mock_orsr_provider):
     # Should have high risk due to status
     assert result["risk_score"] >= 7
     assert any("likvid" in a["message"].lower() for a in result["alerts"])
+
+def test_audit_report_cached_and_versioned(mock_orsr_provider):
+    """Opakovaný audit toho istého IČO sa vráti z cache bez volania registrov"""
+    from services.audit_service import AUDIT_REPORT_VERSION
+    from services.provider_cache import ProviderCache
+
+    service = AuditService(cache=ProviderCache(use_redis=False))
+    mock_orsr_provider.lookup_by_ico.return_value = {
+        "name": "Cached s.r.o.", "address": "Hlavná 1, Nitra", "status": "Aktívna", "postal_code": "94901",
+    }
+
+    first = service.perform_deep_audit("36421928")
+    second = service.perform_deep_audit("36421928")
+    assert second is first
+    assert mock_orsr_provider.lookup_by_ico.call_count == 1
+    assert first["report_version"] == AUDIT_REPORT_VERSION and len(first["fingerprint"]) == 40
+
+    refreshed = service.perform_deep_audit("36421928", force_refresh=True)
+    assert mock_orsr_provider.lookup_by_ico.call_count == 2
+    assert refreshed["fingerprint"] == first["fingerprint"]  # vstupy sa nezmenili
+def test_stale_audit_report_reused_when_fingerprint_matches(mock_orsr_provider, monkeypatch):
+    """Po uplynutí čerstvosti sa report prepočíta len ak sa zmenili vstupy (fingerprint)"""
+    from services import audit_service as audit_module
+    from services.provider_cache import ProviderCache
+
+    monkeypatch.setattr(audit_module, "AUDIT_REPORT_FRESH_SECONDS", 0)
+    service = AuditService(cache=ProviderCache(use_redis=False))
+    company = {"name": "Stable s.r.o.", "address": "Hlavná 1, Nitra", "status": "Aktívna", "postal_code": "94901"}
+    mock_orsr_provider.lookup_by_ico.return_value = company
+
+    first = service.perform_deep_audit("36421928")
+    second = service.perform_deep_audit("36421928")
+    assert mock_orsr_provider.lookup_by_ico.call_count == 2  # vstupy sa overili
+    assert second is first and second["timestamp"] == first["timestamp"]
+
+    mock_orsr_provider.lookup_by_ico.return_value = dict(company, status="V likvidácii")
+    changed = service.perform_deep_audit("36421928")
+    assert changed is not first and changed["fingerprint"] != first["fingerprint"]
+    assert changed["risk_score"] >= 7
+
+
+def test_virtual_address_matcher_word_boundaries():
+    """Aho-Corasick matcher - bez diakritiky, len celé slová"""
+    from services.address_matcher import AddressMatcher, AhoCorasick
+
+    automaton = AhoCorasick(["he", "she", "his", "hers"]).build()
+    assert sorted(p for _, p in automaton.iter_matches("ushers")) == ["he", "hers", "she"]
+
+    matcher = AddressMatcher(["Napájadlá 7", "P.O.Box", "námestie SNP"])
+    assert matcher.find("NAPAJADLA 7, 040 12 Košice") == ["Napájadlá 7"]
+    assert matcher.find("Napájadlá 71, Košice") == []
+    assert matcher.find("P. O. Box 12, Námestie SNP 1, Bratislava") == ["P.O.Box", "námestie SNP"]
+    assert not matcher.matches("")
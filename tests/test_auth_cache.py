@@ -0,0 +1,129 @@
+"""
+Testy pre auth cache (principal cache, revocation, API key usage buffer)
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import auth_cache
+from services.api_keys import ApiKey, ApiKeyUsageBuffer, create_api_key
+from services.auth import User, UserTier, create_access_token, decode_access_token
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    auth_cache.clear_auth_cache()
+    yield
+    auth_cache.clear_auth_cache()
+
+
+@pytest.fixture
+def db(db):
+    db.add(User(email="api@test.sk", hashed_password="x", tier=UserTier.ENTERPRISE))
+    db.commit()
+    return db
+
+
+def test_principal_cache_ttl_expiration():
+    """Principal po TTL expiruje"""
+    cache = auth_cache.PrincipalCache(ttl_seconds=0)
+    cache.set("k", "value", user_id=1)
+    time.sleep(0.01)
+    assert cache.get("k") is None
+
+
+def test_principal_cache_lru_bound():
+    """Cache neprekročí max_size"""
+    cache = auth_cache.PrincipalCache(ttl_seconds=60, max_size=2)
+    cache.set("a", 1, user_id=1)
+    cache.set("b", 2, user_id=1)
+    cache.set("c", 3, user_id=2)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+
+
+def test_invalidate_user_drops_tokens_and_api_keys():
+    """Zmena tieru zahodí všetky principaly používateľa"""
+    user = User(id=7, email="a@b.sk", tier=UserTier.PRO)
+    auth_cache.cache_user("jti:1", user)
+    auth_cache.cache_api_key("hash1", {"api_key_id": 3, "user_id": 7, "user": user})
+    auth_cache.cache_user("jti:2", User(id=8, email="c@d.sk", tier=UserTier.FREE))
+
+    auth_cache.invalidate_user(7)
+
+    assert auth_cache.get_cached_user("jti:1") is None
+    assert auth_cache.get_cached_api_key("hash1") is None
+    assert auth_cache.get_cached_user("jti:2") is not None
+
+
+def test_invalidate_api_key_by_id():
+    """Revoke API key zahodí jeho principal"""
+    auth_cache.cache_api_key("hash1", {"api_key_id": 3, "user_id": 7, "user": None})
+    auth_cache.invalidate_api_key(3)
+    assert auth_cache.get_cached_api_key("hash1") is None
+
+
+def test_token_carries_jti_and_can_be_revoked():
+    """Token má JTI, logout ho odvolá až do expirácie"""
+    token = create_access_token({"sub": "a@b.sk"}, expires_delta=timedelta(minutes=5))
+    payload = decode_access_token(token)
+    key = auth_cache.token_cache_key(token, payload)
+    assert key.startswith("jti:")
+
+    auth_cache.cache_user(key, User(id=1, email="a@b.sk"))
+    auth_cache.revoke_token(key, datetime.utcnow() + timedelta(minutes=5))
+
+    assert auth_cache.is_token_revoked(key)
+    assert auth_cache.get_cached_user(key) is None
+
+
+def test_usage_buffer_aggregates_and_flushes(db):
+    """Usage počítadlá sa agregujú v pamäti a zapíšu jedným flush"""
+    user = db.query(User).first()
+    created = create_api_key(db, user_id=user.id, name="test")
+    buffer = ApiKeyUsageBuffer(flush_interval=3600, flush_threshold=1000)
+
+    for _ in range(5):
+        buffer.record(created["id"])
+    assert buffer.pending_count(created["id"]) == 5
+
+    assert buffer.flush(db) == 1
+    api_key = db.query(ApiKey).filter(ApiKey.id == created["id"]).first()
+    db.refresh(api_key)
+    assert api_key.usage_count == 5
+    assert api_key.last_used_at is not None
+    assert buffer.pending_count(created["id"]) == 0
+
+
+def test_usage_buffer_signals_flush_at_threshold():
+    """record() signalizuje flush po dosiahnutí limitu"""
+    buffer = ApiKeyUsageBuffer(flush_interval=3600, flush_threshold=3)
+    assert buffer.record(1) is False
+    assert buffer.record(2) is False
+    assert buffer.record(1) is True
+
+
+def test_request_path_only_marks_usage_due(monkeypatch):
+    """record_api_key_usage nezapisuje do DB - flush nechá na metering worker"""
+    from services import api_keys
+
+    buffer = ApiKeyUsageBuffer(flush_interval=3600, flush_threshold=2)
+    monkeypatch.setattr(api_keys, "_usage_buffer", buffer)
+    monkeypatch.setattr(api_keys, "flush_api_key_usage", lambda db=None: pytest.fail("flush na request path"))
+
+    api_keys.record_api_key_usage(1)
+    assert not api_keys.api_key_usage_flush_due()
+    api_keys.record_api_key_usage(1)
+    assert api_keys.api_key_usage_flush_due()
+    buffer.drain()
+    assert not api_keys.api_key_usage_flush_due()
@@ -0,0 +1,142 @@
+"""
+Testy pre bulk ingest dumpov registrov (ARES CSV, RPO JSON, KRS XML)
+"""
+
+import gzip
+import json
+import os
+import sys
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import bulk_ingest
+from services.database import CompanyCache, GraphEdge, GraphNode
+from services.identifier_validation import is_valid_ico
+
+ARES_CSV = (
+    "ICO,FIRMA,FORMA,DDATVZN,DDATZAN,TEXTADR,PSC,OBEC_TEXT,ULICE_TEXT,CDOM,COR\n"
+    "25596641,Alfa s.r.o.,112,2000-01-01,,,11000,Praha,Václavské náměstí,846,1\n"
+    "45274649,Beta a.s.,121,1992-05-01,2020-01-01,,60200,Brno,Husova,5,\n"
+    "12345678,Zlé IČO s.r.o.,112,,,,11000,Praha,,,\n"
+)
+
+KRS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Podmioty xmlns="urn:krs">
+  <Podmiot>
+    <NumerKRS>19193</NumerKRS>
+    <Nazwa>Gamma Sp. z o.o.</Nazwa>
+    <FormaPrawna>SPÓŁKA Z OGRANICZONĄ ODPOWIEDZIALNOŚCIĄ</FormaPrawna>
+    <Adres><Ulica>Marszałkowska</Ulica><NrDomu>1</NrDomu><KodPocztowy>00-001</KodPocztowy><Miejscowosc>Warszawa</Miejscowosc></Adres>
+    <Reprezentacja>
+      <Osoba><Imie>Jan</Imie><Nazwisko>Kowalski</Nazwisko></Osoba>
+      <Osoba><Imie>Anna</Imie><Nazwisko>Nowak</Nazwisko></Osoba>
+    </Reprezentacja>
+  </Podmiot>
+</Podmioty>
+"""
+
+
+def _rpo_record(ico, name, executive=None):
+    return {
+        "identifiers": [{"value": ico, "validFrom": "2001-01-01"}],
+        "fullNames": [{"value": f"{name} (old)", "validTo": "2010-01-01"}, {"value": name}],
+        "addresses": [{"street": "Hlavná", "buildingNumber": "1", "postalCodes": ["81101"],
+                       "municipality": {"value": "Bratislava"}}],
+        "legalForms": [{"value": {"value": "Spoločnosť s ručením obmedzeným"}}],
+        "establishment": "2001-01-01",
+        "statutoryBodies": [{"personName": {"formatedName": executive}}] if executive else [],
+    }
+
+
+def test_ares_csv_gz_loads_company_cache_and_graph(db, tmp_path):
+    assert not is_valid_ico("12345678")
+    path = tmp_path / "res.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        handle.write(ARES_CSV)
+
+    stats = bulk_ingest.run_ingest(str(path), "ares_csv", chunk_size=2, workers=1, db=db)
+
+    assert stats == {"records_done": 3, "companies": 2, "rejected": 1, "skipped": 0}
+    rows = {r.identifier: r for r in db.query(CompanyCache)}
+    assert set(rows) == {"25596641", "45274649"}
+    assert rows["25596641"].country == "CZ" and rows["25596641"].company_name == "Alfa s.r.o."
+    assert rows["25596641"].source == "ares_csv" and rows["25596641"].payload["founded"] == "2000-01-01"
+    assert rows["45274649"].status == "Zaniknutá"
+
+    located = db.query(GraphEdge).filter(GraphEdge.type == "LOCATED_AT").all()
+    assert {e.source for e in located} == {"cz_25596641", "cz_45274649"}
+    assert all(e.source_key and e.target_key for e in located)
+
+
+def test_rpo_jsonl_is_idempotent(db, tmp_path):
+    path = tmp_path / "rpo.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in (
+        _rpo_record("00006947", "Ministerstvo s.r.o.", "Ján Novák"),
+        _rpo_record("00006947", "Ministerstvo s.r.o.", "Ján Novák"),
+    )), encoding="utf-8")
+
+    for _ in range(2):
+        bulk_ingest.run_ingest(str(path), "rpo_json", workers=1, checkpoint_path=str(tmp_path / "cp"), db=db)
+        os.remove(tmp_path / "cp")
+
+    company = db.query(CompanyCache).one()
+    assert (company.country, company.company_name, company.legal_form) == (
+        "SK", "Ministerstvo s.r.o.", "Spoločnosť s ručením obmedzeným"
+    )
+    assert company.postal_code == "81101" and company.payload["executives"] == ["Ján Novák"]
+    assert db.query(GraphEdge).filter(GraphEdge.type == "MANAGED_BY").count() == 1
+    assert db.query(GraphNode).filter(GraphNode.type == "person").count() == 1
+
+
+def test_krs_xml_namespaced_records(db, tmp_path):
+    path = tmp_path / "krs.xml"
+    path.write_text(KRS_XML, encoding="utf-8")
+
+    stats = bulk_ingest.run_ingest(str(path), "krs_xml", workers=1, db=db)
+
+    assert stats["companies"] == 1
+    company = db.query(CompanyCache).one()
+    assert (company.country, company.identifier, company.city) == ("PL", "0000019193", "Warszawa")
+    managers = db.query(GraphEdge).filter(GraphEdge.source == "pl_0000019193", GraphEdge.type == "MANAGED_BY")
+    assert managers.count() == 2
+
+
+def test_resume_from_checkpoint(db, tmp_path, monkeypatch):
+    path = tmp_path / "res.csv"
+    path.write_text(ARES_CSV, encoding="utf-8")
+    checkpoint = tmp_path / "res.checkpoint.json"
+    original_write = bulk_ingest.write_chunk
+    calls = []
+
+    def _crash_on_second(session, chunk):
+        calls.append(chunk["raw_count"])
+        if len(calls) == 2:
+            raise RuntimeError("prerušené")
+        original_write(session, chunk)
+
+    monkeypatch.setattr(bulk_ingest, "write_chunk", _crash_on_second)
+    with pytest.raises(RuntimeError):
+        bulk_ingest.run_ingest(str(path), "ares_csv", chunk_size=2, workers=1, checkpoint_path=str(checkpoint), db=db)
+    db.rollback()
+    assert json.loads(checkpoint.read_text())["records_done"] == 2
+
+    monkeypatch.setattr(bulk_ingest, "write_chunk", original_write)
+    stats = bulk_ingest.run_ingest(str(path), "ares_csv", chunk_size=2, workers=1, checkpoint_path=str(checkpoint), db=db)
+
+    assert stats["skipped"] == 2 and stats["records_done"] == 3 and stats["rejected"] == 1
+    assert db.query(CompanyCache).count() == 2
+
+
+def test_worker_pool_preserves_results(db, tmp_path):
+    path = tmp_path / "res.csv"
+    path.write_text(ARES_CSV, encoding="utf-8")
+
+    stats = bulk_ingest.run_ingest(str(path), "ares_csv", chunk_size=1, workers=2, db=db)
+
+    assert stats["records_done"] == 3 and stats["companies"] == 2
+    assert db.query(CompanyCache).count() == 2
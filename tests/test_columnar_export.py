@@ -0,0 +1,115 @@
+"""
+Testy pre columnar (Parquet) export a offline query engine
+"""
+
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+pytest.importorskip("pyarrow")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from services import columnar_export
+from services.columnar_export import PartitionLockedError, export_day, export_pending_days, partition_path, run_query
+from services.database import Analytics, Base, SearchHistory
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    rows = [
+        ("SK", 2.0, "1.1.1.1", datetime(2026, 1, 1, 9)),
+        ("SK", 8.0, "2.2.2.2", datetime(2026, 1, 1, 14)),
+        ("CZ", 4.0, "1.1.1.1", datetime(2026, 1, 2, 9)),
+        ("SK", 6.0, "3.3.3.3", datetime(2026, 1, 3, 10)),  # dnešok - neexportuje sa
+    ]
+    for country, score, ip, ts in rows:
+        session.add(SearchHistory(query="x", country=country, risk_score=score, user_ip=ip, search_timestamp=ts))
+    session.add(Analytics(event_type="search", event_data={"endpoint": "/api/search", "status_code": 200}, timestamp=datetime(2026, 1, 1, 9)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_export_writes_closed_days_once(db, tmp_path):
+    """Exportujú sa len uzavreté dni a len raz"""
+    exported = export_pending_days(db, today=date(2026, 1, 3), base_dir=str(tmp_path))
+    assert exported == {"search_history": 2, "analytics": 2}
+    assert os.path.exists(partition_path("search_history", date(2026, 1, 1), str(tmp_path)))
+    assert not os.path.exists(partition_path("search_history", date(2026, 1, 3), str(tmp_path)))
+
+    again = export_pending_days(db, today=date(2026, 1, 3), base_dir=str(tmp_path))
+    assert again == {"search_history": 0, "analytics": 0}
+
+
+@pytest.mark.skipif(not columnar_export.FCNTL_AVAILABLE, reason="flock nie je dostupný")
+def test_day_locked_by_other_process_is_skipped(db, tmp_path):
+    """Deň, ktorý exportuje iný proces, sa preskočí; dočasné súbory neostávajú"""
+    day = date(2026, 1, 1)
+    directory = os.path.dirname(partition_path("search_history", day, str(tmp_path)))
+    os.makedirs(directory)
+
+    with columnar_export._partition_lock(directory):
+        with pytest.raises(PartitionLockedError):
+            export_day(db, "search_history", day, str(tmp_path))
+        exported = export_pending_days(db, today=date(2026, 1, 3), base_dir=str(tmp_path))
+
+    assert exported["search_history"] == 1
+    assert not os.path.exists(partition_path("search_history", day, str(tmp_path)))
+    assert [name for name in os.listdir(directory) if name.endswith(".tmp")] == []
+
+    assert export_pending_days(db, today=date(2026, 1, 3), base_dir=str(tmp_path))["search_history"] == 1
+    assert os.path.exists(partition_path("search_history", day, str(tmp_path)))
+
+
+def test_query_group_by_date_and_country(db, tmp_path):
+    """Agregácia podľa dňa a krajiny nad Parquet partíciami"""
+    export_pending_days(db, today=date(2026, 1, 3), base_dir=str(tmp_path))
+
+    result = run_query(
+        "search_history",
+        metrics=["count", "avg:risk_score", "count_distinct:client_hash"],
+        group_by=["date", "country"],
+        base_dir=str(tmp_path),
+    )
+    assert result["rows"] == [
+        {"date": "2026-01-01", "country": "SK", "count": 2, "avg:risk_score": 5.0, "count_distinct:client_hash": 2},
+        {"date": "2026-01-02", "country": "CZ", "count": 1, "avg:risk_score": 4.0, "count_distinct:client_hash": 1},
+    ]
+
+
+def test_query_filters_and_date_range(db, tmp_path):
+    """Filtre a rozsah dátumov (partition pruning)"""
+    export_pending_days(db, today=date(2026, 1, 3), base_dir=str(tmp_path))
+
+    result = run_query(
+        "search_history",
+        metrics=["count"],
+        filters={"country": ["SK"]},
+        start_date=date(2026, 1, 1),
+        end_date=date(2026, 1, 1),
+        base_dir=str(tmp_path),
+    )
+    assert result["rows"] == [{"count": 2}]
+
+    by_hour = run_query("search_history", metrics=["count"], group_by=["hour"], base_dir=str(tmp_path))
+    assert by_hour["rows"] == [{"hour": 9, "count": 2}, {"hour": 14, "count": 1}]
+
+
+def test_query_rejects_unknown_columns(tmp_path):
+    """Neplatný dotaz skončí ValueError (400 v API)"""
+    with pytest.raises(ValueError):
+        run_query("search_history", metrics=["sum:user_ip"], base_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        run_query("users", metrics=["count"], base_dir=str(tmp_path))
@@ -0,0 +1,110 @@
+"""
+Testy pre stĺpcový batch firiem a vektorizované risk skóre / fasety
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+np = pytest.importorskip("numpy")
+
+from services import enhanced_data_extractor, pdf_export_service  # noqa: E402
+from services.company_batch import (  # noqa: E402
+    CompanyBatch,
+    risk_histogram,
+    score_batch,
+    screen_companies,
+)
+from services.enhanced_data_extractor import CountryCode, DataQuality, EnhancedDataExtractor  # noqa: E402
+from services.hu_nav import calculate_hu_risk_score  # noqa: E402
+from services.pdf_export_service import PDFExportService  # noqa: E402
+from services.pl_krs import calculate_pl_risk_score  # noqa: E402
+from services.sk_rpo import calculate_sk_risk_score  # noqa: E402
+
+SCALAR_SCORERS = {"SK": calculate_sk_risk_score, "PL": calculate_pl_risk_score, "HU": calculate_hu_risk_score}
+STATUSES = {
+    "SK": ["Aktívna", "v likvidácii", "Konkurz", "zrušená"],
+    "PL": ["aktywna", "w likwidacji", "upadłość", "zawieszona"],
+    "HU": ["működő", "felszámolás alatt", "csődeljárás", "megszűnt"],
+}
+
+
+def _records(n):
+    recent = (date.today() - timedelta(days=100)).isoformat()
+    records = []
+    for i in range(n):
+        country = ["SK", "PL", "HU"][i % 3]
+        records.append({
+            "identifier": str(i),
+            "country": country,
+            "legal_form": ["s.r.o.", "a.s.", "Sp. z o.o."][i % 3],
+            "status": STATUSES[country][i % 4],
+            "executives": ["x"] * (i % 13),
+            "founded": [recent, "2001-05-01", "", "neplatný"][i % 4],
+            "address": ["Hlavná 52", "Virtual office 1", "Mlynská 3"][i % 3 if i % 2 else 2],
+            "risk_score": i % 11,
+        })
+    return records
+
+
+def test_vectorized_scores_match_scalar_functions():
+    """Vektorizované skóre = calculate_sk/pl/hu_risk_score pre každý riadok"""
+    records = _records(240)
+    scores = score_batch(CompanyBatch.from_records(records))
+    expected = [SCALAR_SCORERS[r["country"]](r) for r in records]
+    assert scores.tolist() == expected
+
+
+def test_unscored_country_keeps_input_score():
+    batch = CompanyBatch.from_records([
+        {"country": "CZ", "risk_score": 6.5, "status": "likvidácia"},
+        {"company_data": {"country": "AT", "ico": "1"}, "risk_score": 2},
+    ])
+    assert score_batch(batch).tolist() == [6.5, 2.0]
+    assert batch.country_labels[batch.country[1]] == "AT"
+
+
+def test_screen_histogram_and_summary():
+    result = screen_companies(_records(30))
+    assert result["total_companies"] == 30
+    assert sum(result["histogram"]) == 30
+    scores = [s["risk_score"] for s in result["scores"]]
+    assert result["histogram"] == risk_histogram(np.array(scores))
+    assert result["summary"]["countries"] == {"SK": 10, "PL": 10, "HU": 10}
+    assert {s["risk_level"] for s in result["scores"]} <= {"Low Risk", "Medium Risk", "High Risk"}
+
+
+def test_pdf_statistics_match_python_path(monkeypatch):
+    """Vektorizovaná a pôvodná cesta dávajú rovnaký výsledok"""
+    service = PDFExportService()
+    companies = _records(300)
+    risk_factors = {"financial_health": "High Risk", "operational_risks": ["Virtual office address"]}
+
+    monkeypatch.setattr(pdf_export_service, "VECTORIZE_MIN_ROWS", 0)
+    vectorized = service._calculate_summary_statistics(companies)
+    vectorized_scores = service._calculate_comprehensive_risk_scores(companies, risk_factors)
+
+    monkeypatch.setattr(pdf_export_service, "NUMPY_AVAILABLE", False)
+    assert vectorized == service._calculate_summary_statistics(companies)
+    assert vectorized_scores == service._calculate_comprehensive_risk_scores(companies, risk_factors)
+
+
+def test_search_facets_match_python_path(monkeypatch):
+    extractor = EnhancedDataExtractor.__new__(EnhancedDataExtractor)
+    companies = [
+        extractor._convert_to_enhanced_company(record, CountryCode(record["country"]), "test")
+        for record in _records(50)
+    ]
+    companies[0].data_quality = DataQuality.POOR
+
+    monkeypatch.setattr(enhanced_data_extractor, "VECTORIZE_MIN_ROWS", 0)
+    vectorized = extractor._calculate_facets(companies)
+    monkeypatch.setattr(enhanced_data_extractor, "NUMPY_AVAILABLE", False)
+    assert vectorized == extractor._calculate_facets(companies)
@@ -0,0 +1,146 @@
+"""
+Testy pre company_cache (kľúč krajina + identifikátor, komprimovaný payload, migrácia)
+"""
+
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from sqlalchemy import create_engine, text
+
+from services import database
+from services import search_by_name as search_module
+from services import sk_orsr_provider
+from services.database import (
+    CompanyCache,
+    decode_payload,
+    encode_payload,
+    upsert_company_cache,
+)
+
+
+@pytest.fixture
+def db(db, patch_db_session):
+    return patch_db_session(db, search_module)
+
+
+def test_payload_roundtrip_and_compression():
+    payload = {"name": "Žltá firma s.r.o.", "executives": ["Ján Novák"] * 50, "risk_score": 3}
+    blob = encode_payload(payload)
+    assert blob[:1] in (b"\x01", b"\x02")
+    assert decode_payload(blob) == payload
+    assert len(blob) < len(json.dumps(payload, ensure_ascii=False).encode("utf-8")) / 4
+    # Nekomprimovaný JSON (legacy riadky) sa prečíta priamo
+    assert decode_payload('{"a": 1}') == {"a": 1}
+    assert decode_payload(b'{"a": 1}') == {"a": 1}
+
+
+def test_same_digits_in_two_countries_do_not_collide(db):
+    upsert_company_cache(db, "12345678", "SK", {"name": "SK firma", "status": "Aktívna"})
+    upsert_company_cache(db, "12345678", "CZ", {"name": "CZ firma", "address": "Praha 1"})
+    db.commit()
+    upsert_company_cache(db, "12345678", "SK", {"name": "SK firma", "status": "Konkurz"}, risk_score=7)
+    db.commit()
+
+    rows = {r.country: r for r in db.query(CompanyCache)}
+    assert set(rows) == {"SK", "CZ"}
+    assert rows["SK"].status == "Konkurz" and rows["SK"].risk_score == 7
+    assert rows["SK"].payload == {"name": "SK firma", "status": "Konkurz"}
+    assert rows["CZ"].company_name == "CZ firma" and rows["CZ"].address == "Praha 1"
+    raw = db.execute(text("SELECT payload FROM company_cache WHERE country = 'CZ'")).scalar()
+    assert isinstance(raw, bytes) and decode_payload(raw)["name"] == "CZ firma"
+
+
+def test_search_by_address_uses_typed_column(db):
+    upsert_company_cache(db, "1", "SK", {"name": "Alfa", "address": "Hlavná 1, Bratislava", "legal_form": "s.r.o."})
+    upsert_company_cache(db, "2", "SK", {"name": "Beta", "address": "Mlynská 3, Košice"})
+    db.commit()
+
+    results = search_module.search_by_address("Bratislava", country="sk")
+    assert [r["name"] for r in results] == ["Alfa"]
+    assert search_module.search_by_name("Alfa")[0]["legal_form"] == "s.r.o."
+
+
+def test_search_save_keeps_registry_payload(db, patch_db_session, monkeypatch):
+    patch_db_session(db, database, sk_orsr_provider)
+    monkeypatch.setattr(database, "_initialized", True)
+    orsr = {
+        "name": "Alfa s.r.o.", "status": "Aktívna", "legal_form": "s.r.o.", "address": "Hlavná 1, Bratislava",
+        "executives": ["Ján Novák"], "source": "ORSR",
+    }
+    upsert_company_cache(db, "45274649", "SK", orsr)
+    db.commit()
+
+    # /api/search po ORSR zápise - uzol grafu nesmie prepísať payload registra
+    search_node = {"id": "sk_45274649", "label": "Alfa s.r.o.", "type": "company", "risk_score": 6}
+    assert database.save_company_cache("45274649", "SK", "Alfa s.r.o.", search_node, risk_score=6)
+    assert database.save_company_cache("11111111", "SK", "Nová s.r.o.", {"label": "Nová s.r.o."})
+
+    row = db.query(CompanyCache).filter_by(country="SK", identifier="45274649").one()
+    assert row.payload == orsr
+    assert (row.status, row.legal_form, row.address, row.risk_score) == ("Aktívna", "s.r.o.", "Hlavná 1, Bratislava", 6)
+    assert db.query(CompanyCache).filter_by(identifier="11111111").one().payload == {"label": "Nová s.r.o."}
+
+    # ORSR DB hit vracia plné dáta (bez live scrapingu)
+    sk_orsr_provider.provider_cache.delete(sk_orsr_provider._CACHE_PROVIDER, "45274649")
+    monkeypatch.setattr(sk_orsr_provider.OrsrProvider, "_scrape_orsr", lambda self, ico: pytest.fail("scraping"))
+    assert sk_orsr_provider.OrsrProvider().lookup_by_ico("45274649")["executives"] == ["Ján Novák"]
+
+
+def _load_migration():
+    path = os.path.join(backend_path, "migrations", "company_cache_payload.py")
+    spec = importlib.util.spec_from_file_location("company_cache_payload", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_migration_rewrites_legacy_rows_in_batches(monkeypatch):
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    engine = create_engine("sqlite:///:memory:")
+    graph = {
+        "nodes": [
+            {"id": "sk_1", "label": "Firma 1", "type": "company", "ico": "11111111", "risk_score": 2},
+            {"id": "pers_sk_a", "label": "Osoba", "type": "person"},
+        ],
+        "edges": [{"source": "sk_1", "target": "pers_sk_a", "type": "MANAGED_BY"}],
+    }
+    orsr = {"name": "Firma 2", "status": "Aktívna", "address": "Hlavná 1", "postal_code": "81101"}
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE company_cache (id INTEGER PRIMARY KEY, identifier VARCHAR(100) NOT NULL, "
+            "country VARCHAR(2) NOT NULL, company_name VARCHAR(500), data JSON NOT NULL, company_data JSON, "
+            "risk_score FLOAT, created_at DATETIME, updated_at DATETIME, last_synced_at DATETIME, "
+            "expires_at DATETIME)"
+        ))
+        conn.execute(text("CREATE UNIQUE INDEX ix_company_cache_identifier ON company_cache (identifier)"))
+        conn.execute(text(
+            "INSERT INTO company_cache (identifier, country, company_name, data, company_data, risk_score) VALUES "
+            "('11111111', 'SK', 'Firma 1', :graph, NULL, 2), "
+            "('22222222', 'sk', NULL, :orsr, :orsr, NULL), "
+            "('33333333', 'UNKNOWN', 'X', '{}', NULL, NULL)"
+        ), {"graph": json.dumps(graph), "orsr": json.dumps(orsr)})
+
+        migration = _load_migration()
+        monkeypatch.setattr(migration, "BATCH_SIZE", 1)
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+        rows = conn.execute(text(
+            "SELECT identifier, country, company_name, status, postal_code, payload FROM company_cache ORDER BY id"
+        )).all()
+
+    assert [(r[0], r[1]) for r in rows] == [("11111111", "SK"), ("22222222", "SK")]
+    assert decode_payload(rows[0][5]) == graph["nodes"][0]
+    assert rows[1][2:5] == ("Firma 2", "Aktívna", "81101")
+    assert decode_payload(rows[1][5]) == orsr
@@ -29,7 +29,7 @@ client = TestClient(app)
 @pytest.fixture(autouse=True)
 def mock_external_services(mocker):
     # Mock ARES
-    mock_ares = mocker.patch("main.fetch_ares_cz")
+    mock_ares = mocker.patch("services.registry.providers.fetch_ares_cz")
     mock_ares.return_value = {
         "ekonomickeSubjekty": [
             {
@@ -46,7 +46,7 @@ def mock_external_services(mocker):
     }
     
     # Mock ORSR
-    mock_orsr = mocker.patch("main.get_orsr_provider")
+    mock_orsr = mocker.patch("services.registry.providers.get_orsr_provider")
     mock_provider = MagicMock()
     
     def mock_lookup(ico, force_refresh=False):
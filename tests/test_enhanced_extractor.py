@@ -0,0 +1,168 @@
+"""
+Testy pre paralelné vyhľadávanie v EnhancedDataExtractor (executor, deadline per krajina)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import enhanced_data_extractor
+from services.enhanced_data_extractor import (
+    COUNTRY_STATUS_OK,
+    COUNTRY_STATUS_TIMEOUT,
+    CountryCode,
+    EnhancedDataExtractor,
+)
+
+
+class SlowProvider:
+    """Synchrónny provider blokujúci vlákno (ako legacy scrapery)"""
+
+    def __init__(self, delay, name):
+        self.delay = delay
+        self.name = name
+
+    def lookup_by_ico(self, query):
+        time.sleep(self.delay)
+        return {"ico": query, "name": self.name}
+
+    def fetch(self, query):
+        time.sleep(self.delay)
+        return {"identifier": query, "name": self.name}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    stored = {}
+    monkeypatch.setattr(enhanced_data_extractor, "get_cache", lambda key: stored.get(key, (None,))[0])
+    monkeypatch.setattr(enhanced_data_extractor, "set_cache", lambda key, value, ttl=None: stored.__setitem__(key, (value, ttl)))
+    monkeypatch.setattr(EnhancedDataExtractor, "_search_in_database_sync", lambda self, query, country: [])
+    monkeypatch.setattr(EnhancedDataExtractor, "_save_to_database_sync", lambda self, companies: None)
+    return stored
+
+
+def _session_ttls(cache):
+    return [ttl for value, ttl in cache.values() if isinstance(value, dict) and "rows" in value]
+
+
+def _run_search(providers, countries, deadlines=None):
+    async def _search():
+        extractor = EnhancedDataExtractor()
+        extractor.providers[CountryCode.SK] = providers["SK"]
+        extractor.country_deadlines.update(deadlines or {})
+        try:
+            started = time.perf_counter()
+            result = await extractor.search_companies("12345678", countries=countries)
+            return result, time.perf_counter() - started
+        finally:
+            await extractor.session.close()
+            extractor._executor.shutdown(wait=False)
+
+    return asyncio.run(_search())
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    sk = SlowProvider(0.3, "SK firma")
+    krs = SlowProvider(0.3, "KRS firma")
+    ceidg = SlowProvider(0.3, "CEIDG firma")
+    nav = SlowProvider(0.2, "NAV firma")
+    monkeypatch.setattr(enhanced_data_extractor, "get_krs_provider", lambda: {"fetch_function": krs.fetch})
+    monkeypatch.setattr(enhanced_data_extractor, "get_ceidg_provider", lambda: {"fetch_function": ceidg.fetch})
+    monkeypatch.setattr(enhanced_data_extractor, "get_nav_provider", lambda: {"fetch_function": nav.fetch})
+    return {"SK": sk, "PL": (krs, ceidg), "HU": nav}
+
+
+def test_countries_run_in_parallel(cache, providers):
+    """Celková latencia ~ najpomalšia krajina, nie súčet"""
+    result, elapsed = _run_search(providers, ["SK", "PL", "HU"])
+
+    names = sorted(c["name"] for c in result["companies"])
+    assert names == ["CEIDG firma", "KRS firma", "NAV firma", "SK firma"]
+    assert elapsed < 0.6  # sériovo 1.1 s
+    assert result["partial"] is False
+    assert {info["status"] for info in result["country_status"].values()} == {COUNTRY_STATUS_OK}
+    assert result["country_status"]["PL"]["count"] == 2
+    assert _session_ttls(cache) == [enhanced_data_extractor.SEARCH_SESSION_TTL]
+
+
+def test_slow_country_hits_deadline(cache, providers):
+    """Krajina po deadline vráti status timeout, ostatné výsledky prídu"""
+    providers["SK"].delay = 2.0
+    result, elapsed = _run_search(providers, ["SK", "HU"], deadlines={CountryCode.SK: 0.4})
+
+    assert elapsed < 1.0
+    assert result["partial"] is True
+    assert result["country_status"]["SK"]["status"] == COUNTRY_STATUS_TIMEOUT
+    assert result["country_status"]["HU"]["status"] == COUNTRY_STATUS_OK
+    assert [c["name"] for c in result["companies"]] == ["NAV firma"]
+    # neúplná session žije len krátko
+    assert _session_ttls(cache) == [enhanced_data_extractor.SEARCH_PARTIAL_SESSION_TTL]
+
+
+def _paged_search(extractor_calls, companies_by_country):
+    """Extractor s fake _search_by_country - počíta skutočné hľadania"""
+    async def fake_search(self, query, country):
+        extractor_calls.append(country)
+        return [
+            self._convert_to_enhanced_company(data, country, "test")
+            for data in companies_by_country.get(country.value, [])
+        ]
+
+    return fake_search
+
+
+def test_cursor_pages_read_from_session(cache, monkeypatch):
+    """Ďalšie stránky idú zo session - bez nového hľadania, bez prekryvu"""
+    calls = []
+    data = {
+        "SK": [{"identifier": f"sk{i:02d}", "name": f"SK {i}", "risk_score": i % 5} for i in range(15)],
+        "CZ": [{"identifier": f"cz{i:02d}", "name": f"CZ {i}", "risk_score": i % 3} for i in range(10)],
+    }
+    monkeypatch.setattr(EnhancedDataExtractor, "_search_by_country", _paged_search(calls, data))
+
+    async def _pages():
+        extractor = EnhancedDataExtractor()
+        try:
+            pages = [await extractor.search_companies("x", countries=["SK", "CZ"], limit=10)]
+            while pages[-1]["next_cursor"]:
+                pages.append(await extractor.search_companies("", limit=10, cursor=pages[-1]["next_cursor"]))
+            searches = len(calls)
+            # expirovaná session - kurzor pokračuje podľa keysetu aj po novom hľadaní
+            cache.clear()
+            data["SK"].append({"identifier": "sk99", "name": "Nová", "risk_score": 9})
+            resumed = await extractor.search_companies("", limit=10, cursor=pages[0]["next_cursor"])
+            return pages, resumed, searches
+        finally:
+            await extractor.session.close()
+            extractor._executor.shutdown(wait=False)
+
+    pages, resumed, searches = asyncio.run(_pages())
+
+    assert [len(p["companies"]) for p in pages] == [10, 10, 5]
+    assert searches == 2  # jedno hľadanie per krajina pre všetky stránky
+    ordered = [c["identifier"] for p in pages for c in p["companies"]]
+    assert len(set(ordered)) == 25
+    risks = [c["risk_score"] for p in pages for c in p["companies"]]
+    assert risks == sorted(risks, reverse=True)
+    assert all(p["facets"] == pages[0]["facets"] for p in pages)
+    assert pages[0]["facets"]["countries"] == {"SK": 15, "CZ": 10}
+    assert pages[1]["cache_hit"] is True and pages[1]["search_params"]["offset"] == 10
+
+    assert len(calls) == 4
+    assert [c["identifier"] for c in resumed["companies"]] == ordered[10:20]
+
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(ValueError):
+        enhanced_data_extractor.decode_search_cursor("not-a-cursor")
+    cursor = enhanced_data_extractor.encode_search_cursor({"q": "a", "c": ["SK"], "k": [0, 1, "SK", "1"], "p": 1})
+    assert enhanced_data_extractor.decode_search_cursor(cursor)["k"] == (0, 1, "SK", "1")
@@ -44,7 +44,7 @@ def test_erp_endpoints_require_enterprise_tier():
 
 def test_erp_connection_create_model():
     """Test ERP connection create model"""
-    from backend.main import ErpConnectionCreate
+    from backend.routers.erp import ErpConnectionCreate
 
     # Test valid ERP types
     valid_types = ["sap", "pohoda", "money_s3"]
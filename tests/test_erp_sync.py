@@ -0,0 +1,214 @@
+"""
+Testy pre ERP sync pipeline (watermark, stránkovanie, bulk upsert, risk screening)
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services.auth import User, UserTier
+from services.database import CompanyCache
+from services.erp import erp_service
+from services.erp.base_connector import BaseErpConnector
+from services.erp.models import (
+    ErpConnection,
+    ErpConnectionStatus,
+    ErpInvoice,
+    ErpSupplier,
+    ErpSyncLog,
+    ErpType,
+)
+from services.erp.sync import bulk_upsert, run_erp_sync, screen_suppliers
+
+
+class FakeConnector(BaseErpConnector):
+    """In-memory ERP - záznamy s časom zmeny, počíta stránky"""
+
+    def __init__(self, suppliers, invoices=()):
+        super().__init__({"api_key": "x"})
+        self.records = {"suppliers": list(suppliers), "invoices": list(invoices), "payments": []}
+        self.requests = []
+
+    def fetch_page(self, entity, modified_since, offset, page_size):
+        self.requests.append((entity, modified_since, offset))
+        rows = [
+            {k: v for k, v in r.items() if k != "modified"}
+            for r in self.records[entity]
+            if modified_since is None or r["modified"] >= modified_since
+        ]
+        return rows[offset:offset + page_size]
+
+    def test_connection(self):
+        return {"success": True}
+
+    def get_company_info(self):
+        return {}
+
+    def get_suppliers(self, limit=100):
+        return []
+
+    def get_supplier_payment_history(self, supplier_ico, days=365):
+        return []
+
+    def get_invoices(self, supplier_ico=None, status=None):
+        return []
+
+
+@pytest.fixture
+def db(db):
+    db.add(User(email="erp@test.sk", hashed_password="x", tier=UserTier.ENTERPRISE))
+    db.add(ErpConnection(
+        user_id=1, erp_type=ErpType.POHODA, connection_data={}, status=ErpConnectionStatus.ACTIVE
+    ))
+    db.commit()
+    return db
+
+
+def _suppliers(n, modified):
+    return [
+        {"external_id": f"s{i}", "ico": f"{10000000 + i}", "name": f"Dodávateľ {i}", "modified": modified}
+        for i in range(n)
+    ]
+
+
+def test_bulk_upsert_inserts_then_updates(db):
+    now = datetime(2026, 1, 1)
+    page = [{"external_id": "a", "name": "A"}, {"external_id": "b", "name": "B"}, {"name": "bez id"}]
+    assert bulk_upsert(db, ErpSupplier, 1, page, now) == (2, 0, 1)
+    assert bulk_upsert(db, ErpSupplier, 1, [{"external_id": "a", "name": "A2", "risk_score": 9}], now) == (0, 1, 0)
+    db.commit()
+    rows = {s.external_id: s for s in db.query(ErpSupplier)}
+    assert rows["a"].name == "A2" and rows["a"].risk_score is None  # risk stĺpce sync neprepíše
+    assert len(rows) == 2
+
+
+def test_incremental_sync_uses_watermark(db):
+    old = datetime.utcnow() - timedelta(days=10)
+    connector = FakeConnector(
+        _suppliers(25, old),
+        invoices=[{"external_id": "f1", "supplier_ico": "10000000", "amount": 100, "modified": old}],
+    )
+    connection = db.get(ErpConnection, 1)
+
+    first = run_erp_sync(db, connection, connector, "incremental", page_size=10)
+    assert first["entities"]["suppliers"] == {"inserted": 25, "updated": 0, "failed": 0, "pages": 3}
+    assert first["records_synced"] == 26
+    assert [r[2] for r in connector.requests if r[0] == "suppliers"] == [0, 10, 20]
+
+    # Zmena jedného dodávateľa - incremental stiahne len jeho
+    connector.records["suppliers"][3].update(name="Premenovaný", modified=datetime.utcnow())
+    connector.requests.clear()
+    second = run_erp_sync(db, connection, connector, "incremental", page_size=10)
+    assert second["entities"]["suppliers"] == {"inserted": 0, "updated": 1, "failed": 0, "pages": 1}
+    assert all(r[1] is not None for r in connector.requests)
+    assert db.query(ErpSupplier).filter(ErpSupplier.external_id == "s3").one().name == "Premenovaný"
+
+    # Full sync ignoruje watermark
+    full = run_erp_sync(db, connection, connector, "full", page_size=10)
+    assert full["entities"]["suppliers"]["updated"] == 25
+    assert db.query(ErpSupplier).count() == 25
+    assert db.query(ErpInvoice).count() == 1
+
+
+def test_screen_suppliers_from_company_cache(db):
+    now = datetime.utcnow()
+    for i, ico in enumerate(["10000000", "10000001"]):
+        db.add(ErpSupplier(connection_id=1, external_id=f"s{i}", ico=ico, synced_at=now))
+    db.add(ErpSupplier(connection_id=1, external_id="s9", ico="99999999", synced_at=now))
+    db.add(CompanyCache(
+        identifier="10000000", country="SK",
+        payload={"status": "Konkurz", "executives": ["a"] * 8}, risk_score=2,
+    ))
+    db.add(CompanyCache(identifier="10000001", country="CZ", payload={"name": "x"}, risk_score=5.5))
+    db.commit()
+
+    summary = screen_suppliers(db, 1, batch_size=2)
+
+    assert summary["screened"] == 3 and summary["known"] == 2 and summary["unknown"] == 1
+    rows = {s.ico: s for s in db.query(ErpSupplier)}
+    assert rows["10000001"].risk_level == "Medium Risk" and rows["10000001"].country == "CZ"
+    assert rows["99999999"].risk_level == "unknown" and rows["99999999"].risk_score is None
+    pytest.importorskip("numpy")
+    # SK prepočítané registrovými pravidlami (konkurz 7 + 6-10 konateľov 3)
+    assert rows["10000000"].risk_score == 10 and rows["10000000"].risk_level == "High Risk"
+
+
+def test_sync_erp_data_persists_and_logs(db, monkeypatch):
+    connector = FakeConnector(_suppliers(3, datetime.utcnow()))
+    monkeypatch.setattr(erp_service.ErpService, "get_connector", staticmethod(lambda erp_type, data: connector))
+
+    result = erp_service.sync_erp_data(db, 1, 1)
+
+    assert result["success"] is True and result["records_synced"] == 3
+    assert result["risk_screen"]["unknown"] == 3
+    log = db.query(ErpSyncLog).one()
+    assert log.status == "success" and log.records_synced == 3
+    assert db.get(ErpConnection, 1).status == ErpConnectionStatus.ACTIVE
+
+
+def test_sync_lease_blocks_concurrent_runs_and_expires(db, monkeypatch):
+    connector = FakeConnector(_suppliers(1, datetime.utcnow()))
+    monkeypatch.setattr(erp_service.ErpService, "get_connector", staticmethod(lambda erp_type, data: connector))
+    connection = db.get(ErpConnection, 1)
+
+    connection.sync_started_at = datetime.utcnow()
+    db.commit()
+    assert erp_service.sync_erp_data(db, 1, 1)["message"] == "Sync already running"
+
+    # Lease po páde workeru expiruje
+    connection.sync_started_at = datetime.utcnow() - timedelta(seconds=erp_service.ERP_SYNC_LEASE_SECONDS + 1)
+    db.commit()
+    assert erp_service.sync_erp_data(db, 1, 1)["success"] is True
+    assert db.get(ErpConnection, 1).sync_started_at is None
+
+
+def test_sync_keeps_status_for_user_actions(db, monkeypatch):
+    from services.erp import sync as sync_module
+
+    monkeypatch.setattr(erp_service.ErpService, "get_connector", staticmethod(lambda erp_type, data: FakeConnector([])))
+    seen = {}
+
+    def _run(db, connection, connector, sync_type):
+        seen["status"] = db.get(ErpConnection, 1).status
+        # Používateľ počas syncu pripojenie deaktivuje
+        db.query(ErpConnection).filter(ErpConnection.id == 1).update({ErpConnection.status: ErpConnectionStatus.INACTIVE})
+        db.commit()
+        return {"records_synced": 0, "records_failed": 0, "entities": {}, "risk_screen": {}}
+
+    monkeypatch.setattr(sync_module, "run_erp_sync", _run)
+    assert erp_service.sync_erp_data(db, 1, 1)["success"] is True
+
+    assert seen["status"] == ErpConnectionStatus.ACTIVE
+    connection = db.get(ErpConnection, 1)
+    assert connection.status == ErpConnectionStatus.INACTIVE and connection.sync_started_at is None
+
+
+def test_screening_prefers_connection_country_for_shared_ico(db):
+    """IČO v SK aj CZ cache - použije sa krajina pripojenia, nie posledný riadok"""
+    now = datetime.utcnow()
+    db.add(ErpSupplier(connection_id=1, external_id="s0", ico="10000000", synced_at=now))
+    db.add(CompanyCache(identifier="10000000", country="CZ", payload={}, risk_score=9))
+    db.add(CompanyCache(identifier="10000000", country="SK", payload={}, risk_score=1))
+    db.commit()
+
+    screen_suppliers(db, 1, home_country="CZ")
+    supplier = db.query(ErpSupplier).one()
+    assert supplier.country == "CZ"
+
+    # Bez country v connection_data platí ERP_DEFAULT_COUNTRY (SK)
+    screen_suppliers(db, 1)
+    db.refresh(supplier)
+    assert supplier.country == "SK" and supplier.risk_level == "Low Risk"
+
+    db.get(ErpConnection, 1).connection_data = {"country": "cz"}
+    db.commit()
+    screen_suppliers(db, 1)
+    db.refresh(supplier)
+    assert supplier.country == "CZ"
@@ -0,0 +1,176 @@
+"""
+Testy pre asynchrónne export joby (process pool, dedup, expirácia)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import export_jobs
+from services.export_jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    ExportJob,
+    cleanup_expired_jobs,
+    get_export_job,
+    result_path,
+    resume_pending_jobs,
+    run_export_job,
+    submit_export_job,
+)
+
+COMPANIES = {"companies": [{"company_data": {"ico": str(i), "name": f"Firma {i}"}} for i in range(3)]}
+
+
+@pytest.fixture
+def db(db, patch_db_session, monkeypatch, tmp_path):
+    monkeypatch.setattr(export_jobs, "EXPORT_JOBS_DIR", str(tmp_path))
+    return patch_db_session(db, export_jobs)
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(export_jobs, "_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_identical_input_is_deduplicated(db):
+    """Rovnaký vstup toho istého používateľa vráti existujúci job"""
+    job, dedup = submit_export_job(db, 1, "csv", COMPANIES, {})
+    again, dedup_again = submit_export_job(db, 1, "csv", COMPANIES, {})
+    other, dedup_other = submit_export_job(db, 2, "csv", COMPANIES, {})
+
+    assert not dedup and dedup_again and not dedup_other
+    assert again.id == job.id
+    assert other.id != job.id
+
+    with pytest.raises(ValueError):
+        submit_export_job(db, 1, "docx", COMPANIES, {})
+
+
+def test_job_renders_in_process_pool(db, monkeypatch):
+    """Render beží v samostatnom procese a výsledok sa uloží do result store"""
+    monkeypatch.setattr(export_jobs, "EXPORT_WORKERS", 1)
+    monkeypatch.setattr(export_jobs, "_pool", None)
+    job, _ = submit_export_job(db, 1, "csv", COMPANIES, {})
+    try:
+        asyncio.run(run_export_job(job.id, job.format))
+    finally:
+        export_jobs.shutdown_export_pool()
+
+    db.expire_all()
+    status = get_export_job(db, job.id, 1)
+    assert status["status"] == JOB_DONE
+    assert status["progress"] == 100
+    with open(result_path(job), encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 4 and lines[1].startswith("0,Firma 0")
+    assert not os.path.exists(os.path.join(export_jobs.EXPORT_JOBS_DIR, f"{job.id}.input.json"))
+    assert get_export_job(db, job.id, 2) is None
+
+
+def test_failed_render_marks_job_failed(db, thread_pool, monkeypatch):
+    """Chyba pri renderi sa zapíše do jobu, dedup ho potom ignoruje"""
+    def broken(*args, **kwargs):
+        raise MemoryError("limit")
+
+    monkeypatch.setattr(export_jobs, "render_export", broken)
+    job, _ = submit_export_job(db, 1, "excel", COMPANIES, {})
+    asyncio.run(run_export_job(job.id, job.format))
+
+    db.expire_all()
+    assert db.get(ExportJob, job.id).status == JOB_FAILED
+    retry, dedup = submit_export_job(db, 1, "excel", COMPANIES, {})
+    assert not dedup and retry.id != job.id
+
+
+def test_expired_jobs_are_cleaned_up(db, thread_pool):
+    job, _ = submit_export_job(db, 1, "ndjson", COMPANIES, {})
+    asyncio.run(run_export_job(job.id, job.format))
+    db.expire_all()
+    path = result_path(job)
+    assert os.path.exists(path)
+
+    db.get(ExportJob, job.id).expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    assert cleanup_expired_jobs(db) == 1
+    assert not os.path.exists(path)
+    assert db.query(ExportJob).count() == 0
+
+
+def test_job_is_claimed_once(db, thread_pool, monkeypatch):
+    """Druhý worker job neprevezme, kým beží alebo po dokončení"""
+    renders = []
+
+    def render(format, input_path, output_path, progress_path):
+        renders.append(input_path)
+        with open(output_path, "wb") as f:
+            f.write(b"ok")
+        return 2
+
+    monkeypatch.setattr(export_jobs, "render_export", render)
+    job, _ = submit_export_job(db, 1, "csv", COMPANIES, {})
+    asyncio.run(run_export_job(job.id, job.format))
+    asyncio.run(run_export_job(job.id, job.format))
+
+    db.expire_all()
+    assert len(renders) == 1 and db.get(ExportJob, job.id).status == JOB_DONE
+
+
+def test_job_db_phases_run_off_the_event_loop(db, thread_pool, monkeypatch):
+    monkeypatch.setattr(export_jobs, "render_export", lambda *args: 0)
+    update_job = export_jobs._update_job
+    threads = []
+
+    def tracked(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return update_job(*args, **kwargs)
+
+    monkeypatch.setattr(export_jobs, "_update_job", tracked)
+    job, _ = submit_export_job(db, 1, "csv", COMPANIES, {})
+    asyncio.run(run_export_job(job.id, job.format))
+
+    assert len(threads) == 2  # claim + výsledný stav
+    assert threading.main_thread() not in threads
+
+
+def test_resume_claims_queued_and_stale_jobs(db, thread_pool, monkeypatch):
+    monkeypatch.setattr(export_jobs, "render_export", lambda *args: 0)
+    now = datetime.utcnow()
+    queued, _ = submit_export_job(db, 1, "csv", COMPANIES, {})
+    running, _ = submit_export_job(db, 2, "csv", COMPANIES, {})
+    stale, _ = submit_export_job(db, 3, "csv", COMPANIES, {})
+    db.get(ExportJob, running.id).status = JOB_RUNNING
+    db.get(ExportJob, running.id).started_at = now
+    db.get(ExportJob, stale.id).status = JOB_RUNNING
+    db.get(ExportJob, stale.id).started_at = now - timedelta(seconds=export_jobs.EXPORT_JOB_STALE_SECONDS + 60)
+    db.commit()
+
+    async def _resume():
+        count = await resume_pending_jobs()
+        # Tasky drží modul (silné referencie), po dokončení sa odstránia
+        assert len(export_jobs._background_tasks) == count
+        await asyncio.gather(*list(export_jobs._background_tasks))
+        return count
+
+    assert asyncio.run(_resume()) == 2
+    assert not export_jobs._background_tasks
+    db.expire_all()
+    assert db.get(ExportJob, queued.id).status == JOB_DONE
+    assert db.get(ExportJob, stale.id).status == JOB_DONE
+    assert db.get(ExportJob, running.id).status == JOB_RUNNING
+    assert JOB_QUEUED not in {job.status for job in db.query(ExportJob)}
@@ -0,0 +1,154 @@
+"""
+Testy pre relačnú schému grafu (unikátne hrany, surrogate kľúče, migrácia)
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from services import graph_service as graph_module
+from services.database import GraphEdge, GraphNode
+from services.graph_service import GraphService
+
+
+@pytest.fixture
+def db(db, patch_db_session):
+    return patch_db_session(db, graph_module)
+
+
+def test_upsert_edge_is_idempotent_and_sets_keys(db):
+    service = GraphService()
+    service.upsert_node("sk_1", "Firma 1", "company", "SK")
+    service.upsert_node("pers_sk_a", "Ján Novák", "person", "SK")
+    service.upsert_edge("sk_1", "pers_sk_a", "MANAGED_BY", details={"role": "konateľ"})
+    service.upsert_edge("sk_1", "pers_sk_a", "MANAGED_BY", details={"source": "ORSR"})
+
+    edges = db.query(GraphEdge).all()
+    assert len(edges) == 1
+    assert edges[0].details == {"role": "konateľ", "source": "ORSR"}
+    keys = {n.id: n.key for n in db.query(GraphNode)}
+    assert (edges[0].source_key, edges[0].target_key) == (keys["sk_1"], keys["pers_sk_a"])
+
+
+
+def test_upsert_edge_merges_details_without_reading_the_row(db):
+    service = GraphService()
+    service.upsert_edge("sk_1", "pers_sk_a", "MANAGED_BY", details={"role": "konateľ", "since": "2020"})
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        service.upsert_edge("sk_1", "pers_sk_a", "MANAGED_BY", details={"since": "2021", "source": "ORSR"})
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert not [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    db.expire_all()
+    assert db.query(GraphEdge).one().details == {"role": "konateľ", "since": "2021", "source": "ORSR"}
+
+
+def test_postgres_upsert_merges_details_as_jsonb():
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.dialects.postgresql import insert
+    from services.graph_service import _merged_details
+
+    stmt = insert(GraphEdge).values(source="a", target="b", type="OWNED_BY", details={"x": 1})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "type", "target"],
+        set_={"details": _merged_details("postgresql", stmt.excluded.details)},
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "CAST(excluded.details AS JSONB)" in sql
+    assert "||" in sql
+
+def test_upsert_edge_backfills_missing_keys(db):
+    service = GraphService()
+    service.upsert_edge("sk_1", "pers_sk_a", "OWNED_BY")
+    assert db.query(GraphEdge.target_key).scalar() is None
+
+    service.upsert_node("sk_1", "Firma 1", "company", "SK")
+    service.upsert_node("pers_sk_a", "Ján Novák", "person", "SK")
+    service.upsert_edge("sk_1", "pers_sk_a", "OWNED_BY")
+    db.expire_all()
+    edge = db.query(GraphEdge).one()
+    assert edge.source_key is not None and edge.target_key is not None
+
+
+def test_unique_constraint_rejects_duplicate_edge(db):
+    db.add(GraphEdge(source="sk_1", target="pers_sk_a", type="OWNED_BY"))
+    db.commit()
+    db.add(GraphEdge(source="sk_1", target="pers_sk_a", type="OWNED_BY"))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    # Iný typ vzťahu medzi rovnakými uzlami je samostatná hrana
+    db.add(GraphEdge(source="sk_1", target="pers_sk_a", type="MANAGED_BY"))
+    db.commit()
+    assert db.query(GraphEdge).count() == 2
+
+
+def test_build_company_graph_expands_through_shared_person(db):
+    service = GraphService()
+    for atlas_id in ("1", "2", "3"):
+        service.ingest_company_relationships(atlas_id, "SK", f"Firma {atlas_id}", None, executives=["Ján Novák"])
+    service.ingest_company_relationships("4", "SK", "Firma 4", None, executives=["Iná Osoba"])
+
+    graph = service.build_company_graph("1", "SK")
+
+    node_ids = {n["id"] for n in graph["nodes"]}
+    assert {"sk_1", "sk_2", "sk_3"} <= node_ids and "sk_4" not in node_ids
+    assert len(graph["edges"]) == 3
+    assert graph["summary"]["same_person_or_owner_companies"] == 2
+
+
+def _load_migration():
+    path = os.path.join(backend_path, "migrations", "graph_edges_unique_keys.py")
+    spec = importlib.util.spec_from_file_location("graph_edges_unique_keys", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_migration_deduplicates_legacy_edges():
+    from alembic.migration import MigrationContext
+    from alembic.operations import Operations
+
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE graph_nodes (id VARCHAR(50) PRIMARY KEY, label VARCHAR(500), type VARCHAR(50), "
+                          "country VARCHAR(2), details JSON, created_at DATETIME, updated_at DATETIME)"))
+        conn.execute(text("CREATE INDEX ix_graph_nodes_type ON graph_nodes (type)"))
+        conn.execute(text("CREATE TABLE graph_edges (id INTEGER PRIMARY KEY, source VARCHAR(50), target VARCHAR(50), "
+                          "type VARCHAR(50), weight FLOAT, details JSON, created_at DATETIME, updated_at DATETIME)"))
+        conn.execute(text("CREATE INDEX ix_graph_edges_source ON graph_edges (source)"))
+        conn.execute(text("INSERT INTO graph_nodes (id, label, type) VALUES ('sk_1', 'Firma', 'company'), "
+                          "('pers_sk_a', 'Osoba', 'person')"))
+        conn.execute(text("INSERT INTO graph_edges (source, target, type, details) VALUES "
+                          "('sk_1', 'pers_sk_a', 'MANAGED_BY', '{\"n\": 1}'), "
+                          "('sk_1', 'pers_sk_a', 'MANAGED_BY', '{\"n\": 2}'), "
+                          "('sk_1', 'pers_sk_a', 'OWNED_BY', NULL), "
+                          "('sk_1', 'addr_sk_x', 'LOCATED_AT', NULL)"))
+
+        migration = _load_migration()
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+        rows = conn.execute(text("SELECT type, details, source_key, target_key FROM graph_edges ORDER BY id")).all()
+        assert [r[0] for r in rows] == ["MANAGED_BY", "OWNED_BY", "LOCATED_AT"]
+        assert rows[0][1] == '{"n": 1}'
+        assert rows[0][2] is not None and rows[0][3] is not None
+        assert rows[2][3] is None  # adresný uzol neexistuje
+        indexes = {ix["name"] for ix in inspect(conn).get_indexes("graph_edges")}
+        assert "ix_graph_edges_target_type_source" in indexes
+        assert "ix_graph_edges_source" not in indexes
@@ -0,0 +1,61 @@
+"""
+Testy pre validáciu identifikátorov (kontrolné číslice SK/CZ/PL/HU)
+"""
+
+import os
+import sys
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import identifier_validation
+from services.identifier_validation import (
+    is_valid_hu_tax_number,
+    is_valid_ico,
+    is_valid_krs,
+    is_valid_nip,
+    is_valid_regon,
+    plausible_countries,
+)
+
+
+@pytest.mark.parametrize("ico", ["27074358", "47114983", "35855304", "52374220", "00006947"])
+def test_valid_ico(ico):
+    assert is_valid_ico(ico)
+
+
+@pytest.mark.parametrize("ico", ["12345678", "88888888", "27074359", "2707435", "2707435a", ""])
+def test_invalid_ico(ico):
+    assert not is_valid_ico(ico)
+
+
+def test_polish_checksums():
+    assert is_valid_nip("5261040828") and is_valid_nip("526-104-08-28")
+    assert not is_valid_nip("5261040829") and not is_valid_nip("1234567890")
+    assert is_valid_regon("123456785") and not is_valid_regon("123456786")
+    assert is_valid_regon("12345678512347")
+    assert is_valid_krs("0000123456") and not is_valid_krs("0000000000")
+
+
+def test_hungarian_tax_number():
+    assert is_valid_hu_tax_number("10773381")
+    assert is_valid_hu_tax_number("10773381244")
+    assert not is_valid_hu_tax_number("10773382")
+    assert not is_valid_hu_tax_number("10773381699")  # neplatný kód DPH
+    assert not is_valid_hu_tax_number("10773381299")  # neexistujúci kraj
+
+
+def test_plausible_countries(monkeypatch):
+    assert plausible_countries("27074358") == ["CZ", "SK"]
+    assert plausible_countries("10773381") == ["HU"]
+    assert plausible_countries("12345678") == []
+    assert plausible_countries("0000123456", "pl") == ["PL"]
+    assert plausible_countries("27074358", "HU") == []
+    assert plausible_countries("Agrofert") == []
+
+    monkeypatch.setattr(identifier_validation, "IDENTIFIER_CHECKSUM_VALIDATION", False)
+    assert plausible_countries("12345678") == ["CZ", "SK", "HU", "PL"]
@@ -0,0 +1,132 @@
+"""
+Testy pre API usage metering (počítadlá, kvóty, rollupy)
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import metering
+from services.auth import User, UserTier
+from services.database import Base
+from services.metering import ApiUsageRollup, UsageMeter
+
+
+@pytest.fixture
+def db(db, patch_db_session, monkeypatch):
+    db.add(User(email="m@test.sk", hashed_password="x", tier=UserTier.ENTERPRISE))
+    db.commit()
+    monkeypatch.setattr(metering, "REDIS_AVAILABLE", False)
+    return patch_db_session(db, metering)
+
+
+@pytest.fixture
+def meter(db, monkeypatch):
+    fresh = UsageMeter()
+    monkeypatch.setattr(metering, "_meter", fresh)
+    return fresh
+
+
+def test_quota_enforced_in_constant_time(meter):
+    """Kvóta sa vynúti bez DB zápisu per request"""
+    now = datetime(2026, 1, 1, 12, 0)
+    for i in range(3):
+        allowed, info = meter.record(1, daily_quota=3, now=now)
+        assert allowed
+        assert info["used"] == i + 1
+
+    allowed, info = meter.record(1, daily_quota=3, now=now)
+    assert not allowed
+    assert info["remaining"] == 0
+    assert info["reset_after"] == 12 * 3600
+    # Zamietnutý request sa nepočíta
+    assert meter.current_day_count(1, now) == 3
+
+
+def test_rollup_writes_minute_hour_day_buckets(db, meter):
+    """Rollup rozpočíta minúty do minute/hour/day tabuliek"""
+    base = datetime(2026, 1, 1, 12, 0, 30)
+    for offset in (0, 0, 60, 3600):
+        meter.record(5, now=base + timedelta(seconds=offset))
+
+    assert metering.rollup_usage(db) == 3
+
+    def counts(granularity):
+        return {
+            row.bucket_start: row.request_count
+            for row in db.query(ApiUsageRollup).filter(ApiUsageRollup.granularity == granularity)
+        }
+
+    assert counts("minute") == {
+        datetime(2026, 1, 1, 12, 0): 2,
+        datetime(2026, 1, 1, 12, 1): 1,
+        datetime(2026, 1, 1, 13, 0): 1,
+    }
+    assert counts("hour") == {datetime(2026, 1, 1, 12, 0): 3, datetime(2026, 1, 1, 13, 0): 1}
+    assert counts("day") == {datetime(2026, 1, 1): 4}
+
+
+def test_concurrent_rollups_do_not_lose_counts(meter, tmp_path):
+    """Dva workery s prekrývajúcimi sa rollupmi - žiadny počet sa nestratí"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'metering.db'}")
+    Base.metadata.create_all(bind=engine)
+    first, second = sessionmaker(bind=engine)(), sessionmaker(bind=engine)()
+    now = datetime(2026, 1, 1, 8, 15)
+    meter.record(3, now=now)
+    metering.rollup_usage(first)
+
+    # Worker A má bucket načítaný, worker B medzitým zapíše svoj rollup
+    loaded = first.query(ApiUsageRollup).filter(ApiUsageRollup.granularity == "day").one()
+    assert loaded.request_count == 1
+    meter.record(3, now=now)
+    metering.rollup_usage(second)
+    meter.record(3, now=now)
+    metering.rollup_usage(first)
+
+    second.expire_all()
+    day = second.query(ApiUsageRollup).filter(ApiUsageRollup.granularity == "day").one()
+    assert day.request_count == 3
+    first.close()
+    second.close()
+    engine.dispose()
+
+
+def test_rollup_accumulates_into_existing_rows(db, meter):
+    """Opakovaný rollup pripočíta do existujúcich bucketov"""
+    now = datetime(2026, 1, 1, 8, 15)
+    meter.record(2, now=now)
+    metering.rollup_usage(db)
+    meter.record(2, now=now)
+    metering.rollup_usage(db)
+
+    day = db.query(ApiUsageRollup).filter(ApiUsageRollup.granularity == "day").one()
+    assert day.request_count == 2
+    assert metering.get_usage_by_key(db, now - timedelta(days=1)) == {2: 2}
+
+
+def test_day_counter_seeded_from_rollups(db, meter, monkeypatch):
+    """Po reštarte procesu sa denné počítadlo obnoví z day rollupu"""
+    now = datetime.utcnow()
+    db.add(
+        ApiUsageRollup(
+            api_key_id=9,
+            granularity="day",
+            bucket_start=metering.bucket_start(now, "day"),
+            request_count=41,
+        )
+    )
+    db.commit()
+
+    allowed, info = meter.record(9, daily_quota=42, now=now)
+    assert allowed and info["remaining"] == 0
+    allowed, _ = meter.record(9, daily_quota=42, now=now)
+    assert not allowed
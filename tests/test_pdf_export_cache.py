@@ -0,0 +1,79 @@
+"""
+Testy pre PDF render pipeline (predkompilované šablóny, memoizácia)
+"""
+
+import os
+import sys
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+pytest.importorskip("jinja2")
+
+from services import pdf_export_service
+from services.pdf_export_service import REPORT_TYPES, PDFExportService, RenderedPdfCache
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_export_service, "PDF_TEMPLATE_CACHE_DIR", str(tmp_path / "jinja"))
+    monkeypatch.setattr(pdf_export_service, "_pdf_cache", RenderedPdfCache())
+    svc = PDFExportService(template_dir=str(tmp_path / "missing"))
+    renders = []
+
+    def fake_render(html, document_type):
+        renders.append(document_type)
+        return f"{document_type}:{len(renders)}".encode()
+
+    svc._render_pdf = fake_render
+    svc.renders = renders
+    return svc
+
+
+def test_all_report_types_have_compiled_templates(service):
+    """Všetkých šesť šablón je skompilovaných vopred (fallback zdieľa jednu)"""
+    assert set(service.templates) == set(REPORT_TYPES)
+    assert len({id(t) for t in service.templates.values()}) == 1
+
+
+def test_rendered_pdf_is_memoized_by_input(service):
+    """Rovnaký vstup -> PDF z cache, iný vstup -> nový render"""
+    companies = [{"identifier": "1", "risk_score": 3}]
+    first = service.generate_executive_summary(companies, {"user_id": 1, "export_time": "t1"})
+    again = service.generate_executive_summary(companies, {"user_id": 1, "export_time": "t2"})
+    other = service.generate_executive_summary(companies, {"user_id": 2})
+
+    assert first == again
+    assert other != first
+    assert service.renders == ["executive_summary", "executive_summary"]
+    assert pdf_export_service.get_pdf_cache_stats()["hits"] == 1
+
+
+def test_memo_key_includes_report_type(service):
+    """Rovnaký vstup pre iný typ reportu sa renderuje zvlášť"""
+    companies = [{"identifier": "1", "risk_score": 3}]
+    service.generate_risk_assessment(companies, {})
+    service.generate_comparative_analysis(companies, [])
+    assert service.renders == ["risk_assessment", "comparative_analysis"]
+
+
+def test_cache_evicts_by_size():
+    cache = RenderedPdfCache(ttl_seconds=60, max_bytes=10)
+    cache.set("a", b"12345")
+    cache.set("b", b"12345")
+    cache.set("c", b"12345")
+    assert cache.get("a") is None
+    assert cache.get("c") == b"12345"
+    assert cache.stats()["size_bytes"] == 10
+
+
+def test_stylesheet_parsed_once_per_process(monkeypatch):
+    """CSS a fonty sa parsujú len pri prvom renderi"""
+    pytest.importorskip("weasyprint")
+    monkeypatch.setattr(pdf_export_service, "_stylesheet", None)
+    first = pdf_export_service.get_stylesheet("body { color: red; }")
+    assert pdf_export_service.get_stylesheet("body { color: red; }") is first
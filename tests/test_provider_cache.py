@@ -0,0 +1,115 @@
+"""
+Testy pre spoločnú cache výsledkov providerov (TTL, negatívna cache, LRU/bajtové limity)
+"""
+
+import os
+import sys
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import pl_krs, provider_cache as provider_cache_module, sk_rpo
+from services.provider_cache import MISS, ProviderCache, provider_cache
+
+
+@pytest.fixture
+def cache():
+    return ProviderCache(max_items=3, max_bytes=10_000, negative_ttl_seconds=60, use_redis=False)
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """Singleton bez Redis, vyčistený pred aj po teste"""
+    monkeypatch.setattr(provider_cache, "_redis_enabled", False)
+    provider_cache.clear()
+    yield provider_cache
+    provider_cache.clear()
+
+
+def test_hit_miss_and_negative(cache):
+    assert cache.get("krs_pl", "123456789") is MISS
+    cache.set("krs_pl", "123456789", {"name": "Spółka"})
+    cache.set_not_found("krs_pl", "000000000")
+
+    assert cache.get("krs_pl", "123456789") == {"name": "Spółka"}
+    assert cache.get("krs_pl", "000000000") is None
+    stats = cache.get_stats("krs_pl")
+    assert (stats["hits"], stats["negative_hits"], stats["misses"], stats["items"]) == (1, 1, 1, 2)
+
+
+def test_ttl_expiry(cache, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(provider_cache_module, "time", Mock(monotonic=lambda: clock[0]))
+    cache.set("biala_pl", "1234567890", {"vat": "Czynny"})
+    cache.set("biala_pl", "short", {"vat": "x"}, ttl=timedelta(seconds=10))
+    cache.set_not_found("biala_pl", "missing")
+
+    clock[0] += 61  # po negatívnom TTL
+    assert cache.get("biala_pl", "missing") is MISS
+    assert cache.get("biala_pl", "short") is MISS
+    assert cache.get("biala_pl", "1234567890") == {"vat": "Czynny"}
+
+    clock[0] += 12 * 3600  # po TTL providera (12 h)
+    assert cache.get("biala_pl", "1234567890") is MISS
+
+
+def test_lru_and_byte_bounds(cache):
+    for ico in ("1", "2", "3"):
+        cache.set("rpo_sk", ico, {"ico": ico})
+    cache.get("rpo_sk", "1")  # "1" je najnovšie použitý
+    cache.set("rpo_sk", "4", {"ico": "4"})
+    assert cache.get("rpo_sk", "2") is MISS
+    assert cache.get("rpo_sk", "1") == {"ico": "1"}
+
+    cache.set("ruz_sk", "big", {"blob": "x" * 9_000})
+    stats = cache.get_stats()
+    assert stats["bytes"] <= 10_000 and stats["items"] <= 3
+    assert cache.get("ruz_sk", "big") is not MISS
+    assert stats["providers"]["rpo_sk"]["evictions"] >= 2
+
+    cache.set("ruz_sk", "huge", {"blob": "x" * 20_000})  # väčší ako celá cache
+    assert cache.get("ruz_sk", "huge") is MISS
+
+
+def test_redis_l2_shared_between_workers(monkeypatch):
+    store = {}
+    monkeypatch.setattr(provider_cache_module, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(provider_cache_module, "get_redis_client", lambda: object())
+    monkeypatch.setattr(provider_cache_module, "redis_set", lambda key, value, ttl: store.__setitem__(key, value))
+    monkeypatch.setattr(provider_cache_module, "redis_get", lambda key: store.get(key))
+
+    worker_a, worker_b = ProviderCache(), ProviderCache()
+    worker_a.set("nav_hu", "12345678", {"name": "Kft."})
+    worker_a.set_not_found("nav_hu", "99999999")
+
+    assert worker_b.get("nav_hu", "12345678") == {"name": "Kft."}
+    assert worker_b.get("nav_hu", "99999999") is None
+    assert worker_b.get_stats("nav_hu")["l2_hits"] == 2
+
+
+def test_provider_negative_caches_404(shared_cache, monkeypatch):
+    response = Mock(status_code=404)
+    get = Mock(return_value=response)
+    monkeypatch.setattr(sk_rpo.requests, "get", get)
+
+    assert sk_rpo.fetch_rpo_sk("12345678") is None
+    assert sk_rpo.fetch_rpo_sk("12345678") is None
+    assert get.call_count == 1
+    assert sk_rpo.get_cache_stats()["negative_hits"] == 1
+
+
+def test_provider_caches_success(shared_cache, monkeypatch):
+    response = Mock(status_code=200)
+    response.json.return_value = {"krs": "0000123456"}
+    monkeypatch.setattr(pl_krs, "make_request_with_proxy", Mock(return_value=response))
+
+    assert pl_krs.fetch_krs_pl("0000123456") == {"krs": "0000123456"}
+    assert pl_krs.fetch_krs_pl("0000123456") == {"krs": "0000123456"}
+    assert pl_krs.make_request_with_proxy.call_count == 1
+    assert pl_krs.get_cache_stats()["hits"] == 1
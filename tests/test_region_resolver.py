@@ -146,3 +146,61 @@ def test_region_resolver_coverage():
     assert success_rate >= 0.5, (
         f"Region resolver rozpoznal len {success_rate * 100:.1f}% PSČ (očakávané aspoň 50%)"
     )
+
+
+def test_index_matches_csv_and_prefix_order():
+    """Index = presné PSČ z CSV, prefix vráti prvé PSČ s prefixom v poradí CSV"""
+    from services.sk_region_resolver import _load_postal_codes_from_csv
+
+    mapping = _load_postal_codes_from_csv()
+    for code, data in list(mapping.items())[:200]:
+        assert resolve_region(code) == data
+        assert resolve_region(f"{code[:3]} {code[3:]}") == data
+
+    first_by_prefix = {}
+    for code, data in mapping.items():
+        first_by_prefix.setdefault(code[:3], data)
+    prefix, expected = next((p, d) for p, d in first_by_prefix.items() if f"{p}99" not in mapping)
+    assert resolve_region(f"{prefix}99") == expected
+    assert resolve_region(prefix) == expected
+
+
+def test_results_are_shared_and_immutable():
+    from services.sk_region_resolver import resolve_many
+
+    code = "81101"
+    first, second = resolve_region(code), resolve_region(code)
+    if first is None:
+        pytest.skip("PSČ 81101 nie je v dátach")
+    assert first is second
+    with pytest.raises(TypeError):
+        first["kraj"] = "X"
+    assert first.copy() == dict(first)
+
+    results = resolve_many([code, "", None, "811 01", "abc"])
+    assert results[0] is first and results[3] is first
+    assert results[1] is None and results[2] is None and results[4] is None
+
+
+def test_index_artifact_roundtrip(tmp_path):
+    """Artefakt sa načíta len pre rovnaké CSV"""
+    from services.sk_region_resolver import build_postal_index, load_postal_index, save_postal_index
+
+    csv_path = tmp_path / "psc.csv"
+    csv_path.write_text("postal_code,kraj,okres\n81101,Bratislavský kraj,Bratislava I\n04001,Košický,Košice I\n", encoding="utf-8")
+    index_path = str(tmp_path / "psc.idx")
+
+    save_postal_index(build_postal_index(str(csv_path)), index_path)
+    loaded = load_postal_index(index_path, str(csv_path))
+    assert loaded.lookup("81101") == {"kraj": "Bratislavský", "okres": "Bratislava I"}
+    assert loaded.lookup("04099") == {"kraj": "Košický", "okres": "Košice I"}
+    assert loaded.lookup("99999") is None
+
+    csv_path.write_text("postal_code,kraj,okres\n81101,Iný,Iný\n", encoding="utf-8")
+    assert load_postal_index(index_path, str(csv_path)) is None
+
+
+def test_enrich_extracts_spaced_postal_code():
+    enriched = enrich_address_with_region("Hlavná 1, 811 01, Bratislava")
+    assert enriched["postal_code"] == "81101"
+    assert enriched["city"] == "Bratislava"
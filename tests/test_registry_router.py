@@ -0,0 +1,209 @@
+"""
+Testy pre registry router (routovacia tabuľka, poradie podľa ceny, batch lookup)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import watchlist
+from services.provider_cache import MISS, provider_cache
+from services.registry import (
+    BaseRegistryProvider,
+    CompanyRecord,
+    RegistryRouter,
+    RegistryUnavailableError,
+    get_registry_router,
+    record_to_graph,
+)
+from services.registry import providers
+from services.registry.fixtures import TEST_FIXTURES
+
+VALID_ICO = "25596641"  # platná kontrolná číslica SK/CZ
+INVALID_ICO = "12345678"
+HU_TAX_NUMBER = "10773381"  # törzsszám s platnou kontrolnou číslicou
+
+
+class FakeProvider(BaseRegistryProvider):
+    def __init__(self, country, lengths, cost, known=(), delay=0.0, fallback=False):
+        self.country = country
+        self.name = f"fake_{country}"
+        self.identifier_lengths = lengths
+        self.cost = cost
+        self.known = set(known)
+        self.delay = delay
+        self.fallback = fallback
+        self.calls = []
+        self._lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def fetch(self, identifier, force_refresh=False):
+        with self._lock:
+            self.calls.append(identifier)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if identifier in self.known:
+            return CompanyRecord(country=self.country, identifier=identifier, name=f"{self.country} {identifier}", source=self.name)
+        if self.fallback:
+            return CompanyRecord(country=self.country, identifier=identifier, name=f"Firma {identifier}", source="fallback", fallback=True)
+        return None
+
+
+def _router(*providers):
+    router = RegistryRouter()
+    for provider in providers:
+        router.register(provider)
+    return router
+
+
+def test_routes_by_shape_country_and_cost():
+    sk = FakeProvider("SK", (8,), cost=2, known={VALID_ICO})
+    cz = FakeProvider("CZ", (8,), cost=1)
+    hu = FakeProvider("HU", (8, 11), cost=3)
+    pl = FakeProvider("PL", (9, 10), cost=4)
+    router = _router(sk, hu, pl, cz)
+
+    assert router.candidates(VALID_ICO) == (cz, sk)  # HU kontrolná číslica nesedí
+    assert router.candidates(VALID_ICO, "sk") == (sk,)
+    assert router.candidates(INVALID_ICO) == ()
+    assert router.candidates("0000019193") == (pl,)
+    assert router.candidates(HU_TAX_NUMBER) == (hu,)
+    assert router.candidates("123") == ()
+
+    record = router.fetch(VALID_ICO)
+    assert (record.country, record.source) == ("SK", "fake_SK")
+    assert cz.calls == [VALID_ICO] and hu.calls == []
+
+
+def test_lookup_skips_registries_for_invalid_identifier():
+    cz = FakeProvider("CZ", (8,), cost=1)
+    router = _router(cz)
+
+    assert asyncio.run(router.lookup(INVALID_ICO)) is None
+    assert cz.calls == []
+
+
+def test_failing_provider_falls_through():
+    sk = FakeProvider("SK", (8,), cost=2, fallback=True)
+    router = _router(Broken("CZ", (8,), cost=1), sk)
+
+    record = router.fetch(VALID_ICO)
+    assert record.fallback and record.country == "SK"
+
+
+class Broken(FakeProvider):
+    def fetch(self, identifier, force_refresh=False):
+        raise RegistryUnavailableError(self.name, "timeout")
+
+
+def test_outage_is_not_reported_as_not_found():
+    router = _router(Broken("CZ", (8,), cost=1))
+
+    with pytest.raises(RegistryUnavailableError):
+        router.fetch(VALID_ICO, "CZ")
+    assert asyncio.run(router.lookup_many([(VALID_ICO, "CZ")])) == [None]
+    # Register, ktorý odpovedal "nepoznám", je skutočné nenájdenie
+    assert _router(FakeProvider("CZ", (8,), cost=1)).fetch(VALID_ICO, "CZ") is None
+
+
+def test_ares_transport_error_is_not_negative_cached(monkeypatch):
+    provider_cache.delete("ares_cz", VALID_ICO)
+
+    def _timeout(*args, **kwargs):
+        raise requests.Timeout("ARES timeout")
+
+    monkeypatch.setattr(providers.requests, "post", _timeout)
+    with pytest.raises(RegistryUnavailableError):
+        providers.fetch_ares_cz(VALID_ICO)
+    assert provider_cache.get("ares_cz", VALID_ICO) is MISS
+
+    class NotFound:
+        status_code = 404
+
+    monkeypatch.setattr(providers.requests, "post", lambda *args, **kwargs: NotFound())
+    assert providers.AresProvider().fetch(VALID_ICO) is None
+    assert provider_cache.get("ares_cz", VALID_ICO) is None  # negatívna cache
+    provider_cache.delete("ares_cz", VALID_ICO)
+
+
+def test_fixtures_bypass_registries():
+    router = get_registry_router()
+    record = asyncio.run(router.lookup("88888888"))
+
+    assert record.source == "fixture"
+    graph = record_to_graph(record)
+    assert graph is record.graph
+    assert {n["id"] for n in graph["nodes"]} >= {"sk_88888888", "debt_88888888", "cz_12345678"}
+    assert set(TEST_FIXTURES) == {"88888888", "35855304"}
+
+
+def test_lookup_many_dedupes_and_bounds_concurrency():
+    sk = FakeProvider("SK", (8,), cost=1, known={VALID_ICO, "00006947", "45274649"}, delay=0.05)
+    router = _router(sk)
+    items = [(VALID_ICO, "SK"), ("00006947", "sk"), (VALID_ICO, "SK"), ("45274649", None), (INVALID_ICO, None)]
+
+    records = asyncio.run(router.lookup_many(items, concurrency=2))
+
+    assert [r.identifier if r else None for r in records] == [VALID_ICO, "00006947", VALID_ICO, "45274649", None]
+    assert sorted(sk.calls) == sorted([VALID_ICO, "00006947", "45274649"])
+    assert sk.peak <= 2
+
+
+def test_resolve_references_keeps_full_records():
+    sk = FakeProvider("SK", (8,), cost=1, known={VALID_ICO})
+    router = _router(sk)
+    full = {"identifier": "00006947", "name": "Alfa s.r.o.", "country": "SK", "risk_score": 4}
+
+    resolved = asyncio.run(router.resolve_references([{"identifier": VALID_ICO, "country": "SK"}, full]))
+
+    assert resolved[0]["name"] == f"SK {VALID_ICO}" and resolved[0]["source"] == "fake_SK"
+    assert resolved[1] is full
+
+
+def test_record_graph_has_stable_ids():
+    record = CompanyRecord(
+        country="SK", identifier=VALID_ICO, name="Alfa s.r.o.", source="RPO", status="Aktívna",
+        address="Hlavná 1, 811 01 Bratislava",
+        executives=[{"name": "Ján Novák", "position": "konateľ"}, "Peter Horváth"],
+        shareholders=[{"name": "Beta a.s.", "percentage": 60}],
+        debt={"risk_score": 8, "data": {"has_debt": True, "total_debt": 1200}},
+    )
+
+    graph = record_to_graph(record, {})
+    nodes = {n["id"]: n for n in graph["nodes"]}
+
+    assert nodes[f"sk_{VALID_ICO}"]["details"] == f"IČO: {VALID_ICO}, Status: Aktívna"
+    assert nodes[f"debt_sk_{VALID_ICO}"]["label"] == "Dlh: 1,200 EUR"
+    assert nodes[f"pers_sk_{VALID_ICO}_0"]["details"] == "konateľ"
+    assert nodes[f"share_sk_{VALID_ICO}_0"]["details"] == "60% podiel"
+    assert any(n["type"] == "address" for n in graph["nodes"])
+    assert {e["type"] for e in graph["edges"]} == {"HAS_DEBT", "LOCATED_AT", "MANAGED_BY", "OWNED_BY"}
+
+    fallback = CompanyRecord(country="PL", identifier="0000019193", name="Polska Spółka 0000019193", source="fallback", fallback=True)
+    assert record_to_graph(fallback) == {
+        "nodes": [{"id": "pl_0000019193", "label": "Polska Spółka 0000019193", "type": "company", "country": "PL",
+                   "risk_score": 3, "details": "KRS: 0000019193", "ico": "0000019193"}],
+        "edges": [],
+    }
+
+
+def test_watchlist_ignores_fallback_records(monkeypatch):
+    router = _router(FakeProvider("SK", (8,), cost=1, known={VALID_ICO}, fallback=True))
+    monkeypatch.setattr("services.registry._registry_router", router)
+    fetch = watchlist._fetchers["SK"]
+
+    assert fetch(VALID_ICO)["name"] == f"SK {VALID_ICO}"
+    assert fetch("00006947") is None
@@ -0,0 +1,97 @@
+"""
+Testy pre retention search_history/analytics (mesačné partície, archív pred zmazaním)
+"""
+
+import importlib.util
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import retention
+from services.database import Analytics, SearchHistory
+
+TODAY = date(2026, 10, 19)
+
+
+@pytest.fixture
+def db(db):
+    for ts in (datetime(2025, 8, 3, 10), datetime(2025, 9, 30, 23), datetime(2025, 10, 1), datetime(2026, 10, 1)):
+        db.add(SearchHistory(query="x", country="SK", user_ip="1.1.1.1", search_timestamp=ts))
+        db.add(Analytics(event_type="search", event_data={"endpoint": "/api/search"}, timestamp=ts))
+    db.commit()
+    return db
+
+
+def test_month_helpers():
+    assert retention.add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert retention.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert retention.partition_name("analytics", date(2026, 3, 1)) == "analytics_y2026m03"
+    assert retention.partition_month("search_history_y2025m12") == date(2025, 12, 1)
+    assert retention.partition_month("search_history_default") is None
+
+
+def test_retention_cutoff(monkeypatch):
+    monkeypatch.setitem(retention.RETENTION_MONTHS, "search_history", 12)
+    assert retention.retention_cutoff("search_history", TODAY) == date(2025, 10, 1)
+    monkeypatch.setitem(retention.RETENTION_MONTHS, "search_history", 0)
+    assert retention.retention_cutoff("search_history", TODAY) is None
+
+
+def test_retention_is_opt_in(db, monkeypatch):
+    """Bez env premenných sa po upgrade nič nemaže"""
+    monkeypatch.delenv("SEARCH_HISTORY_RETENTION_MONTHS", raising=False)
+    monkeypatch.delenv("ANALYTICS_RETENTION_MONTHS", raising=False)
+    spec = importlib.util.spec_from_file_location("retention_defaults", retention.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    assert module.RETENTION_MONTHS == {"search_history": 0, "analytics": 0}
+    report = module.apply_retention(db, today=TODAY, archive=False)
+
+    assert report["search_history"]["deleted"] == 0 and report["analytics"]["deleted"] == 0
+    assert db.query(SearchHistory).count() == 4 and db.query(Analytics).count() == 4
+
+
+def test_sqlite_falls_back_to_range_delete(db, monkeypatch):
+    monkeypatch.setitem(retention.RETENTION_MONTHS, "search_history", 12)
+    monkeypatch.setitem(retention.RETENTION_MONTHS, "analytics", 0)
+
+    report = retention.apply_retention(db, today=TODAY, archive=False)
+
+    assert report["search_history"] == {"partitioned": False, "deleted": 2}
+    assert report["analytics"] == {"partitioned": False, "deleted": 0}
+    assert sorted(r.search_timestamp for r in db.query(SearchHistory)) == [datetime(2025, 10, 1), datetime(2026, 10, 1)]
+    assert db.query(Analytics).count() == 4
+
+
+def test_archive_before_delete(db, monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from services.columnar_export import partition_path
+
+    monkeypatch.setitem(retention.RETENTION_MONTHS, "analytics", 12)
+    deleted = retention.delete_expired_rows(db, "analytics", today=TODAY, archive=True, base_dir=str(tmp_path))
+
+    assert deleted == 2
+    assert pq.read_table(partition_path("analytics", date(2025, 8, 3), str(tmp_path))).num_rows == 1
+    assert pq.read_table(partition_path("analytics", date(2025, 9, 30), str(tmp_path))).num_rows == 1
+    assert os.path.exists(partition_path("analytics", date(2025, 9, 1), str(tmp_path)))
+
+
+def test_failed_archive_keeps_rows(db, monkeypatch):
+    monkeypatch.setitem(retention.RETENTION_MONTHS, "search_history", 12)
+
+    def _fail(*args, **kwargs):
+        raise ImportError("pyarrow nie je nainštalovaný")
+
+    monkeypatch.setattr(retention, "archive_month", _fail)
+    assert retention.delete_expired_rows(db, "search_history", today=TODAY, archive=True) == 0
+    assert db.query(SearchHistory).count() == 4
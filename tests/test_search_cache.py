@@ -0,0 +1,86 @@
+"""
+Testy pre pre-serializovanú cache /api/search (JSON bajty bez validácie pri hite)
+"""
+
+import json
+import os
+import sys
+from datetime import timedelta
+
+from fastapi.testclient import TestClient
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+import main
+import services.cache as cache
+from services.cache import TieredCache, dumps_json
+from services.provider_cache import MISS, provider_cache
+from services.registry import BaseRegistryProvider, RegistryRouter, RegistryUnavailableError
+
+FIXTURE_ICO = "88888888"
+
+
+def test_bytes_roundtrip_and_legacy_entries():
+    tiered = TieredCache()
+    tiered._redis_enabled = False
+
+    tiered.set("graph", b'{"nodes":[],"edges":[]}')
+    assert tiered.get_bytes("graph") == b'{"nodes":[],"edges":[]}'
+
+    # Záznam uložený pred zmenou (dict) sa vráti ako JSON bajty
+    tiered.set("legacy", {"nodes": [{"id": "sk_1", "label": "Alfa"}], "edges": []})
+    assert json.loads(tiered.get_bytes("legacy")) == {"nodes": [{"id": "sk_1", "label": "Alfa"}], "edges": []}
+
+    tiered.set("expired", b"{}", ttl=timedelta(seconds=-1))
+    assert tiered.get_bytes("expired") is None
+    assert dumps_json({"label": "Žilina"}).decode("utf-8") == '{"label":"Žilina"}'
+
+
+def test_l2_returns_raw_bytes(monkeypatch):
+    tiered = TieredCache()
+    monkeypatch.setattr(tiered, "_is_redis_active", lambda: True)
+    # decode_responses=True - Redis vracia str, nie dict z json.loads
+    monkeypatch.setattr(cache, "redis_get_raw", lambda key: '{"nodes":[],"edges":[]}')
+
+    assert tiered.get_bytes("graph") == b'{"nodes":[],"edges":[]}'
+    assert tiered._l1_cache["graph"][0] == b'{"nodes":[],"edges":[]}'
+
+
+def test_cache_hit_skips_validation(monkeypatch):
+    client = TestClient(main.app)
+    cache.delete(cache.get_cache_key(FIXTURE_ICO, "search"))
+
+    miss = client.get(f"/api/search?q={FIXTURE_ICO}")
+    assert miss.status_code == 200
+    assert {n["id"] for n in miss.json()["nodes"]} >= {"sk_88888888", "debt_88888888"}
+
+    # Hit nesmie siahnuť na validátor grafu
+    monkeypatch.setattr(main, "graph_adapter", None)
+    hit = client.get(f"/api/search?q={FIXTURE_ICO}")
+    assert hit.status_code == 200
+    assert hit.headers["content-type"] == "application/json"
+    assert hit.content == miss.content
+
+
+def test_registry_outage_returns_503_without_negative_cache(monkeypatch):
+    class DownProvider(BaseRegistryProvider):
+        country = "CZ"
+        name = "ARES"
+        identifier_lengths = (8,)
+
+        def fetch(self, identifier, force_refresh=False):
+            raise RegistryUnavailableError(self.name, "timeout")
+
+    router = RegistryRouter()
+    router.register(DownProvider())
+    monkeypatch.setattr("services.registry._registry_router", router)
+    cache.delete(cache.get_cache_key("25596641", "search"))
+    provider_cache.delete("search", "CZ:25596641")
+
+    response = TestClient(main.app).get("/api/search?q=25596641&country=CZ")
+
+    assert response.status_code == 503
+    assert provider_cache.get("search", "CZ:25596641") is MISS
@@ -0,0 +1,53 @@
+"""
+Testy pre rýchly štart aplikácie (lazy importy ťažkých závislostí, -X importtime budget)
+"""
+
+import os
+import subprocess
+import sys
+
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+
+# Knižnice, ktoré sa smú načítať až pri prvom requeste, ktorý ich potrebuje
+LAZY_MODULES = ("pandas", "numpy", "pyarrow", "openpyxl", "weasyprint", "stripe", "bs4", "aiohttp")
+
+# Kumulatívny čas importu main.py (µs) - veľkorysý strop pre pomalé CI
+IMPORT_BUDGET_US = int(os.getenv("STARTUP_IMPORT_BUDGET_US", "3000000"))
+
+
+def _importtime():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=backend_path,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "STARTUP_WORKER_DELAY_SECONDS": "3600"},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_main_import_skips_heavy_dependencies_and_fits_budget():
+    modules = _importtime()
+
+    assert "main" in modules
+    loaded = [name for name in LAZY_MODULES if name in modules]
+    assert loaded == [], f"Ťažké závislosti načítané pri importe main.py: {loaded}"
+    assert modules["main"] < IMPORT_BUDGET_US, f"import main trval {modules['main'] / 1000:.0f} ms"
+
+
+def test_routers_are_mounted():
+    if backend_path not in sys.path:
+        sys.path.insert(0, backend_path)
+    from main import app
+
+    paths = set(app.openapi()["paths"])
+    assert {"/api/export/batch", "/api/v2/export/jobs", "/api/enterprise/erp/connect",
+            "/api/analytics/query", "/api/payment/checkout", "/api/search"} <= paths
@@ -0,0 +1,129 @@
+"""
+Testy pre streamovaný export (write-only Excel, CSV/NDJSON generátory)
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from services import export_service
+from services.database import Base, FavoriteCompany
+from services.export_service import (
+    BATCH_HEADERS,
+    company_row,
+    export_batch_to_excel,
+    export_to_excel,
+    iter_favorite_companies,
+    stream_companies,
+    stream_csv,
+    stream_ndjson,
+)
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def _companies(n):
+    for i in range(n):
+        yield {
+            "company_data": {"ico": f"{i:08d}", "name": f"Firma {i} s.r.o.", "country": "SK"},
+            "risk_score": i % 10,
+            "notes": "",
+        }
+
+
+def test_batch_excel_roundtrip_with_sampled_widths():
+    """Write-only workbook je čitateľný a šírky sú odhadnuté zo vzorky"""
+    companies = list(_companies(5))
+    companies[0]["company_data"]["name"] = "X" * 80
+
+    wb = openpyxl.load_workbook(io.BytesIO(export_batch_to_excel(companies)))
+    ws = wb["Batch Export"]
+    rows = list(ws.iter_rows(values_only=True))
+    assert list(rows[0]) == BATCH_HEADERS
+    assert rows[2][0] == "00000001"
+    assert len(rows) == 6
+    assert ws.column_dimensions["B"].width == 50  # strop šírky
+
+
+def test_graph_excel_keeps_summary_sheet():
+    """Grafový export má nodes, vzťahy a súhrn s typmi"""
+    graph = {
+        "nodes": [{"id": "1", "type": "company", "label": "A"}, {"id": "2", "type": "person", "label": "B"}],
+        "edges": [{"source": "1", "target": "2", "type": "OWNED_BY"}],
+    }
+    wb = openpyxl.load_workbook(io.BytesIO(export_to_excel(graph)))
+    assert wb.sheetnames == ["Výsledky vyhľadávania", "Vzťahy", "Súhrn"]
+    summary = {row[0]: row[1] for row in wb["Súhrn"].iter_rows(min_row=2, values_only=True)}
+    assert summary["Celkový počet nodov"] == 2
+    assert summary["company"] == 1
+    assert summary["OWNED_BY"] == 1
+
+
+def test_csv_and_ndjson_are_chunked(monkeypatch):
+    """Generátory vracajú viac chunkov a dáta sa dajú spätne načítať"""
+    monkeypatch.setattr(export_service, "EXPORT_CHUNK_SIZE", 256)
+
+    chunks = list(stream_csv(BATCH_HEADERS, (company_row(c) for c in _companies(50))))
+    assert len(chunks) > 1
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert rows[0] == BATCH_HEADERS
+    assert len(rows) == 51
+
+    lines = b"".join(stream_ndjson({"i": i} for i in range(50))).decode().splitlines()
+    assert [json.loads(line)["i"] for line in lines] == list(range(50))
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        stream_companies([], "pdf")
+
+
+def test_csv_memory_is_flat():
+    """Peak pamäť pri CSV nezávisí od počtu riadkov"""
+    def peak(n):
+        tracemalloc.start()
+        for _ in stream_companies(_companies(n), "csv")[0]:
+            pass
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    small, large = peak(1_000), peak(20_000)
+    assert large < small * 2
+
+
+def test_favorites_streamed_from_db(monkeypatch):
+    """Obľúbené firmy sa čítajú z DB kurzora po chunkoch"""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(25):
+        session.add(FavoriteCompany(user_id=1, company_identifier=str(i), company_name=f"F{i}", country="SK"))
+    session.add(FavoriteCompany(user_id=2, company_identifier="x", company_name="Other", country="CZ"))
+    session.commit()
+
+    @contextmanager
+    def _session():
+        yield session
+
+    monkeypatch.setattr(export_service, "get_db_session", _session)
+
+    stream, media_type, _ = stream_companies(iter_favorite_companies(1, chunk_size=10), "ndjson")
+    records = [json.loads(line) for line in b"".join(stream).decode().splitlines()]
+    assert media_type == "application/x-ndjson"
+    assert [r["identifier"] for r in records] == [str(i) for i in range(25)]
+    session.close()
@@ -0,0 +1,210 @@
+"""
+Testy pre watchlist monitoring (hash skip, diff, change eventy cez webhooky)
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import watchlist, webhooks
+from services.auth import User, UserTier
+from services.database import FavoriteCompany
+from services.watchlist import (
+    WATCHLIST_EVENT,
+    OutboundBudget,
+    WatchedCompany,
+    WatchlistChange,
+    compact_snapshot,
+    diff_snapshots,
+    get_user_watchlist_changes,
+    run_watchlist_check,
+)
+from services.webhooks import WebhookOutbox, create_webhook
+
+
+@pytest.fixture
+def db(db, patch_db_session, monkeypatch):
+    monkeypatch.setattr(watchlist, "_favorites_synced_at", None)
+    for email in ("a@test.sk", "b@test.sk"):
+        db.add(User(email=email, hashed_password="x", tier=UserTier.ENTERPRISE))
+    db.commit()
+    return patch_db_session(db, watchlist)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fake register - počíta fetch volania"""
+    data = {
+        "12345678": {
+            "name": "Alfa s.r.o.",
+            "status": "Aktívna",
+            "address": "Hlavná 1, 811 01 Bratislava",
+            "executives": ["Ján Novák"],
+            "risk_score": 3,
+        },
+        "87654321": {"name": "Beta a.s.", "status": "Aktívna", "executives": [], "risk_score": 2},
+    }
+    calls = []
+
+    def fetch(identifier):
+        calls.append(identifier)
+        return dict(data[identifier]) if identifier in data else None
+
+    monkeypatch.setitem(watchlist._fetchers, "SK", fetch)
+    return data, calls
+
+
+def _favorite(db, user_id, identifier, company_data=None, created_at=None):
+    db.add(FavoriteCompany(
+        user_id=user_id,
+        company_identifier=identifier,
+        company_name=identifier,
+        country="SK",
+        company_data=company_data,
+        created_at=created_at or datetime.utcnow(),
+    ))
+    db.commit()
+
+
+def _check(db, now):
+    return asyncio.run(run_watchlist_check(now=now, budget=OutboundBudget(rate=1000, burst=1000)))
+
+
+def test_snapshot_diff():
+    old = compact_snapshot({"status": "Aktívna", "executives": ["A", {"name": "B"}], "address": "ul. Hlavná 1, 81101 BA"}, "SK")
+    new = compact_snapshot({"status": "v likvidácii", "executives": ["B", "C"], "address": "Hlavná 1, 811 01 Bratislava"}, "SK")
+    assert diff_snapshots(old, new) == [
+        {"field": "status", "old": "Aktívna", "new": "v likvidácii"},
+        {"field": "executives", "added": ["C"], "removed": ["A"]},
+    ]
+
+
+def test_changes_detected_and_pushed(db, registry):
+    data, calls = registry
+    create_webhook(db, user_id=1, url="https://a.example/hook", events=[WATCHLIST_EVENT])
+    create_webhook(db, user_id=2, url="https://b.example/hook", events=["new_risk_score"])
+    _favorite(db, 1, "12345678", {"name": "Alfa s.r.o.", "status": "Aktívna"})
+    _favorite(db, 2, "12345678")
+    _favorite(db, 2, "87654321")
+    now = datetime(2026, 1, 1, 12)
+
+    # Prvý beh: seed snapshot z obľúbených sa zhoduje s registrom -> žiadna zmena
+    stats = _check(db, now)
+    assert stats == {"checked": 2, "unchanged": 2, "changed": 0, "failed": 0, "events": 0}
+    assert sorted(calls) == ["12345678", "87654321"]  # jeden fetch per firma
+
+    # Pred recheck intervalom sa nič nesťahuje
+    assert _check(db, now + timedelta(hours=1))["checked"] == 0
+
+    data["12345678"]["status"] = "v likvidácii"
+    data["12345678"]["executives"] = ["Eva Malá"]
+    stats = _check(db, now + timedelta(days=1))
+    assert stats == {"checked": 2, "unchanged": 1, "changed": 1, "failed": 0, "events": 1}
+
+    change = db.query(WatchlistChange).one()
+    assert change.changes == [
+        {"field": "status", "old": "Aktívna", "new": "v likvidácii"},
+        {"field": "executives", "added": ["Eva Malá"], "removed": ["Ján Novák"]},
+    ]
+    outbox = db.query(WebhookOutbox).one()  # user 2 neodoberá company_changed
+    assert outbox.payload["data"]["company_identifier"] == "12345678"
+    favorite = db.query(FavoriteCompany).filter(FavoriteCompany.user_id == 1).one()
+    assert favorite.company_data["status"] == "v likvidácii"
+
+    assert [c.id for c in get_user_watchlist_changes(db, 2)] == [change.id]
+
+
+def test_change_is_not_recorded_without_its_outbox_event(db, registry, monkeypatch):
+    """Zlyhanie zápisu do outboxu vráti aj zmenu a snapshot (event sa nestratí)"""
+    data, _ = registry
+    create_webhook(db, user_id=1, url="https://a.example/hook", events=[WATCHLIST_EVENT])
+    _favorite(db, 1, "12345678")
+    now = datetime(2026, 1, 1, 12)
+    _check(db, now)
+    digest = db.query(WatchedCompany).one().content_hash
+
+    data["12345678"]["status"] = "v likvidácii"
+
+    enqueue = webhooks.enqueue_event
+    failures = [RuntimeError("outbox down")]
+
+    def flaky_enqueue(*args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return enqueue(*args, **kwargs)
+
+    monkeypatch.setattr(webhooks, "enqueue_event", flaky_enqueue)
+    with pytest.raises(RuntimeError):
+        _check(db, now + timedelta(days=1))
+    assert db.query(WatchlistChange).count() == 0
+    assert db.query(WatchedCompany).one().content_hash == digest
+
+    # Po expirácii leasu sa zmena zistí znova a event ide do outboxu
+    assert _check(db, now + timedelta(days=2))["events"] == 1
+    assert db.query(WebhookOutbox).count() == 1
+
+
+def test_failed_fetch_backs_off_and_orphans_removed(db, registry):
+    _favorite(db, 1, "99999999")
+    now = datetime(2026, 1, 1, 12)
+    assert _check(db, now)["failed"] == 1
+    row = db.query(WatchedCompany).one()
+    assert row.failure_count == 1 and row.next_check_at > now
+
+    # Firma bez obľúbených sa odstráni, keď príde na rad (bez fetchu)
+    db.query(FavoriteCompany).delete()
+    db.commit()
+    assert _check(db, now + timedelta(days=1))["failed"] == 0
+    assert db.query(WatchedCompany).count() == 0
+
+
+def test_claim_takes_lease_once(db, registry):
+    _favorite(db, 1, "12345678")
+    now = datetime(2026, 1, 1, 12)
+    lease_until = now + timedelta(minutes=15)
+    watchlist.sync_watchlist(db, now)
+
+    due = watchlist._claim_due(db, now, 10, lease_until)
+    assert [item["identifier"] for item in due] == ["12345678"]
+    assert watchlist._claim_due(db, now, 10, lease_until) == []  # iný worker nedostane nič
+
+    # Po expirácii leasu firmu prevezme ďalší worker - pôvodný držiteľ už nezapisuje
+    later = lease_until + timedelta(seconds=1)
+    assert len(watchlist._claim_due(db, later, 10, later + timedelta(minutes=15))) == 1
+    stats, changes = watchlist._apply_results(db, {due[0]["id"]: {"name": "Alfa s.r.o."}}, now, lease_until)
+    assert stats["checked"] == 0 and changes == []
+    assert db.query(WatchedCompany).one().last_checked_at is None
+
+
+def test_sync_reads_only_new_favorites(db, registry):
+    _favorite(db, 1, "12345678", created_at=datetime.utcnow() - timedelta(days=1))
+    assert watchlist.sync_watchlist(db)["added"] == 1
+
+    # Starý riadok sa pri ďalšom syncu už nečíta
+    db.query(WatchedCompany).delete()
+    db.commit()
+    assert watchlist.sync_watchlist(db)["added"] == 0
+
+    _favorite(db, 2, "87654321")
+    assert watchlist.sync_watchlist(db)["added"] == 1
+    assert [row.company_identifier for row in db.query(WatchedCompany)] == ["87654321"]
+
+
+def test_outbound_budget_limits_rate():
+    budget = OutboundBudget(rate=50, burst=1)
+
+    async def _acquire(n):
+        started = time.perf_counter()
+        await asyncio.gather(*(budget.acquire() for _ in range(n)))
+        return time.perf_counter() - started
+
+    assert asyncio.run(_acquire(6)) >= 0.09  # 5 tokenov po burste pri 50/s
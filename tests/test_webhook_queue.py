@@ -0,0 +1,202 @@
+"""
+Testy pre webhook outbox a dispatcher (batching, retry, dead letter)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+# Pridať backend do path
+backend_path = os.path.join(os.path.dirname(__file__), "..", "backend")
+if backend_path not in sys.path:
+    sys.path.insert(0, backend_path)
+
+from services import webhooks
+from services.auth import User, UserTier
+from services.webhooks import (
+    OUTBOX_DEAD,
+    Webhook,
+    WebhookDelivery,
+    WebhookDispatcher,
+    WebhookOutbox,
+    create_webhook,
+    enqueue_event,
+    generate_webhook_signature,
+    requeue_dead_letters,
+)
+
+
+@pytest.fixture
+def db(db, patch_db_session):
+    db.add(User(email="w@test.sk", hashed_password="x", tier=UserTier.ENTERPRISE))
+    db.commit()
+    return patch_db_session(db, webhooks)
+
+
+class FakeSender:
+    """Zaznamenáva requesty, odpovedá podľa URL"""
+
+    def __init__(self, statuses=None, delay=0.0):
+        self.statuses = statuses or {}
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, url, body, headers):
+        self.calls.append((url, json.loads(body), headers))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status_code = self.statuses.get(url, 200)
+        if isinstance(status_code, Exception):
+            raise status_code
+        return status_code, "ok"
+
+
+def _webhook(db, url, events=("company_updated",), batch=1):
+    data = create_webhook(db, 1, url, list(events), secret="s3cret", max_batch_size=batch)
+    return data["id"]
+
+
+def test_enqueue_is_filtered_by_subscription(db):
+    """Do outboxu ide len odberateľom eventu"""
+    _webhook(db, "http://a")
+    _webhook(db, "http://b", events=("new_risk_score",))
+
+    assert enqueue_event(db, "company_updated", {"ico": "1"}) == 1
+    assert db.query(WebhookOutbox).count() == 1
+
+
+def test_deliver_event_enqueues_off_the_loop(db, monkeypatch):
+    """deliver_event_to_all_webhooks zapíše outbox v threade a prebudí dispatcher"""
+    _webhook(db, "http://a")
+    woken = []
+    monkeypatch.setattr(webhooks._dispatcher, "notify", lambda: woken.append(True))
+
+    assert asyncio.run(webhooks.deliver_event_to_all_webhooks("company_updated", {"ico": "1"})) == 1
+    assert db.query(WebhookOutbox).count() == 1
+    assert woken == [True]
+
+
+def test_successful_delivery_is_signed_logged_and_removed(db):
+    """Úspešné doručenie: podpis, bulk delivery log, položka zmizne z outboxu"""
+    webhook_id = _webhook(db, "http://a")
+    enqueue_event(db, "company_updated", {"ico": "1"})
+    sender = FakeSender()
+
+    counts = asyncio.run(WebhookDispatcher(sender=sender).run_once())
+
+    assert counts == {"delivered": 1, "retried": 0, "dead_lettered": 0}
+    url, body, headers = sender.calls[0]
+    assert body["event"] == "company_updated" and body["data"] == {"ico": "1"}
+    expected = generate_webhook_signature(json.dumps(body, default=str), "s3cret")
+    assert headers["X-ILUMINATI-Signature"] == f"sha256={expected}"
+    assert db.query(WebhookOutbox).count() == 0
+    assert db.query(WebhookDelivery).filter(WebhookDelivery.success == True).count() == 1  # noqa: E712
+    assert db.get(Webhook, webhook_id).success_count == 1
+
+
+def test_batching_per_subscriber(db):
+    """Webhook s max_batch_size dostane viac eventov v jednom requeste"""
+    _webhook(db, "http://batch", batch=10)
+    for i in range(3):
+        enqueue_event(db, "company_updated", {"ico": str(i)})
+    sender = FakeSender()
+
+    counts = asyncio.run(WebhookDispatcher(sender=sender).run_once())
+
+    assert counts["delivered"] == 3
+    assert len(sender.calls) == 1
+    body = sender.calls[0][1]
+    assert body["event"] == "batch"
+    assert [e["data"]["ico"] for e in body["events"]] == ["0", "1", "2"]
+
+
+def test_retry_with_backoff_then_dead_letter(db, monkeypatch):
+    """5xx sa opakuje s backoffom, po vyčerpaní pokusov ide do dead letter"""
+    monkeypatch.setattr(webhooks, "WEBHOOK_MAX_ATTEMPTS", 2)
+    webhook_id = _webhook(db, "http://down")
+    enqueue_event(db, "company_updated", {"ico": "1"})
+    dispatcher = WebhookDispatcher(sender=FakeSender({"http://down": 503}))
+    now = datetime.utcnow()
+
+    assert asyncio.run(dispatcher.run_once(now=now))["retried"] == 1
+    item = db.query(WebhookOutbox).one()
+    assert item.attempts == 1
+    assert item.next_attempt_at >= now + timedelta(seconds=webhooks.WEBHOOK_RETRY_BASE_SECONDS)
+
+    # Pred uplynutím backoffu sa nič neposiela
+    assert asyncio.run(dispatcher.run_once(now=now))["retried"] == 0
+
+    later = item.next_attempt_at + timedelta(seconds=1)
+    assert asyncio.run(dispatcher.run_once(now=later))["dead_lettered"] == 1
+    assert db.query(WebhookOutbox).one().status == OUTBOX_DEAD
+    assert db.get(Webhook, webhook_id).failure_count == 2
+
+    assert requeue_dead_letters(db, webhook_id, 1) == 1
+    assert db.query(WebhookOutbox).one().attempts == 0
+
+
+def test_permanent_client_error_is_not_retried(db):
+    """4xx (okrem 408/429) je trvalá chyba"""
+    _webhook(db, "http://gone")
+    enqueue_event(db, "company_updated", {"ico": "1"})
+
+    counts = asyncio.run(WebhookDispatcher(sender=FakeSender({"http://gone": 404})).run_once())
+    assert counts["dead_lettered"] == 1
+
+
+def test_claim_per_endpoint_fits_in_lease(db, monkeypatch):
+    """Pomalý endpoint dostane v jednom claime len toľko, koľko stihne doručiť pred expiráciou leasu"""
+    monkeypatch.setattr(webhooks, "WEBHOOK_CLAIM_LEASE_SECONDS", 30)
+    monkeypatch.setattr(webhooks, "WEBHOOK_TIMEOUT_SECONDS", 10)
+    monkeypatch.setattr(webhooks, "WEBHOOK_PER_ENDPOINT_CONCURRENCY", 2)
+    slow = _webhook(db, "http://slow")
+    for i in range(10):
+        enqueue_event(db, "company_updated", {"ico": str(i)}, webhook_ids=[slow])
+    _webhook(db, "http://other")
+    enqueue_event(db, "company_updated", {"ico": "x"})
+
+    counts = asyncio.run(WebhookDispatcher(sender=FakeSender()).run_once())
+
+    # 2 kolá (30 s / 10 s - 1 rezerva) × 2 súbežné requesty = 4 položky pre slow, 1 pre other
+    assert counts["delivered"] == 5
+    assert db.query(WebhookOutbox).count() == 7
+
+
+def test_results_of_lost_lease_are_not_recorded(db):
+    """Ak položku počas doručovania prevezme iný worker, výsledok sa nezapíše dvakrát"""
+    _webhook(db, "http://a")
+    enqueue_event(db, "company_updated", {"ico": "1"})
+
+    class ReclaimingSender(FakeSender):
+        async def __call__(self, url, body, headers):
+            # Lease expiroval a položku claimol iný worker (session sa počas HTTP nedrží)
+            db.query(WebhookOutbox).update({WebhookOutbox.claim_token: "other-worker"})
+            db.commit()
+            return await super().__call__(url, body, headers)
+
+    counts = asyncio.run(WebhookDispatcher(sender=ReclaimingSender()).run_once())
+
+    assert counts == {"delivered": 0, "retried": 0, "dead_lettered": 0}
+    assert db.query(WebhookOutbox).one().claim_token == "other-worker"
+    assert db.query(WebhookDelivery).count() == 0
+
+
+def test_slow_subscriber_does_not_serialize_delivery(db):
+    """Doručenia bežia súbežne - throughput nezávisí od počtu odberateľov"""
+    for i in range(20):
+        _webhook(db, f"http://slow{i}")
+    enqueue_event(db, "company_updated", {"ico": "1"})
+    dispatcher = WebhookDispatcher(sender=FakeSender(delay=0.05))
+
+    started = time.perf_counter()
+    counts = asyncio.run(dispatcher.run_once())
+    elapsed = time.perf_counter() - started
+
+    assert counts["delivered"] == 20
+    assert elapsed < 0.5  # sériovo by to bolo 1 s
+    assert dispatcher.get_stats()["deliveries_per_second"] > 40